@@ -31,6 +31,7 @@ import octobot_commons.enums as commons_enums
 import octobot_commons.symbol_util as symbol_util
 import octobot_commons.databases as databases
 import octobot_backtesting.data as data
+import tentacles.Backtesting.importers.exchanges as importer_exchanges
 import tentacles.Backtesting.importers.exchanges.generic_exchange_importer as generic_exchange_importer
 
 try:
@@ -40,13 +41,18 @@ except ImportError:
 
 
 class ExchangeBotSnapshotWithHistoryCollector(collector.AbstractExchangeBotSnapshotCollector):
+    """
+    When compression is set (zstd, zlib or lzma), candles are saved in compressed blocks (see CompressedCandles).
+    Updated compressed data files are compressed again.
+    """
     IMPORTER = generic_exchange_importer.GenericExchangeDataImporter
 
     def __init__(self, config, exchange_name, tentacles_setup_config, symbols, time_frames,
                  use_all_available_timeframes=False,
                  data_format=backtesting_enums.DataFormats.REGULAR_COLLECTOR_DATA,
                  start_timestamp=None,
-                 end_timestamp=None):
+                 end_timestamp=None,
+                 compression=None):
         super().__init__(config, exchange_name, tentacles_setup_config, symbols, time_frames,
                          use_all_available_timeframes, data_format=data_format,
                          start_timestamp=start_timestamp, end_timestamp=end_timestamp)
@@ -56,6 +62,7 @@ class ExchangeBotSnapshotWithHistoryCollector(collector.AbstractExchangeBotSnaps
                                                         data_format=data_format)
         self.is_creating_database = False
         self.description = None
+        self.compression = compression
         self.set_file_path()
 
     def get_permanent_file_identifier(self):
@@ -68,6 +75,11 @@ class ExchangeBotSnapshotWithHistoryCollector(collector.AbstractExchangeBotSnaps
         self.create_database()
         await self.database.initialize()
         await self._check_database_content()
+        if not self.is_creating_database:
+            # compressed candles are updated in the OHLCV table
+            compression = await importer_exchanges.CompressedCandles.decompress_database(self.database)
+            if compression is not None and self.compression is None:
+                self.compression = compression
 
     def set_file_path(self) -> None:
         super().set_file_path()
@@ -134,6 +146,8 @@ class ExchangeBotSnapshotWithHistoryCollector(collector.AbstractExchangeBotSnaps
                         tasks = []
             if tasks:
                 await asyncio.gather(*tasks)
+            if self.compression is not None:
+                await importer_exchanges.CompressedCandles.compress_database(self.database, self.compression)
 
         except Exception as err:
             await self.database.stop()
@@ -219,48 +233,57 @@ class ExchangeBotSnapshotWithHistoryCollector(collector.AbstractExchangeBotSnaps
                 last_progress = progress_over_all_steps
         return last_progress
 
-    def find_candle(self, candles, timestamp):
-        for candle in candles:
-            if candle[-1][commons_enums.PriceIndexes.IND_PRICE_TIME.value] == timestamp:
-                return candle[-1], candle[0]
-        return None, None
-
     async def update_ohlcv(self, exchange, symbol, time_frame, time_frame_sec,
                            database_candles, current_bot_candles):
-        to_add_candles = []
+        """
+        Merges current_bot_candles into the data file: updated and new candles are saved in a single transaction
+        :param database_candles: the data file OHLCV rows of this pair
+        """
+        cryptocurrency = self.exchange_manager.exchange.get_pair_cryptocurrency(symbol)
+        database_candle_index_by_time = {
+            candle[-1][commons_enums.PriceIndexes.IND_PRICE_TIME.value]: index
+            for index, candle in enumerate(database_candles)
+        }
+        to_update_rows = []
+        to_add_rows = []
         for up_to_date_candle in current_bot_candles:
             current_candle_time = up_to_date_candle[commons_enums.PriceIndexes.IND_PRICE_TIME.value]
-            equivalent_db_candle, candle_timestamp = self.find_candle(database_candles, current_candle_time)
-            if equivalent_db_candle is None:
-                to_add_candles.append(up_to_date_candle)
-            elif equivalent_db_candle != up_to_date_candle:
-                updated_value_by_column = {
-                    "candle": json.dumps(up_to_date_candle)
-                }
-                await self.database.update(backtesting_enums.ExchangeDataTables.OHLCV,
-                                           updated_value_by_column=updated_value_by_column,
-                                           exchange_name=exchange,
-                                           cryptocurrency=self.exchange_manager.exchange.get_pair_cryptocurrency(symbol),
-                                           symbol=symbol,
-                                           time_frame=time_frame.value,
-                                           timestamp=candle_timestamp)
-        if to_add_candles:
-            await self.save_ohlcv(
-                exchange=exchange,
-                cryptocurrency=self.exchange_manager.exchange.get_pair_cryptocurrency(symbol),
-                symbol=symbol, time_frame=time_frame, candle=to_add_candles,
-                timestamp=[candle[commons_enums.PriceIndexes.IND_PRICE_TIME.value] + time_frame_sec
-                           for candle in to_add_candles],
-                multiple=True
-            )
+            try:
+                candle_timestamp, *_, equivalent_db_candle = \
+                    database_candles[database_candle_index_by_time[current_candle_time]]
+            except KeyError:
+                to_add_rows.append((current_candle_time + time_frame_sec, exchange, cryptocurrency, str(symbol),
+                                    time_frame.value, json.dumps(up_to_date_candle)))
+                continue
+            if equivalent_db_candle != up_to_date_candle:
+                to_update_rows.append((json.dumps(up_to_date_candle), exchange, cryptocurrency, str(symbol),
+                                       time_frame.value, candle_timestamp))
+        if not (to_update_rows or to_add_rows):
+            return
+        async with self.database.aio_cursor() as cursor:
+            if to_update_rows:
+                await cursor.executemany(f"UPDATE {backtesting_enums.ExchangeDataTables.OHLCV.value} "
+                                         f"SET candle = ? WHERE exchange_name = ? AND cryptocurrency = ? "
+                                         f"AND symbol = ? AND time_frame = ? AND timestamp = ?",
+                                         to_update_rows)
+            if to_add_rows:
+                await cursor.executemany(f"INSERT INTO {backtesting_enums.ExchangeDataTables.OHLCV.value} "
+                                         f"(timestamp, exchange_name, cryptocurrency, symbol, time_frame, candle) "
+                                         f"VALUES (?, ?, ?, ?, ?, ?)",
+                                         to_add_rows)
+        await self.database.connection.commit()
 
     async def _check_ohlcv_integrity(self, exchange, symbol, time_frame):
-        database_candles = await self._import_candles_from_datafile(exchange, symbol, time_frame)
         # ensure no timestamp is here twice
-        timestamps = set(candle[0] for candle in database_candles)
-        if len(timestamps) != len(database_candles):
+        async with self.database.aio_cursor() as cursor:
+            await cursor.execute(f"SELECT COUNT(*), COUNT(DISTINCT timestamp) "
+                                 f"FROM {backtesting_enums.ExchangeDataTables.OHLCV.value} "
+                                 f"WHERE exchange_name = ? AND symbol = ? AND time_frame = ?",
+                                 (exchange, str(symbol), time_frame.value))
+            candles_count, timestamps_count = await cursor.fetchone()
+        if timestamps_count != candles_count:
             self.logger.warning(f"Duplicate candles in {exchange} data file for {symbol} on {time_frame}: "
-                                f"{len(timestamps)} different timestamps for {len(database_candles)} "
+                                f"{timestamps_count} different timestamps for {candles_count} "
                                 f"different candles.")
             return False
         return True
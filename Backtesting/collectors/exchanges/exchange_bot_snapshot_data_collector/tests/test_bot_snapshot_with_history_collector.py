@@ -0,0 +1,84 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import contextlib
+import json
+import os
+
+import mock
+import pytest
+
+import octobot_backtesting.enums as enums
+import octobot_commons.enums as commons_enums
+import tests.test_utils.config as test_utils_config
+import tentacles.Backtesting.collectors.exchanges as collector_exchanges
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+EXCHANGE = "binance"
+SYMBOL = "BTC/USDT"
+TIME_FRAME = commons_enums.TimeFrames.ONE_HOUR
+TIME_FRAME_SECONDS = 3600
+
+
+@contextlib.asynccontextmanager
+async def snapshot_collector():
+    collector = collector_exchanges.ExchangeBotSnapshotWithHistoryCollector(
+        {}, EXCHANGE, test_utils_config.load_test_tentacles_config(), [SYMBOL], [TIME_FRAME]
+    )
+    collector.exchange_manager = mock.Mock(exchange=mock.Mock(get_pair_cryptocurrency=mock.Mock(return_value="BTC")))
+    collector.create_database()
+    try:
+        await collector.database.initialize()
+        yield collector
+    finally:
+        await collector.database.stop()
+        if os.path.isfile(collector.temp_file_path):
+            os.remove(collector.temp_file_path)
+
+
+def _candle(candle_time, close):
+    return [candle_time, close, close + 1, close - 1, close, 10.0]
+
+
+async def test_update_ohlcv():
+    async with snapshot_collector() as collector:
+        data_file_candles = [_candle(index * TIME_FRAME_SECONDS, 100 + index) for index in range(10)]
+        await collector.database.insert_all(enums.ExchangeDataTables.OHLCV,
+                                            timestamp=[candle[0] + TIME_FRAME_SECONDS for candle in data_file_candles],
+                                            exchange_name=EXCHANGE, cryptocurrency="BTC", symbol=SYMBOL,
+                                            time_frame=TIME_FRAME.value,
+                                            candle=[json.dumps(candle) for candle in data_file_candles])
+        # 3 overlapping candles (the first one is updated) and 2 new ones
+        bot_candles = [list(candle) for candle in data_file_candles[-3:]] + \
+            [_candle(index * TIME_FRAME_SECONDS, 200 + index) for index in range(10, 12)]
+        bot_candles[0][commons_enums.PriceIndexes.IND_PRICE_CLOSE.value] = 500
+        for _ in range(2):
+            # merging twice changes nothing
+            database_candles = await collector._import_candles_from_datafile(EXCHANGE, SYMBOL, TIME_FRAME)
+            await collector.update_ohlcv(EXCHANGE, SYMBOL, TIME_FRAME, TIME_FRAME_SECONDS,
+                                         database_candles, bot_candles)
+            assert await collector._check_ohlcv_integrity(EXCHANGE, SYMBOL, TIME_FRAME)
+            rows = await collector._import_candles_from_datafile(EXCHANGE, SYMBOL, TIME_FRAME)
+            assert len(rows) == 12
+            candles_by_time = {candle[0]: (timestamp, candle) for timestamp, *_, candle in rows}
+            assert len(candles_by_time) == 12
+            assert candles_by_time[bot_candles[0][0]] == (bot_candles[0][0] + TIME_FRAME_SECONDS, bot_candles[0])
+            assert candles_by_time[bot_candles[1][0]] == (bot_candles[1][0] + TIME_FRAME_SECONDS, bot_candles[1])
+            for candle in bot_candles[-2:]:
+                assert candles_by_time[candle[0]] == (candle[0] + TIME_FRAME_SECONDS, candle)
+            for candle in data_file_candles[:7]:
+                assert candles_by_time[candle[0]][1] == candle
@@ -1 +1,2 @@
-from .history_collector import ExchangeHistoryDataCollector
\ No newline at end of file
+from .history_collector import ExchangeHistoryDataCollector
+from .candle_gaps import find_candle_gaps, scan_data_file
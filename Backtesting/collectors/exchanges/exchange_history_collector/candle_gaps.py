@@ -0,0 +1,157 @@
+#  Drakkar-Software OctoBot
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+import octobot_backtesting.enums as backtesting_enums
+import octobot_commons.constants as commons_constants
+import octobot_commons.databases as databases
+import octobot_commons.enums as commons_enums
+import tentacles.Backtesting.importers.exchanges as importer_exchanges
+
+
+def find_candle_gaps(candle_times, time_frame_sec):
+    """
+    :param candle_times: the candles open times in seconds, in any order
+    :return: the (first, last) open times of each range of missing candles and the duplicated open times
+    """
+    candle_times = np.sort(np.asarray(candle_times, dtype=np.int64))
+    deltas = np.diff(candle_times)
+    duplicates = np.unique(candle_times[1:][deltas == 0])
+    gap_indexes = np.flatnonzero(deltas > time_frame_sec)
+    gaps = [
+        (int(candle_times[index]) + time_frame_sec, int(candle_times[index + 1]) - time_frame_sec)
+        for index in gap_indexes
+    ]
+    return gaps, duplicates.tolist()
+
+
+def get_missing_candles_count(gaps, time_frame_sec):
+    return sum((last - first) // time_frame_sec + 1 for first, last in gaps)
+
+
+async def scan_database(database):
+    """
+    Scans the candles of the OHLCV table of the given data file database
+    :return: (gaps, duplicates) of the pairs with missing or duplicated candles by (symbol, time frame value),
+    see find_candle_gaps
+    """
+    if not await database.check_table_exists(backtesting_enums.ExchangeDataTables.OHLCV):
+        return {}
+    async with database.aio_cursor() as cursor:
+        await cursor.execute(f"SELECT DISTINCT symbol, time_frame "
+                             f"FROM {backtesting_enums.ExchangeDataTables.OHLCV.value}")
+        pairs = await cursor.fetchall()
+    report = {}
+    for symbol, time_frame in pairs:
+        if time_frame == commons_enums.TimeFrames.ONE_MONTH.value:
+            # months don't have a fixed duration
+            continue
+        time_frame_sec = commons_enums.TimeFramesMinutes[commons_enums.TimeFrames(time_frame)] \
+            * commons_constants.MINUTE_TO_SECONDS
+        async with database.aio_cursor() as cursor:
+            await cursor.execute(f"SELECT {database.TIMESTAMP_COLUMN} "
+                                 f"FROM {backtesting_enums.ExchangeDataTables.OHLCV.value} "
+                                 f"WHERE symbol = ? AND time_frame = ?", (symbol, time_frame))
+            rows = await cursor.fetchall()
+        # stored timestamps are the candles close time in seconds
+        close_times = np.fromiter((row[0] for row in rows), dtype=np.float64, count=len(rows))
+        gaps, duplicates = find_candle_gaps(np.round(close_times).astype(np.int64) - time_frame_sec, time_frame_sec)
+        if gaps or duplicates:
+            report[(symbol, time_frame)] = (gaps, duplicates)
+    return report
+
+
+async def scan_data_file(file_path):
+    """
+    Compressed and shared data files are scanned in a decompressed copy
+    :return: the scan_database report of the data file
+    """
+    database = databases.SQLiteDatabase(file_path)
+    await database.initialize()
+    try:
+        is_compressed = await database.check_table_exists(importer_exchanges.CompressedCandles.BLOCKS_TABLE) \
+            or await database.check_table_exists(importer_exchanges.SharedCandles.BLOCKS_TABLE)
+        if not is_compressed:
+            return await scan_database(database)
+    finally:
+        await database.stop()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        copy_path = shutil.copy(file_path, os.path.join(temp_dir, os.path.basename(file_path)))
+        database = databases.SQLiteDatabase(copy_path)
+        await database.initialize()
+        try:
+            await importer_exchanges.CompressedCandles.decompress_database(database)
+            await importer_exchanges.SharedCandles.decompress_database(database,
+                                                                       store=importer_exchanges.SharedCandlesStore())
+            return await scan_database(database)
+        finally:
+            await database.stop()
+
+
+def get_report_lines(report):
+    lines = []
+    for (symbol, time_frame), (gaps, duplicates) in report.items():
+        time_frame_sec = commons_enums.TimeFramesMinutes[commons_enums.TimeFrames(time_frame)] \
+            * commons_constants.MINUTE_TO_SECONDS
+        lines.append(f"{symbol} {time_frame}: {len(gaps)} gaps "
+                     f"({get_missing_candles_count(gaps, time_frame_sec)} missing candles), "
+                     f"{len(duplicates)} duplicated candles")
+    return lines
+
+
+async def _repair_data_file(file_path):
+    import octobot_backtesting.api as backtesting_api
+    import octobot_tentacles_manager.api as tentacles_manager_api
+    import tentacles.Backtesting.collectors.exchanges.exchange_history_collector.history_collector as \
+        history_collector
+    description = await backtesting_api.get_file_description(os.path.basename(file_path),
+                                                             data_path=os.path.dirname(file_path))
+    collector = history_collector.ExchangeHistoryDataCollector(
+        {}, description[backtesting_enums.DataFormatKeys.EXCHANGE.value],
+        tentacles_manager_api.get_tentacles_setup_config(), [], None,
+        data_file=file_path, repair_candle_gaps=True
+    )
+    await collector.initialize()
+    await collector.start()
+    return collector.candle_gaps, collector.repaired_candles
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Finds the missing and duplicated candles of OctoBot data files.")
+    parser.add_argument("data_files", nargs="+", help="data files to scan")
+    parser.add_argument("--repair", action="store_true",
+                        help="download the missing candles from the exchange and remove the duplicated candles")
+    parsed_args = parser.parse_args(args)
+    for file_path in parsed_args.data_files:
+        if parsed_args.repair:
+            report, repaired_candles = asyncio.run(_repair_data_file(file_path))
+            lines = [f"{line}, {repaired_candles.get(pair, 0)} repaired candles"
+                     for pair, line in zip(report, get_report_lines(report))]
+        else:
+            lines = get_report_lines(asyncio.run(scan_data_file(file_path)))
+        print(f"{file_path}:" if lines else f"{file_path}: no missing or duplicated candle")
+        for line in lines:
+            print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
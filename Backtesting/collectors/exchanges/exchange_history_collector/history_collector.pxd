@@ -20,3 +20,19 @@ from octobot_backtesting.collectors.exchanges.exchange_collector cimport Abstrac
 cdef class ExchangeHistoryDataCollector(AbstractExchangeHistoryCollector):
     cdef public object exchange
     cdef public object exchange_manager
+    cdef public object data_file
+    cdef public bint columnar_candles
+    cdef public object compression
+    cdef public bint collect_trades
+    cdef public bint shared_candles
+    cdef public object shared_candles_store
+    cdef public dict shared_chunks
+    cdef public bint repair_candle_gaps
+    cdef public dict candle_gaps
+    cdef public dict repaired_candles
+    cdef public object description
+    cdef public dict checkpoints
+    cdef public dict progress_by_pair
+    cdef public bint is_resuming
+    cdef public object requests_semaphore
+    cdef public object database_lock
@@ -13,37 +13,149 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
+import asyncio
+import enum
+import json
 import logging
 import os
+import shutil
 import time
 
+import numpy as np
+
 import octobot_backtesting.collectors as collector
+import octobot_backtesting.constants as backtesting_constants
+import octobot_backtesting.data as data
 import octobot_backtesting.enums as backtesting_enums
 import octobot_backtesting.errors as errors
 import octobot_commons.constants as commons_constants
 import octobot_commons.enums as commons_enums
+import octobot_commons.symbol_util as symbol_util
 import octobot_commons.time_frame_manager as time_frame_manager
+import tentacles.Backtesting.importers.exchanges as importer_exchanges
 import tentacles.Backtesting.importers.exchanges.generic_exchange_importer as generic_exchange_importer
+import tentacles.Backtesting.collectors.exchanges.exchange_history_collector.candle_gaps as candle_gaps
 
 try:
     import octobot_trading.api as trading_api
+    import octobot_trading.enums as trading_enums
+    import octobot_trading.errors as trading_errors
 except ImportError:
     logging.error("ExchangeHistoryDataCollector requires OctoBot-Trading package installed")
 
 
 class ExchangeHistoryDataCollector(collector.AbstractExchangeHistoryCollector):
+    """
+    Collects (symbol, time frame) pairs concurrently. The last saved candle of each pair is checkpointed in the
+    collected database: an interrupted collection is resumed by the next collector of the same exchange, symbols,
+    time frames and time range.
+    When data_file is given, this existing data file is updated instead: only the candles after its last candle
+    (and before its first candle when start_timestamp is before it) are collected.
+    When columnar_candles is True, the columnar candles file of the data file is also created (see ColumnarCandlesFile).
+    When compression is set (zstd, zlib or lzma), candles are saved in compressed blocks instead
+    (see CompressedCandles). Updated compressed data files are compressed again.
+    When shared_candles is True, candles are saved in the shared candles store and the data file only keeps their
+    manifest (see SharedCandles). Candles of the complete time buckets of the store are then read from the store
+    instead of being downloaded again. Updated shared data files are shared again.
+    When collect_trades is True, public trades are also collected: they are saved by periods of the shortest time
+    frame alongside the ticker of each period (derived from its trades). Exchanges don't expose their order books
+    history.
+    When repair_candle_gaps is True, the data_file pairs are scanned for missing and duplicated candles instead
+    (see candle_gaps): only their missing candles are downloaded and duplicated candles are removed.
+    """
     IMPORTER = generic_exchange_importer.GenericExchangeDataImporter
+    # exchange requests are also spaced according to the exchange rate limit by the exchange connector
+    MAX_CONCURRENT_REQUESTS = 5
+    TRADES_PAGE_SIZE = 1000
+    ALL_TIME_FRAMES_IDENTIFIER = "all"
+
+    class HistoryCollectorTables(enum.Enum):
+        CHECKPOINTS = "checkpoints"
 
     def __init__(self, config, exchange_name, tentacles_setup_config, symbols, time_frames,
                  use_all_available_timeframes=False,
                  data_format=backtesting_enums.DataFormats.REGULAR_COLLECTOR_DATA,
                  start_timestamp=None,
-                 end_timestamp=None):
+                 end_timestamp=None,
+                 data_file=None,
+                 columnar_candles=False,
+                 compression=None,
+                 collect_trades=False,
+                 shared_candles=False,
+                 repair_candle_gaps=False):
         super().__init__(config, exchange_name, tentacles_setup_config, symbols, time_frames,
                          use_all_available_timeframes, data_format=data_format,
                          start_timestamp=start_timestamp, end_timestamp=end_timestamp)
         self.exchange = None
         self.exchange_manager = None
+        # existing data file to update
+        self.data_file = data_file
+        self.columnar_candles = columnar_candles
+        self.compression = compression
+        self.collect_trades = collect_trades
+        self.shared_candles = shared_candles
+        self.shared_candles_store = None
+        # (symbol str, time_frame value): bucket start time to complete chunk of the shared candles store
+        self.shared_chunks = {}
+        self.repair_candle_gaps = repair_candle_gaps
+        # (symbol str, time_frame value): (gaps, duplicates) of the data file pairs, see candle_gaps.find_candle_gaps
+        self.candle_gaps = {}
+        # (symbol str, time_frame value): downloaded missing candles count
+        self.repaired_candles = {}
+        self.description = None
+        # (symbol str, time_frame value): (last saved candle time in milliseconds, True when the pair is collected)
+        self.checkpoints = {}
+        # (symbol str, time_frame value): collected percent
+        self.progress_by_pair = {}
+        self.is_resuming = False
+        self.requests_semaphore = None
+        # pairs are saving their candles and checkpoints one after the other
+        self.database_lock = None
+        if self.data_file is None:
+            # the temp file of an interrupted collection is found again from the collection parameters
+            self.temp_file_path = os.path.join(
+                self.path,
+                data.get_backtesting_file_name(self.__class__, self.get_resume_file_identifier,
+                                               data_format=data_format)
+            ) + backtesting_constants.BACKTESTING_DATA_FILE_TEMP_EXT
+        else:
+            self.file_path = self.data_file if os.path.isfile(self.data_file) \
+                else os.path.join(self.path, self.data_file)
+            self.file_name = os.path.basename(self.file_path)
+            self.temp_file_path = self.file_path + backtesting_constants.BACKTESTING_DATA_FILE_TEMP_EXT
+
+    def get_resume_file_identifier(self):
+        symbols = "-".join(symbol_util.merge_symbol(str(symbol)) for symbol in self.symbols)
+        time_frames = self.ALL_TIME_FRAMES_IDENTIFIER if self.use_all_available_timeframes \
+            else "-".join(tf.value for tf in self.time_frames)
+        return backtesting_constants.BACKTESTING_DATA_FILE_SEPARATOR.join(
+            str(element)
+            for element in (self.exchange_name, symbols, time_frames, self.start_timestamp, self.end_timestamp)
+        )
+
+    async def initialize(self):
+        if self.repair_candle_gaps and self.data_file is None:
+            raise errors.DataCollectorError("Candle gaps can only be repaired in an existing data file")
+        if self.data_file is not None:
+            if not os.path.isfile(self.file_path):
+                raise errors.BacktestingFileNotFound(f"Data file to update not found: {self.file_path}")
+            # the data file is updated in a copy: it is not altered when the update fails
+            shutil.copy(self.file_path, self.temp_file_path)
+            await super().initialize()
+            try:
+                await self._check_data_file_content()
+                await self._decompress_data_file()
+                await self._restore_shared_candles()
+            except Exception:
+                await self.database.stop()
+                os.remove(self.temp_file_path)
+                raise
+            return
+        self.is_resuming = os.path.isfile(self.temp_file_path)
+        await super().initialize()
+        if self.is_resuming:
+            await self._load_checkpoints()
+            self.logger.info(f"Resuming {self.exchange_name} history collection from {self.temp_file_path}")
 
     async def start(self):
         self.should_stop = False
@@ -60,34 +172,72 @@ class ExchangeHistoryDataCollector(collector.AbstractExchangeHistoryCollector):
                 .build()
 
             self.exchange = self.exchange_manager.exchange
+            if self.shared_candles:
+                self.shared_candles_store = await importer_exchanges.SharedCandlesStore().initialize()
+            self.requests_semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+            self.database_lock = asyncio.Lock()
             self._load_timeframes_if_necessary()
 
             await self.check_timestamps()
 
             # create description
-            await self._create_description()
+            if not self.is_resuming and self.data_file is None:
+                await self._create_description()
 
             self.total_steps = len(self.time_frames) * len(self.symbols)
+            self.current_step_index = 0
+            self.progress_by_pair = {
+                (str(symbol), time_frame.value): 0
+                for symbol in self.symbols
+                for time_frame in self.time_frames
+            }
+            if self.collect_trades:
+                self.progress_by_pair.update({
+                    (str(symbol), backtesting_enums.ExchangeDataTables.RECENT_TRADES.value): 0
+                    for symbol in self.symbols
+                })
             self.in_progress = True
 
             self.logger.info(f"Start collecting history on {self.exchange_name}")
-            for symbol_index, symbol in enumerate(self.symbols):
-                self.logger.info(f"Collecting history for {symbol}...")
+            for symbol in self.symbols:
                 await self.get_ticker_history(self.exchange_name, symbol)
                 await self.get_order_book_history(self.exchange_name, symbol)
-                await self.get_recent_trades_history(self.exchange_name, symbol)
-
-                for time_frame_index, time_frame in enumerate(self.time_frames):
-                    self.current_step_index = (symbol_index * len(self.time_frames)) + time_frame_index + 1
-                    self.logger.info(
-                        f"[{time_frame_index}/{len(self.time_frames)}] Collecting {symbol} history on {time_frame}...")
-                    await self.get_ohlcv_history(self.exchange_name, symbol, time_frame)
-                    await self.get_kline_history(self.exchange_name, symbol, time_frame)
+
+            if self.repair_candle_gaps:
+                await self._repair_candle_gaps()
+            else:
+                # collect every pair before raising to checkpoint as much history as possible
+                results = await asyncio.gather(
+                    *(self._collect_pair_history(symbol, time_frame)
+                      for symbol in self.symbols
+                      for time_frame in self.time_frames),
+                    *(self.get_recent_trades_history(self.exchange_name, symbol)
+                      for symbol in self.symbols),
+                    return_exceptions=True
+                )
+                for result in results:
+                    if isinstance(result, Exception):
+                        raise result
+            if self.should_stop:
+                # stopped collections are not saved
+                raise errors.DataCollectorError(f"{self.exchange_name} history collection stopped")
+            if self.data_file is not None and not self.repair_candle_gaps:
+                await self._update_description()
+            if self.shared_candles:
+                await importer_exchanges.SharedCandles.share_database(self.database, self.shared_candles_store,
+                                                                      self.compression)
+            elif self.compression is None:
+                await self._create_columnar_candles_file_if_necessary()
+            else:
+                await importer_exchanges.CompressedCandles.compress_database(self.database, self.compression)
         except Exception as err:
             await self.database.stop()
             should_stop_database = False
+            if not self.should_stop and self.checkpoints and self.data_file is None:
+                self.logger.warning(f"Interrupted {self.exchange_name} history collection can be resumed "
+                                    f"from {self.temp_file_path}")
             # Do not keep errored data file
-            if os.path.isfile(self.temp_file_path):
+            elif os.path.isfile(self.temp_file_path):
                 os.remove(self.temp_file_path)
             if not self.should_stop:
                 self.logger.exception(err, True, f"Error when collecting {self.exchange_name} history for "
@@ -96,6 +246,14 @@ class ExchangeHistoryDataCollector(collector.AbstractExchangeHistoryCollector):
         finally:
             await self.stop(should_stop_database=should_stop_database)
 
+    async def _collect_pair_history(self, symbol, time_frame):
+        self.logger.info(f"Collecting {symbol} history on {time_frame}...")
+        await self.get_ohlcv_history(self.exchange_name, symbol, time_frame)
+        await self.get_kline_history(self.exchange_name, symbol, time_frame)
+        self.current_step_index += 1
+        self.logger.info(f"[{self.current_step_index}/{self.total_steps}] Collected {symbol} history "
+                         f"on {time_frame}")
+
     def _load_all_available_timeframes(self):
         allowed_timeframes = set(tf.value for tf in commons_enums.TimeFrames)
         self.time_frames = [commons_enums.TimeFrames(time_frame)
@@ -106,7 +264,11 @@ class ExchangeHistoryDataCollector(collector.AbstractExchangeHistoryCollector):
         self.should_stop = True
         if self.exchange_manager is not None:
             await self.exchange_manager.stop()
+        if self.shared_candles_store is not None:
+            await self.shared_candles_store.stop()
+            self.shared_candles_store = None
         if should_stop_database:
+            await self._drop_checkpoints()
             await self.database.stop()
             self.finalize_database()
         self.exchange_manager = None
@@ -114,73 +276,590 @@ class ExchangeHistoryDataCollector(collector.AbstractExchangeHistoryCollector):
         self.finished = True
         return self.finished
 
+    def finalize_database(self):
+        if os.path.isfile(self.file_path):
+            # updated data file
+            os.remove(self.file_path)
+        os.rename(self.temp_file_path, self.file_path)
+
+    async def _check_data_file_content(self):
+        self.description = await data.get_database_description(self.database)
+        found_exchange_name = self.description[backtesting_enums.DataFormatKeys.EXCHANGE.value]
+        found_symbols = self.description[backtesting_enums.DataFormatKeys.SYMBOLS.value]
+        found_time_frames = self.description[backtesting_enums.DataFormatKeys.TIME_FRAMES.value]
+        if found_exchange_name != self.exchange_name:
+            raise errors.IncompatibleDatafileError(f"Exchange name in database: {found_exchange_name}, "
+                                                   f"requested exchange: {self.exchange_name}")
+        # update every pair of the data file by default
+        if self.symbols:
+            if any(str(symbol) not in found_symbols for symbol in self.symbols):
+                raise errors.IncompatibleDatafileError(f"Pairs in database: {found_symbols}, "
+                                                       f"requested pairs: {self.symbols}")
+        else:
+            self.symbols = found_symbols
+            self.config[commons_constants.CONFIG_CRYPTO_CURRENCIES] = {"Symbols": {
+                commons_constants.CONFIG_CRYPTO_PAIRS: self.symbols}}
+        if self.time_frames and not self.use_all_available_timeframes:
+            if any(time_frame not in found_time_frames for time_frame in self.time_frames):
+                raise errors.IncompatibleDatafileError(f"Time frames in database: {found_time_frames}, "
+                                                       f"requested time frames: {self.time_frames}")
+        else:
+            self.time_frames = found_time_frames
+            self.use_all_available_timeframes = False
+        async with self.database.aio_cursor() as cursor:
+            await cursor.execute(f"CREATE INDEX IF NOT EXISTS index_{backtesting_enums.ExchangeDataTables.OHLCV.value}"
+                                 f"_symbol_time_frame_timestamp "
+                                 f"ON {backtesting_enums.ExchangeDataTables.OHLCV.value} "
+                                 f"(symbol, time_frame, timestamp)")
+        await self.database.connection.commit()
+
+    async def _update_description(self):
+        if self.description[backtesting_enums.DataFormatKeys.VERSION.value] != self.VERSION:
+            # no time range in previous versions descriptions
+            return
+        description_start_timestamp = int(self.description[backtesting_enums.DataFormatKeys.START_TIMESTAMP.value])
+        if not description_start_timestamp and self.start_timestamp is None:
+            # data file of the latest candles: no time range
+            return
+        start_timestamp = int(self.start_timestamp / 1000) if self.start_timestamp else description_start_timestamp
+        end_timestamp = int((self.end_timestamp or time.time() * 1000) / 1000)
+        await self.database.update(backtesting_enums.DataTables.DESCRIPTION,
+                                   updated_value_by_column={
+                                       "timestamp": time.time(),
+                                       "start_timestamp": min(start_timestamp, description_start_timestamp)
+                                       if description_start_timestamp else start_timestamp,
+                                       "end_timestamp": max(
+                                           end_timestamp,
+                                           int(self.description[backtesting_enums.DataFormatKeys.END_TIMESTAMP.value])
+                                       ),
+                                   },
+                                   exchange=self.exchange_name)
+
+    async def _create_columnar_candles_file_if_necessary(self):
+        columnar_candles_file_path = importer_exchanges.ColumnarCandlesFile.get_file_path(self.file_path)
+        # an updated data file keeps its columnar candles file up to date
+        if self.columnar_candles or os.path.isfile(columnar_candles_file_path):
+            await importer_exchanges.ColumnarCandlesFile.create_from_database(self.database,
+                                                                             columnar_candles_file_path)
+
+    async def _decompress_data_file(self):
+        # compressed candles are updated in the OHLCV table
+        compression = await importer_exchanges.CompressedCandles.decompress_database(self.database)
+        if compression is not None and self.compression is None:
+            self.compression = compression
+
+    async def _restore_shared_candles(self):
+        # shared candles are updated in the OHLCV table
+        store = importer_exchanges.SharedCandlesStore()
+        if await importer_exchanges.SharedCandles.decompress_database(self.database, store=store) is not None:
+            self.shared_candles = True
+
+    async def _get_stored_candles_interval(self, symbol, time_frame, time_frame_sec):
+        """
+        :return: the open time in milliseconds of the first and last stored candles
+        """
+        first_candle_close_time = (await self.database.select_min(backtesting_enums.ExchangeDataTables.OHLCV,
+                                                                  [self.database.TIMESTAMP_COLUMN],
+                                                                  symbol=str(symbol),
+                                                                  time_frame=time_frame.value))[0][0]
+        if first_candle_close_time is None:
+            return None, None
+        last_candle_close_time = (await self.database.select_max(backtesting_enums.ExchangeDataTables.OHLCV,
+                                                                 [self.database.TIMESTAMP_COLUMN],
+                                                                 symbol=str(symbol),
+                                                                 time_frame=time_frame.value))[0][0]
+        # stored timestamps are the candles close time in seconds
+        return (int(first_candle_close_time) - time_frame_sec) * 1000, \
+            (int(last_candle_close_time) - time_frame_sec) * 1000
+
     async def get_ticker_history(self, exchange, symbol):
+        # tickers are derived from trades, see get_recent_trades_history
         pass
 
     async def get_order_book_history(self, exchange, symbol):
-        pass
+        """
+        Exchanges don't expose their order books history: order books can only be collected live
+        by the ExchangeLiveDataCollector
+        """
+        self.logger.debug(f"{self.exchange_name} doesn't expose its order books history: "
+                          f"{symbol} order books are not collected")
 
     async def get_recent_trades_history(self, exchange, symbol):
-        pass
+        if not self.collect_trades:
+            return
+        trades_table = backtesting_enums.ExchangeDataTables.RECENT_TRADES
+        last_period_end, is_complete = self.checkpoints.get((str(symbol), trades_table.value), (None, False))
+        if is_complete:
+            self._set_pair_progress(symbol, trades_table, 100)
+            return
+        if self.is_resuming:
+            await self._remove_unchecked_trades(symbol, last_period_end)
+
+        first_stored_period_end = last_stored_period_end = None
+        if self.data_file is not None:
+            first_stored_period_end, last_stored_period_end = await self._get_stored_trades_interval(symbol)
+
+        try:
+            if first_stored_period_end is not None:
+                first_stored_period_start = first_stored_period_end - self._get_trades_period_ms()
+                if self.start_timestamp is not None and self.start_timestamp < first_stored_period_start:
+                    # missing head: stop before the first stored period
+                    await self._collect_trades_history(exchange, symbol, self.start_timestamp,
+                                                       first_stored_period_start - 1, False)
+                # missing tail
+                await self._collect_trades_history(exchange, symbol, last_stored_period_end, self.end_timestamp, True)
+            else:
+                await self._collect_trades_history(exchange, symbol,
+                                                   self.start_timestamp if last_period_end is None
+                                                   else last_period_end,
+                                                   self.end_timestamp, True)
+        except trading_errors.NotSupported:
+            self.logger.warning(f"{self.exchange_name} doesn't expose its trades: {symbol} trades are not collected")
+        self._set_pair_progress(symbol, trades_table, 100)
+
+    async def _collect_trades_history(self, exchange, symbol, since, end_timestamp, completes_pair):
+        """
+        Collects trades from since to end_timestamp (or now) page by page, checkpointing each saved page.
+        Trades are saved by periods of the shortest time frame once their period is complete: only the current page
+        and the trades of the current period are kept in memory.
+        When since is None, only the latest trades page is collected.
+        :param completes_pair: when True, the pair is checkpointed as collected at the end of the collection
+        """
+        period_ms = self._get_trades_period_ms()
+        end_timestamp = end_timestamp or time.time() * 1000
+        if since is not None:
+            # start at the beginning of a period to save complete periods only
+            since -= since % period_ms
+            if since > end_timestamp:
+                # nothing to collect
+                return
+        start_fetch_time = since
+        period_trades = []
+        fetched_trade_ids = set()
+        while not self.should_stop:
+            trades = await self._get_trades(symbol, since)
+            new_trades = [
+                trade
+                for trade in trades
+                if trade[trading_enums.ExchangeConstantsOrderColumns.ID.value] not in fetched_trade_ids
+                and (since is None or trade[trading_enums.ExchangeConstantsOrderColumns.TIMESTAMP.value] >= since)
+                and trade[trading_enums.ExchangeConstantsOrderColumns.TIMESTAMP.value] <= end_timestamp
+            ]
+            last_trade_timestamp = trades[-1][trading_enums.ExchangeConstantsOrderColumns.TIMESTAMP.value] \
+                if trades else None
+            # an older last trade is the exchange ignoring since
+            is_complete = since is None or last_trade_timestamp is None \
+                or not since <= last_trade_timestamp <= end_timestamp
+            periods = []
+            for trade in new_trades:
+                if period_trades and self._get_trade_period_end(trade, period_ms) \
+                        > self._get_trade_period_end(period_trades[0], period_ms):
+                    periods.append(period_trades)
+                    period_trades = []
+                period_trades.append(trade)
+            if is_complete and period_trades and \
+                    (since is None or self._get_trade_period_end(period_trades[0], period_ms) <= end_timestamp + 1):
+                # the period of the last trades is also over
+                periods.append(period_trades)
+                period_trades = []
+            await self._save_trades(exchange, symbol, periods, period_ms, is_complete and completes_pair)
+            if is_complete:
+                break
+            if not new_trades:
+                # a page of already fetched trades at this timestamp: skip the other trades of this timestamp
+                since += 1
+            else:
+                if last_trade_timestamp > since:
+                    fetched_trade_ids = set()
+                # trades of the last timestamp are fetched again in the next page
+                fetched_trade_ids.update(
+                    trade[trading_enums.ExchangeConstantsOrderColumns.ID.value]
+                    for trade in new_trades
+                    if trade[trading_enums.ExchangeConstantsOrderColumns.TIMESTAMP.value] == last_trade_timestamp
+                )
+                since = last_trade_timestamp
+            self._set_pair_progress(symbol, backtesting_enums.ExchangeDataTables.RECENT_TRADES,
+                                    round((since - start_fetch_time) / (end_timestamp - start_fetch_time) * 100)
+                                    if end_timestamp > start_fetch_time else 100)
+
+    async def _get_trades(self, symbol, since):
+        # since is a request parameter: exchanges ignoring it are detected in _collect_trades_history
+        kwargs = {} if since is None else {"since": since}
+        async with self.requests_semaphore:
+            return await self.exchange.get_recent_trades(str(symbol), limit=self.TRADES_PAGE_SIZE, **kwargs)
+
+    async def _save_trades(self, exchange, symbol, periods, period_ms, is_complete):
+        """
+        Saves the trades and the ticker of each period at the period end time in seconds and checkpoints
+        the last saved period end time
+        """
+        async with self.database_lock:
+            last_period_end = None
+            if periods:
+                cryptocurrency = self.exchange_manager.exchange.get_pair_cryptocurrency(str(symbol))
+                timestamps = [self._get_trade_period_end(trades[0], period_ms) / 1000 for trades in periods]
+                await self.save_recent_trades(timestamps, exchange, cryptocurrency, str(symbol),
+                                              [[self._get_saved_trade(trade) for trade in trades]
+                                               for trades in periods],
+                                              multiple=True)
+                await self.save_ticker(timestamps, exchange, cryptocurrency, str(symbol),
+                                       [self._get_period_ticker(str(symbol), trades, timestamp)
+                                        for trades, timestamp in zip(periods, timestamps)],
+                                       multiple=True)
+                last_period_end = self._get_trade_period_end(periods[-1][0], period_ms)
+            elif not is_complete:
+                return
+            await self._save_checkpoint(
+                symbol, backtesting_enums.ExchangeDataTables.RECENT_TRADES,
+                last_period_end or self.checkpoints.get(
+                    (str(symbol), backtesting_enums.ExchangeDataTables.RECENT_TRADES.value), (None, False)
+                )[0],
+                is_complete
+            )
+
+    def _get_trades_period_ms(self):
+        return commons_enums.TimeFramesMinutes[time_frame_manager.find_min_time_frame(self.time_frames)] \
+            * commons_constants.MINUTE_TO_SECONDS * 1000
+
+    @staticmethod
+    def _get_trade_period_end(trade, period_ms):
+        timestamp = trade[trading_enums.ExchangeConstantsOrderColumns.TIMESTAMP.value]
+        return timestamp - timestamp % period_ms + period_ms
+
+    @staticmethod
+    def _get_saved_trade(trade):
+        # saved trades timestamps are in seconds, like candles times
+        return {
+            trading_enums.ExchangeConstantsOrderColumns.ID.value:
+                trade[trading_enums.ExchangeConstantsOrderColumns.ID.value],
+            trading_enums.ExchangeConstantsOrderColumns.TIMESTAMP.value:
+                trade[trading_enums.ExchangeConstantsOrderColumns.TIMESTAMP.value] / 1000,
+            trading_enums.ExchangeConstantsOrderColumns.SIDE.value:
+                trade[trading_enums.ExchangeConstantsOrderColumns.SIDE.value],
+            trading_enums.ExchangeConstantsOrderColumns.PRICE.value:
+                trade[trading_enums.ExchangeConstantsOrderColumns.PRICE.value],
+            trading_enums.ExchangeConstantsOrderColumns.AMOUNT.value:
+                trade[trading_enums.ExchangeConstantsOrderColumns.AMOUNT.value],
+        }
+
+    @staticmethod
+    def _get_period_ticker(symbol, trades, timestamp):
+        prices = [trade[trading_enums.ExchangeConstantsOrderColumns.PRICE.value] for trade in trades]
+        base_volume = sum(trade[trading_enums.ExchangeConstantsOrderColumns.AMOUNT.value] for trade in trades)
+        quote_volume = sum(trade[trading_enums.ExchangeConstantsOrderColumns.PRICE.value]
+                           * trade[trading_enums.ExchangeConstantsOrderColumns.AMOUNT.value]
+                           for trade in trades)
+        return {
+            trading_enums.ExchangeConstantsTickersColumns.SYMBOL.value: symbol,
+            trading_enums.ExchangeConstantsTickersColumns.TIMESTAMP.value: timestamp,
+            trading_enums.ExchangeConstantsTickersColumns.OPEN.value: prices[0],
+            trading_enums.ExchangeConstantsTickersColumns.HIGH.value: max(prices),
+            trading_enums.ExchangeConstantsTickersColumns.LOW.value: min(prices),
+            trading_enums.ExchangeConstantsTickersColumns.CLOSE.value: prices[-1],
+            trading_enums.ExchangeConstantsTickersColumns.LAST.value: prices[-1],
+            trading_enums.ExchangeConstantsTickersColumns.BASE_VOLUME.value: base_volume,
+            trading_enums.ExchangeConstantsTickersColumns.QUOTE_VOLUME.value: quote_volume,
+            trading_enums.ExchangeConstantsTickersColumns.VWAP.value:
+                quote_volume / base_volume if base_volume else prices[-1],
+        }
+
+    async def _get_stored_trades_interval(self, symbol):
+        """
+        :return: the end time in milliseconds of the first and last stored trades periods
+        """
+        if not await self.database.check_table_exists(backtesting_enums.ExchangeDataTables.RECENT_TRADES):
+            return None, None
+        first_period_end = (await self.database.select_min(backtesting_enums.ExchangeDataTables.RECENT_TRADES,
+                                                           [self.database.TIMESTAMP_COLUMN],
+                                                           symbol=str(symbol)))[0][0]
+        if first_period_end is None:
+            return None, None
+        last_period_end = (await self.database.select_max(backtesting_enums.ExchangeDataTables.RECENT_TRADES,
+                                                          [self.database.TIMESTAMP_COLUMN],
+                                                          symbol=str(symbol)))[0][0]
+        # stored timestamps are the periods end time in seconds
+        return round(float(first_period_end) * 1000), round(float(last_period_end) * 1000)
 
     async def get_ohlcv_history(self, exchange, symbol, time_frame):
-        self.current_step_percent = 0
+        pair = (str(symbol), time_frame.value)
+        last_candle_timestamp, is_complete = self.checkpoints.get(pair, (None, False))
+        if is_complete:
+            self._set_pair_progress(symbol, time_frame, 100)
+            return
         # use time_frame_sec to add time to save the candle closing time
         time_frame_sec = commons_enums.TimeFramesMinutes[time_frame] * commons_constants.MINUTE_TO_SECONDS
+        time_frame_ms = time_frame_sec * 1000
+        if self.is_resuming:
+            await self._remove_unchecked_candles(symbol, time_frame, last_candle_timestamp, time_frame_sec)
 
-        if self.start_timestamp is not None:
-            first_candle_timestamp = await self.get_first_candle_timestamp(symbol, time_frame)
-            since = self.start_timestamp
-            if self.start_timestamp < first_candle_timestamp:
-                since = first_candle_timestamp
+        first_stored_candle_timestamp = last_stored_candle_timestamp = None
+        if self.data_file is not None:
+            first_stored_candle_timestamp, last_stored_candle_timestamp = \
+                await self._get_stored_candles_interval(symbol, time_frame, time_frame_sec)
 
-            if ((self.end_timestamp or time.time()*1000) - since) < (time_frame_sec * 1000):
-                return
+        if first_stored_candle_timestamp is not None:
+            if self.start_timestamp is not None and self.start_timestamp < first_stored_candle_timestamp:
+                # missing head: stop before the first stored candle
+                await self._collect_ohlcv_history(exchange, symbol, time_frame, time_frame_sec,
+                                                  self.start_timestamp, first_stored_candle_timestamp - 1,
+                                                  None, False)
+            # missing tail
+            await self._collect_ohlcv_history(exchange, symbol, time_frame, time_frame_sec,
+                                              last_stored_candle_timestamp + time_frame_ms, self.end_timestamp,
+                                              None, True)
+        elif self.start_timestamp is not None:
+            if last_candle_timestamp is None:
+                first_candle_timestamp = await self.get_first_candle_timestamp(symbol, time_frame)
+                since = self.start_timestamp
+                if self.start_timestamp < first_candle_timestamp:
+                    since = first_candle_timestamp
+                if ((self.end_timestamp or time.time()*1000) - since) < time_frame_ms:
+                    await self._save_candles(exchange, symbol, time_frame, [], time_frame_sec, since, True)
+                    self._set_pair_progress(symbol, time_frame, 100)
+                    return
+            else:
+                since = last_candle_timestamp + time_frame_ms
+            await self._collect_ohlcv_history(exchange, symbol, time_frame, time_frame_sec,
+                                              since, self.end_timestamp, last_candle_timestamp, True)
+        else:
+            candles = await self._get_symbol_prices(symbol, time_frame)
+            last_candle_timestamp = candles[-1][commons_enums.PriceIndexes.IND_PRICE_TIME.value] if candles else None
+            await self._save_candles(exchange, symbol, time_frame, candles, time_frame_sec,
+                                     last_candle_timestamp, True)
+        self._set_pair_progress(symbol, time_frame, 100)
 
-            candles = await self.exchange.get_symbol_prices(symbol, time_frame, since=since)
+    async def _collect_ohlcv_history(self, exchange, symbol, time_frame, time_frame_sec, since, end_timestamp,
+                                     last_candle_timestamp, completes_pair):
+        """
+        Collects candles from since to end_timestamp (or now), checkpointing each saved page
+        :param completes_pair: when True, the pair is checkpointed as collected at the end of the collection
+        """
+        if end_timestamp is not None and since > end_timestamp:
+            # nothing to collect
+            return
+        time_frame_ms = time_frame_sec * 1000
+        is_complete = False
+        start_fetch_time = since
+        while not self.should_stop:
+            candles = await self._get_shared_candles(symbol, time_frame, since)
+            if candles is None:
+                candles = await self._get_symbol_prices(symbol, time_frame, since=since)
+            if not candles:
+                break
+            previous_last_candle_timestamp = last_candle_timestamp
             last_candle_timestamp = candles[-1][commons_enums.PriceIndexes.IND_PRICE_TIME.value]
-            total_interval = (self.end_timestamp or (time.time()*1000)) - last_candle_timestamp
-            start_fetch_time = last_candle_timestamp
-
-            if self.end_timestamp is not None:
-                while candles[-1][commons_enums.PriceIndexes.IND_PRICE_TIME.value] > self.end_timestamp:
+            if end_timestamp is not None:
+                while candles and \
+                        candles[-1][commons_enums.PriceIndexes.IND_PRICE_TIME.value] > end_timestamp:
                     candles.pop(-1)
+            is_complete = last_candle_timestamp >= end_timestamp - time_frame_ms \
+                if end_timestamp else False
+            await self._save_candles(exchange, symbol, time_frame, candles, time_frame_sec,
+                                     last_candle_timestamp, is_complete and completes_pair)
+            if is_complete or (previous_last_candle_timestamp is not None
+                               and last_candle_timestamp <= previous_last_candle_timestamp):
+                break
+            total_interval = (end_timestamp or (time.time()*1000)) - start_fetch_time
+            self._set_pair_progress(symbol, time_frame,
+                                    round((last_candle_timestamp - start_fetch_time) / total_interval * 100)
+                                    if total_interval > 0 else 100)
+            since = last_candle_timestamp + time_frame_ms
+        if not self.should_stop and not is_complete:
+            await self._save_candles(exchange, symbol, time_frame, [], time_frame_sec,
+                                     last_candle_timestamp, completes_pair)
 
-            self.exchange.uniformize_candles_if_necessary(candles)
-            await self.save_ohlcv(exchange=exchange,
-                                  cryptocurrency=self.exchange_manager.exchange.get_pair_cryptocurrency(symbol),
-                                  symbol=symbol, time_frame=time_frame, candle=candles,
-                                  timestamp=[candle[0] + time_frame_sec for candle in candles], multiple=True)
-            candles.clear()
-
-            while since < last_candle_timestamp if not self.end_timestamp \
-                    else (last_candle_timestamp < self.end_timestamp - (time_frame_sec * 1000)):
-                since = last_candle_timestamp
-                self.current_step_percent = round((since-start_fetch_time) / total_interval * 100)
-                self.logger.info(f"[{self.current_step_percent}%] historical data fetched for {symbol} {time_frame}")
-                candles += await self.exchange.get_symbol_prices(symbol, time_frame,
-                                                                 since=(since + (time_frame_sec * 1000)))
-                if candles:
-                    last_candle_timestamp = candles[-1][commons_enums.PriceIndexes.IND_PRICE_TIME.value]
-                    if self.end_timestamp is not None:
-                        while candles[-1][commons_enums.PriceIndexes.IND_PRICE_TIME.value] > self.end_timestamp:
-                            candles.pop(-1)
+    async def _repair_candle_gaps(self):
+        """
+        Downloads the missing candles of each pair in parallel, then saves them and removes duplicated candles
+        in a single transaction
+        """
+        pairs = set((str(symbol), time_frame.value) for symbol in self.symbols for time_frame in self.time_frames)
+        self.candle_gaps = {
+            pair: gaps
+            for pair, gaps in (await candle_gaps.scan_database(self.database)).items()
+            if pair in pairs
+        }
+        self.total_steps = len(self.candle_gaps)
+        self.progress_by_pair = {pair: 0 for pair in self.candle_gaps}
+        missing_candles = await asyncio.gather(
+            *(self._get_pair_missing_candles(symbol, commons_enums.TimeFrames(time_frame), gaps)
+              for (symbol, time_frame), (gaps, _) in self.candle_gaps.items())
+        )
+        self.repaired_candles = {
+            pair: len(candles)
+            for pair, candles in zip(self.candle_gaps, missing_candles)
+        }
+        if self.should_stop:
+            return
+        ohlcv_table = backtesting_enums.ExchangeDataTables.OHLCV.value
+        async with self.database_lock:
+            async with self.database.aio_cursor() as cursor:
+                for (symbol, time_frame), (_, duplicates) in self.candle_gaps.items():
+                    if duplicates:
+                        # keep the first saved candle of each time
+                        await cursor.execute(f"DELETE FROM {ohlcv_table} WHERE symbol = ? AND time_frame = ? "
+                                             f"AND rowid NOT IN (SELECT MIN(rowid) FROM {ohlcv_table} "
+                                             f"WHERE symbol = ? AND time_frame = ? "
+                                             f"GROUP BY {self.database.TIMESTAMP_COLUMN})",
+                                             (symbol, time_frame, symbol, time_frame))
+                for (symbol, time_frame), candles in zip(self.candle_gaps, missing_candles):
+                    if not candles:
+                        continue
                     self.exchange.uniformize_candles_if_necessary(candles)
-                    await self.save_ohlcv(
-                        exchange=exchange,
-                        cryptocurrency=self.exchange_manager.exchange.get_pair_cryptocurrency(symbol),
-                        symbol=symbol, time_frame=time_frame, candle=candles,
-                        timestamp=[candle[commons_enums.PriceIndexes.IND_PRICE_TIME.value] + time_frame_sec
-                                   for candle in candles],
-                        multiple=True)
-                    candles.clear()
+                    time_frame_sec = commons_enums.TimeFramesMinutes[commons_enums.TimeFrames(time_frame)] \
+                        * commons_constants.MINUTE_TO_SECONDS
+                    cryptocurrency = self.exchange_manager.exchange.get_pair_cryptocurrency(symbol)
+                    await cursor.executemany(
+                        f"INSERT INTO {ohlcv_table} ({self.database.TIMESTAMP_COLUMN}, exchange_name, "
+                        f"cryptocurrency, symbol, time_frame, candle) VALUES (?, ?, ?, ?, ?, ?)",
+                        [(candle[commons_enums.PriceIndexes.IND_PRICE_TIME.value] + time_frame_sec,
+                          self.exchange_name, cryptocurrency, symbol, time_frame, json.dumps(candle))
+                         for candle in candles]
+                    )
+            await self.database.connection.commit()
+        for (symbol, time_frame), (gaps, duplicates) in self.candle_gaps.items():
+            self.logger.info(f"Repaired {symbol} {time_frame}: {self.repaired_candles[(symbol, time_frame)]} "
+                             f"downloaded candles for {len(gaps)} gaps, {len(duplicates)} removed duplicated candles")
+
+    async def _get_pair_missing_candles(self, symbol, time_frame, gaps):
+        candles = [
+            candle
+            for gap_candles in await asyncio.gather(*(self._get_gap_candles(symbol, time_frame, first, last)
+                                                      for first, last in gaps))
+            for candle in gap_candles
+        ]
+        self.current_step_index += 1
+        self._set_pair_progress(symbol, time_frame, 100)
+        return candles
+
+    async def _get_gap_candles(self, symbol, time_frame, first_missing_time, last_missing_time):
+        """
+        :return: the candles the exchange has between the given candles open times in seconds
+        """
+        time_frame_ms = commons_enums.TimeFramesMinutes[time_frame] * commons_constants.MINUTE_TO_SECONDS * 1000
+        since = first_missing_time * 1000
+        end_time = last_missing_time * 1000
+        candles = []
+        while not self.should_stop and since <= end_time:
+            page = [
+                candle
+                for candle in await self._get_symbol_prices(symbol, time_frame, since=since)
+                if since <= candle[commons_enums.PriceIndexes.IND_PRICE_TIME.value] <= end_time
+            ]
+            if not page:
+                # the exchange also misses these candles
+                break
+            candles += page
+            since = page[-1][commons_enums.PriceIndexes.IND_PRICE_TIME.value] + time_frame_ms
+        return candles
+
+    async def _get_shared_candles(self, symbol, time_frame, since):
+        """
+        :return: the candles from since of the first complete time bucket of the shared candles store with candles
+        from since, None when since time bucket has to be downloaded
+        """
+        if self.shared_candles_store is None:
+            return None
+        pair = (str(symbol), time_frame.value)
+        if pair not in self.shared_chunks:
+            self.shared_chunks[pair] = await self.shared_candles_store.get_complete_chunks(
+                self.exchange_name, str(symbol), time_frame.value
+            )
+        bucket_duration = self.shared_candles_store.get_bucket_duration(time_frame.value)
+        since_sec = since / 1000
+        bucket_start = since_sec - since_sec % bucket_duration
+        while bucket_start in self.shared_chunks[pair]:
+            columns = self.shared_candles_store.get_chunk_columns(*self.shared_chunks[pair][bucket_start])
+            candle_times = columns[importer_exchanges.ColumnarCandlesFile.TIMESTAMP_COLUMN]
+            start_index = int(np.searchsorted(candle_times, since_sec))
+            if start_index < len(candle_times):
+                # candles are in milliseconds like exchange candles
+                return [
+                    [candle_time * 1000, *values]
+                    for candle_time, *values in zip(*(column[start_index:].tolist()
+                                                      for column in columns.values()))
+                ]
+            # no candle from since in this complete bucket
+            bucket_start += bucket_duration
+        return None
+
+    async def _get_symbol_prices(self, symbol, time_frame, **kwargs):
+        async with self.requests_semaphore:
+            return await self.exchange.get_symbol_prices(symbol, time_frame, **kwargs)
+
+    async def _save_candles(self, exchange, symbol, time_frame, candles, time_frame_sec,
+                            last_candle_timestamp, is_complete):
+        async with self.database_lock:
+            if candles:
+                self.exchange.uniformize_candles_if_necessary(candles)
+                await self.save_ohlcv(exchange=exchange,
+                                      cryptocurrency=self.exchange_manager.exchange.get_pair_cryptocurrency(symbol),
+                                      symbol=symbol, time_frame=time_frame, candle=candles,
+                                      timestamp=[candle[commons_enums.PriceIndexes.IND_PRICE_TIME.value]
+                                                 + time_frame_sec
+                                                 for candle in candles],
+                                      multiple=True)
+            await self._save_checkpoint(symbol, time_frame, last_candle_timestamp, is_complete)
+
+    def _set_pair_progress(self, symbol, time_frame, percent):
+        self.progress_by_pair[(str(symbol), time_frame.value)] = percent
+        self.current_step_percent = sum(self.progress_by_pair.values()) / len(self.progress_by_pair)
+        self.logger.info(f"[{percent}%] historical data fetched for {symbol} {time_frame}")
+
+    def get_progress_by_pair(self):
+        return self.progress_by_pair
+
+    async def _load_checkpoints(self):
+        if not await self.database.check_table_exists(self.HistoryCollectorTables.CHECKPOINTS):
+            return
+        # a 0 timestamp is a pair without candles
+        self.checkpoints = {
+            (symbol, time_frame): (int(float(timestamp)) or None, is_complete == str(True))
+            for timestamp, symbol, time_frame, is_complete
+            in await self.database.select(self.HistoryCollectorTables.CHECKPOINTS)
+        }
+
+    async def _save_checkpoint(self, symbol, time_frame, last_candle_timestamp, is_complete):
+        pair = (str(symbol), time_frame.value)
+        if pair in self.checkpoints:
+            await self.database.update(self.HistoryCollectorTables.CHECKPOINTS,
+                                       {"timestamp": last_candle_timestamp or 0, "is_complete": is_complete},
+                                       symbol=str(symbol), time_frame=time_frame.value)
         else:
-            candles = await self.exchange.get_symbol_prices(symbol, time_frame)
-            self.exchange.uniformize_candles_if_necessary(candles)
-            await self.save_ohlcv(exchange=exchange,
-                                  cryptocurrency=self.exchange_manager.exchange.get_pair_cryptocurrency(symbol),
-                                  symbol=symbol, time_frame=time_frame, candle=candles,
-                                  timestamp=[candle[0] + time_frame_sec for candle in candles], multiple=True)
+            await self.database.insert(self.HistoryCollectorTables.CHECKPOINTS, last_candle_timestamp or 0,
+                                       symbol=str(symbol), time_frame=time_frame.value, is_complete=is_complete)
+        self.checkpoints[pair] = (last_candle_timestamp, is_complete)
+
+    async def _remove_unchecked_candles(self, symbol, time_frame, last_candle_timestamp, time_frame_sec):
+        # candles saved after the last checkpoint of an interrupted collection are fetched again
+        if not await self.database.check_table_exists(backtesting_enums.ExchangeDataTables.OHLCV):
+            return
+        # saved candles timestamps are their closing time in seconds
+        last_checked_timestamp = -1 if last_candle_timestamp is None \
+            else last_candle_timestamp / 1000 + time_frame_sec
+        async with self.database_lock, self.database.aio_cursor() as cursor:
+            await cursor.execute(f"DELETE FROM {backtesting_enums.ExchangeDataTables.OHLCV.value} "
+                                 f"WHERE symbol = ? AND time_frame = ? AND timestamp > ?",
+                                 (str(symbol), time_frame.value, last_checked_timestamp))
+        await self.database.connection.commit()
+
+    async def _remove_unchecked_trades(self, symbol, last_period_end):
+        # trades and tickers saved after the last checkpoint of an interrupted collection are fetched again
+        last_checked_timestamp = -1 if last_period_end is None else last_period_end / 1000
+        async with self.database_lock:
+            for table in (backtesting_enums.ExchangeDataTables.RECENT_TRADES,
+                          backtesting_enums.ExchangeDataTables.TICKER):
+                if await self.database.check_table_exists(table):
+                    async with self.database.aio_cursor() as cursor:
+                        await cursor.execute(f"DELETE FROM {table.value} WHERE symbol = ? AND timestamp > ?",
+                                             (str(symbol), last_checked_timestamp))
+            await self.database.connection.commit()
+
+    async def _drop_checkpoints(self):
+        # checkpoints are only useful to resume a collection
+        async with self.database.aio_cursor() as cursor:
+            await cursor.execute(f"DROP TABLE IF EXISTS {self.HistoryCollectorTables.CHECKPOINTS.value}")
+        await self.database.connection.commit()
 
     async def get_kline_history(self, exchange, symbol, time_frame):
         pass
@@ -197,5 +876,5 @@ class ExchangeHistoryDataCollector(collector.AbstractExchangeHistoryCollector):
                 raise errors.DataCollectorError("start_timestamp is higher than end_timestamp")
 
     async def get_first_candle_timestamp(self, symbol, time_frame):
-        return (await self.exchange.get_symbol_prices(symbol, time_frame, limit=1, since=0))[0]\
+        return (await self._get_symbol_prices(symbol, time_frame, limit=1, since=0))[0]\
                                             [commons_enums.PriceIndexes.IND_PRICE_TIME.value]
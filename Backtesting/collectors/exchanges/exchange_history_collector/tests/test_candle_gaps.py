@@ -0,0 +1,88 @@
+#  Drakkar-Software OctoBot
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import json
+import time
+
+import pytest
+
+import octobot_backtesting.enums as enums
+import octobot_commons.databases as databases
+import octobot_commons.enums as commons_enums
+import tentacles.Backtesting.collectors.exchanges as collector_exchanges
+import tentacles.Backtesting.importers.exchanges as importer_exchanges
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+EXCHANGE = "binance"
+SYMBOL = "BTC/USDT"
+TIME_FRAME = commons_enums.TimeFrames.ONE_HOUR
+TIME_FRAME_SEC = 3600
+
+
+async def create_data_file(file_path, candle_times):
+    database = databases.SQLiteDatabase(file_path)
+    await database.initialize()
+    try:
+        await database.insert(enums.DataTables.DESCRIPTION, timestamp=time.time(), version="1.1", exchange=EXCHANGE,
+                              symbols=json.dumps([SYMBOL]), time_frames=json.dumps([TIME_FRAME.value]),
+                              start_timestamp=0, end_timestamp=0)
+        candles = [[candle_time, 1, 2, 0.5, 1.5, 10] for candle_time in candle_times]
+        await database.insert_all(enums.ExchangeDataTables.OHLCV,
+                                  timestamp=[candle[0] + TIME_FRAME_SEC for candle in candles],
+                                  exchange_name=EXCHANGE, cryptocurrency="BTC", symbol=SYMBOL,
+                                  time_frame=TIME_FRAME.value, candle=[json.dumps(candle) for candle in candles])
+    finally:
+        await database.stop()
+
+
+async def test_find_candle_gaps():
+    assert collector_exchanges.find_candle_gaps([], 60) == ([], [])
+    assert collector_exchanges.find_candle_gaps([0, 60, 120], 60) == ([], [])
+    # unsorted times
+    assert collector_exchanges.find_candle_gaps([480, 0, 60, 60, 300, 120, 420, 480], 60) == \
+        ([(180, 240), (360, 360)], [60, 480])
+
+
+async def test_scan_data_file(tmp_path):
+    file_path = str(tmp_path / "ExchangeHistoryDataCollector_test.data")
+    candle_times = [index * TIME_FRAME_SEC for index in range(200) if index not in (10, 11, 12, 150)]
+    await create_data_file(file_path, candle_times + candle_times[50:52])
+    expected_report = {
+        (SYMBOL, TIME_FRAME.value): ([(10 * TIME_FRAME_SEC, 12 * TIME_FRAME_SEC),
+                                      (150 * TIME_FRAME_SEC, 150 * TIME_FRAME_SEC)],
+                                     candle_times[50:52])
+    }
+    assert await collector_exchanges.scan_data_file(file_path) == expected_report
+
+    # compressed data files are scanned in a decompressed copy
+    await create_data_file(str(tmp_path / "ExchangeHistoryDataCollector_compressed.data"), candle_times)
+    database = databases.SQLiteDatabase(str(tmp_path / "ExchangeHistoryDataCollector_compressed.data"))
+    await database.initialize()
+    try:
+        await importer_exchanges.CompressedCandles.compress_database(database)
+    finally:
+        await database.stop()
+    assert await collector_exchanges.scan_data_file(
+        str(tmp_path / "ExchangeHistoryDataCollector_compressed.data")
+    ) == {(SYMBOL, TIME_FRAME.value): (expected_report[(SYMBOL, TIME_FRAME.value)][0], [])}
+    database = databases.SQLiteDatabase(str(tmp_path / "ExchangeHistoryDataCollector_compressed.data"))
+    await database.initialize()
+    try:
+        # the data file is not decompressed
+        assert await database.check_table_exists(importer_exchanges.CompressedCandles.BLOCKS_TABLE)
+    finally:
+        await database.stop()
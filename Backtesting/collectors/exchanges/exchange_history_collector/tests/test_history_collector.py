@@ -14,16 +14,20 @@
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
 import pytest
+import mock
 import os
 import contextlib
 import json
 import asyncio
 
 import octobot_commons.databases as databases
+import octobot_commons.enums as commons_enums
 import octobot_backtesting.enums as enums
 import octobot_backtesting.errors as errors
+import octobot_backtesting.importers as importers
 import tests.test_utils.config as test_utils_config
 import tentacles.Backtesting.collectors.exchanges as collector_exchanges
+import tentacles.Backtesting.importers.exchanges as importer_exchanges
 import tentacles.Trading.Exchange as tentacles_exchanges
 
 # All test coroutines will be treated as marked.
@@ -35,12 +39,19 @@ BINANCE_MAX_CANDLES_COUNT = 500
 
 @contextlib.asynccontextmanager
 async def data_collector(exchange_name, tentacles_setup_config, symbols, time_frames, use_all_available_timeframes,
-                         start_timestamp=None, end_timestamp=None):
+                         start_timestamp=None, end_timestamp=None, data_file=None, columnar_candles=False,
+                         compression=None, collect_trades=False, shared_candles=False, repair_candle_gaps=False):
     collector_instance = collector_exchanges.ExchangeHistoryDataCollector(
         {}, exchange_name, tentacles_setup_config, symbols, time_frames,
         use_all_available_timeframes=use_all_available_timeframes,
         start_timestamp=start_timestamp,
-        end_timestamp=end_timestamp
+        end_timestamp=end_timestamp,
+        data_file=data_file,
+        columnar_candles=columnar_candles,
+        compression=compression,
+        collect_trades=collect_trades,
+        shared_candles=shared_candles,
+        repair_candle_gaps=repair_candle_gaps
     )
     try:
         await collector_instance.initialize()
@@ -50,6 +61,9 @@ async def data_collector(exchange_name, tentacles_setup_config, symbols, time_fr
             os.remove(collector_instance.file_path)
         if collector_instance.temp_file_path and os.path.isfile(collector_instance.temp_file_path):
             os.remove(collector_instance.temp_file_path)
+        if collector_instance.file_path and \
+                os.path.isfile(importer_exchanges.ColumnarCandlesFile.get_file_path(collector_instance.file_path)):
+            os.remove(importer_exchanges.ColumnarCandlesFile.get_file_path(collector_instance.file_path))
 
 
 @contextlib.asynccontextmanager
@@ -130,6 +144,216 @@ async def test_collect_valid_date_range():
             assert max_timestamp <= 1549843200000
 
 
+async def test_resume_collect():
+    tentacles_setup_config = test_utils_config.load_test_tentacles_config()
+    symbols = ["ETH/BTC"]
+    async with data_collector(BINANCE, tentacles_setup_config, symbols, None, True, 1549065660000, 1549670520000) \
+            as interrupted_collector:
+        calls = []
+        original_get_symbol_prices = interrupted_collector._get_symbol_prices
+
+        async def _interrupted_get_symbol_prices(*args, **kwargs):
+            calls.append(args)
+            if len(calls) > 20:
+                raise errors.DataCollectorError("interrupted")
+            return await original_get_symbol_prices(*args, **kwargs)
+
+        with mock.patch.object(interrupted_collector, "_get_symbol_prices", _interrupted_get_symbol_prices), \
+                pytest.raises(errors.DataCollectorError):
+            await interrupted_collector.start()
+        # interrupted collection is kept to be resumed
+        assert interrupted_collector.checkpoints
+        assert os.path.isfile(interrupted_collector.temp_file_path)
+        assert not os.path.isfile(interrupted_collector.file_path)
+
+        async with data_collector(BINANCE, tentacles_setup_config, symbols, None, True, 1549065660000,
+                                  1549670520000) as collector:
+            assert collector.is_resuming
+            assert collector.temp_file_path == interrupted_collector.temp_file_path
+            await collector.start()
+            assert not os.path.isfile(collector.temp_file_path)
+            assert all(progress == 100 for progress in collector.get_progress_by_pair().values())
+            async with collector_database(collector) as database:
+                ohlcv = await database.select(enums.ExchangeDataTables.OHLCV)
+                # same candles as a collection without interruption
+                assert len(ohlcv) == 16833
+                assert len(set((candle[0], candle[4]) for candle in ohlcv)) == len(ohlcv)
+                assert not await database.check_table_exists(collector.HistoryCollectorTables.CHECKPOINTS)
+
+
+async def test_update_data_file():
+    tentacles_setup_config = test_utils_config.load_test_tentacles_config()
+    symbols = ["ETH/BTC"]
+    async with data_collector(BINANCE, tentacles_setup_config, symbols, None, True, 1549324860000, 1549497660000) \
+            as collector:
+        await collector.start()
+        async with collector_database(collector) as database:
+            collected_ohlcv_count = len(await database.select(enums.ExchangeDataTables.OHLCV))
+
+        # add previous and next candles to the collected data file
+        async with data_collector(BINANCE, tentacles_setup_config, [], None, False, 1549065660000, 1549670520000,
+                                  data_file=collector.file_path) as updating_collector:
+            assert updating_collector.file_path == collector.file_path
+            assert updating_collector.symbols == symbols
+            assert updating_collector.time_frames == collector.time_frames
+            await updating_collector.start()
+            assert not os.path.isfile(updating_collector.temp_file_path)
+            async with collector_database(updating_collector) as database:
+                ohlcv = await database.select(enums.ExchangeDataTables.OHLCV)
+                assert len(ohlcv) > collected_ohlcv_count
+                # no candle is collected twice
+                assert len(set((candle[0], candle[4]) for candle in ohlcv)) == len(ohlcv)
+                h_ohlcv = await database.select(enums.ExchangeDataTables.OHLCV, time_frame="1h")
+                assert len(h_ohlcv) >= 168
+                min_timestamp = (await database.select_min(enums.ExchangeDataTables.OHLCV, ["timestamp"],
+                                                           time_frame="1m"))[0][0]*1000
+                assert min_timestamp <= 1549065720000
+                description = (await database.select(enums.DataTables.DESCRIPTION))[0]
+                assert int(description[5]) == 1549065660
+                assert int(description[6]) == 1549670520
+
+
+async def test_update_incompatible_data_file():
+    tentacles_setup_config = test_utils_config.load_test_tentacles_config()
+    async with data_collector(BINANCE, tentacles_setup_config, ["ETH/BTC"], None, True, 1549065660000,
+                              1549670520000) as collector:
+        await collector.start()
+        with pytest.raises(errors.IncompatibleDatafileError):
+            async with data_collector(BINANCE, tentacles_setup_config, ["BTC/USDT"], None, True,
+                                      data_file=collector.file_path):
+                pass
+
+
+async def test_repair_candle_gaps():
+    tentacles_setup_config = test_utils_config.load_test_tentacles_config()
+    async with data_collector(BINANCE, tentacles_setup_config, ["ETH/BTC"], [commons_enums.TimeFrames.ONE_HOUR],
+                              False, 1549324860000, 1549497660000) as collector:
+        await collector.start()
+        async with collector_database(collector) as database:
+            collected_ohlcv = await database.select(enums.ExchangeDataTables.OHLCV)
+            # remove 3 candles and duplicate 2 candles
+            async with database.aio_cursor() as cursor:
+                await cursor.execute(f"DELETE FROM {enums.ExchangeDataTables.OHLCV.value} "
+                                     f"WHERE timestamp IN (?, ?, ?)",
+                                     (collected_ohlcv[10][0], collected_ohlcv[11][0], collected_ohlcv[20][0]))
+            await database.insert_all(enums.ExchangeDataTables.OHLCV,
+                                      timestamp=[collected_ohlcv[30][0], collected_ohlcv[31][0]],
+                                      exchange_name=BINANCE, cryptocurrency="ETH", symbol="ETH/BTC",
+                                      time_frame=commons_enums.TimeFrames.ONE_HOUR.value,
+                                      candle=[collected_ohlcv[30][-1], collected_ohlcv[31][-1]])
+        report = await collector_exchanges.scan_data_file(collector.file_path)
+        gaps, duplicates = report[("ETH/BTC", commons_enums.TimeFrames.ONE_HOUR.value)]
+        assert len(gaps) == 2
+        assert len(duplicates) == 2
+
+        async with data_collector(BINANCE, tentacles_setup_config, [], None, False,
+                                  data_file=collector.file_path, repair_candle_gaps=True) as repairing_collector:
+            await repairing_collector.start()
+            assert repairing_collector.repaired_candles == {("ETH/BTC", commons_enums.TimeFrames.ONE_HOUR.value): 3}
+            assert await collector_exchanges.scan_data_file(repairing_collector.file_path) == {}
+            async with collector_database(repairing_collector) as database:
+                ohlcv = await database.select(enums.ExchangeDataTables.OHLCV)
+                assert sorted(candle[0] for candle in ohlcv) == sorted(candle[0] for candle in collected_ohlcv)
+
+
+async def test_repair_candle_gaps_without_data_file():
+    tentacles_setup_config = test_utils_config.load_test_tentacles_config()
+    with pytest.raises(errors.DataCollectorError):
+        async with data_collector(BINANCE, tentacles_setup_config, ["ETH/BTC"], None, True,
+                                  repair_candle_gaps=True):
+            pass
+
+
+async def test_collect_columnar_candles():
+    tentacles_setup_config = test_utils_config.load_test_tentacles_config()
+    async with data_collector(BINANCE, tentacles_setup_config, ["ETH/BTC"], None, True, 1549065660000,
+                              1549670520000, columnar_candles=True) as collector:
+        await collector.start()
+        columnar_candles_file_path = importer_exchanges.ColumnarCandlesFile.get_file_path(collector.file_path)
+        assert os.path.isfile(columnar_candles_file_path)
+        columnar_candles_file = importer_exchanges.ColumnarCandlesFile(columnar_candles_file_path).open()
+        try:
+            assert columnar_candles_file.ohlcv_count == 16833
+            block = columnar_candles_file.get_block(BINANCE, "ETH/BTC", "1h")
+            assert len(block.candle_times) == 168
+            async with collector_database(collector) as database:
+                assert block.select() == importers.import_ohlcvs(
+                    await database.select(enums.ExchangeDataTables.OHLCV, symbol="ETH/BTC", time_frame="1h")
+                )
+        finally:
+            columnar_candles_file.close()
+
+
+async def test_collect_compressed_candles():
+    tentacles_setup_config = test_utils_config.load_test_tentacles_config()
+    async with data_collector(BINANCE, tentacles_setup_config, ["ETH/BTC"], None, True, 1549324860000,
+                              1549497660000, compression=importer_exchanges.CompressedCandles.ZLIB) as collector:
+        await collector.start()
+        async with collector_database(collector) as database:
+            assert await database.select_count(enums.ExchangeDataTables.OHLCV, ["*"]) == [(0, )]
+        importer = importer_exchanges.GenericExchangeDataImporter({}, collector.file_path)
+        await importer.initialize()
+        try:
+            assert enums.ExchangeDataTables.OHLCV in importer.available_data_types
+            collected_candles = await importer.get_ohlcv(BINANCE, "ETH/BTC", commons_enums.TimeFrames.ONE_HOUR)
+            assert collected_candles
+        finally:
+            await importer.stop()
+
+        # updated data files stay compressed
+        async with data_collector(BINANCE, tentacles_setup_config, [], None, False, 1549065660000, 1549670520000,
+                                  data_file=collector.file_path) as updating_collector:
+            await updating_collector.start()
+            assert updating_collector.compression == importer_exchanges.CompressedCandles.ZLIB
+            importer = importer_exchanges.GenericExchangeDataImporter({}, updating_collector.file_path)
+            await importer.initialize()
+            try:
+                assert importer.compressed_candles is not None
+                candles = await importer.get_ohlcv(BINANCE, "ETH/BTC", commons_enums.TimeFrames.ONE_HOUR)
+                assert len(candles) == 168
+                assert all(candle in candles for candle in collected_candles)
+            finally:
+                await importer.stop()
+
+
+async def test_collect_shared_candles():
+    tentacles_setup_config = test_utils_config.load_test_tentacles_config()
+    async with data_collector(BINANCE, tentacles_setup_config, ["ETH/BTC"], [commons_enums.TimeFrames.ONE_HOUR],
+                              False, 1549324860000, 1549497660000, shared_candles=True) as collector:
+        await collector.start()
+        async with collector_database(collector) as database:
+            assert await database.select_count(enums.ExchangeDataTables.OHLCV, ["*"]) == [(0, )]
+        importer = importer_exchanges.GenericExchangeDataImporter({}, collector.file_path)
+        await importer.initialize()
+        try:
+            assert isinstance(importer.compressed_candles, importer_exchanges.SharedCandles)
+            collected_candles = await importer.get_ohlcv(BINANCE, "ETH/BTC", commons_enums.TimeFrames.ONE_HOUR)
+            assert collected_candles
+        finally:
+            await importer.stop()
+
+
+async def test_collect_trades():
+    tentacles_setup_config = test_utils_config.load_test_tentacles_config()
+    # 2 hours of trades
+    async with data_collector(BINANCE, tentacles_setup_config, ["ETH/BTC"], [commons_enums.TimeFrames.ONE_HOUR],
+                              False, 1549324800000, 1549331999999, collect_trades=True) as collector:
+        await collector.start()
+        assert collector.progress_by_pair[("ETH/BTC", enums.ExchangeDataTables.RECENT_TRADES.value)] == 100
+        async with collector_database(collector) as database:
+            recent_trades = await database.select(enums.ExchangeDataTables.RECENT_TRADES, symbol="ETH/BTC")
+            tickers = await database.select(enums.ExchangeDataTables.TICKER, symbol="ETH/BTC")
+        # a row by hour, saved at the end of the hour
+        assert sorted(float(row[0]) for row in recent_trades) == [1549328400, 1549332000]
+        assert len(tickers) == len(recent_trades)
+        trades = json.loads(recent_trades[0][-1])
+        assert trades
+        assert all(1549328400 <= trade["timestamp"] < 1549332000 for trade in trades)
+        ticker = json.loads(tickers[0][-1])
+        assert ticker["low"] <= ticker["close"] <= ticker["high"]
+        assert ticker["baseVolume"] == pytest.approx(sum(trade["amount"] for trade in trades))
+
+
 async def test_collect_invalid_date_range():
     tentacles_setup_config = test_utils_config.load_test_tentacles_config()
     symbols = ["ETH/BTC"]
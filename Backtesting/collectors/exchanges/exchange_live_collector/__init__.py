@@ -1 +1,2 @@
-from .live_collector import ExchangeLiveDataCollector
\ No newline at end of file
+from .live_collector import ExchangeLiveDataCollector
+from .buffered_writer import BufferedDataWriter
@@ -0,0 +1,121 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+
+import octobot_commons.logging as logging
+
+
+class BufferedDataWriter:
+    """
+    Buffers the rows to save in a data file database by table. The rows of a table are saved in a single transaction
+    when flush_size of them are buffered, and every buffered row is saved every flush_interval seconds.
+    At most max_buffered_rows rows are buffered: adding a row to a full buffer waits for its flush (backpressure),
+    or drops the row when a flush is already in progress (the database can't keep up).
+    """
+    DEFAULT_FLUSH_SIZE = 500
+    DEFAULT_FLUSH_INTERVAL = 1
+    DEFAULT_MAX_BUFFERED_ROWS = 20000
+
+    def __init__(self, database, flush_size=DEFAULT_FLUSH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 max_buffered_rows=DEFAULT_MAX_BUFFERED_ROWS):
+        self.database = database
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_buffered_rows = max_buffered_rows
+        self.logger = logging.get_logger(self.__class__.__name__)
+        # table: (timestamps, column name: values), columns are in the table columns order
+        self.buffers = {}
+        self.buffered_rows = 0
+        # table: rows count
+        self.saved_rows = {}
+        self.dropped_rows = {}
+        # number of rows which had to wait for a flush to be buffered
+        self.backpressure_count = 0
+        self._reported_dropped_rows = 0
+        self._flush_lock = asyncio.Lock()
+        self._flush_task = None
+
+    def start(self):
+        self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        # waits for the periodic flush in progress (if any) before saving the remaining rows
+        await self.flush()
+
+    async def add(self, table, timestamp, **values):
+        """
+        :param values: column name to value of the row, in the table columns order
+        :return: False when the row has been dropped
+        """
+        if self.buffered_rows >= self.max_buffered_rows:
+            if self._flush_lock.locked():
+                self.dropped_rows[table] = self.dropped_rows.get(table, 0) + 1
+                return False
+            self.backpressure_count += 1
+            await self.flush()
+        timestamps, columns = self.buffers.setdefault(table, ([], {column: [] for column in values}))
+        timestamps.append(timestamp)
+        for column, value in values.items():
+            columns[column].append(value)
+        self.buffered_rows += 1
+        if len(timestamps) >= self.flush_size:
+            await self.flush(table)
+        return True
+
+    async def flush(self, table=None):
+        """
+        Saves the buffered rows of table, of every table when table is None
+        """
+        async with self._flush_lock:
+            for flushed_table in list(self.buffers) if table is None else [table]:
+                timestamps, columns = self.buffers.pop(flushed_table, ([], {}))
+                if not timestamps:
+                    continue
+                self.buffered_rows -= len(timestamps)
+                # insert_all saves every row in a single statement
+                await self.database.insert_all(flushed_table, timestamps, **columns)
+                self.saved_rows[flushed_table] = self.saved_rows.get(flushed_table, 0) + len(timestamps)
+        dropped_rows = sum(self.dropped_rows.values())
+        if dropped_rows > self._reported_dropped_rows:
+            self.logger.warning(f"{dropped_rows - self._reported_dropped_rows} rows dropped: the data file can't "
+                                f"keep up with the collected data (dropped rows: "
+                                f"{', '.join(f'{t.value}: {count}' for t, count in self.dropped_rows.items())})")
+            self._reported_dropped_rows = dropped_rows
+
+    def get_statistics(self):
+        return {
+            "buffered_rows": self.buffered_rows,
+            "saved_rows": {table.value: count for table, count in self.saved_rows.items()},
+            "dropped_rows": {table.value: count for table, count in self.dropped_rows.items()},
+            "backpressure_count": self.backpressure_count,
+        }
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                # shielded: cancelling the periodic flush should not lose the rows it is saving
+                await asyncio.shield(self.flush())
+                self.logger.debug(f"Collected data: {self.get_statistics()}")
+            except Exception as e:
+                self.logger.exception(e, True, f"Error when saving collected data: {e}")
@@ -18,4 +18,10 @@
 from octobot_backtesting.collectors.exchanges.exchange_collector cimport ExchangeDataCollector
 
 cdef class ExchangeLiveDataCollector(ExchangeDataCollector):
-    pass
+    cdef public int flush_size
+    cdef public double flush_interval
+    cdef public int max_buffered_rows
+    cdef public double order_book_sampling_ms
+    cdef public object writer
+    cdef public dict last_order_book_times
+    cdef public int sampled_out_order_books
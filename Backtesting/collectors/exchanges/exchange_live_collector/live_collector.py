@@ -14,11 +14,14 @@
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
 import asyncio
+import json
 import logging
 import time
 
 import octobot_backtesting.collectors.exchanges as exchanges
+import octobot_backtesting.enums as backtesting_enums
 import octobot_commons.channels_name as channels_name
+import tentacles.Backtesting.collectors.exchanges.exchange_live_collector.buffered_writer as buffered_writer
 import tentacles.Backtesting.importers.exchanges.generic_exchange_importer as generic_exchange_importer
 
 try:
@@ -29,8 +32,41 @@ except ImportError:
 
 
 class ExchangeLiveDataCollector(exchanges.AbstractExchangeLiveCollector):
+    """
+    Collected data is saved through a BufferedDataWriter: rows are saved by batches, see BufferedDataWriter for
+    flush_size, flush_interval and max_buffered_rows.
+    When order_book_sampling_ms is set, at most one order book is saved per symbol every order_book_sampling_ms
+    milliseconds.
+    """
     IMPORTER = generic_exchange_importer.GenericExchangeDataImporter
 
+    def __init__(self, config, exchange_name, tentacles_setup_config, symbols, time_frames,
+                 use_all_available_timeframes=False,
+                 data_format=backtesting_enums.DataFormats.REGULAR_COLLECTOR_DATA,
+                 start_timestamp=None,
+                 end_timestamp=None,
+                 flush_size=buffered_writer.BufferedDataWriter.DEFAULT_FLUSH_SIZE,
+                 flush_interval=buffered_writer.BufferedDataWriter.DEFAULT_FLUSH_INTERVAL,
+                 max_buffered_rows=buffered_writer.BufferedDataWriter.DEFAULT_MAX_BUFFERED_ROWS,
+                 order_book_sampling_ms=0):
+        super().__init__(config, exchange_name, tentacles_setup_config, symbols, time_frames,
+                         use_all_available_timeframes, data_format=data_format,
+                         start_timestamp=start_timestamp, end_timestamp=end_timestamp)
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_buffered_rows = max_buffered_rows
+        self.order_book_sampling_ms = order_book_sampling_ms
+        self.writer = None
+        # symbol: time of the last saved order book
+        self.last_order_book_times = {}
+        self.sampled_out_order_books = 0
+
+    async def initialize(self):
+        await super().initialize()
+        self.writer = buffered_writer.BufferedDataWriter(self.database, flush_size=self.flush_size,
+                                                         flush_interval=self.flush_interval,
+                                                         max_buffered_rows=self.max_buffered_rows)
+
     async def start(self):
         exchange_manager = await trading_api.create_exchange_builder(self.config, self.exchange_name) \
             .is_simulated() \
@@ -45,6 +81,7 @@ class ExchangeLiveDataCollector(exchanges.AbstractExchangeLiveCollector):
 
         # create description
         await self._create_description()
+        self.writer.start()
 
         exchange_id = exchange_manager.id
         await exchange_channel.get_chan(channels_name.OctoBotTradingChannelsName.TICKER_CHANNEL.value,
@@ -60,36 +97,85 @@ class ExchangeLiveDataCollector(exchanges.AbstractExchangeLiveCollector):
 
         await asyncio.gather(*asyncio.all_tasks(asyncio.get_event_loop()))
 
+    async def stop(self, **kwargs):
+        if self.writer is not None:
+            await self.writer.stop()
+        await super().stop(**kwargs)
+
+    def get_statistics(self):
+        return {
+            **self.writer.get_statistics(),
+            "sampled_out_order_books": self.sampled_out_order_books,
+        }
+
+    async def save_ticker(self, timestamp, exchange, cryptocurrency, symbol, ticker, multiple=False):
+        if multiple:
+            return await super().save_ticker(timestamp, exchange, cryptocurrency, symbol, ticker, multiple=multiple)
+        await self.writer.add(backtesting_enums.ExchangeDataTables.TICKER, timestamp,
+                              exchange_name=exchange, cryptocurrency=cryptocurrency,
+                              symbol=symbol, recent_trades=json.dumps(ticker))
+
+    async def save_order_book(self, timestamp, exchange, cryptocurrency, symbol, asks, bids, multiple=False):
+        if multiple:
+            return await super().save_order_book(timestamp, exchange, cryptocurrency, symbol, asks, bids,
+                                                 multiple=multiple)
+        await self.writer.add(backtesting_enums.ExchangeDataTables.ORDER_BOOK, timestamp,
+                              exchange_name=exchange, cryptocurrency=cryptocurrency, symbol=symbol,
+                              asks=json.dumps(asks), bids=json.dumps(bids))
+
+    async def save_recent_trades(self, timestamp, exchange, cryptocurrency, symbol, recent_trades, multiple=False):
+        if multiple:
+            return await super().save_recent_trades(timestamp, exchange, cryptocurrency, symbol, recent_trades,
+                                                    multiple=multiple)
+        await self.writer.add(backtesting_enums.ExchangeDataTables.RECENT_TRADES, timestamp,
+                              exchange_name=exchange, cryptocurrency=cryptocurrency,
+                              symbol=symbol, recent_trades=json.dumps(recent_trades))
+
+    async def save_ohlcv(self, timestamp, exchange, cryptocurrency, symbol, time_frame, candle, multiple=False):
+        if multiple:
+            return await super().save_ohlcv(timestamp, exchange, cryptocurrency, symbol, time_frame, candle,
+                                            multiple=multiple)
+        await self.writer.add(backtesting_enums.ExchangeDataTables.OHLCV, timestamp,
+                              exchange_name=exchange, cryptocurrency=cryptocurrency,
+                              symbol=symbol, time_frame=time_frame.value,
+                              candle=json.dumps(candle))
+
+    async def save_kline(self, timestamp, exchange, cryptocurrency, symbol, time_frame, kline, multiple=False):
+        if multiple:
+            return await super().save_kline(timestamp, exchange, cryptocurrency, symbol, time_frame, kline,
+                                            multiple=multiple)
+        await self.writer.add(backtesting_enums.ExchangeDataTables.KLINE, timestamp,
+                              exchange_name=exchange, cryptocurrency=cryptocurrency,
+                              symbol=symbol, time_frame=time_frame.value,
+                              candle=json.dumps(kline))
+
     async def ticker_callback(self, exchange: str, exchange_id: str,
                               cryptocurrency: str, symbol: str, ticker):
-        self.logger.info(f"TICKER : CRYPTOCURRENCY = {cryptocurrency} || SYMBOL = {symbol} || TICKER = {ticker}")
         await self.save_ticker(timestamp=time.time(), exchange=exchange,
                                cryptocurrency=cryptocurrency, symbol=symbol, ticker=ticker)
 
     async def order_book_callback(self, exchange: str, exchange_id: str,
                                   cryptocurrency: str, symbol: str, asks, bids):
-        self.logger.info(f"ORDERBOOK : CRYPTOCURRENCY = {cryptocurrency} || SYMBOL = {symbol} "
-                         f"|| ASKS = {asks} || BIDS = {bids}")
-        await self.save_order_book(timestamp=time.time(), exchange=exchange,
+        current_time = time.time()
+        if self.order_book_sampling_ms:
+            if (current_time - self.last_order_book_times.get(symbol, 0)) * 1000 < self.order_book_sampling_ms:
+                self.sampled_out_order_books += 1
+                return
+            self.last_order_book_times[symbol] = current_time
+        await self.save_order_book(timestamp=current_time, exchange=exchange,
                                    cryptocurrency=cryptocurrency, symbol=symbol, asks=asks, bids=bids)
 
     async def recent_trades_callback(self, exchange: str, exchange_id: str,
                                      cryptocurrency: str, symbol: str, recent_trades):
-        self.logger.info(f"RECENT TRADE : CRYPTOCURRENCY = {cryptocurrency} || SYMBOL = {symbol} "
-                         f"|| RECENT TRADE = {recent_trades}")
         await self.save_recent_trades(timestamp=time.time(), exchange=exchange,
                                       cryptocurrency=cryptocurrency, symbol=symbol, recent_trades=recent_trades)
 
     async def ohlcv_callback(self, exchange: str, exchange_id: str,
                              cryptocurrency: str, symbol: str, time_frame, candle):
-        self.logger.info(f"OHLCV : CRYPTOCURRENCY = {cryptocurrency} || SYMBOL = {symbol} "
-                         f"|| TIME FRAME = {time_frame} || CANDLE = {candle}")
         await self.save_ohlcv(timestamp=time.time(), exchange=exchange,
                               cryptocurrency=cryptocurrency, symbol=symbol, time_frame=time_frame, candle=candle)
 
     async def kline_callback(self, exchange: str, exchange_id: str,
                              cryptocurrency: str, symbol: str, time_frame, kline):
-        self.logger.info(f"KLINE : CRYPTOCURRENCY = {cryptocurrency} || SYMBOL = {symbol} "
-                         f"|| TIME FRAME = {time_frame} || KLINE = {kline}")
         await self.save_kline(timestamp=time.time(), exchange=exchange,
                               cryptocurrency=cryptocurrency, symbol=symbol, time_frame=time_frame, kline=kline)
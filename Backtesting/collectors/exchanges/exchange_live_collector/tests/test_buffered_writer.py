@@ -0,0 +1,129 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import mock
+import pytest
+
+import octobot_backtesting.enums as enums
+import tentacles.Backtesting.collectors.exchanges as collector_exchanges
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+TICKER = enums.ExchangeDataTables.TICKER
+OHLCV = enums.ExchangeDataTables.OHLCV
+
+
+class Database:
+    def __init__(self, insert_duration=0):
+        self.insert_duration = insert_duration
+        # table: saved timestamps
+        self.rows = {}
+        self.inserts_count = 0
+
+    async def insert_all(self, table, timestamp, **columns):
+        await asyncio.sleep(self.insert_duration)
+        assert all(len(values) == len(timestamp) for values in columns.values())
+        self.rows.setdefault(table, []).extend(timestamp)
+        self.inserts_count += 1
+
+
+async def _add_rows(writer, table, timestamps):
+    return [await writer.add(table, timestamp, exchange_name="binance", symbol="BTC/USDT", data="{}")
+            for timestamp in timestamps]
+
+
+async def test_flush_by_size():
+    database = Database()
+    writer = collector_exchanges.BufferedDataWriter(database, flush_size=10, flush_interval=10)
+    assert all(await _add_rows(writer, TICKER, range(25)))
+    assert await _add_rows(writer, OHLCV, range(5))
+    # one insert per full table buffer
+    assert database.rows == {TICKER: list(range(20))}
+    assert database.inserts_count == 2
+    assert writer.buffered_rows == 10
+    await writer.stop()
+    assert database.rows == {TICKER: list(range(25)), OHLCV: list(range(5))}
+    assert writer.get_statistics() == {
+        "buffered_rows": 0,
+        "saved_rows": {TICKER.value: 25, OHLCV.value: 5},
+        "dropped_rows": {},
+        "backpressure_count": 0,
+    }
+
+
+async def test_flush_by_interval():
+    database = Database()
+    writer = collector_exchanges.BufferedDataWriter(database, flush_size=100, flush_interval=0.05)
+    writer.start()
+    await _add_rows(writer, TICKER, range(5))
+    assert database.rows == {}
+    await asyncio.sleep(0.12)
+    assert database.rows == {TICKER: list(range(5))}
+    assert writer.buffered_rows == 0
+    await writer.stop()
+    assert database.inserts_count == 1
+
+
+async def test_backpressure_and_dropped_rows():
+    database = Database(insert_duration=0.05)
+    writer = collector_exchanges.BufferedDataWriter(database, flush_size=100, flush_interval=10, max_buffered_rows=5)
+    # full buffer: waits for its flush
+    assert all(await _add_rows(writer, TICKER, range(6)))
+    assert writer.backpressure_count == 1
+    assert database.rows == {TICKER: list(range(5))}
+    await _add_rows(writer, TICKER, range(6, 10))
+    # full buffer while flushing: dropped
+    with mock.patch.object(writer.logger, "warning", mock.Mock()) as warning_mock:
+        added = await asyncio.gather(*(writer.add(TICKER, timestamp, data="{}") for timestamp in range(10, 21)))
+        assert added == [True] * 6 + [False] * 5
+        await writer.stop()
+        warning_mock.assert_called_once()
+    assert writer.get_statistics() == {
+        "buffered_rows": 0,
+        "saved_rows": {TICKER.value: 16},
+        "dropped_rows": {TICKER.value: 5},
+        "backpressure_count": 2,
+    }
+    assert sorted(database.rows[TICKER]) == list(range(16))
+
+
+async def test_stop_during_periodic_flush():
+    database = Database(insert_duration=0.1)
+    writer = collector_exchanges.BufferedDataWriter(database, flush_size=100, flush_interval=0.01)
+    writer.start()
+    await _add_rows(writer, TICKER, range(5))
+    # periodic flush in progress
+    await asyncio.sleep(0.05)
+    assert writer.buffered_rows == 0
+    await _add_rows(writer, TICKER, range(5, 10))
+    await writer.stop()
+    assert database.rows == {TICKER: list(range(10))}
+
+
+async def test_order_book_sampling():
+    collector = collector_exchanges.ExchangeLiveDataCollector({}, "binance", None, ["BTC/USDT", "ETH/USDT"], [],
+                                                              order_book_sampling_ms=100)
+    with mock.patch.object(collector, "save_order_book", mock.AsyncMock()) as save_order_book_mock:
+        for _ in range(10):
+            await collector.order_book_callback("binance", "id", "BTC", "BTC/USDT", [[1, 2]], [[0.5, 1]])
+        await collector.order_book_callback("binance", "id", "ETH", "ETH/USDT", [[1, 2]], [[0.5, 1]])
+        # one order book per symbol
+        assert [call.kwargs["symbol"] for call in save_order_book_mock.await_args_list] == ["BTC/USDT", "ETH/USDT"]
+        assert collector.sampled_out_order_books == 9
+        await asyncio.sleep(0.11)
+        await collector.order_book_callback("binance", "id", "BTC", "BTC/USDT", [[1, 2]], [[0.5, 1]])
+        assert save_order_book_mock.await_count == 3
@@ -0,0 +1 @@
+from .columnar_candles_converter import ColumnarCandlesConverter
@@ -0,0 +1,66 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import os.path as path
+import sqlite3
+
+import octobot_backtesting.constants as backtesting_constants
+import octobot_backtesting.converters as converters
+import octobot_backtesting.enums as backtesting_enums
+import octobot_commons.databases as databases
+import octobot_commons.errors as commons_errors
+import tentacles.Backtesting.importers.exchanges as importer_exchanges
+
+
+class ColumnarCandlesConverter(converters.DataConverter):
+    """
+    ColumnarCandlesConverter creates the columnar candles file of a data file: its candles are then loaded from
+    memory-mapped columns by the GenericExchangeDataImporter. Only the data file read indexes are created.
+    """
+
+    def __init__(self, backtesting_file_to_convert):
+        super().__init__(backtesting_file_to_convert)
+        self.data_file_path = backtesting_file_to_convert \
+            if path.isfile(backtesting_file_to_convert) \
+            else path.join(backtesting_constants.BACKTESTING_FILE_PATH, backtesting_file_to_convert)
+        self.converted_file = importer_exchanges.ColumnarCandlesFile.get_file_path(self.data_file_path)
+        self.database = None
+
+    async def can_convert(self) -> bool:
+        if not path.isfile(self.data_file_path):
+            return False
+        database = databases.SQLiteDatabase(self.data_file_path)
+        try:
+            await database.initialize()
+            return await database.check_table_exists(backtesting_enums.ExchangeDataTables.OHLCV) \
+                and await database.check_table_not_empty(backtesting_enums.ExchangeDataTables.OHLCV)
+        except (commons_errors.DatabaseNotFoundError, sqlite3.DatabaseError):
+            # not a SQLite data file
+            return False
+        finally:
+            await database.stop()
+
+    async def convert(self) -> bool:
+        try:
+            self.database = databases.SQLiteDatabase(self.data_file_path)
+            await self.database.initialize()
+            return await importer_exchanges.ColumnarCandlesFile.create_from_database(self.database,
+                                                                                    self.converted_file)
+        except Exception as e:
+            self.logger.exception(e, True, f"Error while converting data file: {e}")
+            return False
+        finally:
+            if self.database is not None:
+                await self.database.stop()
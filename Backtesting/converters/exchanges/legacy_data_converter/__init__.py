@@ -1 +1,2 @@
-from .legacy_converter import LegacyDataConverter
\ No newline at end of file
+from .legacy_data_reader import LegacyDataReader
+from .legacy_converter import LegacyDataConverter
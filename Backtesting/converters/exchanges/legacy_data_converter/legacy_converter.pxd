@@ -22,9 +22,10 @@ cdef class LegacyDataConverter(DataConverter):
     cdef str symbol
     cdef str time_data
     cdef list time_frames
-    cdef dict file_content
     cdef DataBase database
+    cdef public long converted_candles_count
+    cdef public double conversion_duration
 
-    cdef list _get_formatted_candles(self, object time_frame)
-    cdef dict _read_data_file(self)
-    cdef dict _read_data_file(self)
+    cdef list _get_formatted_candles(self, list columns, long start, long end)
+    cdef bint _is_valid_time_frame(self, str time_frame, object columns)
+    cdef object _get_reader(self)
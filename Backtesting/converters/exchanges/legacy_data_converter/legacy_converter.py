@@ -13,11 +13,14 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
-import gzip
+import argparse
+import asyncio
+import concurrent.futures
 import json
 import enum
 import os.path as path
 import datetime
+import time
 
 import octobot_backtesting.collectors.exchanges as exchanges
 import octobot_backtesting.constants as backtesting_constants
@@ -27,16 +30,22 @@ import octobot_backtesting.enums as backtesting_enums
 import octobot_commons.databases as databases
 import octobot_commons.constants as commons_constants
 import octobot_commons.enums as commons_enums
+import octobot_commons.logging as logging
 import octobot_commons.symbol_util as symbol_util
+import tentacles.Backtesting.converters.exchanges.legacy_data_converter.legacy_data_reader as legacy_data_reader
 
 
 class LegacyDataConverter(converters.DataConverter):
     """
     LegacyDataConverter can be used to convert OctoBot v0.3 data files into v0.4 data files.
+    Legacy files are read incrementally (see LegacyDataReader) and their candles are saved by batches of
+    BATCH_SIZE candles, each batch in its own transaction. Use convert_files to convert files in parallel processes,
+    from the command line: python -m tentacles.Backtesting.converters.exchanges.legacy_data_converter.legacy_converter
     """
     DATA_FILE_EXT = ".data"
     VERSION = "1.0"
     DATA_FILE_TIME_DATE_FORMAT = '%Y%m%d%H%M%S'
+    BATCH_SIZE = 10000
 
     class PriceIndexes(enum.Enum):
         IND_PRICE_TIME = 0
@@ -52,38 +61,48 @@ class LegacyDataConverter(converters.DataConverter):
         self.symbol = ""
         self.time_data = ""
         self.time_frames = []
-        self.file_content = {}
         self.database = None
-        self.converted_file = backtesting_data.get_backtesting_file_name(exchanges.AbstractExchangeHistoryCollector)
+        # files converted in parallel are named after their legacy file
+        self.converted_file = backtesting_data.get_backtesting_file_name(
+            exchanges.AbstractExchangeHistoryCollector,
+            lambda: path.splitext(path.basename(self.file_to_convert))[0]
+        )
+        self.converted_candles_count = 0
+        self.conversion_duration = 0
 
     async def can_convert(self, ) -> bool:
         self.exchange_name, self.symbol, self.time_data = LegacyDataConverter._interpret_file_name(self.file_to_convert)
         if None in (self.exchange_name, self.symbol, self.time_data):
             return False
-        self.file_content = self._read_data_file()
-        if not self.file_content:
+        try:
+            # the file is only read until its first valid time frame
+            return any(self._is_valid_time_frame(time_frame, columns)
+                       for time_frame, columns in self._get_reader().iter_time_frames())
+        except Exception:
             return False
-        for time_frame, candles_data in self.file_content.items():
-            try:
-                # check time frame validity
-                time_frame = commons_enums.TimeFrames(time_frame)
-                # check candle data validity
-                if isinstance(candles_data, list) and len(candles_data) == 6:
-                    # check candle data non-emptiness
-                    if all(data for data in candles_data):
-                        self.time_frames.append(time_frame)
-            except ValueError:
-                pass
-        return bool(self.time_frames)
 
     async def convert(self) -> bool:
+        start_time = time.time()
+        self.time_frames = []
+        self.converted_candles_count = 0
+        converted_file_path = path.join(backtesting_constants.BACKTESTING_FILE_PATH, self.converted_file)
+        if path.exists(converted_file_path):
+            # converting into an existing file would duplicate its candles
+            self.logger.error(f"{self.file_to_convert} is already converted into {converted_file_path}")
+            return False
         try:
-            self.database = databases.SQLiteDatabase(
-                path.join(backtesting_constants.BACKTESTING_FILE_PATH, self.converted_file))
+            self.database = databases.SQLiteDatabase(converted_file_path)
             await self.database.initialize()
+            for time_frame, columns in self._get_reader().iter_time_frames():
+                if self._is_valid_time_frame(time_frame, columns):
+                    self.time_frames.append(commons_enums.TimeFrames(time_frame))
+                    await self._convert_ohlcv(self.time_frames[-1], columns)
+            if not self.time_frames:
+                return False
             await self._create_description()
-            for time_frame in self.time_frames:
-                await self._convert_ohlcv(time_frame)
+            self.conversion_duration = time.time() - start_time
+            self.logger.info(f"Converted {self.converted_candles_count} candles of {self.file_to_convert} in "
+                             f"{round(self.conversion_duration, 2)}s ({round(self.get_throughput())} candles/s)")
             return True
         except Exception as e:
             self.logger.exception(e, True, f"Error while converting data file: {e}")
@@ -92,6 +111,33 @@ class LegacyDataConverter(converters.DataConverter):
             if self.database is not None:
                 await self.database.stop()
 
+    def get_throughput(self):
+        """
+        :return: the converted candles per second of the last conversion
+        """
+        return self.converted_candles_count / self.conversion_duration if self.conversion_duration else 0
+
+    @classmethod
+    def convert_files(cls, files_to_convert, processes=None):
+        """
+        Converts legacy data files in parallel processes
+        :param processes: processes count, defaults to the processors count
+        :return: the converted file of each file to convert, None when a file is not converted
+        """
+        start_time = time.time()
+        with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(_convert_file, files_to_convert))
+        duration = time.time() - start_time
+        candles_count = sum(converted_candles_count for _, converted_candles_count in results)
+        logging.get_logger(cls.__name__).info(
+            f"Converted {candles_count} candles of {len(files_to_convert)} files in {round(duration, 2)}s "
+            f"({round(candles_count / duration) if duration else 0} candles/s)"
+        )
+        return {
+            file_to_convert: converted_file
+            for file_to_convert, (converted_file, _) in zip(files_to_convert, results)
+        }
+
     async def _create_description(self):
         time_object = datetime.datetime.strptime(self.time_data, self.DATA_FILE_TIME_DATE_FORMAT)
         await self.database.insert(backtesting_enums.DataTables.DESCRIPTION,
@@ -101,46 +147,38 @@ class LegacyDataConverter(converters.DataConverter):
                                    symbols=json.dumps([self.symbol]),
                                    time_frames=json.dumps([tf.value for tf in self.time_frames]))
 
-    async def _convert_ohlcv(self, time_frame):
+    async def _convert_ohlcv(self, time_frame, columns):
         # use time_frame_sec to add time to save the candle closing time
         time_frame_sec = commons_enums.TimeFramesMinutes[time_frame] * commons_constants.MINUTE_TO_SECONDS
-        candles = self._get_formatted_candles(time_frame)
-        await self.database.insert_all(backtesting_enums.ExchangeDataTables.OHLCV,
-                                       timestamp=[candle[0] + time_frame_sec for candle in candles],
-                                       exchange_name=self.exchange_name, symbol=self.symbol,
-                                       time_frame=time_frame.value, candle=[json.dumps(c) for c in candles])
-
-    def _get_formatted_candles(self, time_frame):
-        data = self.file_content[time_frame.value]
-        candles = []
-        for i in range(len(data[LegacyDataConverter.PriceIndexes.IND_PRICE_TIME.value])):
-            candles.insert(i, [None] * len(LegacyDataConverter.PriceIndexes))
-            candles[i][LegacyDataConverter.PriceIndexes.IND_PRICE_CLOSE.value] = \
-                data[LegacyDataConverter.PriceIndexes.IND_PRICE_CLOSE.value][i]
-            candles[i][LegacyDataConverter.PriceIndexes.IND_PRICE_OPEN.value] = \
-                data[LegacyDataConverter.PriceIndexes.IND_PRICE_OPEN.value][i]
-            candles[i][LegacyDataConverter.PriceIndexes.IND_PRICE_HIGH.value] = \
-                data[LegacyDataConverter.PriceIndexes.IND_PRICE_HIGH.value][i]
-            candles[i][LegacyDataConverter.PriceIndexes.IND_PRICE_LOW.value] = \
-                data[LegacyDataConverter.PriceIndexes.IND_PRICE_LOW.value][i]
-            candles[i][LegacyDataConverter.PriceIndexes.IND_PRICE_TIME.value] = \
-                data[LegacyDataConverter.PriceIndexes.IND_PRICE_TIME.value][i]
-            candles[i][LegacyDataConverter.PriceIndexes.IND_PRICE_VOL.value] = \
-                data[LegacyDataConverter.PriceIndexes.IND_PRICE_VOL.value][i]
-        return candles
-
-    def _read_data_file(self):
+        candles_count = len(columns[LegacyDataConverter.PriceIndexes.IND_PRICE_TIME.value])
+        for batch_start in range(0, candles_count, self.BATCH_SIZE):
+            candles = self._get_formatted_candles(columns, batch_start,
+                                                  min(batch_start + self.BATCH_SIZE, candles_count))
+            await self.database.insert_all(backtesting_enums.ExchangeDataTables.OHLCV,
+                                           timestamp=[candle[0] + time_frame_sec for candle in candles],
+                                           exchange_name=self.exchange_name, symbol=self.symbol,
+                                           time_frame=time_frame.value, candle=[json.dumps(c) for c in candles])
+            self.converted_candles_count += len(candles)
+
+    def _get_formatted_candles(self, columns, start, end):
+        # legacy columns are in PriceIndexes order
+        return [
+            [column[index] for column in columns]
+            for index in range(start, end)
+        ]
+
+    def _is_valid_time_frame(self, time_frame, columns):
+        if columns is None:
+            return False
         try:
-            # try zipfile
-            with gzip.open(self.file_to_convert, 'r') as file_to_parse:
-                file_content = json.loads(file_to_parse.read())
-        except OSError:
-            # try without unzip
-            with open(self.file_to_convert) as file_to_parse:
-                file_content = json.loads(file_to_parse.read())
-        except Exception:
-            return {}
-        return file_content
+            commons_enums.TimeFrames(time_frame)
+        except ValueError:
+            return False
+        # every column has a value for each candle
+        return len(set(len(column) for column in columns)) == 1
+
+    def _get_reader(self):
+        return legacy_data_reader.LegacyDataReader(self.file_to_convert)
 
     @staticmethod
     def _interpret_file_name(file_name):
@@ -150,9 +188,34 @@ class LegacyDataConverter(converters.DataConverter):
             symbol = symbol_util.merge_currencies(data[1], data[2])
             file_ext = LegacyDataConverter.DATA_FILE_EXT
             timestamp = data[3] + data[4].replace(file_ext, "")
-        except KeyError:
+        except (KeyError, IndexError):
             exchange_name = None
             symbol = None
             timestamp = None
 
         return exchange_name, symbol, timestamp
+
+
+def _convert_file(file_to_convert):
+    # runs in a converting process
+    async def convert():
+        converter = LegacyDataConverter(file_to_convert)
+        if await converter.can_convert() and await converter.convert():
+            return converter.converted_file, converter.converted_candles_count
+        return None, 0
+    return asyncio.run(convert())
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Converts OctoBot v0.3 data files into current data files.")
+    parser.add_argument("data_files", nargs="+", help="legacy data files to convert")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="converting processes count, defaults to the processors count")
+    parsed_args = parser.parse_args(args)
+    for file_path, converted_file in LegacyDataConverter.convert_files(parsed_args.data_files,
+                                                                       parsed_args.processes).items():
+        print(f"{file_path}: {'converted into ' + converted_file if converted_file else 'not converted'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import array
+import gzip
+import json
+import re
+
+GZIP_MAGIC_NUMBER = b"\x1f\x8b"
+ARRAY_TYPE_CODES = ("q", "d")
+
+
+class LegacyDataReader:
+    """
+    Reads the {time frame: [times, opens, highs, lows, closes, volumes]} content of a legacy data file (gzip or
+    plain JSON) incrementally: the file is tokenized chunk by chunk and the values of each time frame columns are
+    stored in typed arrays, only one time frame columns are kept in memory.
+    """
+    CHUNK_SIZE = 1 << 20
+    COLUMNS_COUNT = 6
+    # structural characters, strings, runs of comma separated numbers and literals
+    TOKEN_PATTERN = re.compile(r'\s*(?:([\[\]{}:,])|("(?:[^"\\]|\\.)*")|'
+                               r'(-?[0-9][-+0-9.eE]*(?:\s*,\s*-?[0-9][-+0-9.eE]*)*)|(true|false|null))')
+    STRUCTURE, STRING, NUMBERS, LITERAL = range(1, 5)
+    LITERALS = {"true": True, "false": False, "null": None}
+
+    def __init__(self, file_path, chunk_size=CHUNK_SIZE):
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+
+    def iter_time_frames(self):
+        """
+        :return: a generator of (time frame, columns) of the file, columns are None when the time frame content is
+        not a list of 6 non-empty columns
+        """
+        tokens = self._iter_tokens()
+        if next(tokens, (None, None)) != (self.STRUCTURE, "{"):
+            raise ValueError(f"{self.file_path} is not a legacy data file")
+        for token_type, value in tokens:
+            if (token_type, value) == (self.STRUCTURE, ","):
+                continue
+            if (token_type, value) == (self.STRUCTURE, "}"):
+                return
+            if token_type != self.STRING or next(tokens, (None, None)) != (self.STRUCTURE, ":"):
+                raise ValueError(f"Invalid legacy data file content in {self.file_path}")
+            yield value, self._read_columns(tokens)
+        raise ValueError(f"Unexpected end of {self.file_path}")
+
+    def _read_columns(self, tokens):
+        token = next(tokens)
+        if token != (self.STRUCTURE, "["):
+            self._skip_value(tokens, token)
+            return None
+        columns = []
+        for token in tokens:
+            if token == (self.STRUCTURE, "]"):
+                break
+            if token == (self.STRUCTURE, ","):
+                continue
+            if token != (self.STRUCTURE, "[") or columns is None:
+                self._skip_value(tokens, token)
+                columns = None
+                continue
+            column = self._read_column(tokens)
+            if column is None:
+                columns = None
+            elif columns is not None:
+                columns.append(column)
+        if columns is None or len(columns) != self.COLUMNS_COUNT or not all(columns):
+            return None
+        return columns
+
+    def _read_column(self, tokens):
+        column = array.array(ARRAY_TYPE_CODES[0])
+        for token_type, value in tokens:
+            if token_type == self.NUMBERS:
+                column = self._extend_column(column, json.loads(f"[{value}]"))
+            elif token_type == self.LITERAL:
+                column = self._extend_column(column, [self.LITERALS[value]])
+            elif value == "]":
+                return column
+            elif value != ",":
+                # not a values column
+                self._skip_value(tokens, (token_type, value))
+                self._skip_value(tokens, (self.STRUCTURE, "["))
+                return None
+        raise ValueError(f"Unexpected end of {self.file_path}")
+
+    @staticmethod
+    def _extend_column(column, values):
+        # int columns become float columns and then lists when values are not numbers
+        if isinstance(column, array.array):
+            for type_code in ARRAY_TYPE_CODES[ARRAY_TYPE_CODES.index(column.typecode):]:
+                try:
+                    values_array = array.array(type_code, values)
+                except (TypeError, OverflowError):
+                    continue
+                if column.typecode != type_code:
+                    column = array.array(type_code, column)
+                column.extend(values_array)
+                return column
+            column = column.tolist()
+        column.extend(values)
+        return column
+
+    def _skip_value(self, tokens, first_token):
+        depth = 1 if first_token[0] == self.STRUCTURE and first_token[1] in "[{" else 0
+        while depth:
+            token_type, value = next(tokens)
+            if token_type == self.STRUCTURE:
+                if value in "[{":
+                    depth += 1
+                elif value in "]}":
+                    depth -= 1
+
+    def _iter_tokens(self):
+        with self._open() as data_file:
+            buffer = ""
+            position = 0
+            is_eof = False
+            while True:
+                match = self.TOKEN_PATTERN.match(buffer, position)
+                if not is_eof and (match is None or match.end() == len(buffer)):
+                    if match is not None and match.lastindex == self.NUMBERS and \
+                            (cut := buffer.rfind(",", match.start(self.NUMBERS), match.end())) != -1:
+                        # long numbers runs are given in parts
+                        yield self.NUMBERS, buffer[match.start(self.NUMBERS):cut]
+                        position = cut
+                        continue
+                    chunk = data_file.read(self.chunk_size)
+                    is_eof = not chunk
+                    buffer = buffer[position:] + chunk
+                    position = 0
+                    continue
+                if match is None:
+                    if buffer[position:].strip():
+                        raise ValueError(f"Invalid legacy data file content in {self.file_path}")
+                    return
+                position = match.end()
+                token_type = match.lastindex
+                value = match.group(token_type)
+                yield token_type, json.loads(value) if token_type == self.STRING else value
+
+    def _open(self):
+        with open(self.file_path, "rb") as data_file:
+            is_gzip = data_file.read(len(GZIP_MAGIC_NUMBER)) == GZIP_MAGIC_NUMBER
+        return gzip.open(self.file_path, "rt", encoding="utf-8") if is_gzip \
+            else open(self.file_path, encoding="utf-8")
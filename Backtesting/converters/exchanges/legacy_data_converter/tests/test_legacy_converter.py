@@ -0,0 +1,82 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import gzip
+import json
+import os
+import sqlite3
+
+import pytest
+
+import octobot_backtesting.constants as backtesting_constants
+import tentacles.Backtesting.converters.exchanges.legacy_data_converter as legacy_data_converter
+import tentacles.Backtesting.converters.exchanges.legacy_data_converter.legacy_converter as legacy_converter
+
+CANDLES_COUNT = 25
+
+
+@pytest.fixture
+def legacy_file(tmp_path, monkeypatch):
+    # converted files are saved in the backtesting data folder
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(backtesting_constants.BACKTESTING_FILE_PATH)
+    file_path = str(tmp_path / "binance_BTC_USDT_20190205_000000.data")
+    _write_legacy_file(file_path)
+    return file_path
+
+
+def _write_legacy_file(file_path):
+    with gzip.open(file_path, "wt") as data_file:
+        json.dump({"1h": [[1549324800 + i * 3600 for i in range(CANDLES_COUNT)]] + [[1.5] * CANDLES_COUNT] * 5},
+                  data_file)
+
+
+def _get_candles_count(converted_file):
+    with sqlite3.connect(os.path.join(backtesting_constants.BACKTESTING_FILE_PATH, converted_file)) as database:
+        return database.execute("SELECT COUNT(*) FROM ohlcv").fetchone()[0]
+
+
+@pytest.mark.asyncio
+async def test_convert(legacy_file):
+    converter = legacy_data_converter.LegacyDataConverter(legacy_file)
+    assert await converter.can_convert()
+    assert await converter.convert()
+    assert converter.converted_candles_count == CANDLES_COUNT
+    assert _get_candles_count(converter.converted_file) == CANDLES_COUNT
+
+
+@pytest.mark.asyncio
+async def test_convert_existing_converted_file(legacy_file):
+    converter = legacy_data_converter.LegacyDataConverter(legacy_file)
+    assert await converter.can_convert()
+    assert await converter.convert()
+    converter = legacy_data_converter.LegacyDataConverter(legacy_file)
+    assert await converter.can_convert()
+    # converting again would duplicate the candles
+    assert not await converter.convert()
+    assert _get_candles_count(converter.converted_file) == CANDLES_COUNT
+
+
+def test_main(legacy_file, tmp_path, capsys):
+    invalid_file = str(tmp_path / "invalid.data")
+    with open(invalid_file, "w") as data_file:
+        data_file.write("invalid")
+    legacy_converter.main([legacy_file, invalid_file, "--processes", "1"])
+    converted_file = legacy_data_converter.LegacyDataConverter(legacy_file).converted_file
+    assert capsys.readouterr().out.splitlines() == [
+        f"{legacy_file}: converted into {converted_file}",
+        f"{invalid_file}: not converted",
+    ]
+    assert _get_candles_count(converted_file) == CANDLES_COUNT
@@ -0,0 +1,109 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import gzip
+import json
+
+import pytest
+
+import tentacles.Backtesting.converters.exchanges.legacy_data_converter as legacy_data_converter
+
+CANDLES_COUNT = 100
+DATA = {
+    "1h": [[1549324800 + i * 3600 for i in range(CANDLES_COUNT)],
+           [1.5 + i for i in range(CANDLES_COUNT)],
+           [2.25e-3] * CANDLES_COUNT,
+           [-1] * CANDLES_COUNT,
+           [1.75] * CANDLES_COUNT,
+           [1e10] * CANDLES_COUNT],
+    "4h": [[1549324800, 1549339200], [1, 2], [1, 2], [1, 2], [1, 2], [1, 2]],
+    "invalid_content": {"key": "value, with [ \"structural\" ] chars"},
+    "missing_columns": [[1, 2], [1, 2]],
+    "not_numbers": [[1, 2], ["a", "b"], [1, 2], [1, 2], [1, 2], [1, 2]],
+    "with_nulls": [[1, 2], [1, None], [1, 2.5], [1, 2], [1, 2], [1, 2]],
+}
+
+
+def _write_data_file(file_path, data, compress):
+    with (gzip.open(file_path, "wt") if compress else open(file_path, "w")) as data_file:
+        json.dump(data, data_file)
+
+
+def _read_time_frames(file_path, chunk_size=legacy_data_converter.LegacyDataReader.CHUNK_SIZE):
+    return {
+        time_frame: columns if columns is None else [list(column) for column in columns]
+        for time_frame, columns in legacy_data_converter.LegacyDataReader(file_path, chunk_size).iter_time_frames()
+    }
+
+
+def _expected_time_frames():
+    return {
+        "1h": DATA["1h"],
+        "4h": DATA["4h"],
+        "invalid_content": None,
+        "missing_columns": None,
+        "not_numbers": None,
+        "with_nulls": DATA["with_nulls"],
+    }
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_iter_time_frames(tmp_path, compress):
+    file_path = str(tmp_path / "binance_BTC_USDT_20190205_000000.data")
+    _write_data_file(file_path, DATA, compress)
+    assert _read_time_frames(file_path) == _expected_time_frames()
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_iter_time_frames_chunk_boundaries(tmp_path, compress):
+    file_path = str(tmp_path / "binance_BTC_USDT_20190205_000000.data")
+    _write_data_file(file_path, DATA, compress)
+    # chunks end inside every kind of token
+    for chunk_size in range(1, 40):
+        assert _read_time_frames(file_path, chunk_size) == _expected_time_frames()
+
+
+def test_iter_time_frames_column_types(tmp_path):
+    file_path = str(tmp_path / "binance_BTC_USDT_20190205_000000.data")
+    _write_data_file(file_path, DATA, False)
+    columns = dict(legacy_data_converter.LegacyDataReader(file_path).iter_time_frames())["1h"]
+    assert [column.typecode for column in columns] == ["q", "d", "d", "q", "d", "d"]
+
+
+def test_iter_time_frames_stops_at_first_time_frames(tmp_path):
+    file_path = str(tmp_path / "binance_BTC_USDT_20190205_000000.data")
+    with open(file_path, "w") as data_file:
+        # truncated file
+        data_file.write(json.dumps({"4h": DATA["4h"]})[:-1] + ', "1h": [[1, 2')
+    time_frames = legacy_data_converter.LegacyDataReader(file_path).iter_time_frames()
+    assert next(time_frames)[0] == "4h"
+    with pytest.raises(ValueError):
+        next(time_frames)
+
+
+@pytest.mark.parametrize("content", [
+    "",
+    "[]",
+    "not json",
+    '{"1h" [[1]]}',
+    '{"1h": [[1, 2], [1, 2], [1, 2], [1, 2], [1, 2], [1, 2]] invalid}',
+    '{"1h": [[1, 2], [1, 2], [1, 2], [1, 2], [1, 2], [1, 2]]',
+])
+def test_iter_time_frames_invalid_content(tmp_path, content):
+    file_path = str(tmp_path / "binance_BTC_USDT_20190205_000000.data")
+    with open(file_path, "w") as data_file:
+        data_file.write(content)
+    with pytest.raises(ValueError):
+        list(legacy_data_converter.LegacyDataReader(file_path, 8).iter_time_frames())
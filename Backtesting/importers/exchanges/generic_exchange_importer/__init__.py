@@ -1 +1,5 @@
-from .generic_exchange_importer import GenericExchangeDataImporter
\ No newline at end of file
+from .generic_exchange_importer import GenericExchangeDataImporter
+from .columnar_candles import ColumnarCandlesFile, CandlesBlock
+from .chunked_table_reader import ChunkedTableReader
+from .compressed_candles import CompressedCandles, CompressedCandlesPair
+from .shared_candles import SharedCandlesStore, SharedCandles
@@ -0,0 +1,121 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import bisect
+
+import octobot_commons.databases as databases
+import octobot_commons.errors as commons_errors
+
+
+class ChunkedTableReader:
+    """
+    Reads the rows of a data file table in chronological chunks of chunk_size rows: only the rows from the last
+    requested inferior timestamp up to the last read chunk are kept in memory.
+    Like ChronologicalReadDatabaseCache, requests are expected to be chronological: requesting rows before the
+    last requested inferior timestamp reads the table again from there.
+    """
+    IGNORED_TIMESTAMP = -1
+    INDEXED_COLUMNS = ("symbol", "time_frame", "timestamp")
+
+    def __init__(self, database, table, import_rows, chunk_size, **where):
+        """
+        :param import_rows: function converting selected rows, see octobot_backtesting.importers.import_ohlcvs
+        :param where: column values of the read rows, None values are ignored
+        """
+        self.database = database
+        self.table = table
+        self.import_rows = import_rows
+        self.chunk_size = chunk_size
+        self.where = {column: value for column, value in where.items() if value is not None}
+        # imported rows and their timestamp, sorted by (timestamp, rowid)
+        self.rows = []
+        self.timestamps = []
+        # rows before this timestamp are not read
+        self.inferior_timestamp = None
+        # (timestamp, rowid) of the last read row
+        self.last_read_key = None
+        self.is_exhausted = False
+
+    @classmethod
+    async def create_indexes(cls, database, tables):
+        """
+        Creates the (symbol, time_frame, timestamp) indexes of the given tables used by chunked reads
+        """
+        for table in tables:
+            async with database.aio_cursor() as cursor:
+                await cursor.execute(f"PRAGMA table_info({table.value})")
+                table_columns = [column_info[1] for column_info in await cursor.fetchall()]
+                indexed_columns = [column for column in cls.INDEXED_COLUMNS if column in table_columns]
+                await cursor.execute(f"CREATE INDEX IF NOT EXISTS index_{table.value}_{'_'.join(indexed_columns)} "
+                                     f"ON {table.value} ({', '.join(indexed_columns)})")
+        await database.connection.commit()
+
+    async def get(self, inferior_timestamp, superior_timestamp, limit=databases.SQLiteDatabase.DEFAULT_SIZE):
+        """
+        :return: the rows between inferior_timestamp and superior_timestamp (included), sorted by timestamp.
+        When superior_timestamp is ignored, only the first limit rows are returned.
+        """
+        if inferior_timestamp == self.IGNORED_TIMESTAMP:
+            inferior_timestamp = float("-inf")
+        if self.inferior_timestamp is None or inferior_timestamp < self.inferior_timestamp:
+            self._reset(inferior_timestamp)
+        else:
+            # previous rows will not be requested anymore
+            first_index = bisect.bisect_left(self.timestamps, inferior_timestamp)
+            del self.rows[:first_index]
+            del self.timestamps[:first_index]
+            self.inferior_timestamp = inferior_timestamp
+        if superior_timestamp == self.IGNORED_TIMESTAMP:
+            while not self.is_exhausted and (limit == databases.SQLiteDatabase.DEFAULT_SIZE or len(self.rows) < limit):
+                await self._read_chunk()
+            return self.rows[:] if limit == databases.SQLiteDatabase.DEFAULT_SIZE else self.rows[:limit]
+        while not self.is_exhausted and (not self.timestamps or self.timestamps[-1] <= superior_timestamp):
+            await self._read_chunk()
+        return self.rows[:bisect.bisect_right(self.timestamps, superior_timestamp)]
+
+    def _reset(self, inferior_timestamp):
+        self.rows = []
+        self.timestamps = []
+        self.inferior_timestamp = inferior_timestamp
+        self.last_read_key = None
+        self.is_exhausted = False
+
+    async def _read_chunk(self):
+        where_clauses = [f"{column} = ?" for column in self.where]
+        parameters = list(self.where.values())
+        if self.last_read_key is not None:
+            # keyset pagination: rows with the same timestamp can be split between chunks,
+            # timestamp >= ? is a range of the (symbol, time_frame, timestamp) index
+            last_timestamp, last_rowid = self.last_read_key
+            where_clauses.append(f"{databases.SQLiteDatabase.TIMESTAMP_COLUMN} >= ? "
+                                 f"AND ({databases.SQLiteDatabase.TIMESTAMP_COLUMN} > ? OR rowid > ?)")
+            parameters += [last_timestamp, last_timestamp, last_rowid]
+        elif self.inferior_timestamp != float("-inf"):
+            where_clauses.append(f"{databases.SQLiteDatabase.TIMESTAMP_COLUMN} >= ?")
+            parameters.append(self.inferior_timestamp)
+        where = f"WHERE {' AND '.join(where_clauses)} " if where_clauses else ""
+        if self.last_read_key is None and not await self.database.check_table_exists(self.table):
+            raise commons_errors.DatabaseNotFoundError(f"Missing {self.table.value} table")
+        async with self.database.aio_cursor() as cursor:
+            await cursor.execute(f"SELECT rowid, * FROM {self.table.value} {where}"
+                                 f"ORDER BY {databases.SQLiteDatabase.TIMESTAMP_COLUMN}, rowid LIMIT ?",
+                                 parameters + [self.chunk_size])
+            rows = await cursor.fetchall()
+        if len(rows) < self.chunk_size:
+            self.is_exhausted = True
+        if rows:
+            self.last_read_key = (rows[-1][1], rows[-1][0])
+            self.rows += self.import_rows([list(row[1:]) for row in rows])
+            self.timestamps += [row[1] for row in rows]
@@ -0,0 +1,341 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import json
+import os
+import sqlite3
+import struct
+
+import numpy as np
+
+import octobot_backtesting.constants as backtesting_constants
+import octobot_backtesting.enums as backtesting_enums
+import octobot_commons.constants as commons_constants
+import octobot_commons.enums as commons_enums
+import octobot_commons.logging as logging
+import tentacles.Backtesting.importers.exchanges.generic_exchange_importer.chunked_table_reader as \
+    chunked_table_reader
+
+
+class ColumnarCandlesFile:
+    """
+    Columnar copy of the candles of a data file, saved next to it with the COLUMNAR_CANDLES_FILE_EXT extension.
+    Each (symbol, time frame) block holds contiguous little-endian columns: int64 candle times (in seconds) and
+    float64 open, high, low, close and volume values, sorted by time. Columns are memory-mapped into NumPy arrays.
+    Layout: MAGIC, header length (uint32), JSON header, then the ALIGNMENT aligned column blocks.
+    Blocks only contain pairs which candles are saved at their close time: other pairs are read from the data file.
+    The header holds the data file size and modification time: updating the data file outdates its columnar candles.
+    """
+    COLUMNAR_CANDLES_FILE_EXT = ".candles"
+    MAGIC = b"OBCANDLES"
+    VERSION = 2
+    ALIGNMENT = 64
+    HEADER_LENGTH_FORMAT = "<I"
+    TIMESTAMP_COLUMN = "timestamp"
+    CANDLE_COLUMN = "candle"
+    REQUIRED_ROW_VALUE_COLUMNS = ("exchange_name", "symbol", "time_frame")
+    COLUMNS = {
+        TIMESTAMP_COLUMN: np.dtype("<i8"),
+        "open": np.dtype("<f8"),
+        "high": np.dtype("<f8"),
+        "low": np.dtype("<f8"),
+        "close": np.dtype("<f8"),
+        "volume": np.dtype("<f8"),
+    }
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        # number of OHLCV rows, size and modification time (in nanoseconds) of the data file when this file
+        # was created
+        self.ohlcv_count = 0
+        self.data_file_size = None
+        self.data_file_mtime = None
+        # (symbol, time_frame value): CandlesBlock
+        self.blocks = {}
+        self._buffer = None
+
+    @classmethod
+    def get_file_path(cls, data_file_path):
+        return f"{data_file_path}{cls.COLUMNAR_CANDLES_FILE_EXT}"
+
+    def open(self):
+        self._buffer = np.memmap(self.file_path, dtype=np.uint8, mode="r")
+        header_start = len(self.MAGIC) + struct.calcsize(self.HEADER_LENGTH_FORMAT)
+        if bytes(self._buffer[:len(self.MAGIC)]) != self.MAGIC:
+            raise ValueError(f"{self.file_path} is not a columnar candles file")
+        header_length, = struct.unpack(self.HEADER_LENGTH_FORMAT, bytes(self._buffer[len(self.MAGIC):header_start]))
+        header = json.loads(bytes(self._buffer[header_start:header_start + header_length]))
+        if header["version"] != self.VERSION:
+            raise ValueError(f"Unsupported columnar candles file version: {header['version']}")
+        self.ohlcv_count = header["ohlcv_count"]
+        self.data_file_size = header["data_file_size"]
+        self.data_file_mtime = header["data_file_mtime"]
+        data_start = self._align(header_start + header_length)
+        for block in header["blocks"]:
+            columns = {}
+            for column, dtype in self.COLUMNS.items():
+                column_start = data_start + block["offsets"][column]
+                columns[column] = self._buffer[column_start:column_start + block["count"] * dtype.itemsize].view(dtype)
+            self.blocks[(block["symbol"], block["time_frame"])] = CandlesBlock(
+                block["exchange_name"], block["symbol"], block["time_frame"], block["row_values"], columns
+            )
+        return self
+
+    def close(self):
+        self.blocks = {}
+        # the file is unmapped when its last array view is released
+        self._buffer = None
+
+    def is_up_to_date(self, data_file_path, ohlcv_count):
+        """
+        :return: True when the data file has not been updated since this file creation
+        """
+        data_file_stat = os.stat(data_file_path)
+        return ohlcv_count == self.ohlcv_count \
+            and data_file_stat.st_size == self.data_file_size \
+            and data_file_stat.st_mtime_ns == self.data_file_mtime
+
+    def get_block(self, exchange_name, symbol, time_frame):
+        block = self.blocks.get((symbol, time_frame))
+        if block is None or (exchange_name is not None and block.exchange_name != exchange_name):
+            return None
+        return block
+
+    @classmethod
+    def write(cls, file_path, blocks, ohlcv_count, data_file_path):
+        """
+        Writes blocks into file_path through a temporary file: an existing file is replaced at once
+        :param blocks: CandlesBlock to write
+        :param ohlcv_count: number of OHLCV rows of the data file
+        :param data_file_path: path of the data file, it should not be updated afterwards
+        """
+        data_file_stat = os.stat(data_file_path)
+        header_blocks = []
+        offset = 0
+        for block in blocks:
+            offsets = {}
+            for column, dtype in cls.COLUMNS.items():
+                offsets[column] = offset
+                offset = cls._align(offset + len(block.columns[column]) * dtype.itemsize)
+            header_blocks.append({
+                "exchange_name": block.exchange_name,
+                "symbol": block.symbol,
+                "time_frame": block.time_frame,
+                "row_values": block.row_values,
+                "count": len(block.columns[cls.TIMESTAMP_COLUMN]),
+                "offsets": offsets,
+            })
+        header = json.dumps({
+            "version": cls.VERSION,
+            "ohlcv_count": ohlcv_count,
+            "data_file_size": data_file_stat.st_size,
+            "data_file_mtime": data_file_stat.st_mtime_ns,
+            "blocks": header_blocks,
+        }).encode()
+        header_end = len(cls.MAGIC) + struct.calcsize(cls.HEADER_LENGTH_FORMAT) + len(header)
+        temp_file_path = f"{file_path}{backtesting_constants.BACKTESTING_DATA_FILE_TEMP_EXT}"
+        with open(temp_file_path, "wb") as output_file:
+            output_file.write(cls.MAGIC)
+            output_file.write(struct.pack(cls.HEADER_LENGTH_FORMAT, len(header)))
+            output_file.write(header)
+            output_file.write(bytes(cls._align(header_end) - header_end))
+            position = 0
+            for block, header_block in zip(blocks, header_blocks):
+                for column, dtype in cls.COLUMNS.items():
+                    output_file.write(bytes(header_block["offsets"][column] - position))
+                    content = np.ascontiguousarray(block.columns[column], dtype=dtype).tobytes()
+                    output_file.write(content)
+                    position = header_block["offsets"][column] + len(content)
+        os.replace(temp_file_path, file_path)
+
+    @classmethod
+    async def create_from_database(cls, database, file_path):
+        """
+        Writes the candles of the given data file database into file_path
+        :return: True when the columnar candles file has been created
+        """
+        row_value_columns = await cls.get_row_value_columns(database)
+        if row_value_columns is None:
+            return False
+        try:
+            # create the data file read indexes beforehand: reading the data file would otherwise create them
+            # and outdate the columnar candles file
+            await chunked_table_reader.ChunkedTableReader.create_indexes(
+                database,
+                [table for table in backtesting_enums.ExchangeDataTables if await database.check_table_exists(table)]
+            )
+        except sqlite3.OperationalError:
+            # read-only data file: its indexes can't be created when reading it either
+            pass
+        blocks = []
+        ohlcv_count = 0
+        async for _, count, block in cls.iter_database_blocks(database, row_value_columns):
+            ohlcv_count += count
+            if block is not None:
+                blocks.append(block)
+        if not blocks:
+            return False
+        cls.write(file_path, blocks, ohlcv_count, database.file_name)
+        return True
+
+    @classmethod
+    async def get_row_value_columns(cls, database):
+        """
+        :return: the OHLCV table columns between the timestamp and the candle columns, None when the data file
+        candles can't be stored in columns
+        """
+        if not await database.check_table_exists(backtesting_enums.ExchangeDataTables.OHLCV):
+            return None
+        async with database.aio_cursor() as cursor:
+            await cursor.execute(f"PRAGMA table_info({backtesting_enums.ExchangeDataTables.OHLCV.value})")
+            table_columns = [column_info[1] for column_info in await cursor.fetchall()]
+        # rows are (timestamp, *row values, candle): exchange_name, cryptocurrency, symbol and time_frame
+        # in current data files
+        row_value_columns = table_columns[1:-1]
+        if table_columns[0] != database.TIMESTAMP_COLUMN or table_columns[-1] != cls.CANDLE_COLUMN \
+                or any(column not in row_value_columns for column in cls.REQUIRED_ROW_VALUE_COLUMNS):
+            return None
+        return row_value_columns
+
+    @classmethod
+    async def iter_database_blocks(cls, database, row_value_columns):
+        """
+        Reads the OHLCV table of the given data file database one pair at a time
+        :param row_value_columns: columns returned by get_row_value_columns
+        :return: an async generator of (row values, rows count, CandlesBlock) of each pair, the CandlesBlock is None
+        when the pair candles can't be stored in columns
+        """
+        table = backtesting_enums.ExchangeDataTables.OHLCV.value
+        selected_row_values = ", ".join(row_value_columns)
+        async with database.aio_cursor() as cursor:
+            await cursor.execute(f"SELECT {selected_row_values}, COUNT(*) FROM {table} GROUP BY {selected_row_values}")
+            pairs = await cursor.fetchall()
+        for *row_values, count in pairs:
+            async with database.aio_cursor() as cursor:
+                await cursor.execute(f"SELECT {database.TIMESTAMP_COLUMN}, {cls.CANDLE_COLUMN} FROM {table} WHERE "
+                                     f"{' AND '.join(f'{column} = ?' for column in row_value_columns)} "
+                                     f"ORDER BY {database.TIMESTAMP_COLUMN}",
+                                     row_values)
+                rows = await cursor.fetchall()
+            values_by_column = dict(zip(row_value_columns, row_values))
+            block = CandlesBlock.from_rows(values_by_column["exchange_name"], values_by_column["symbol"],
+                                           values_by_column["time_frame"], row_values, rows)
+            if block is None:
+                logging.get_logger(cls.__name__).debug(
+                    f"{values_by_column['symbol']} {values_by_column['time_frame']} candles can't be stored in "
+                    f"columns: they are kept in the data file only"
+                )
+            yield row_values, count, block
+
+    @classmethod
+    def _align(cls, position):
+        return -(-position // cls.ALIGNMENT) * cls.ALIGNMENT
+
+
+class CandlesBlock:
+    """
+    Candles of a (symbol, time frame): column name to NumPy array, see ColumnarCandlesFile.COLUMNS.
+    row_values are the values of the data file rows between their timestamp and their candle.
+    """
+
+    def __init__(self, exchange_name, symbol, time_frame, row_values, columns):
+        self.exchange_name = exchange_name
+        self.symbol = symbol
+        self.time_frame = time_frame
+        self.row_values = list(row_values)
+        self.columns = columns
+        self.candle_times = columns[ColumnarCandlesFile.TIMESTAMP_COLUMN]
+        # data file timestamps are the candles close time
+        self.time_frame_sec = commons_enums.TimeFramesMinutes[commons_enums.TimeFrames(time_frame)] * \
+            commons_constants.MINUTE_TO_SECONDS
+
+    @classmethod
+    def from_rows(cls, exchange_name, symbol, time_frame, row_values, rows):
+        """
+        :param rows: (timestamp, candle) OHLCV rows of the pair, sorted by timestamp
+        :return: None when candles are not complete or are not saved at their close time
+        """
+        try:
+            values = np.array([json.loads(candle) for _, candle in rows], dtype=np.float64)
+        except (TypeError, ValueError):
+            # candles with missing values
+            return None
+        if values.ndim != 2 or values.shape[1] != len(ColumnarCandlesFile.COLUMNS) or np.isnan(values).any():
+            return None
+        columns = {
+            column: values[:, index].astype(dtype)
+            for index, (column, dtype) in enumerate(ColumnarCandlesFile.COLUMNS.items())
+        }
+        block = cls(exchange_name, symbol, time_frame, row_values, columns)
+        timestamps = np.array([timestamp for timestamp, _ in rows], dtype=np.float64)
+        if not np.array_equal(block.candle_times + block.time_frame_sec, timestamps):
+            # live data file candles are saved at their collection time
+            return None
+        return block
+
+    def select(self, limit=-1, timestamps=None, operations=None):
+        """
+        :return: the OHLCV rows selected like SQLiteDatabase.select_from_timestamp: latest candles first
+        """
+        start_index, end_index = self._get_indexes(timestamps or [], operations or [])
+        if limit is not None and limit != -1:
+            start_index = max(start_index, end_index - limit)
+        if start_index >= end_index:
+            return []
+        return self._get_rows(slice(end_index - 1, None if start_index == 0 else start_index - 1, -1))
+
+    def get_window(self, inferior_timestamp, superior_timestamp, limit=-1):
+        """
+        :return: the OHLCV rows between inferior_timestamp and superior_timestamp (included, -1 to ignore them)
+        sorted by timestamp. When superior_timestamp is ignored, only the first limit rows are returned.
+        """
+        timestamps, operations = [], []
+        if inferior_timestamp != -1:
+            timestamps.append(inferior_timestamp)
+            operations.append(commons_enums.DataBaseOperations.SUP_EQUALS.value)
+        if superior_timestamp != -1:
+            timestamps.append(superior_timestamp)
+            operations.append(commons_enums.DataBaseOperations.INF_EQUALS.value)
+        start_index, end_index = self._get_indexes(timestamps, operations)
+        if superior_timestamp == -1 and limit is not None and limit != -1:
+            end_index = min(end_index, start_index + limit)
+        if start_index >= end_index:
+            return []
+        return self._get_rows(slice(start_index, end_index))
+
+    def _get_indexes(self, timestamps, operations):
+        start_index, end_index = 0, len(self.candle_times)
+        for timestamp, operation in zip(timestamps, operations):
+            candle_time = float(timestamp) - self.time_frame_sec
+            if operation in (commons_enums.DataBaseOperations.SUP_EQUALS.value,
+                             commons_enums.DataBaseOperations.EQUALS.value):
+                start_index = max(start_index, np.searchsorted(self.candle_times, candle_time, side="left"))
+            if operation in (commons_enums.DataBaseOperations.INF_EQUALS.value,
+                             commons_enums.DataBaseOperations.EQUALS.value):
+                end_index = min(end_index, np.searchsorted(self.candle_times, candle_time, side="right"))
+            if operation == commons_enums.DataBaseOperations.SUP.value:
+                start_index = max(start_index, np.searchsorted(self.candle_times, candle_time, side="right"))
+            if operation == commons_enums.DataBaseOperations.INF.value:
+                end_index = min(end_index, np.searchsorted(self.candle_times, candle_time, side="left"))
+        return int(start_index), int(end_index)
+
+    def _get_rows(self, selection):
+        return [
+            [close_timestamp, *self.row_values, [candle_time, open_value, high, low, close, volume]]
+            for close_timestamp, candle_time, open_value, high, low, close, volume in zip(
+                (self.candle_times[selection] + self.time_frame_sec).tolist(),
+                *(self.columns[column][selection].tolist() for column in ColumnarCandlesFile.COLUMNS)
+            )
+        ]
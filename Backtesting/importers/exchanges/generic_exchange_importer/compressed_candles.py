@@ -0,0 +1,366 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import bisect
+import collections
+import enum
+import json
+import lzma
+import zlib
+
+import numpy as np
+
+import octobot_backtesting.enums as backtesting_enums
+import octobot_commons.enums as commons_enums
+import octobot_commons.logging as logging
+import tentacles.Backtesting.importers.exchanges.generic_exchange_importer.columnar_candles as columnar_candles
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class CompressedCandles:
+    """
+    Compressed candle blocks of a data file, stored in its BLOCKS table instead of its OHLCV table.
+    Each block holds up to BLOCK_SIZE candles of a (symbol, time frame) as the ColumnarCandlesFile.COLUMNS:
+    columns are delta encoded (float64 values on their int64 bit patterns, which is lossless), their bytes are
+    shuffled to group similar bytes together and the result is compressed with zstd, zlib or lzma.
+    Blocks are decompressed on their first read and the last CACHED_BLOCKS decoded blocks are kept in memory.
+    """
+    ZSTD = "zstd"
+    ZLIB = "zlib"
+    LZMA = "lzma"
+    COMPRESSIONS = (ZSTD, ZLIB, LZMA)
+    ZSTD_LEVEL = 10
+    ZLIB_LEVEL = 9
+    BLOCK_SIZE = 4096
+    CACHED_BLOCKS = 16
+    BLOCK_COLUMNS = ("timestamp", "exchange_name", "symbol", "time_frame", "row_values", "first_timestamp",
+                     "candles_count", "compression", "block")
+
+    class CompressedCandlesTables(enum.Enum):
+        BLOCKS = "ohlcv_blocks"
+
+    BLOCKS_TABLE = CompressedCandlesTables.BLOCKS
+
+    def __init__(self, database):
+        self.database = database
+        # (symbol, time_frame value): CompressedCandlesPair
+        self.pairs = {}
+        # block id: decoded columns
+        self._decoded_blocks = collections.OrderedDict()
+
+    async def load(self):
+        """
+        Loads the blocks index: blocks content is only read when required
+        """
+        async with self.database.aio_cursor() as cursor:
+            await cursor.execute(f"SELECT rowid, exchange_name, symbol, time_frame, row_values, first_timestamp, "
+                                 f"timestamp, candles_count FROM {self.BLOCKS_TABLE.value} "
+                                 f"ORDER BY symbol, time_frame, first_timestamp")
+            for block_id, exchange_name, symbol, time_frame, row_values, first_timestamp, last_timestamp, count \
+                    in await cursor.fetchall():
+                try:
+                    pair = self.pairs[(symbol, time_frame)]
+                except KeyError:
+                    pair = self.pairs[(symbol, time_frame)] = CompressedCandlesPair(
+                        self, exchange_name, symbol, time_frame, list(json.loads(row_values).values())
+                    )
+                pair.add_block(block_id, first_timestamp, last_timestamp, count)
+        return self
+
+    def get_pair(self, exchange_name, symbol, time_frame):
+        pair = self.pairs.get((symbol, time_frame))
+        if pair is None or (exchange_name is not None and pair.exchange_name != exchange_name):
+            return None
+        return pair
+
+    def get_timestamps(self, time_frame=None):
+        """
+        :return: the first candle close time of each time frame and the last candle close time (0 when there is
+        no candle)
+        """
+        first_timestamps = {}
+        last_timestamp = 0
+        for (_, pair_time_frame), pair in self.pairs.items():
+            if time_frame is not None and pair_time_frame != time_frame:
+                continue
+            first_timestamps[pair_time_frame] = min(first_timestamps.get(pair_time_frame, pair.first_timestamps[0]),
+                                                    pair.first_timestamps[0])
+            last_timestamp = max(last_timestamp, pair.last_timestamps[-1])
+        return first_timestamps, last_timestamp
+
+    async def get_blocks_columns(self, block_ids):
+        """
+        :return: the decoded columns of each block of block_ids
+        """
+        missing_block_ids = [block_id for block_id in block_ids if block_id not in self._decoded_blocks]
+        if missing_block_ids:
+            for block_id, compression, count, content in await self._read_blocks(missing_block_ids):
+                self._decoded_blocks[block_id] = self.decode_columns(content, compression, count)
+        blocks_columns = []
+        for block_id in block_ids:
+            self._decoded_blocks.move_to_end(block_id)
+            blocks_columns.append(self._decoded_blocks[block_id])
+        while len(self._decoded_blocks) > max(self.CACHED_BLOCKS, len(block_ids)):
+            self._decoded_blocks.popitem(last=False)
+        return blocks_columns
+
+    async def _read_blocks(self, block_ids):
+        """
+        :return: the (block id, compression, candles count, content) of each block of block_ids
+        """
+        async with self.database.aio_cursor() as cursor:
+            await cursor.execute(f"SELECT rowid, compression, candles_count, block FROM {self.BLOCKS_TABLE.value} "
+                                 f"WHERE rowid IN ({', '.join('?' for _ in block_ids)})",
+                                 block_ids)
+            return await cursor.fetchall()
+
+    @classmethod
+    def get_compression(cls, compression=None):
+        """
+        :return: compression when it is available, zstd or zlib when zstandard is not installed otherwise
+        """
+        if compression in cls.COMPRESSIONS and (compression != cls.ZSTD or zstandard is not None):
+            return compression
+        if compression is not None:
+            logging.get_logger(cls.__name__).warning(f"{compression} compression is not available")
+        return cls.ZLIB if zstandard is None else cls.ZSTD
+
+    @classmethod
+    def encode_columns(cls, columns, compression):
+        """
+        :param columns: column name to NumPy array, see ColumnarCandlesFile.COLUMNS
+        :return: the compressed block content
+        """
+        values = np.stack([
+            np.ascontiguousarray(columns[column], dtype=dtype).view(np.int64)
+            for column, dtype in columnar_candles.ColumnarCandlesFile.COLUMNS.items()
+        ])
+        # integers are wrapping around on overflows: decoding with cumsum gives the same bits back
+        deltas = np.diff(values, axis=1, prepend=np.zeros((len(values), 1), dtype=np.int64))
+        shuffled = deltas.view(np.uint8).reshape(len(values), -1, np.dtype(np.int64).itemsize).transpose(0, 2, 1)
+        return cls._compress(shuffled.tobytes(), compression)
+
+    @classmethod
+    def decode_columns(cls, content, compression, count):
+        """
+        :return: the column name to NumPy array of an encode_columns block content
+        """
+        columns_count = len(columnar_candles.ColumnarCandlesFile.COLUMNS)
+        deltas = np.frombuffer(cls._decompress(content, compression), dtype=np.uint8) \
+            .reshape(columns_count, np.dtype(np.int64).itemsize, count) \
+            .transpose(0, 2, 1).copy().view(np.int64).reshape(columns_count, count)
+        values = np.cumsum(deltas, axis=1, dtype=np.int64)
+        return {
+            column: values[index].view(dtype)
+            for index, (column, dtype) in enumerate(columnar_candles.ColumnarCandlesFile.COLUMNS.items())
+        }
+
+    @classmethod
+    async def compress_database(cls, database, compression=None, block_size=BLOCK_SIZE):
+        """
+        Moves the candles of the given data file database into compressed blocks. Pairs which candles can't be
+        stored in columns (see ColumnarCandlesFile) are kept in the OHLCV table.
+        The data file is expected not to be compressed already, see decompress_database.
+        :return: the number of compressed pairs
+        """
+        compression = cls.get_compression(compression)
+        row_value_columns = await columnar_candles.ColumnarCandlesFile.get_row_value_columns(database)
+        if row_value_columns is None:
+            return 0
+        async with database.aio_cursor() as cursor:
+            await cursor.execute(f"CREATE TABLE IF NOT EXISTS {cls.CompressedCandlesTables.BLOCKS.value} "
+                                 f"({database.TIMESTAMP_COLUMN} datetime, exchange_name text, symbol text, "
+                                 f"time_frame text, row_values text, first_timestamp datetime, "
+                                 f"candles_count integer, compression text, block blob)")
+        compressed_pairs = 0
+        async for row_values, _, block in columnar_candles.ColumnarCandlesFile.iter_database_blocks(
+                database, row_value_columns):
+            if block is None:
+                continue
+            encoded_row_values = json.dumps(dict(zip(row_value_columns, row_values)))
+            close_times = block.candle_times + block.time_frame_sec
+            blocks = []
+            for start in range(0, len(block.candle_times), block_size):
+                selection = slice(start, start + block_size)
+                blocks.append((
+                    int(close_times[selection][-1]), block.exchange_name, block.symbol, block.time_frame,
+                    encoded_row_values, int(close_times[selection][0]), len(close_times[selection]), compression,
+                    cls.encode_columns({column: values[selection] for column, values in block.columns.items()},
+                                       compression)
+                ))
+            async with database.aio_cursor() as cursor:
+                await cursor.executemany(f"INSERT INTO {cls.CompressedCandlesTables.BLOCKS.value} "
+                                         f"({', '.join(cls.BLOCK_COLUMNS)}) "
+                                         f"VALUES ({', '.join('?' for _ in cls.BLOCK_COLUMNS)})",
+                                         blocks)
+                await cursor.execute(f"DELETE FROM {backtesting_enums.ExchangeDataTables.OHLCV.value} WHERE "
+                                     f"{' AND '.join(f'{column} = ?' for column in row_value_columns)}",
+                                     row_values)
+            compressed_pairs += 1
+        await database.connection.commit()
+        await cls._vacuum(database)
+        return compressed_pairs
+
+    @classmethod
+    async def decompress_database(cls, database, **kwargs):
+        """
+        Moves the candles of the compressed blocks of the given data file database back into its OHLCV table
+        :param kwargs: constructor arguments
+        :return: the compression of the blocks, None when the data file is not compressed
+        """
+        if not await database.check_table_exists(cls.BLOCKS_TABLE):
+            return None
+        compression = None
+        compressed_candles = cls(database, **kwargs)
+        async with database.aio_cursor() as cursor:
+            await cursor.execute(f"SELECT rowid, exchange_name, symbol, time_frame, row_values, compression "
+                                 f"FROM {cls.BLOCKS_TABLE.value}")
+            blocks = await cursor.fetchall()
+        for block_id, exchange_name, symbol, time_frame, row_values, compression in blocks:
+            values_by_column = json.loads(row_values)
+            block = columnar_candles.CandlesBlock(exchange_name, symbol, time_frame, values_by_column.values(),
+                                                  (await compressed_candles.get_blocks_columns([block_id]))[0])
+            async with database.aio_cursor() as cursor:
+                await cursor.executemany(
+                    f"INSERT INTO {backtesting_enums.ExchangeDataTables.OHLCV.value} "
+                    f"({database.TIMESTAMP_COLUMN}, {', '.join(values_by_column)}, "
+                    f"{columnar_candles.ColumnarCandlesFile.CANDLE_COLUMN}) "
+                    f"VALUES ({', '.join('?' for _ in range(len(values_by_column) + 2))})",
+                    [(*row[:-1], json.dumps(row[-1])) for row in block.select()]
+                )
+        async with database.aio_cursor() as cursor:
+            await cursor.execute(f"DROP TABLE {cls.BLOCKS_TABLE.value}")
+        await database.connection.commit()
+        return compression
+
+    @classmethod
+    def _compress(cls, content, compression):
+        if compression == cls.ZSTD:
+            return zstandard.ZstdCompressor(level=cls.ZSTD_LEVEL).compress(content)
+        if compression == cls.LZMA:
+            return lzma.compress(content)
+        return zlib.compress(content, cls.ZLIB_LEVEL)
+
+    @classmethod
+    def _decompress(cls, content, compression):
+        if compression == cls.ZSTD:
+            if zstandard is None:
+                raise ImportError("zstandard package is required to read zstd compressed candles")
+            return zstandard.ZstdDecompressor().decompress(content)
+        if compression == cls.LZMA:
+            return lzma.decompress(content)
+        return zlib.decompress(content)
+
+    @staticmethod
+    async def _vacuum(database):
+        # shrink the data file: removed rows are otherwise kept as free pages
+        async with database.aio_cursor() as cursor:
+            await cursor.execute("VACUUM")
+
+
+class CompressedCandlesPair:
+    """
+    Compressed blocks of a (symbol, time frame), sorted by time: reads only decode the blocks of the
+    requested candles and give the same rows as CandlesBlock.select and CandlesBlock.get_window
+    """
+
+    def __init__(self, compressed_candles, exchange_name, symbol, time_frame, row_values):
+        self.compressed_candles = compressed_candles
+        self.exchange_name = exchange_name
+        self.symbol = symbol
+        self.time_frame = time_frame
+        self.row_values = row_values
+        self.block_ids = []
+        # blocks first and last candles close time
+        self.first_timestamps = []
+        self.last_timestamps = []
+        self.counts = []
+        # ((first block index, last block index + 1), CandlesBlock) of the last read
+        self._last_candles_block = (None, None)
+
+    def add_block(self, block_id, first_timestamp, last_timestamp, count):
+        self.block_ids.append(block_id)
+        self.first_timestamps.append(float(first_timestamp))
+        self.last_timestamps.append(float(last_timestamp))
+        self.counts.append(count)
+
+    async def select(self, limit=-1, timestamps=None, operations=None):
+        start_index, end_index = self._get_blocks_indexes(*self._get_interval(timestamps or [], operations or []))
+        if limit is not None and limit != -1 and start_index < end_index:
+            # latest candles first: the last block can be partially selected
+            block_index = end_index - 1
+            selected_count = 0
+            while block_index > start_index and selected_count < limit:
+                block_index -= 1
+                selected_count += self.counts[block_index]
+            start_index = block_index
+        candles_block = await self._get_candles_block(start_index, end_index)
+        return [] if candles_block is None \
+            else candles_block.select(limit=limit, timestamps=timestamps, operations=operations)
+
+    async def get_window(self, inferior_timestamp, superior_timestamp, limit=-1):
+        start_index, end_index = self._get_blocks_indexes(
+            float("-inf") if inferior_timestamp == -1 else float(inferior_timestamp),
+            float("inf") if superior_timestamp == -1 else float(superior_timestamp)
+        )
+        if superior_timestamp == -1 and limit is not None and limit != -1 and start_index < end_index:
+            # first candles first: the first block can be partially selected
+            block_index = start_index + 1
+            selected_count = 0
+            while block_index < end_index and selected_count < limit:
+                selected_count += self.counts[block_index]
+                block_index += 1
+            end_index = block_index
+        candles_block = await self._get_candles_block(start_index, end_index)
+        return [] if candles_block is None \
+            else candles_block.get_window(inferior_timestamp, superior_timestamp, limit=limit)
+
+    def _get_interval(self, timestamps, operations):
+        inferior_timestamp, superior_timestamp = float("-inf"), float("inf")
+        for timestamp, operation in zip(timestamps, operations):
+            if operation in (commons_enums.DataBaseOperations.SUP_EQUALS.value,
+                             commons_enums.DataBaseOperations.SUP.value,
+                             commons_enums.DataBaseOperations.EQUALS.value):
+                inferior_timestamp = max(inferior_timestamp, float(timestamp))
+            if operation in (commons_enums.DataBaseOperations.INF_EQUALS.value,
+                             commons_enums.DataBaseOperations.INF.value,
+                             commons_enums.DataBaseOperations.EQUALS.value):
+                superior_timestamp = min(superior_timestamp, float(timestamp))
+        return inferior_timestamp, superior_timestamp
+
+    def _get_blocks_indexes(self, inferior_timestamp, superior_timestamp):
+        return bisect.bisect_left(self.last_timestamps, inferior_timestamp), \
+            bisect.bisect_right(self.first_timestamps, superior_timestamp)
+
+    async def _get_candles_block(self, start_index, end_index):
+        if start_index >= end_index:
+            return None
+        indexes, candles_block = self._last_candles_block
+        if indexes == (start_index, end_index):
+            return candles_block
+        blocks_columns = await self.compressed_candles.get_blocks_columns(self.block_ids[start_index:end_index])
+        candles_block = columnar_candles.CandlesBlock(
+            self.exchange_name, self.symbol, self.time_frame, self.row_values,
+            blocks_columns[0] if len(blocks_columns) == 1 else {
+                column: np.concatenate([columns[column] for columns in blocks_columns])
+                for column in columnar_candles.ColumnarCandlesFile.COLUMNS
+            }
+        )
+        self._last_candles_block = ((start_index, end_index), candles_block)
+        return candles_block
@@ -17,4 +17,6 @@
 from octobot_backtesting.importers.exchanges.exchange_importer cimport ExchangeDataImporter
 
 cdef class GenericExchangeDataImporter(ExchangeDataImporter):
-    pass
\ No newline at end of file
+    cdef public object columnar_candles_file
+    cdef public object compressed_candles
+    cdef public dict chunked_readers
\ No newline at end of file
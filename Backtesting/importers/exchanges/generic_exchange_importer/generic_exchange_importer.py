@@ -13,8 +13,180 @@
 #
 #  You should have received a copy of the GNU Lesser General Public
 #  License along with this library.
+import os
+import sqlite3
+
+import octobot_backtesting.enums as backtesting_enums
+import octobot_backtesting.errors as backtesting_errors
 import octobot_backtesting.importers as importers
+import octobot_commons.constants as commons_constants
+import octobot_commons.databases as databases
+import octobot_commons.enums as commons_enums
+import octobot_commons.errors as commons_errors
+import tentacles.Backtesting.importers.exchanges.generic_exchange_importer.chunked_table_reader as \
+    chunked_table_reader
+import tentacles.Backtesting.importers.exchanges.generic_exchange_importer.columnar_candles as columnar_candles
+import tentacles.Backtesting.importers.exchanges.generic_exchange_importer.compressed_candles as \
+    compressed_candles
+import tentacles.Backtesting.importers.exchanges.generic_exchange_importer.shared_candles as shared_candles
 
 
 class GenericExchangeDataImporter(importers.ExchangeDataImporter):
-    pass
+    """
+    Candles are read from the columnar candles file of the data file when it is up to date with the data file,
+    see ColumnarCandlesFile. Candles of compressed data files are decompressed one block at a time when read,
+    see CompressedCandles. Candles of data files sharing their candles are read from the shared candles store
+    chunks of their manifest the same way, see SharedCandles.
+    Time window reads (get_..._from_timestamps) only read the requested window in chunks of CHUNK_SIZE rows
+    using (symbol, time_frame, timestamp) indexes created on initialization: memory usage doesn't depend on
+    the data file size.
+    """
+    CHUNK_SIZE = 5000
+    IMPORT_ROWS_BY_TABLE = {
+        backtesting_enums.ExchangeDataTables.OHLCV: importers.import_ohlcvs,
+        backtesting_enums.ExchangeDataTables.KLINE: importers.import_klines,
+        backtesting_enums.ExchangeDataTables.TICKER: importers.import_tickers,
+        backtesting_enums.ExchangeDataTables.ORDER_BOOK: importers.import_order_books,
+        backtesting_enums.ExchangeDataTables.RECENT_TRADES: importers.import_recent_trades,
+    }
+
+    def __init__(self, config, file_path):
+        super().__init__(config, file_path)
+        self.columnar_candles_file = None
+        self.compressed_candles = None
+        # (exchange_name, symbol, time_frame, data_type): ChunkedTableReader
+        self.chunked_readers = {}
+
+    async def initialize(self) -> None:
+        await super().initialize()
+        await self._create_indexes()
+        await self._load_columnar_candles_file()
+        await self._load_compressed_candles()
+
+    async def stop(self) -> None:
+        self.chunked_readers = {}
+        self.compressed_candles = None
+        if self.columnar_candles_file is not None:
+            self.columnar_candles_file.close()
+            self.columnar_candles_file = None
+        await super().stop()
+
+    async def get_ohlcv(self, exchange_name=None, symbol=None,
+                        time_frame=commons_enums.TimeFrames.ONE_HOUR,
+                        limit=databases.SQLiteDatabase.DEFAULT_SIZE,
+                        timestamps=None,
+                        operations=None):
+        if self.columnar_candles_file is not None and symbol is not None and time_frame is not None:
+            block = self.columnar_candles_file.get_block(exchange_name, self._get_importer_symbol(symbol),
+                                                         time_frame.value)
+            if block is not None:
+                return block.select(limit=limit, timestamps=timestamps, operations=operations)
+        if self.compressed_candles is not None and symbol is not None and time_frame is not None:
+            pair = self.compressed_candles.get_pair(exchange_name, self._get_importer_symbol(symbol),
+                                                    time_frame.value)
+            if pair is not None:
+                return await pair.select(limit=limit, timestamps=timestamps, operations=operations)
+        return await super().get_ohlcv(exchange_name=exchange_name, symbol=symbol, time_frame=time_frame,
+                                       limit=limit, timestamps=timestamps, operations=operations)
+
+    async def _get_from_cache(self, exchange_name, symbol, time_frame, data_type,
+                              inferior_timestamp, superior_timestamp, set_cache_method, limit):
+        symbol = self._get_importer_symbol(symbol)
+        if data_type is backtesting_enums.ExchangeDataTables.OHLCV and self.columnar_candles_file is not None:
+            block = self.columnar_candles_file.get_block(exchange_name, symbol, time_frame.value)
+            if block is not None:
+                return block.get_window(inferior_timestamp, superior_timestamp, limit=limit)
+        if data_type is backtesting_enums.ExchangeDataTables.OHLCV and self.compressed_candles is not None:
+            pair = self.compressed_candles.get_pair(exchange_name, symbol, time_frame.value)
+            if pair is not None:
+                return await pair.get_window(inferior_timestamp, superior_timestamp, limit=limit)
+        key = (exchange_name, symbol, time_frame, data_type)
+        try:
+            reader = self.chunked_readers[key]
+        except KeyError:
+            reader = self.chunked_readers[key] = chunked_table_reader.ChunkedTableReader(
+                self.database, data_type, self.IMPORT_ROWS_BY_TABLE[data_type], self.CHUNK_SIZE,
+                exchange_name=exchange_name, symbol=symbol, time_frame=None if time_frame is None else time_frame.value
+            )
+        return await reader.get(inferior_timestamp, superior_timestamp, limit=limit)
+
+    async def get_data_timestamp_interval(self, time_frame=None):
+        if self.compressed_candles is None:
+            return await super().get_data_timestamp_interval(time_frame=time_frame)
+        minimum_timestamp, maximum_timestamp = 0, 0
+        for table in self.available_data_types:
+            if table is backtesting_enums.ExchangeDataTables.OHLCV:
+                continue
+            try:
+                min_timestamp = (await self.database.select_min(table, [self.database.TIMESTAMP_COLUMN]))[0][0]
+                max_timestamp = (await self.database.select_max(table, [self.database.TIMESTAMP_COLUMN]))[0][0]
+                minimum_timestamp = min(minimum_timestamp, min_timestamp) if minimum_timestamp else min_timestamp
+                maximum_timestamp = max(maximum_timestamp, max_timestamp)
+            except (IndexError, commons_errors.DatabaseNotFoundError):
+                pass
+        # OHLCV timestamps of both the compressed blocks and the OHLCV table
+        first_timestamps, last_timestamp = self.compressed_candles.get_timestamps(time_frame=time_frame)
+        ohlcv_kwargs = {"time_frame": time_frame} if time_frame else {}
+        try:
+            for min_timestamp, found_time_frame in await self.database.select_min(
+                    backtesting_enums.ExchangeDataTables.OHLCV, [self.database.TIMESTAMP_COLUMN],
+                    [commons_constants.CONFIG_TIME_FRAME], group_by=commons_constants.CONFIG_TIME_FRAME,
+                    **ohlcv_kwargs):
+                first_timestamps[found_time_frame] = min(first_timestamps.get(found_time_frame, min_timestamp),
+                                                         min_timestamp)
+                last_timestamp = max(last_timestamp, (await self.database.select_max(
+                    backtesting_enums.ExchangeDataTables.OHLCV, [self.database.TIMESTAMP_COLUMN],
+                    time_frame=found_time_frame))[0][0])
+        except (IndexError, commons_errors.DatabaseNotFoundError):
+            pass
+        if not first_timestamps:
+            if time_frame:
+                raise backtesting_errors.MissingTimeFrame(f"Missing time frame in data file: {time_frame}")
+            return minimum_timestamp, maximum_timestamp
+        # the latest first candle of the time frames
+        min_ohlcv_timestamp = max(first_timestamps.values())
+        if minimum_timestamp > 0 and maximum_timestamp > 0:
+            return max(minimum_timestamp, min_ohlcv_timestamp), max(maximum_timestamp, last_timestamp)
+        return min_ohlcv_timestamp, last_timestamp
+
+    async def _init_available_data_types(self):
+        await super()._init_available_data_types()
+        if backtesting_enums.ExchangeDataTables.OHLCV not in self.available_data_types \
+                and (await self.database.check_table_exists(compressed_candles.CompressedCandles.BLOCKS_TABLE)
+                     or await self.database.check_table_exists(shared_candles.SharedCandles.BLOCKS_TABLE)):
+            # candles of compressed and shared data files are in blocks
+            self.available_data_types = [table for table in backtesting_enums.ExchangeDataTables
+                                         if table in self.available_data_types
+                                         or table is backtesting_enums.ExchangeDataTables.OHLCV]
+
+    async def _create_indexes(self):
+        try:
+            await chunked_table_reader.ChunkedTableReader.create_indexes(self.database, self.available_data_types)
+        except sqlite3.OperationalError as e:
+            # read-only data file
+            self.logger.warning(f"Can't create {self.file_path} indexes, data reads will be slower: {e}")
+
+    async def _load_columnar_candles_file(self):
+        data_file_path = self.adapt_file_path_if_necessary()
+        file_path = columnar_candles.ColumnarCandlesFile.get_file_path(data_file_path)
+        if not os.path.isfile(file_path):
+            return
+        try:
+            columnar_candles_file = columnar_candles.ColumnarCandlesFile(file_path).open()
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning(f"Ignored invalid columnar candles file {file_path}: {e}")
+            return
+        ohlcv_count = (await self.database.select_count(backtesting_enums.ExchangeDataTables.OHLCV, ["*"]))[0][0] \
+            if backtesting_enums.ExchangeDataTables.OHLCV in self.available_data_types else 0
+        if not columnar_candles_file.is_up_to_date(data_file_path, ohlcv_count):
+            # the data file has been updated after the columnar candles file creation
+            self.logger.warning(f"Ignored outdated columnar candles file {file_path}")
+            columnar_candles_file.close()
+            return
+        self.columnar_candles_file = columnar_candles_file
+
+    async def _load_compressed_candles(self):
+        if await self.database.check_table_exists(compressed_candles.CompressedCandles.BLOCKS_TABLE):
+            self.compressed_candles = await compressed_candles.CompressedCandles(self.database).load()
+        elif await self.database.check_table_exists(shared_candles.SharedCandles.BLOCKS_TABLE):
+            self.compressed_candles = await shared_candles.SharedCandles(self.database).load()
@@ -0,0 +1,230 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import enum
+import hashlib
+import json
+import os
+
+import numpy as np
+
+import octobot_backtesting.constants as backtesting_constants
+import octobot_backtesting.enums as backtesting_enums
+import octobot_commons.constants as commons_constants
+import octobot_commons.databases as databases
+import octobot_commons.enums as commons_enums
+import tentacles.Backtesting.importers.exchanges.generic_exchange_importer.columnar_candles as columnar_candles
+import tentacles.Backtesting.importers.exchanges.generic_exchange_importer.compressed_candles as \
+    compressed_candles
+
+
+class SharedCandlesStore:
+    """
+    Candles shared by data files: chunks of the candles of an (exchange, symbol, time frame) time bucket of
+    BUCKET_SIZE candles, encoded like CompressedCandles blocks. Chunk files are named after the hash of their
+    content: identical chunks of different data files are stored once.
+    The store index references the latest chunk of each time bucket, chunks of complete time buckets (with
+    every candle of the bucket time range) are reused by collectors instead of downloading their candles again.
+    """
+    DEFAULT_PATH = os.path.join(backtesting_constants.BACKTESTING_FILE_PATH, "shared_candles")
+    INDEX_FILE_NAME = "index.sqlite"
+    CHUNK_FILE_EXT = ".chunk"
+    BUCKET_SIZE = compressed_candles.CompressedCandles.BLOCK_SIZE
+    INDEX_COLUMNS = ("timestamp", "exchange_name", "symbol", "time_frame", "bucket_start", "row_values",
+                     "first_timestamp", "candles_count", "compression", "chunk", "is_complete")
+
+    class SharedCandlesStoreTables(enum.Enum):
+        CHUNKS = "chunks"
+
+    def __init__(self, path=None):
+        self.path = path or self.DEFAULT_PATH
+        # index database, only required to reference and find chunks
+        self.database = None
+
+    async def initialize(self):
+        os.makedirs(self.path, exist_ok=True)
+        self.database = databases.SQLiteDatabase(os.path.join(self.path, self.INDEX_FILE_NAME))
+        await self.database.initialize()
+        async with self.database.aio_cursor() as cursor:
+            await cursor.execute(f"CREATE TABLE IF NOT EXISTS {self.SharedCandlesStoreTables.CHUNKS.value} "
+                                 f"({self.database.TIMESTAMP_COLUMN} datetime, exchange_name text, symbol text, "
+                                 f"time_frame text, bucket_start integer, row_values text, "
+                                 f"first_timestamp datetime, candles_count integer, compression text, chunk text, "
+                                 f"is_complete integer, "
+                                 f"PRIMARY KEY (exchange_name, symbol, time_frame, bucket_start))")
+        await self.database.connection.commit()
+        return self
+
+    async def stop(self):
+        if self.database is not None:
+            await self.database.stop()
+            self.database = None
+
+    @classmethod
+    def get_bucket_duration(cls, time_frame):
+        """
+        :return: the duration in seconds of the time buckets of time_frame (a TimeFrames value)
+        """
+        return commons_enums.TimeFramesMinutes[commons_enums.TimeFrames(time_frame)] \
+            * commons_constants.MINUTE_TO_SECONDS * cls.BUCKET_SIZE
+
+    def write_chunk(self, content):
+        """
+        :return: the chunk id of content
+        """
+        chunk = hashlib.sha256(content).hexdigest()
+        chunk_path = self._get_chunk_path(chunk)
+        if not os.path.isfile(chunk_path):
+            os.makedirs(os.path.dirname(chunk_path), exist_ok=True)
+            # chunks are written at once: concurrent readers never see partial chunks
+            temp_path = f"{chunk_path}.{os.getpid()}"
+            with open(temp_path, "wb") as chunk_file:
+                chunk_file.write(content)
+            os.replace(temp_path, chunk_path)
+        return chunk
+
+    def read_chunk(self, chunk):
+        with open(self._get_chunk_path(chunk), "rb") as chunk_file:
+            return chunk_file.read()
+
+    async def index_chunks(self, chunks):
+        """
+        References chunks in the index, a time bucket chunk is replaced by a chunk of the same bucket only when
+        the new chunk is complete or has more candles
+        :param chunks: INDEX_COLUMNS values of each chunk
+        """
+        table = self.SharedCandlesStoreTables.CHUNKS.value
+        async with self.database.aio_cursor() as cursor:
+            await cursor.executemany(
+                f"INSERT INTO {table} ({', '.join(self.INDEX_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in self.INDEX_COLUMNS)}) "
+                f"ON CONFLICT (exchange_name, symbol, time_frame, bucket_start) DO UPDATE SET "
+                f"{', '.join(f'{column} = excluded.{column}' for column in self.INDEX_COLUMNS)} "
+                f"WHERE excluded.is_complete > {table}.is_complete OR (excluded.is_complete = {table}.is_complete "
+                f"AND excluded.candles_count > {table}.candles_count)",
+                chunks
+            )
+        await self.database.connection.commit()
+
+    async def get_complete_chunks(self, exchange_name, symbol, time_frame):
+        """
+        :return: the bucket start time to (chunk, compression, candles count) of the complete chunks of a pair
+        """
+        async with self.database.aio_cursor() as cursor:
+            await cursor.execute(f"SELECT bucket_start, chunk, compression, candles_count "
+                                 f"FROM {self.SharedCandlesStoreTables.CHUNKS.value} "
+                                 f"WHERE exchange_name = ? AND symbol = ? AND time_frame = ? AND is_complete = 1",
+                                 (exchange_name, symbol, time_frame))
+            return {
+                bucket_start: (chunk, compression, count)
+                for bucket_start, chunk, compression, count in await cursor.fetchall()
+            }
+
+    def get_chunk_columns(self, chunk, compression, count):
+        """
+        :return: the column name to NumPy array of a chunk, see ColumnarCandlesFile.COLUMNS
+        """
+        return compressed_candles.CompressedCandles.decode_columns(self.read_chunk(chunk), compression, count)
+
+    def _get_chunk_path(self, chunk):
+        # chunks are spread in sub folders
+        return os.path.join(self.path, chunk[:2], f"{chunk}{self.CHUNK_FILE_EXT}")
+
+
+class SharedCandles(compressed_candles.CompressedCandles):
+    """
+    Candles of a data file saved in a SharedCandlesStore: the data file CHUNKS table is the manifest of the store
+    chunks of its candles, which are read like CompressedCandles blocks.
+    """
+
+    class SharedCandlesTables(enum.Enum):
+        CHUNKS = "ohlcv_shared_chunks"
+
+    BLOCKS_TABLE = SharedCandlesTables.CHUNKS
+    CHUNK_COLUMNS = ("timestamp", "exchange_name", "symbol", "time_frame", "row_values", "first_timestamp",
+                     "candles_count", "compression", "chunk")
+
+    def __init__(self, database, store=None):
+        super().__init__(database)
+        self.store = store or SharedCandlesStore()
+
+    async def _read_blocks(self, block_ids):
+        async with self.database.aio_cursor() as cursor:
+            await cursor.execute(f"SELECT rowid, compression, candles_count, chunk FROM {self.BLOCKS_TABLE.value} "
+                                 f"WHERE rowid IN ({', '.join('?' for _ in block_ids)})",
+                                 block_ids)
+            return [
+                (block_id, compression, count, self.store.read_chunk(chunk))
+                for block_id, compression, count, chunk in await cursor.fetchall()
+            ]
+
+    @classmethod
+    async def share_database(cls, database, store, compression=None):
+        """
+        Moves the candles of the given data file database into the store chunks of their time buckets. Pairs which
+        candles can't be stored in columns (see ColumnarCandlesFile) are kept in the OHLCV table.
+        The data file is expected not to be shared already, see decompress_database.
+        :param store: an initialized SharedCandlesStore
+        :return: the number of shared pairs
+        """
+        compression = cls.get_compression(compression)
+        row_value_columns = await columnar_candles.ColumnarCandlesFile.get_row_value_columns(database)
+        if row_value_columns is None:
+            return 0
+        async with database.aio_cursor() as cursor:
+            await cursor.execute(f"CREATE TABLE IF NOT EXISTS {cls.BLOCKS_TABLE.value} "
+                                 f"({database.TIMESTAMP_COLUMN} datetime, exchange_name text, symbol text, "
+                                 f"time_frame text, row_values text, first_timestamp datetime, "
+                                 f"candles_count integer, compression text, chunk text)")
+        shared_pairs = 0
+        async for row_values, _, block in columnar_candles.ColumnarCandlesFile.iter_database_blocks(
+                database, row_value_columns):
+            if block is None:
+                continue
+            encoded_row_values = json.dumps(dict(zip(row_value_columns, row_values)))
+            bucket_duration = store.get_bucket_duration(block.time_frame)
+            bucket_starts = block.candle_times - block.candle_times % bucket_duration
+            # buckets between the first and last candles have every candle the exchange has
+            first_complete_bucket_start = int(bucket_starts[0]) if bucket_starts[0] == block.candle_times[0] \
+                else int(bucket_starts[0]) + bucket_duration
+            last_complete_bucket_end = int(block.candle_times[-1]) + block.time_frame_sec
+            close_times = block.candle_times + block.time_frame_sec
+            manifest_rows = []
+            index_rows = []
+            bucket_limits = np.flatnonzero(np.diff(bucket_starts)) + 1
+            for start, end in zip([0, *bucket_limits.tolist()], [*bucket_limits.tolist(), len(bucket_starts)]):
+                selection = slice(start, end)
+                bucket_start = int(bucket_starts[start])
+                chunk = store.write_chunk(cls.encode_columns(
+                    {column: values[selection] for column, values in block.columns.items()}, compression
+                ))
+                chunk_values = (int(close_times[end - 1]), block.exchange_name, block.symbol, block.time_frame,
+                                encoded_row_values, int(close_times[start]), end - start, compression, chunk)
+                manifest_rows.append(chunk_values)
+                is_complete = first_complete_bucket_start <= bucket_start \
+                    and bucket_start + bucket_duration <= last_complete_bucket_end
+                index_rows.append((*chunk_values[:4], bucket_start, *chunk_values[4:], int(is_complete)))
+            await store.index_chunks(index_rows)
+            async with database.aio_cursor() as cursor:
+                await cursor.executemany(f"INSERT INTO {cls.BLOCKS_TABLE.value} ({', '.join(cls.CHUNK_COLUMNS)}) "
+                                         f"VALUES ({', '.join('?' for _ in cls.CHUNK_COLUMNS)})",
+                                         manifest_rows)
+                await cursor.execute(f"DELETE FROM {backtesting_enums.ExchangeDataTables.OHLCV.value} WHERE "
+                                     f"{' AND '.join(f'{column} = ?' for column in row_value_columns)}",
+                                     row_values)
+            shared_pairs += 1
+        await database.connection.commit()
+        await cls._vacuum(database)
+        return shared_pairs
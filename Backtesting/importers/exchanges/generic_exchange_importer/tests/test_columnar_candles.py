@@ -0,0 +1,209 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import contextlib
+import json
+import os
+import time
+
+import numpy as np
+import pytest
+
+import octobot_backtesting.enums as enums
+import octobot_backtesting.importers as importers
+import octobot_commons.databases as databases
+import octobot_commons.enums as commons_enums
+import tentacles.Backtesting.importers.exchanges as importer_exchanges
+import tentacles.Backtesting.converters.exchanges as converter_exchanges
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+EXCHANGE = "binance"
+SYMBOL = "BTC/USDT"
+LIVE_SYMBOL = "ETH/USDT"
+TIME_FRAME = commons_enums.TimeFrames.ONE_HOUR
+TIME_FRAME_SEC = 3600
+CANDLES_COUNT = 1000
+# benchmarks are long and timing dependant: they only run when this environment variable is set
+BENCHMARKS_ENV_VAR = "RUN_BENCHMARKS"
+BENCHMARK_CANDLES_COUNT = 50000
+# rows are still built from the columns
+MIN_ROWS_SPEEDUP = 2
+MIN_ARRAYS_SPEEDUP = 10
+
+
+def _candles(candles_count):
+    return [
+        [index * TIME_FRAME_SEC, 100 + index, 101.5 + index, 99.25 + index, 100.5 + index, 12.5 + index % 7]
+        for index in range(candles_count)
+    ]
+
+
+@contextlib.asynccontextmanager
+async def data_file(file_path, candles_count):
+    database = databases.SQLiteDatabase(str(file_path))
+    await database.initialize()
+    try:
+        await database.insert(enums.DataTables.DESCRIPTION, timestamp=time.time(), version="1.1", exchange=EXCHANGE,
+                              symbols=json.dumps([SYMBOL, LIVE_SYMBOL]), time_frames=json.dumps([TIME_FRAME.value]),
+                              start_timestamp=0, end_timestamp=0)
+        candles = _candles(candles_count)
+        await database.insert_all(enums.ExchangeDataTables.OHLCV,
+                                  timestamp=[candle[0] + TIME_FRAME_SEC for candle in candles],
+                                  exchange_name=EXCHANGE, cryptocurrency="BTC", symbol=SYMBOL,
+                                  time_frame=TIME_FRAME.value, candle=[json.dumps(candle) for candle in candles])
+        # live data file candles are saved at their collection time
+        await database.insert_all(enums.ExchangeDataTables.OHLCV,
+                                  timestamp=[candle[0] + 10 for candle in candles[:10]],
+                                  exchange_name=EXCHANGE, cryptocurrency="ETH", symbol=LIVE_SYMBOL,
+                                  time_frame=TIME_FRAME.value, candle=[json.dumps(candle) for candle in candles[:10]])
+        yield database
+    finally:
+        await database.stop()
+
+
+async def _select_from_database(database, symbol, limit=-1, inferior_timestamp=-1, superior_timestamp=-1):
+    timestamps, operations = importers.get_operations_from_timestamps(superior_timestamp, inferior_timestamp)
+    return importers.import_ohlcvs(await database.select_from_timestamp(
+        enums.ExchangeDataTables.OHLCV, size=limit, exchange_name=EXCHANGE, symbol=symbol,
+        time_frame=TIME_FRAME.value, timestamps=timestamps, operations=operations
+    ))
+
+
+def _select_from_columnar_candles_file(file_path, symbol, limit=-1, inferior_timestamp=-1, superior_timestamp=-1):
+    timestamps, operations = importers.get_operations_from_timestamps(superior_timestamp, inferior_timestamp)
+    columnar_candles_file = importer_exchanges.ColumnarCandlesFile(file_path).open()
+    try:
+        return columnar_candles_file.get_block(EXCHANGE, symbol, TIME_FRAME.value)\
+            .select(limit=limit, timestamps=timestamps, operations=operations)
+    finally:
+        columnar_candles_file.close()
+
+
+async def _load_arrays_from_database(database, symbol):
+    candles = [candle for *_, candle in await _select_from_database(database, symbol)]
+    return np.array(candles, dtype=np.float64)
+
+
+def _load_arrays_from_columnar_candles_file(file_path, symbol):
+    columnar_candles_file = importer_exchanges.ColumnarCandlesFile(file_path).open()
+    try:
+        columns = columnar_candles_file.get_block(EXCHANGE, symbol, TIME_FRAME.value).columns
+        return np.column_stack(list(columns.values()))
+    finally:
+        columnar_candles_file.close()
+
+
+async def _best_time(function, *args):
+    durations = []
+    for _ in range(3):
+        start = time.perf_counter()
+        result = function(*args)
+        if hasattr(result, "__await__"):
+            await result
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+async def test_create_from_database(tmp_path):
+    file_path = str(tmp_path / "ExchangeHistoryDataCollector_test.data")
+    columnar_candles_file_path = importer_exchanges.ColumnarCandlesFile.get_file_path(file_path)
+    async with data_file(file_path, CANDLES_COUNT) as database:
+        assert await importer_exchanges.ColumnarCandlesFile.create_from_database(database, columnar_candles_file_path)
+        columnar_candles_file = importer_exchanges.ColumnarCandlesFile(columnar_candles_file_path).open()
+        assert columnar_candles_file.ohlcv_count == CANDLES_COUNT + 10
+        # live pair is kept in the data file only
+        assert list(columnar_candles_file.blocks) == [(SYMBOL, TIME_FRAME.value)]
+        assert columnar_candles_file.get_block("kraken", SYMBOL, TIME_FRAME.value) is None
+        block = columnar_candles_file.get_block(EXCHANGE, SYMBOL, TIME_FRAME.value)
+        assert block.columns["close"].dtype == np.float64
+        assert block.candle_times[-1] == (CANDLES_COUNT - 1) * TIME_FRAME_SEC
+        columnar_candles_file.close()
+        for kwargs in ({}, {"limit": 10}, {"inferior_timestamp": 36000},
+                       {"inferior_timestamp": 36000, "superior_timestamp": 72000, "limit": 5},
+                       {"superior_timestamp": 1}, {"inferior_timestamp": CANDLES_COUNT * TIME_FRAME_SEC * 2}):
+            assert _select_from_columnar_candles_file(columnar_candles_file_path, SYMBOL, **kwargs) \
+                == await _select_from_database(database, SYMBOL, **kwargs)
+
+
+async def test_importer(tmp_path):
+    file_path = str(tmp_path / "ExchangeHistoryDataCollector_test.data")
+    async with data_file(file_path, CANDLES_COUNT) as database:
+        await database.connection.commit()
+        expected_candles = await _select_from_database(database, SYMBOL, inferior_timestamp=36000)
+        expected_live_candles = await _select_from_database(database, LIVE_SYMBOL)
+    converter = converter_exchanges.ColumnarCandlesConverter(file_path)
+    assert await converter.can_convert()
+    assert await converter.convert()
+    assert os.path.isfile(converter.converted_file)
+
+    importer = importer_exchanges.GenericExchangeDataImporter({}, file_path)
+    await importer.initialize()
+    try:
+        assert importer.columnar_candles_file is not None
+        assert await importer.get_ohlcv_from_timestamps(EXCHANGE, SYMBOL, TIME_FRAME, inferior_timestamp=36000) \
+            == sorted(expected_candles)
+        assert await importer.get_ohlcv(EXCHANGE, LIVE_SYMBOL, TIME_FRAME) == expected_live_candles
+    finally:
+        await importer.stop()
+
+    # candles updated in place
+    database = databases.SQLiteDatabase(file_path)
+    await database.initialize()
+    try:
+        async with database.aio_cursor() as cursor:
+            await cursor.execute(f"UPDATE {enums.ExchangeDataTables.OHLCV.value} SET candle = ? WHERE symbol = ? "
+                                 f"AND timestamp = ?", (json.dumps([0, 100, 110, 90, 105, 10]), SYMBOL, TIME_FRAME_SEC))
+        await database.connection.commit()
+    finally:
+        await database.stop()
+    importer = importer_exchanges.GenericExchangeDataImporter({}, file_path)
+    await importer.initialize()
+    try:
+        assert importer.columnar_candles_file is None
+    finally:
+        await importer.stop()
+
+    # outdated columnar candles file
+    assert await converter.convert()
+    async with data_file(file_path, 1):
+        pass
+    importer = importer_exchanges.GenericExchangeDataImporter({}, file_path)
+    await importer.initialize()
+    try:
+        assert importer.columnar_candles_file is None
+    finally:
+        await importer.stop()
+
+
+@pytest.mark.skipif(not os.getenv(BENCHMARKS_ENV_VAR), reason=f"set {BENCHMARKS_ENV_VAR}=1 to run benchmarks")
+async def test_load_time_benchmark(tmp_path):
+    file_path = str(tmp_path / "ExchangeHistoryDataCollector_test.data")
+    columnar_candles_file_path = importer_exchanges.ColumnarCandlesFile.get_file_path(file_path)
+    async with data_file(file_path, BENCHMARK_CANDLES_COUNT) as database:
+        assert await importer_exchanges.ColumnarCandlesFile.create_from_database(database, columnar_candles_file_path)
+        assert _select_from_columnar_candles_file(columnar_candles_file_path, SYMBOL) \
+            == await _select_from_database(database, SYMBOL)
+        assert await _best_time(_select_from_database, database, SYMBOL) \
+            > MIN_ROWS_SPEEDUP * await _best_time(_select_from_columnar_candles_file, columnar_candles_file_path,
+                                                  SYMBOL)
+        np.testing.assert_array_equal(
+            _load_arrays_from_columnar_candles_file(columnar_candles_file_path, SYMBOL)[::-1],
+            await _load_arrays_from_database(database, SYMBOL)
+        )
+        assert await _best_time(_load_arrays_from_database, database, SYMBOL) \
+            > MIN_ARRAYS_SPEEDUP * await _best_time(_load_arrays_from_columnar_candles_file,
+                                                    columnar_candles_file_path, SYMBOL)
@@ -0,0 +1,224 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import contextlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pytest
+
+import octobot_backtesting.enums as enums
+import octobot_commons.databases as databases
+import octobot_commons.enums as commons_enums
+import tentacles.Backtesting.importers.exchanges as importer_exchanges
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+EXCHANGE = "binance"
+SYMBOL = "BTC/USDT"
+LIVE_SYMBOL = "ETH/USDT"
+TIME_FRAME = commons_enums.TimeFrames.ONE_HOUR
+TIME_FRAME_SEC = 3600
+CANDLES_COUNT = 1000
+BLOCK_SIZE = 64
+# benchmarks are long and timing dependant: they only run when this environment variable is set
+BENCHMARKS_ENV_VAR = "RUN_BENCHMARKS"
+BENCHMARK_CANDLES_COUNT = 50000
+MIN_SIZE_RATIO = 3
+# compressing a data file is faster than writing it
+MAX_COMPRESSION_TIME_RATIO = 1
+MIN_READ_SPEEDUP = 1
+
+
+def _candles(candles_count):
+    random = np.random.default_rng(42)
+    closes = np.round(30000 + np.cumsum(random.normal(0, 50, candles_count)), 2)
+    return [
+        [index * TIME_FRAME_SEC, float(np.round(close - 10, 2)), float(np.round(close + 25.5, 2)),
+         float(np.round(close - 30.25, 2)), float(close), float(np.round(random.uniform(0, 500), 4))]
+        for index, close in enumerate(closes)
+    ]
+
+
+@contextlib.asynccontextmanager
+async def opened_database(file_path):
+    database = databases.SQLiteDatabase(str(file_path))
+    await database.initialize()
+    try:
+        yield database
+    finally:
+        await database.stop()
+
+
+async def create_data_file(file_path, candles_count):
+    async with opened_database(file_path) as database:
+        await database.insert(enums.DataTables.DESCRIPTION, timestamp=time.time(), version="1.1", exchange=EXCHANGE,
+                              symbols=json.dumps([SYMBOL, LIVE_SYMBOL]), time_frames=json.dumps([TIME_FRAME.value]),
+                              start_timestamp=0, end_timestamp=0)
+        candles = _candles(candles_count)
+        await database.insert_all(enums.ExchangeDataTables.OHLCV,
+                                  timestamp=[candle[0] + TIME_FRAME_SEC for candle in candles],
+                                  exchange_name=EXCHANGE, cryptocurrency="BTC", symbol=SYMBOL,
+                                  time_frame=TIME_FRAME.value, candle=[json.dumps(candle) for candle in candles])
+        # live data file candles are saved at their collection time
+        await database.insert_all(enums.ExchangeDataTables.OHLCV,
+                                  timestamp=[candle[0] + 10 for candle in candles[:10]],
+                                  exchange_name=EXCHANGE, cryptocurrency="ETH", symbol=LIVE_SYMBOL,
+                                  time_frame=TIME_FRAME.value, candle=[json.dumps(candle) for candle in candles[:10]])
+        await database.connection.commit()
+
+
+@contextlib.asynccontextmanager
+async def importer(file_path):
+    data_importer = importer_exchanges.GenericExchangeDataImporter({}, file_path)
+    await data_importer.initialize()
+    try:
+        yield data_importer
+    finally:
+        await data_importer.stop()
+
+
+async def _read_windows(data_importer, candles_count, window_size):
+    candles = []
+    for window_start in range(0, candles_count, window_size):
+        candles += await data_importer.get_ohlcv_from_timestamps(
+            EXCHANGE, SYMBOL, TIME_FRAME,
+            inferior_timestamp=window_start * TIME_FRAME_SEC + 1,
+            superior_timestamp=(window_start + window_size) * TIME_FRAME_SEC
+        )
+    return candles
+
+
+async def _best_time(function, *args):
+    durations = []
+    for _ in range(3):
+        start = time.perf_counter()
+        result = function(*args)
+        if hasattr(result, "__await__"):
+            await result
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+async def test_encode_columns():
+    candles = np.array(_candles(CANDLES_COUNT), dtype=np.float64)
+    columns = {
+        column: candles[:, index].astype(dtype)
+        for index, (column, dtype) in enumerate(importer_exchanges.ColumnarCandlesFile.COLUMNS.items())
+    }
+    # bit patterns deltas overflow: they still give the same values back
+    columns["low"][0] = -np.finfo(np.float64).max
+    columns["volume"][1] = np.finfo(np.float64).tiny
+    for compression in (importer_exchanges.CompressedCandles.get_compression(importer_exchanges.CompressedCandles.ZSTD),
+                        importer_exchanges.CompressedCandles.ZLIB, importer_exchanges.CompressedCandles.LZMA):
+        content = importer_exchanges.CompressedCandles.encode_columns(columns, compression)
+        assert len(content) < CANDLES_COUNT * len(columns) * 8 / 2
+        decoded_columns = importer_exchanges.CompressedCandles.decode_columns(content, compression, CANDLES_COUNT)
+        for column, values in columns.items():
+            assert decoded_columns[column].dtype == values.dtype
+            np.testing.assert_array_equal(decoded_columns[column], values)
+    assert importer_exchanges.CompressedCandles.get_compression("bz2") in (importer_exchanges.CompressedCandles.ZSTD,
+                                                                          importer_exchanges.CompressedCandles.ZLIB)
+
+
+async def test_compress_database(tmp_path):
+    file_path = str(tmp_path / "ExchangeHistoryDataCollector_test.data")
+    await create_data_file(file_path, CANDLES_COUNT)
+    async with importer(file_path) as data_importer:
+        expected_interval = await data_importer.get_data_timestamp_interval(TIME_FRAME.value)
+        expected_selections = [
+            await data_importer.get_ohlcv(EXCHANGE, symbol, TIME_FRAME, **kwargs)
+            for symbol in (SYMBOL, LIVE_SYMBOL)
+            for kwargs in ({}, {"limit": 100},
+                           {"timestamps": [72000], "operations": [commons_enums.DataBaseOperations.INF_EQUALS.value]},
+                           {"limit": 5, "timestamps": [36000],
+                            "operations": [commons_enums.DataBaseOperations.SUP_EQUALS.value]})
+        ]
+        expected_windows = [
+            await data_importer.get_ohlcv_from_timestamps(EXCHANGE, SYMBOL, TIME_FRAME, limit=200,
+                                                          inferior_timestamp=inferior_timestamp,
+                                                          superior_timestamp=-1)
+            for inferior_timestamp in (0, 36000)
+        ]
+        expected_candles = await _read_windows(data_importer, CANDLES_COUNT, 100)
+    uncompressed_size = os.path.getsize(file_path)
+
+    async with opened_database(file_path) as database:
+        assert await importer_exchanges.CompressedCandles.compress_database(database, block_size=BLOCK_SIZE) == 1
+        # live pair is kept in the OHLCV table
+        assert await database.select_count(enums.ExchangeDataTables.OHLCV, ["*"]) == [(10, )]
+    assert os.path.getsize(file_path) < uncompressed_size
+    async with importer(file_path) as data_importer:
+        assert enums.ExchangeDataTables.OHLCV in data_importer.available_data_types
+        assert len(data_importer.compressed_candles.get_pair(EXCHANGE, SYMBOL, TIME_FRAME.value).block_ids) \
+            == CANDLES_COUNT // BLOCK_SIZE + 1
+        assert data_importer.compressed_candles.get_pair("kraken", SYMBOL, TIME_FRAME.value) is None
+        assert await data_importer.get_data_timestamp_interval(TIME_FRAME.value) == expected_interval
+        assert [
+            await data_importer.get_ohlcv(EXCHANGE, symbol, TIME_FRAME, **kwargs)
+            for symbol in (SYMBOL, LIVE_SYMBOL)
+            for kwargs in ({}, {"limit": 100},
+                           {"timestamps": [72000], "operations": [commons_enums.DataBaseOperations.INF_EQUALS.value]},
+                           {"limit": 5, "timestamps": [36000],
+                            "operations": [commons_enums.DataBaseOperations.SUP_EQUALS.value]})
+        ] == expected_selections
+        assert [
+            await data_importer.get_ohlcv_from_timestamps(EXCHANGE, SYMBOL, TIME_FRAME, limit=200,
+                                                          inferior_timestamp=inferior_timestamp,
+                                                          superior_timestamp=-1)
+            for inferior_timestamp in (0, 36000)
+        ] == expected_windows
+        assert await _read_windows(data_importer, CANDLES_COUNT, 100) == expected_candles
+        # only the latest decoded blocks are kept
+        assert len(data_importer.compressed_candles._decoded_blocks) \
+            <= importer_exchanges.CompressedCandles.CACHED_BLOCKS
+
+    async with opened_database(file_path) as database:
+        assert await importer_exchanges.CompressedCandles.decompress_database(database) \
+            == importer_exchanges.CompressedCandles.get_compression()
+        assert not await database.check_table_exists(
+            importer_exchanges.CompressedCandles.CompressedCandlesTables.BLOCKS
+        )
+    async with importer(file_path) as data_importer:
+        assert data_importer.compressed_candles is None
+        assert await _read_windows(data_importer, CANDLES_COUNT, 100) == expected_candles
+
+
+@pytest.mark.skipif(not os.getenv(BENCHMARKS_ENV_VAR), reason=f"set {BENCHMARKS_ENV_VAR}=1 to run benchmarks")
+async def test_benchmark(tmp_path):
+    file_path = str(tmp_path / "ExchangeHistoryDataCollector_test.data")
+    compressed_file_path = str(tmp_path / "ExchangeHistoryDataCollector_compressed.data")
+    start = time.perf_counter()
+    await create_data_file(file_path, BENCHMARK_CANDLES_COUNT)
+    write_duration = time.perf_counter() - start
+    shutil.copy(file_path, compressed_file_path)
+    async with opened_database(compressed_file_path) as database:
+        start = time.perf_counter()
+        await importer_exchanges.CompressedCandles.compress_database(database)
+        compression_duration = time.perf_counter() - start
+    assert compression_duration < MAX_COMPRESSION_TIME_RATIO * write_duration
+    assert os.path.getsize(file_path) > MIN_SIZE_RATIO * os.path.getsize(compressed_file_path)
+
+    async with importer(file_path) as data_importer, importer(compressed_file_path) as compressed_data_importer:
+        assert await _read_windows(compressed_data_importer, BENCHMARK_CANDLES_COUNT, 500) \
+            == await _read_windows(data_importer, BENCHMARK_CANDLES_COUNT, 500)
+        data_importer.chunked_readers = {}
+        assert await _best_time(_read_windows, data_importer, BENCHMARK_CANDLES_COUNT, 500) \
+            > MIN_READ_SPEEDUP * await _best_time(_read_windows, compressed_data_importer,
+                                                  BENCHMARK_CANDLES_COUNT, 500)
@@ -0,0 +1,134 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import json
+import time
+
+import mock
+import pytest
+
+import octobot_backtesting.enums as enums
+import octobot_backtesting.importers as importers
+import octobot_commons.databases as databases
+import octobot_commons.enums as commons_enums
+import octobot_commons.errors as commons_errors
+import tentacles.Backtesting.importers.exchanges as importer_exchanges
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+EXCHANGE = "binance"
+SYMBOL = "BTC/USDT"
+TIME_FRAME = commons_enums.TimeFrames.ONE_HOUR
+TIME_FRAME_SEC = 3600
+CANDLES_COUNT = 500
+CHUNK_SIZE = 20
+
+
+async def _create_data_file(file_path):
+    database = databases.SQLiteDatabase(file_path)
+    await database.initialize()
+    try:
+        await database.insert(enums.DataTables.DESCRIPTION, timestamp=time.time(), version="1.1", exchange=EXCHANGE,
+                              symbols=json.dumps([SYMBOL]), time_frames=json.dumps([TIME_FRAME.value]),
+                              start_timestamp=0, end_timestamp=0)
+        candles = [[index * TIME_FRAME_SEC, 1, 2, 0.5, 1.5, 10] for index in range(CANDLES_COUNT)]
+        await database.insert_all(enums.ExchangeDataTables.OHLCV,
+                                  timestamp=[candle[0] + TIME_FRAME_SEC for candle in candles],
+                                  exchange_name=EXCHANGE, cryptocurrency="BTC", symbol=SYMBOL,
+                                  time_frame=TIME_FRAME.value, candle=[json.dumps(candle) for candle in candles])
+        # 3 tickers by timestamp: chunks are splitting tickers of the same timestamp
+        tickers = [{"close": index} for index in range(CANDLES_COUNT)]
+        await database.insert_all(enums.ExchangeDataTables.TICKER,
+                                  timestamp=[index // 3 * 60 for index in range(CANDLES_COUNT)],
+                                  exchange_name=EXCHANGE, cryptocurrency="BTC", symbol=SYMBOL,
+                                  ticker=[json.dumps(ticker) for ticker in tickers])
+    finally:
+        await database.stop()
+
+
+async def _importer(importer_class, file_path):
+    importer = importer_class({}, file_path)
+    await importer.initialize()
+    return importer
+
+
+async def test_indexes(tmp_path):
+    file_path = str(tmp_path / "ExchangeHistoryDataCollector_test.data")
+    await _create_data_file(file_path)
+    importer = await _importer(importer_exchanges.GenericExchangeDataImporter, file_path)
+    try:
+        async with importer.database.aio_cursor() as cursor:
+            await cursor.execute("SELECT name FROM sqlite_master WHERE type='index'")
+            indexes = [row[0] for row in await cursor.fetchall()]
+        assert "index_ohlcv_symbol_time_frame_timestamp" in indexes
+        assert "index_ticker_symbol_timestamp" in indexes
+    finally:
+        await importer.stop()
+
+
+async def test_get_ohlcv_from_timestamps(tmp_path):
+    file_path = str(tmp_path / "ExchangeHistoryDataCollector_test.data")
+    await _create_data_file(file_path)
+    reference_importer = await _importer(importers.ExchangeDataImporter, file_path)
+    importer = await _importer(importer_exchanges.GenericExchangeDataImporter, file_path)
+    try:
+        with mock.patch.object(importer, "CHUNK_SIZE", CHUNK_SIZE):
+            # same calls as the backtesting ohlcv updater
+            start = 100 * TIME_FRAME_SEC
+            assert await importer.get_ohlcv_from_timestamps(EXCHANGE, SYMBOL, TIME_FRAME, limit=10,
+                                                            inferior_timestamp=start, superior_timestamp=start) \
+                == await reference_importer.get_ohlcv_from_timestamps(EXCHANGE, SYMBOL, TIME_FRAME, limit=10,
+                                                                      inferior_timestamp=start,
+                                                                      superior_timestamp=start)
+            last_timestamp = start
+            for timestamp in range(start + TIME_FRAME_SEC, (CANDLES_COUNT + 2) * TIME_FRAME_SEC, TIME_FRAME_SEC):
+                kwargs = {"inferior_timestamp": last_timestamp + 1, "superior_timestamp": timestamp + TIME_FRAME_SEC}
+                candles = await importer.get_ohlcv_from_timestamps(EXCHANGE, SYMBOL, TIME_FRAME, **kwargs)
+                assert candles == await reference_importer.get_ohlcv_from_timestamps(EXCHANGE, SYMBOL, TIME_FRAME,
+                                                                                     **kwargs)
+                reader, = importer.chunked_readers.values()
+                # only the current chunk is in memory
+                assert len(reader.rows) <= CHUNK_SIZE + 2
+                last_timestamp = timestamp
+            assert candles == []
+            # reading previous candles again
+            assert len(await importer.get_ohlcv_from_timestamps(EXCHANGE, SYMBOL, TIME_FRAME,
+                                                                inferior_timestamp=TIME_FRAME_SEC,
+                                                                superior_timestamp=10 * TIME_FRAME_SEC)) == 10
+    finally:
+        await reference_importer.stop()
+        await importer.stop()
+
+
+async def test_get_ticker_from_timestamps(tmp_path):
+    file_path = str(tmp_path / "ExchangeHistoryDataCollector_test.data")
+    await _create_data_file(file_path)
+    importer = await _importer(importer_exchanges.GenericExchangeDataImporter, file_path)
+    try:
+        with mock.patch.object(importer, "CHUNK_SIZE", CHUNK_SIZE):
+            tickers = []
+            for timestamp in range(0, CANDLES_COUNT // 3 * 60 + 60, 60):
+                tickers += await importer.get_ticker_from_timestamps(EXCHANGE, SYMBOL, inferior_timestamp=timestamp,
+                                                                     superior_timestamp=timestamp)
+            assert [ticker[-1]["close"] for ticker in tickers] == list(range(CANDLES_COUNT))
+            # same calls as the backtesting ticker updater
+            ticker, = await importer.get_ticker_from_timestamps(EXCHANGE, SYMBOL, inferior_timestamp=61, limit=1)
+            assert ticker[0] == 120
+            assert ticker[-1] == {"close": 6}
+        with pytest.raises(commons_errors.DatabaseNotFoundError):
+            await importer.get_order_book_from_timestamps(EXCHANGE, SYMBOL, inferior_timestamp=0, limit=1)
+    finally:
+        await importer.stop()
@@ -0,0 +1,96 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import glob
+import os
+import shutil
+
+import mock
+import pytest
+
+import octobot_backtesting.enums as enums
+import tentacles.Backtesting.importers.exchanges as importer_exchanges
+from tentacles.Backtesting.importers.exchanges.generic_exchange_importer.tests import test_compressed_candles
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+EXCHANGE = test_compressed_candles.EXCHANGE
+SYMBOL = test_compressed_candles.SYMBOL
+TIME_FRAME = test_compressed_candles.TIME_FRAME
+CANDLES_COUNT = 1000
+BUCKET_SIZE = 64
+
+
+async def _read_candles(file_path):
+    async with test_compressed_candles.importer(file_path) as data_importer:
+        return await data_importer.get_data_timestamp_interval(TIME_FRAME.value), \
+            await data_importer.get_ohlcv(EXCHANGE, SYMBOL, TIME_FRAME), \
+            await test_compressed_candles._read_windows(data_importer, CANDLES_COUNT, 100)
+
+
+def _chunk_files(store):
+    return glob.glob(os.path.join(store.path, "*", f"*{store.CHUNK_FILE_EXT}"))
+
+
+async def test_share_database(tmp_path):
+    store_path = str(tmp_path / "shared_candles")
+    file_path = str(tmp_path / "ExchangeHistoryDataCollector_test.data")
+    other_file_path = str(tmp_path / "ExchangeHistoryDataCollector_other.data")
+    await test_compressed_candles.create_data_file(file_path, CANDLES_COUNT)
+    # a data file with the same candles
+    shutil.copy(file_path, other_file_path)
+    expected_candles = await _read_candles(file_path)
+    with mock.patch.object(importer_exchanges.SharedCandlesStore, "DEFAULT_PATH", store_path), \
+            mock.patch.object(importer_exchanges.SharedCandlesStore, "BUCKET_SIZE", BUCKET_SIZE):
+        store = await importer_exchanges.SharedCandlesStore().initialize()
+        try:
+            async with test_compressed_candles.opened_database(file_path) as database:
+                assert await importer_exchanges.SharedCandles.share_database(database, store) == 1
+                # live pair is kept in the OHLCV table
+                assert await database.select_count(enums.ExchangeDataTables.OHLCV, ["*"]) == [(10, )]
+            buckets_count = -(-CANDLES_COUNT // BUCKET_SIZE)
+            assert len(_chunk_files(store)) == buckets_count
+            # the last bucket is not complete
+            complete_chunks = await store.get_complete_chunks(EXCHANGE, SYMBOL, TIME_FRAME.value)
+            assert sorted(complete_chunks) == [
+                index * store.get_bucket_duration(TIME_FRAME.value) for index in range(buckets_count - 1)
+            ]
+            columns = store.get_chunk_columns(*complete_chunks[0])
+            assert columns[importer_exchanges.ColumnarCandlesFile.TIMESTAMP_COLUMN].tolist() == [
+                index * test_compressed_candles.TIME_FRAME_SEC for index in range(BUCKET_SIZE)
+            ]
+
+            async with test_compressed_candles.opened_database(other_file_path) as database:
+                assert await importer_exchanges.SharedCandles.share_database(database, store) == 1
+            # identical chunks are stored once
+            assert len(_chunk_files(store)) == buckets_count
+            assert await store.get_complete_chunks(EXCHANGE, SYMBOL, TIME_FRAME.value) == complete_chunks
+
+            assert await _read_candles(file_path) == expected_candles
+            assert await _read_candles(other_file_path) == expected_candles
+            async with test_compressed_candles.importer(file_path) as data_importer:
+                assert isinstance(data_importer.compressed_candles, importer_exchanges.SharedCandles)
+                assert enums.ExchangeDataTables.OHLCV in data_importer.available_data_types
+
+            async with test_compressed_candles.opened_database(file_path) as database:
+                assert await importer_exchanges.SharedCandles.decompress_database(database, store=store) \
+                    == importer_exchanges.CompressedCandles.get_compression()
+                assert not await database.check_table_exists(importer_exchanges.SharedCandles.BLOCKS_TABLE)
+            async with test_compressed_candles.importer(file_path) as data_importer:
+                assert data_importer.compressed_candles is None
+            assert await _read_candles(file_path) == expected_candles
+        finally:
+            await store.stop()
@@ -0,0 +1,204 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+
+import octobot_commons.enums as commons_enums
+import octobot_commons.logging as logging
+import octobot_evaluators.enums as evaluators_enums
+import octobot_evaluators.matrix as matrix
+import octobot_trading.api as trading_api
+
+
+class EvaluationsCoalescer:
+    """
+    Groups the technical evaluations notifications of a (exchange, symbol, time frame, evaluation time):
+    the last notification is given to evaluation_callback once every expected evaluator notified its evaluation
+    or when deadline seconds elapsed since the first notification.
+    """
+    DEFAULT_DEADLINE = 5
+
+    def __init__(self, evaluation_callback, deadline=DEFAULT_DEADLINE):
+        # evaluation_callback(*notification)
+        self.evaluation_callback = evaluation_callback
+        self.deadline = deadline
+        self.logger = logging.get_logger(self.__class__.__name__)
+        # (exchange_name, symbol, time_frame, eval_time): (notified evaluators, last notification)
+        self.pending_evaluations = {}
+        self.deadline_tasks = {}
+        # (exchange_name, symbol, time_frame): evaluation time of the last evaluated notification
+        self.evaluated_times = {}
+        # (exchange_name, cryptocurrency, symbol, time_frame): names of the evaluators to wait for
+        self.expected_evaluators = {}
+        # exchange_name: True when backtesting
+        self.backtesting_by_exchange = {}
+
+    def should_coalesce(self, matrix_id, exchange_name):
+        # backtesting evaluations are not waiting for each other
+        try:
+            return not self.backtesting_by_exchange[exchange_name]
+        except KeyError:
+            exchange_manager = trading_api.get_exchange_manager_from_exchange_name_and_id(
+                exchange_name,
+                trading_api.get_exchange_id_from_matrix_id(exchange_name, matrix_id)
+            )
+            is_backtesting = self.backtesting_by_exchange[exchange_name] = \
+                trading_api.get_is_backtesting(exchange_manager)
+            return not is_backtesting
+
+    async def add_technical_evaluation(self, matrix_id, evaluator_name, exchange_name, cryptocurrency, symbol,
+                                       time_frame, notification):
+        """
+        Waits for the technical evaluators of the matrix that already evaluated this symbol and time frame
+        """
+        expected_key = (exchange_name, cryptocurrency, symbol, time_frame)
+        expected_evaluators = self.expected_evaluators.get(expected_key)
+        if expected_evaluators is None or evaluator_name not in expected_evaluators:
+            expected_evaluators = self.expected_evaluators[expected_key] = self._get_expected_evaluators(
+                matrix_id, exchange_name, cryptocurrency, symbol, time_frame
+            )
+        eval_time = matrix.get_tentacle_eval_time(matrix_id, self._get_path(evaluator_name, exchange_name,
+                                                                             cryptocurrency, symbol, time_frame))
+        evaluated_time = self.evaluated_times.get((exchange_name, symbol, time_frame))
+        if eval_time is None or (evaluated_time is not None and eval_time <= evaluated_time):
+            # late evaluation: its evaluation time has already been evaluated
+            await self.evaluation_callback(*notification)
+            return
+        await self.add((exchange_name, symbol, time_frame, eval_time), evaluator_name, expected_evaluators,
+                       notification)
+
+    async def add(self, key, evaluator_name, expected_evaluators, notification):
+        """
+        :param key: (exchange_name, symbol, time_frame, eval_time) of the notified evaluation
+        :param expected_evaluators: names of the evaluators to wait for
+        :param notification: evaluation_callback arguments
+        """
+        notified_evaluators, _ = self.pending_evaluations.get(key, (set(), None))
+        notified_evaluators.add(evaluator_name)
+        self.pending_evaluations[key] = (notified_evaluators, notification)
+        if notified_evaluators.issuperset(expected_evaluators):
+            await self.flush(key)
+        elif key not in self.deadline_tasks:
+            self.deadline_tasks[key] = asyncio.create_task(self._flush_after_deadline(key, expected_evaluators))
+
+    async def flush(self, key):
+        _, notification = self.pending_evaluations.pop(key, (None, None))
+        deadline_task = self.deadline_tasks.pop(key, None)
+        if deadline_task is not None and deadline_task is not asyncio.current_task():
+            deadline_task.cancel()
+        if notification is not None:
+            exchange_name, symbol, time_frame, eval_time = key
+            self.evaluated_times[(exchange_name, symbol, time_frame)] = eval_time
+            await self.evaluation_callback(*notification)
+
+    def clear_cache(self):
+        self.expected_evaluators = {}
+
+    def stop(self):
+        for deadline_task in self.deadline_tasks.values():
+            deadline_task.cancel()
+        self.deadline_tasks = {}
+        self.pending_evaluations = {}
+
+    def _get_expected_evaluators(self, matrix_id, exchange_name, cryptocurrency, symbol, time_frame):
+        return {
+            evaluator_name
+            for evaluator_name in matrix.get_node_children_by_names_at_path(
+                matrix_id,
+                matrix.get_tentacle_path(exchange_name=exchange_name,
+                                         tentacle_type=evaluators_enums.EvaluatorMatrixTypes.TA.value)
+            )
+            if matrix.get_tentacle_node(matrix_id, self._get_path(evaluator_name, exchange_name, cryptocurrency,
+                                                                  symbol, time_frame)) is not None
+        }
+
+    @staticmethod
+    def _get_path(evaluator_name, exchange_name, cryptocurrency, symbol, time_frame):
+        return matrix.get_matrix_default_value_path(tentacle_name=evaluator_name,
+                                                    tentacle_type=evaluators_enums.EvaluatorMatrixTypes.TA.value,
+                                                    exchange_name=exchange_name,
+                                                    cryptocurrency=cryptocurrency,
+                                                    symbol=symbol,
+                                                    time_frame=time_frame)
+
+    async def _flush_after_deadline(self, key, expected_evaluators):
+        await asyncio.sleep(self.deadline)
+        notified_evaluators, _ = self.pending_evaluations.get(key, (set(), None))
+        _, symbol, time_frame, _ = key
+        self.logger.debug(f"{', '.join(expected_evaluators.difference(notified_evaluators))} {time_frame} "
+                          f"evaluations are missing for {symbol} after {self.deadline} seconds: "
+                          f"evaluating without them.")
+        try:
+            await self.flush(key)
+        except Exception as e:
+            self.logger.exception(e, True, f"Error when evaluating {symbol} {time_frame} evaluations: {e}")
+
+
+class CoalescingStrategyMixin:
+    """
+    Strategy evaluators mixin coalescing the technical evaluations notifications of their time frames when
+    evaluation_debounce_time is set in their config: it is the maximum time to wait for the other technical
+    evaluators of a candle
+    """
+    EVALUATION_DEBOUNCE_TIME = "evaluation_debounce_time"
+
+    def init_evaluations_coalescer(self, config):
+        debounce_time = config.get(self.EVALUATION_DEBOUNCE_TIME, 0)
+        self.evaluations_coalescer = EvaluationsCoalescer(self._evaluate_coalesced_notification,
+                                                          deadline=debounce_time) if debounce_time else None
+
+    async def stop(self) -> None:
+        if self.evaluations_coalescer is not None:
+            self.evaluations_coalescer.stop()
+        await super().stop()
+
+    def clear_cache(self):
+        super().clear_cache()
+        if self.evaluations_coalescer is not None:
+            self.evaluations_coalescer.clear_cache()
+
+    async def strategy_matrix_callback(self,
+                                       matrix_id,
+                                       evaluator_name,
+                                       evaluator_type,
+                                       eval_note,
+                                       eval_note_type,
+                                       exchange_name,
+                                       cryptocurrency,
+                                       symbol,
+                                       time_frame):
+        if self.evaluations_coalescer is not None \
+                and evaluator_type == evaluators_enums.EvaluatorMatrixTypes.TA.value \
+                and commons_enums.TimeFrames(time_frame) in self.strategy_time_frames \
+                and self.evaluations_coalescer.should_coalesce(matrix_id, exchange_name):
+            # evaluate once every technical evaluator of this candle is done
+            await self.evaluations_coalescer.add_technical_evaluation(
+                matrix_id, evaluator_name, exchange_name, cryptocurrency, symbol, time_frame,
+                (matrix_id, evaluator_name, evaluator_type, eval_note, eval_note_type, exchange_name,
+                 cryptocurrency, symbol, time_frame)
+            )
+            return
+        await super().strategy_matrix_callback(matrix_id,
+                                               evaluator_name,
+                                               evaluator_type,
+                                               eval_note,
+                                               eval_note_type,
+                                               exchange_name,
+                                               cryptocurrency,
+                                               symbol,
+                                               time_frame)
+
+    async def _evaluate_coalesced_notification(self, *notification):
+        await super().strategy_matrix_callback(*notification)
@@ -26,9 +26,12 @@ import octobot_evaluators.evaluators as evaluators
 import octobot_tentacles_manager.api.configurator as tentacles_manager_api
 import octobot_tentacles_manager.configuration as tm_configuration
 import octobot_trading.api as trading_api
+import tentacles.Evaluator.Util as EvaluatorUtil
+import tentacles.Evaluator.Strategies.mixed_strategies_evaluator.evaluations_coalescer as evaluations_coalescer
+import tentacles.Evaluator.Strategies.mixed_strategies_evaluator.strategy_matrix_view as strategy_matrix_view
 
 
-class SimpleStrategyEvaluator(evaluators.StrategyEvaluator):
+class SimpleStrategyEvaluator(evaluations_coalescer.CoalescingStrategyMixin, evaluators.StrategyEvaluator):
     SOCIAL_EVALUATORS_NOTIFICATION_TIMEOUT_KEY = "social_evaluators_notification_timeout"
     RE_EVAL_TA_ON_RT_OR_SOCIAL = "re_evaluate_TA_when_social_or_realtime_notification"
     BACKGROUND_SOCIAL_EVALUATORS = "background_social_evaluators"
@@ -43,6 +46,35 @@ class SimpleStrategyEvaluator(evaluators.StrategyEvaluator):
         self.re_evaluate_TA_when_social_or_realtime_notification = config.get(
             SimpleStrategyEvaluator.RE_EVAL_TA_ON_RT_OR_SOCIAL, True)
         self.background_social_evaluators = config.get(SimpleStrategyEvaluator.BACKGROUND_SOCIAL_EVALUATORS, [])
+        self.init_evaluations_coalescer(config)
+        self.matrix_view = None
+
+    def clear_cache(self):
+        super().clear_cache()
+        self.matrix_view = None
+
+    async def strategy_matrix_callback(self,
+                                       matrix_id,
+                                       evaluator_name,
+                                       evaluator_type,
+                                       eval_note,
+                                       eval_note_type,
+                                       exchange_name,
+                                       cryptocurrency,
+                                       symbol,
+                                       time_frame):
+        # every notification updates the matrix view, including the ones not waking up the strategy
+        self._get_matrix_view().update(exchange_name, cryptocurrency, symbol, evaluator_type, evaluator_name,
+                                       time_frame)
+        await super().strategy_matrix_callback(matrix_id,
+                                               evaluator_name,
+                                               evaluator_type,
+                                               eval_note,
+                                               eval_note_type,
+                                               exchange_name,
+                                               cryptocurrency,
+                                               symbol,
+                                               time_frame)
 
     async def matrix_callback(self,
                               matrix_id,
@@ -76,6 +108,7 @@ class SimpleStrategyEvaluator(evaluators.StrategyEvaluator):
                                            cryptocurrency,
                                            symbol)
 
+    @EvaluatorUtil.timed_stage(EvaluatorUtil.EvaluationLatencyTracker.STRATEGY_EVALUATION)
     async def _trigger_evaluation(self,
                                   matrix_id,
                                   evaluator_name,
@@ -87,46 +120,10 @@ class SimpleStrategyEvaluator(evaluators.StrategyEvaluator):
                                   symbol):
         # ensure only start evaluations when technical evaluators have been initialized
         try:
-            TA_by_timeframe = {
-                available_time_frame: matrix.get_evaluations_by_evaluator(
-                    matrix_id,
-                    exchange_name,
-                    evaluators_enums.EvaluatorMatrixTypes.TA.value,
-                    cryptocurrency,
-                    symbol,
-                    available_time_frame.value,
-                    allow_missing=False,
-                    allowed_values=[commons_constants.START_PENDING_EVAL_NOTE])
-                for available_time_frame in self.strategy_time_frames
-            }
-            # social evaluators by symbol
-            social_evaluations_by_evaluator = matrix.get_evaluations_by_evaluator(matrix_id,
-                                                                                  exchange_name,
-                                                                                  evaluators_enums.EvaluatorMatrixTypes.SOCIAL.value,
-                                                                                  cryptocurrency,
-                                                                                  symbol)
-            # social evaluators by crypto currency
-            social_evaluations_by_evaluator.update(matrix.get_evaluations_by_evaluator(matrix_id,
-                                                                                       exchange_name,
-                                                                                       evaluators_enums.EvaluatorMatrixTypes.SOCIAL.value,
-                                                                                       cryptocurrency))
-            available_rt_time_frames = self.get_available_time_frames(matrix_id,
-                                                                      exchange_name,
-                                                                      evaluators_enums.EvaluatorMatrixTypes.REAL_TIME.value,
-                                                                      cryptocurrency,
-                                                                      symbol)
-            RT_evaluations_by_time_frame = {
-                available_time_frame: matrix.get_evaluations_by_evaluator(
-                    matrix_id,
-                    exchange_name,
-                    evaluators_enums.EvaluatorMatrixTypes.REAL_TIME.value,
-                    cryptocurrency,
-                    symbol,
-                    available_time_frame)
-                for available_time_frame in available_rt_time_frames
-            }
+            evaluations_view = self._get_matrix_view().get_view(matrix_id, exchange_name, cryptocurrency, symbol)
+            evaluations_view.check_technical_evaluations()
             if self.re_evaluate_TA_when_social_or_realtime_notification \
-                    and any(value for value in TA_by_timeframe.values()) \
+                    and evaluations_view.technical_evaluations \
                     and evaluator_type != evaluators_enums.EvaluatorMatrixTypes.TA.value \
                     and evaluator_type in self.re_evaluation_triggering_eval_types \
                     and evaluator_name not in self.background_social_evaluators:
@@ -144,40 +141,18 @@ class SimpleStrategyEvaluator(evaluators.StrategyEvaluator):
                                                                                                           self.strategy_time_frames)
                     # do not continue this evaluation
                     return
-            counter = 0
-            total_evaluation = 0
-
-            for eval_by_rt in RT_evaluations_by_time_frame.values():
-                for evaluation in eval_by_rt.values():
-                    eval_value = evaluators_api.get_value(evaluation)
-                    if evaluators_util.check_valid_eval_note(eval_value, eval_type=evaluators_api.get_type(evaluation),
-                                                             expected_eval_type=evaluators_constants.EVALUATOR_EVAL_DEFAULT_TYPE):
-                        total_evaluation += eval_value
-                        counter += 1
 
-            for eval_by_ta in TA_by_timeframe.values():
-                for evaluation in eval_by_ta.values():
-                    eval_value = evaluators_api.get_value(evaluation)
-                    if evaluators_util.check_valid_eval_note(eval_value, eval_type=evaluators_api.get_type(evaluation),
-                                                             expected_eval_type=evaluators_constants.EVALUATOR_EVAL_DEFAULT_TYPE):
-                        total_evaluation += eval_value
-                        counter += 1
-
-            if social_evaluations_by_evaluator:
+            current_time = None
+            if evaluations_view.social_nodes:
                 exchange_manager = trading_api.get_exchange_manager_from_exchange_name_and_id(
                     exchange_name,
                     trading_api.get_exchange_id_from_matrix_id(exchange_name, self.matrix_id)
                 )
                 current_time = trading_api.get_exchange_current_time(exchange_manager)
-                for evaluation in social_evaluations_by_evaluator.values():
-                    eval_value = evaluators_api.get_value(evaluation)
-                    if evaluators_util.check_valid_eval_note(eval_value, eval_type=evaluators_api.get_type(evaluation),
-                                                             expected_eval_type=evaluators_constants.EVALUATOR_EVAL_DEFAULT_TYPE,
-                                                             eval_time=evaluators_api.get_time(evaluation),
-                                                             expiry_delay=self.social_evaluators_default_timeout,
-                                                             current_time=current_time):
-                        total_evaluation += eval_value
-                        counter += 1
+            total_evaluation, counter = evaluations_view.get_evaluation(
+                current_time=current_time,
+                social_expiry_delay=self.social_evaluators_default_timeout
+            )
 
             if counter > 0:
                 self.eval_note = total_evaluation / counter
@@ -190,8 +165,55 @@ class SimpleStrategyEvaluator(evaluators.StrategyEvaluator):
         except Exception as e:
             self.logger.exception(e, True, f"Error when computing strategy evaluation: {e}")
 
+    def _get_matrix_view(self):
+        if self.matrix_view is None:
+            self.matrix_view = strategy_matrix_view.StrategyMatrixView(
+                self._create_symbol_evaluations_view,
+                [time_frame.value for time_frame in self.strategy_time_frames]
+            )
+        return self.matrix_view
+
+    def _create_symbol_evaluations_view(self, matrix_id, exchange_name, cryptocurrency, symbol):
+        technical_nodes = self._get_evaluation_nodes(matrix_id, exchange_name,
+                                                     evaluators_enums.EvaluatorMatrixTypes.TA.value,
+                                                     cryptocurrency, symbol,
+                                                     [time_frame.value for time_frame in self.strategy_time_frames])
+        real_time_nodes = self._get_evaluation_nodes(matrix_id, exchange_name,
+                                                     evaluators_enums.EvaluatorMatrixTypes.REAL_TIME.value,
+                                                     cryptocurrency, symbol,
+                                                     self.get_available_time_frames(
+                                                         matrix_id,
+                                                         exchange_name,
+                                                         evaluators_enums.EvaluatorMatrixTypes.REAL_TIME.value,
+                                                         cryptocurrency,
+                                                         symbol))
+        # social evaluators by symbol and by crypto currency
+        social_nodes = self._get_evaluation_nodes(matrix_id, exchange_name,
+                                                  evaluators_enums.EvaluatorMatrixTypes.SOCIAL.value,
+                                                  cryptocurrency, symbol, [None])
+        social_nodes.update(self._get_evaluation_nodes(matrix_id, exchange_name,
+                                                       evaluators_enums.EvaluatorMatrixTypes.SOCIAL.value,
+                                                       cryptocurrency, None, [None]))
+        return strategy_matrix_view.SymbolEvaluationsView(technical_nodes, real_time_nodes, social_nodes)
+
+    def _get_evaluation_nodes(self, matrix_id, exchange_name, evaluator_type, cryptocurrency, symbol, time_frames):
+        nodes = {}
+        for evaluator_name in self._get_available_evaluators(matrix_id, exchange_name, evaluator_type,
+                                                             use_cache=False):
+            for time_frame in time_frames:
+                node = matrix.get_tentacle_node(matrix_id, matrix.get_matrix_default_value_path(
+                    tentacle_name=evaluator_name,
+                    tentacle_type=evaluator_type,
+                    exchange_name=exchange_name,
+                    cryptocurrency=cryptocurrency,
+                    symbol=symbol,
+                    time_frame=time_frame))
+                if node is not None:
+                    nodes[(evaluator_type, evaluator_name, symbol, time_frame)] = node
+        return nodes
+
 
-class TechnicalAnalysisStrategyEvaluator(evaluators.StrategyEvaluator):
+class TechnicalAnalysisStrategyEvaluator(evaluations_coalescer.CoalescingStrategyMixin, evaluators.StrategyEvaluator):
     TIME_FRAMES_TO_WEIGHT = "time_frames_to_weight"
     TIME_FRAME = "time_frame"
     WEIGHT = "weight"
@@ -204,7 +226,9 @@ class TechnicalAnalysisStrategyEvaluator(evaluators.StrategyEvaluator):
         config = tentacles_manager_api.get_tentacle_config(self.tentacles_setup_config, self.__class__)
         self.weight_by_time_frames = TechnicalAnalysisStrategyEvaluator._get_weight_by_time_frames(
             config[TechnicalAnalysisStrategyEvaluator.TIME_FRAMES_TO_WEIGHT])
+        self.init_evaluations_coalescer(config)
 
+    @EvaluatorUtil.timed_stage(EvaluatorUtil.EvaluationLatencyTracker.STRATEGY_EVALUATION)
     async def matrix_callback(self,
                               matrix_id,
                               evaluator_name,
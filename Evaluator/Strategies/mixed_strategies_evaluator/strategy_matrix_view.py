@@ -0,0 +1,169 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import octobot_commons.constants as commons_constants
+import octobot_commons.evaluators_util as evaluators_util
+import octobot_evaluators.api as evaluators_api
+import octobot_evaluators.constants as evaluators_constants
+import octobot_evaluators.enums as evaluators_enums
+import octobot_evaluators.errors as errors
+
+
+class SymbolEvaluationsView:
+    """
+    Evaluation nodes of the matrix used to evaluate a symbol. Nodes are updated in place by the matrix:
+    the sum of technical and real-time notes is kept up to date by updating the changed evaluations only.
+    Evaluations can be set without notification (such as technical evaluations reset): changed node values are
+    refreshed before reading evaluations. Social evaluations expire: they are checked on each evaluation.
+    Keys are (evaluator type, evaluator name, symbol, time frame), symbol is None for cryptocurrency evaluations.
+    """
+
+    def __init__(self, technical_nodes, real_time_nodes, social_nodes):
+        self.nodes = {**technical_nodes, **real_time_nodes}
+        self.social_nodes = social_nodes
+        # cryptocurrency evaluations first: they are used instead of the symbol ones when set
+        self.social_nodes_by_evaluator = {}
+        for key in sorted(social_nodes, key=lambda node_key: node_key[2] is not None):
+            self.social_nodes_by_evaluator.setdefault(key[1], []).append(social_nodes[key])
+        # node values the view is up to date with
+        self.values = {}
+        self.notes = {}
+        self.total_evaluation = 0
+        # technical evaluations that are neither set nor pending
+        self.unset_technical_evaluations = set()
+        # technical evaluations that are set or pending
+        self.technical_evaluations = set()
+        for key in self.nodes:
+            self.update(key)
+
+    def has_node(self, key):
+        return key in self.nodes or key in self.social_nodes
+
+    def update(self, key):
+        try:
+            node = self.nodes[key]
+        except KeyError:
+            # social evaluations are read on each evaluation
+            return
+        eval_value = self.values[key] = evaluators_api.get_value(node)
+        if key[0] == evaluators_enums.EvaluatorMatrixTypes.TA.value:
+            if eval_value == commons_constants.START_PENDING_EVAL_NOTE \
+                    or evaluators_util.check_valid_eval_note(eval_value):
+                self.unset_technical_evaluations.discard(key)
+                self.technical_evaluations.add(key)
+            else:
+                self.unset_technical_evaluations.add(key)
+                self.technical_evaluations.discard(key)
+        previous_note = self.notes.pop(key, None)
+        if previous_note is not None:
+            self.total_evaluation -= previous_note
+        if evaluators_util.check_valid_eval_note(eval_value, eval_type=evaluators_api.get_type(node),
+                                                 expected_eval_type=evaluators_constants.EVALUATOR_EVAL_DEFAULT_TYPE):
+            self.notes[key] = eval_value
+            self.total_evaluation += eval_value
+
+    def refresh(self):
+        """
+        Updates the evaluations that changed without being notified
+        """
+        for key, node in self.nodes.items():
+            if evaluators_api.get_value(node) is not self.values[key]:
+                self.update(key)
+
+    def check_technical_evaluations(self):
+        """
+        :raise UnsetTentacleEvaluation: when a technical evaluation is not set
+        """
+        self.refresh()
+        for key in self.unset_technical_evaluations:
+            _, evaluator_name, symbol, time_frame = key
+            raise errors.UnsetTentacleEvaluation(f"Missing {time_frame} for {evaluator_name} on {symbol}, "
+                                                 f"evaluation is {repr(evaluators_api.get_value(self.nodes[key]))}).")
+
+    def get_evaluation(self, current_time=None, social_expiry_delay=None):
+        """
+        :return: the sum of the valid notes and their count
+        """
+        self.refresh()
+        total_evaluation = self.total_evaluation
+        counter = len(self.notes)
+        for nodes in self.social_nodes_by_evaluator.values():
+            node = next((node
+                         for node in nodes
+                         if evaluators_util.check_valid_eval_note(evaluators_api.get_value(node))), None)
+            if node is None:
+                continue
+            eval_value = evaluators_api.get_value(node)
+            if evaluators_util.check_valid_eval_note(eval_value, eval_type=evaluators_api.get_type(node),
+                                                     expected_eval_type=evaluators_constants.EVALUATOR_EVAL_DEFAULT_TYPE,
+                                                     eval_time=evaluators_api.get_time(node),
+                                                     expiry_delay=social_expiry_delay,
+                                                     current_time=current_time):
+                total_evaluation += eval_value
+                counter += 1
+        return total_evaluation, counter
+
+
+class StrategyMatrixView:
+    """
+    SymbolEvaluationsViews of a strategy, created from the matrix on their first use and updated by the strategy
+    matrix notifications. A view is created again when an evaluation it doesn't have is notified.
+    """
+
+    def __init__(self, create_view, technical_time_frames):
+        # create_view(matrix_id, exchange_name, cryptocurrency, symbol)
+        self.create_view = create_view
+        self.technical_time_frames = technical_time_frames
+        # (exchange_name, cryptocurrency, symbol): SymbolEvaluationsView
+        self.views = {}
+
+    def get_view(self, matrix_id, exchange_name, cryptocurrency, symbol):
+        key = (exchange_name, cryptocurrency, symbol)
+        try:
+            return self.views[key]
+        except KeyError:
+            view = self.views[key] = self.create_view(matrix_id, exchange_name, cryptocurrency, symbol)
+            return view
+
+    def update(self, exchange_name, cryptocurrency, symbol, evaluator_type, evaluator_name, time_frame):
+        if not self._is_viewed(evaluator_type, time_frame):
+            return
+        node_key = (evaluator_type, evaluator_name, symbol, time_frame)
+        if symbol is None:
+            # cryptocurrency evaluation: used by every symbol of this cryptocurrency
+            for view_key in list(self.views):
+                if view_key[0] == exchange_name and view_key[1] == cryptocurrency:
+                    self._update_view(view_key, node_key)
+            return
+        view_key = (exchange_name, cryptocurrency, symbol)
+        if view_key in self.views:
+            self._update_view(view_key, node_key)
+
+    def clear(self):
+        self.views = {}
+
+    def _update_view(self, view_key, node_key):
+        view = self.views[view_key]
+        if view.has_node(node_key):
+            view.update(node_key)
+        else:
+            # new evaluation: create the view again from the matrix
+            self.views.pop(view_key)
+
+    def _is_viewed(self, evaluator_type, time_frame):
+        if evaluator_type == evaluators_enums.EvaluatorMatrixTypes.TA.value:
+            return time_frame in self.technical_time_frames
+        return evaluator_type in (evaluators_enums.EvaluatorMatrixTypes.REAL_TIME.value,
+                                  evaluators_enums.EvaluatorMatrixTypes.SOCIAL.value)
@@ -0,0 +1,125 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import mock
+import pytest
+
+import octobot_commons.enums as commons_enums
+import octobot_evaluators.enums as evaluators_enums
+import tentacles.Evaluator.Strategies.mixed_strategies_evaluator.evaluations_coalescer as evaluations_coalescer
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+KEY = ("binance", "BTC/USDT", "1h", 3600)
+
+
+@pytest.fixture
+def coalescer():
+    coalescer = evaluations_coalescer.EvaluationsCoalescer(mock.AsyncMock(), deadline=0.05)
+    yield coalescer
+    coalescer.stop()
+
+
+async def test_add(coalescer):
+    await coalescer.add(KEY, "RSI", {"RSI", "MACD"}, ("RSI", 1))
+    coalescer.evaluation_callback.assert_not_called()
+    assert KEY in coalescer.deadline_tasks
+    await coalescer.add(KEY, "MACD", {"RSI", "MACD"}, ("MACD", -1))
+    # evaluated once, with the last notification
+    coalescer.evaluation_callback.assert_awaited_once_with("MACD", -1)
+    assert coalescer.pending_evaluations == coalescer.deadline_tasks == {}
+    assert coalescer.evaluated_times == {("binance", "BTC/USDT", "1h"): 3600}
+
+
+async def test_add_deadline(coalescer):
+    await coalescer.add(KEY, "RSI", {"RSI", "MACD"}, ("RSI", 1))
+    await asyncio.sleep(0.1)
+    coalescer.evaluation_callback.assert_awaited_once_with("RSI", 1)
+    assert coalescer.pending_evaluations == coalescer.deadline_tasks == {}
+
+
+async def test_add_technical_evaluation(coalescer):
+    eval_times = {"RSI": 3600, "MACD": 3600}
+    with mock.patch.object(coalescer, "_get_expected_evaluators", mock.Mock(return_value={"RSI", "MACD"})) \
+            as _get_expected_evaluators_mock, \
+            mock.patch.object(coalescer, "_get_path", mock.Mock(side_effect=lambda name, *_: name)), \
+            mock.patch.object(evaluations_coalescer.matrix, "get_tentacle_eval_time",
+                              mock.Mock(side_effect=lambda _, path: eval_times[path]), create=True):
+        for evaluator_name in ("RSI", "MACD"):
+            await coalescer.add_technical_evaluation("matrix_id", evaluator_name, "binance", "BTC", "BTC/USDT", "1h",
+                                                     (evaluator_name, ))
+        _get_expected_evaluators_mock.assert_called_once_with("matrix_id", "binance", "BTC", "BTC/USDT", "1h")
+        coalescer.evaluation_callback.assert_awaited_once_with("MACD")
+
+        # late evaluation: forwarded
+        await coalescer.add_technical_evaluation("matrix_id", "RSI", "binance", "BTC", "BTC/USDT", "1h", ("RSI", ))
+        coalescer.evaluation_callback.assert_awaited_with("RSI")
+        assert coalescer.evaluation_callback.await_count == 2
+
+        # next candle
+        eval_times["RSI"] = 7200
+        await coalescer.add_technical_evaluation("matrix_id", "RSI", "binance", "BTC", "BTC/USDT", "1h", ("RSI", ))
+        assert coalescer.evaluation_callback.await_count == 2
+        assert ("binance", "BTC/USDT", "1h", 7200) in coalescer.pending_evaluations
+
+
+class Strategy:
+    def __init__(self):
+        self.notifications = []
+        self.strategy_time_frames = [commons_enums.TimeFrames.ONE_HOUR]
+
+    async def strategy_matrix_callback(self, *notification):
+        self.notifications.append(notification)
+
+    async def stop(self):
+        pass
+
+    def clear_cache(self):
+        pass
+
+
+class CoalescingStrategy(evaluations_coalescer.CoalescingStrategyMixin, Strategy):
+    pass
+
+
+async def test_coalescing_strategy_mixin():
+    strategy = CoalescingStrategy()
+    strategy.init_evaluations_coalescer({})
+    assert strategy.evaluations_coalescer is None
+    ta_notification = ("matrix_id", "RSI", evaluators_enums.EvaluatorMatrixTypes.TA.value, 1, None, "binance", "BTC",
+                       "BTC/USDT", "1h")
+    await strategy.strategy_matrix_callback(*ta_notification)
+    assert strategy.notifications == [ta_notification]
+
+    strategy.init_evaluations_coalescer({strategy.EVALUATION_DEBOUNCE_TIME: 0})
+    assert strategy.evaluations_coalescer is None
+    strategy.init_evaluations_coalescer({strategy.EVALUATION_DEBOUNCE_TIME: 1})
+    assert strategy.evaluations_coalescer.deadline == 1
+    with mock.patch.object(strategy.evaluations_coalescer, "should_coalesce", mock.Mock(return_value=True)), \
+            mock.patch.object(strategy.evaluations_coalescer, "add_technical_evaluation", mock.AsyncMock()) \
+            as add_technical_evaluation_mock:
+        await strategy.strategy_matrix_callback(*ta_notification)
+        add_technical_evaluation_mock.assert_awaited_once_with("matrix_id", "RSI", "binance", "BTC", "BTC/USDT",
+                                                               "1h", ta_notification)
+        # not coalesced time frame
+        await strategy.strategy_matrix_callback(*ta_notification[:-1], "4h")
+        assert add_technical_evaluation_mock.await_count == 1
+    assert strategy.notifications == [ta_notification, ta_notification[:-1] + ("4h", )]
+    # coalesced evaluations skip the mixin
+    await strategy._evaluate_coalesced_notification(*ta_notification)
+    assert strategy.notifications[-1] == ta_notification
+    await strategy.stop()
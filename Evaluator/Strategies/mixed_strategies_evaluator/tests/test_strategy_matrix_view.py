@@ -0,0 +1,112 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import mock
+import pytest
+
+import octobot_commons.constants as commons_constants
+import octobot_evaluators.constants as evaluators_constants
+import octobot_evaluators.enums as evaluators_enums
+import octobot_evaluators.errors as errors
+import tentacles.Evaluator.Strategies.mixed_strategies_evaluator.strategy_matrix_view as strategy_matrix_view
+
+TA = evaluators_enums.EvaluatorMatrixTypes.TA.value
+REAL_TIME = evaluators_enums.EvaluatorMatrixTypes.REAL_TIME.value
+SOCIAL = evaluators_enums.EvaluatorMatrixTypes.SOCIAL.value
+SYMBOL = "BTC/USDT"
+
+
+def _node(value, value_time=0):
+    return mock.Mock(node_value=value, node_type=evaluators_constants.EVALUATOR_EVAL_DEFAULT_TYPE,
+                     node_value_time=value_time)
+
+
+@pytest.fixture
+def nodes():
+    return {
+        (TA, "RSI", SYMBOL, "1h"): _node(0.5),
+        (TA, "RSI", SYMBOL, "4h"): _node(commons_constants.START_PENDING_EVAL_NOTE),
+        (TA, "MACD", SYMBOL, "1h"): _node(-0.1),
+        (REAL_TIME, "InstantFluctuations", SYMBOL, "1m"): _node(1),
+    }
+
+
+def test_symbol_evaluations_view(nodes):
+    technical_nodes = {key: node for key, node in nodes.items() if key[0] == TA}
+    real_time_nodes = {key: node for key, node in nodes.items() if key[0] == REAL_TIME}
+    view = strategy_matrix_view.SymbolEvaluationsView(technical_nodes, real_time_nodes, {})
+    assert view.get_evaluation() == (pytest.approx(1.4), 3)
+    view.check_technical_evaluations()
+    assert len(view.technical_evaluations) == 3
+
+    # updated in place by the matrix
+    nodes[(TA, "RSI", SYMBOL, "4h")].node_value = -1
+    nodes[(TA, "MACD", SYMBOL, "1h")].node_value = None
+    view.update((TA, "RSI", SYMBOL, "4h"))
+    view.update((TA, "MACD", SYMBOL, "1h"))
+    assert view.get_evaluation() == (pytest.approx(0.5), 3)
+    with pytest.raises(errors.UnsetTentacleEvaluation):
+        view.check_technical_evaluations()
+
+
+def test_symbol_evaluations_view_not_notified_evaluations(nodes):
+    technical_nodes = {key: node for key, node in nodes.items() if key[0] == TA}
+    view = strategy_matrix_view.SymbolEvaluationsView(technical_nodes, {}, {})
+    assert view.get_evaluation() == (pytest.approx(0.4), 2)
+
+    # technical evaluations reset: set without notification
+    nodes[(TA, "RSI", SYMBOL, "1h")].node_value = commons_constants.START_PENDING_EVAL_NOTE
+    view.check_technical_evaluations()
+    assert view.get_evaluation() == (pytest.approx(-0.1), 1)
+    nodes[(TA, "RSI", SYMBOL, "4h")].node_value = 0.3
+    assert view.get_evaluation() == (pytest.approx(0.2), 2)
+    nodes[(TA, "MACD", SYMBOL, "1h")].node_value = None
+    with pytest.raises(errors.UnsetTentacleEvaluation):
+        view.check_technical_evaluations()
+
+
+def test_symbol_evaluations_view_social_evaluations():
+    social_nodes = {
+        (SOCIAL, "Reddit", SYMBOL, None): _node(0.2, value_time=100),
+        (SOCIAL, "Reddit", None, None): _node(0.6, value_time=100),
+        (SOCIAL, "Telegram", SYMBOL, None): _node(-1, value_time=0),
+    }
+    view = strategy_matrix_view.SymbolEvaluationsView({}, {}, social_nodes)
+    # cryptocurrency evaluation is used instead of the symbol one, Telegram evaluation expired
+    assert view.get_evaluation(current_time=150, social_expiry_delay=100) == (pytest.approx(0.6), 1)
+    social_nodes[(SOCIAL, "Reddit", None, None)].node_value = None
+    assert view.get_evaluation(current_time=150, social_expiry_delay=100) == (pytest.approx(0.2), 1)
+
+
+def test_strategy_matrix_view(nodes):
+    create_view = mock.Mock(side_effect=lambda *_: strategy_matrix_view.SymbolEvaluationsView(
+        {key: node for key, node in nodes.items() if key[0] == TA}, {}, {}
+    ))
+    matrix_view = strategy_matrix_view.StrategyMatrixView(create_view, ["1h", "4h"])
+    view = matrix_view.get_view("matrix_id", "binance", "BTC", SYMBOL)
+    assert matrix_view.get_view("matrix_id", "binance", "BTC", SYMBOL) is view
+    create_view.assert_called_once_with("matrix_id", "binance", "BTC", SYMBOL)
+
+    nodes[(TA, "RSI", SYMBOL, "1h")].node_value = 1
+    matrix_view.update("binance", "BTC", SYMBOL, TA, "RSI", "1h")
+    assert view.get_evaluation() == (pytest.approx(0.9), 2)
+    # not a strategy time frame
+    matrix_view.update("binance", "BTC", SYMBOL, TA, "RSI", "1d")
+    assert matrix_view.get_view("matrix_id", "binance", "BTC", SYMBOL) is view
+
+    # new evaluator: view is created again
+    matrix_view.update("binance", "BTC", SYMBOL, REAL_TIME, "InstantFluctuations", "1m")
+    assert matrix_view.get_view("matrix_id", "binance", "BTC", SYMBOL) is not view
+    assert create_view.call_count == 2
@@ -37,16 +37,24 @@ class RSIMomentumEvaluator(evaluators.TAEvaluator):
         self.short_term_averages = [7, 5, 4, 3, 2, 1]
         self.long_term_averages = [40, 30, 20, 15, 10]
 
+    async def stop(self) -> None:
+        await super().stop()
+        EvaluatorUtil.clear_evaluator_indicators(self)
+
+    @EvaluatorUtil.timed_ohlcv_callback
     async def ohlcv_callback(self, exchange: str, exchange_id: str,
                              cryptocurrency: str, symbol: str, time_frame, candle, inc_in_construction_data):
-        candle_data = trading_api.get_symbol_close_candles(self.get_exchange_symbol_data(exchange, exchange_id, symbol),
+        symbol_candles = self.get_exchange_symbol_data(exchange, exchange_id, symbol)
+        candle_data = trading_api.get_symbol_close_candles(symbol_candles,
                                                            time_frame,
                                                            include_in_construction=inc_in_construction_data)
-        await self.evaluate(cryptocurrency, symbol, time_frame, candle_data, candle)
+        indicators = EvaluatorUtil.CandlesIndicators.from_symbol_candles(
+            symbol_candles, exchange_id, symbol, time_frame, include_in_construction=inc_in_construction_data)
+        await self.evaluate(cryptocurrency, symbol, time_frame, candle_data, candle, indicators=indicators)
 
-    async def evaluate(self, cryptocurrency, symbol, time_frame, candle_data, candle):
+    async def evaluate(self, cryptocurrency, symbol, time_frame, candle_data, candle, indicators=tulipy):
         if candle_data is not None and len(candle_data) > self.period_length:
-            rsi_v = tulipy.rsi(candle_data, period=self.period_length)
+            rsi_v = indicators.rsi(candle_data, period=self.period_length)
 
             if len(rsi_v) and not math.isnan(rsi_v[-1]):
                 long_trend = EvaluatorUtil.TrendAnalysis.get_trend(rsi_v, self.long_term_averages)
@@ -124,12 +132,12 @@ class RSIWeightMomentumEvaluator(evaluators.TAEvaluator):
         except KeyError as e:
             raise error.ConfigError(f"Error when reading config: {e}")
 
-    def _get_rsi_averages(self, symbol_candles, time_frame, include_in_construction):
+    def _get_rsi_averages(self, symbol_candles, time_frame, include_in_construction, indicators=tulipy):
         # compute the slow and fast RSI average
         candle_data = trading_api.get_symbol_close_candles(symbol_candles, time_frame,
                                                            include_in_construction=include_in_construction)
         if len(candle_data) > self.period_length:
-            rsi_v = tulipy.rsi(candle_data, period=self.period_length)
+            rsi_v = indicators.rsi(candle_data, period=self.period_length)
             rsi_v = data_util.drop_nan(rsi_v)
             if len(rsi_v):
                 slow_average = numpy.mean(rsi_v[-self.slow_eval_count:])
@@ -156,13 +164,21 @@ class RSIWeightMomentumEvaluator(evaluators.TAEvaluator):
             self.logger.error(f"Error when reading from config file: missing {e}")
         return None, None
 
+    async def stop(self) -> None:
+        await super().stop()
+        EvaluatorUtil.clear_evaluator_indicators(self)
+
+    @EvaluatorUtil.timed_ohlcv_callback
     async def ohlcv_callback(self, exchange: str, exchange_id: str,
                              cryptocurrency: str, symbol: str, time_frame, candle, inc_in_construction_data):
         try:
             symbol_candles = self.get_exchange_symbol_data(exchange, exchange_id, symbol)
+            indicators = EvaluatorUtil.CandlesIndicators.from_symbol_candles(
+                symbol_candles, exchange_id, symbol, time_frame, include_in_construction=inc_in_construction_data)
             # compute the slow and fast RSI average
             slow_rsi, fast_rsi, rsi_v = self._get_rsi_averages(symbol_candles, time_frame,
-                                                               include_in_construction=inc_in_construction_data)
+                                                               include_in_construction=inc_in_construction_data,
+                                                               indicators=indicators)
             current_candle_time = trading_api.get_symbol_time_candles(symbol_candles, time_frame,
                                                                       include_in_construction=inc_in_construction_data)[
                 -1]
@@ -199,19 +215,28 @@ class BBMomentumEvaluator(evaluators.TAEvaluator):
         super().__init__(tentacles_setup_config)
         self.period_length = 20
 
+    async def stop(self) -> None:
+        await super().stop()
+        EvaluatorUtil.clear_evaluator_indicators(self)
+
+    @EvaluatorUtil.timed_ohlcv_callback
     async def ohlcv_callback(self, exchange: str, exchange_id: str,
                              cryptocurrency: str, symbol: str, time_frame, candle, inc_in_construction_data):
-        candle_data = trading_api.get_symbol_close_candles(self.get_exchange_symbol_data(exchange, exchange_id, symbol),
+        symbol_candles = self.get_exchange_symbol_data(exchange, exchange_id, symbol)
+        candle_data = trading_api.get_symbol_close_candles(symbol_candles,
                                                            time_frame,
                                                            self.period_length,
                                                            include_in_construction=inc_in_construction_data)
-        await self.evaluate(cryptocurrency, symbol, time_frame, candle_data, candle)
+        indicators = EvaluatorUtil.CandlesIndicators.from_symbol_candles(
+            symbol_candles, exchange_id, symbol, time_frame, self.period_length,
+            include_in_construction=inc_in_construction_data)
+        await self.evaluate(cryptocurrency, symbol, time_frame, candle_data, candle, indicators=indicators)
 
-    async def evaluate(self, cryptocurrency, symbol, time_frame, candle_data, candle):
+    async def evaluate(self, cryptocurrency, symbol, time_frame, candle_data, candle, indicators=tulipy):
         self.eval_note = commons_constants.START_PENDING_EVAL_NOTE
         if len(candle_data) >= self.period_length:
             # compute bollinger bands
-            lower_band, middle_band, upper_band = tulipy.bbands(candle_data, self.period_length, 2)
+            lower_band, middle_band, upper_band = indicators.bbands(candle_data, self.period_length, 2)
 
             # if close to lower band => low value => bad,
             # therefore if close to middle, value is keeping up => good
@@ -267,6 +292,11 @@ class ADXMomentumEvaluator(evaluators.TAEvaluator):
     # implementation according to: https://www.investopedia.com/articles/technical/02/041002.asp => length = 14 and
     # exponential moving average = 20 in a uptrend market
     # idea: adx > 30 => strong trend, < 20 => trend change to come
+    async def stop(self) -> None:
+        await super().stop()
+        EvaluatorUtil.clear_evaluator_indicators(self)
+
+    @EvaluatorUtil.timed_ohlcv_callback
     async def ohlcv_callback(self, exchange: str, exchange_id: str,
                              cryptocurrency: str, symbol: str, time_frame, candle, inc_in_construction_data):
         symbol_candles = self.get_exchange_symbol_data(exchange, exchange_id, symbol)
@@ -277,22 +307,26 @@ class ADXMomentumEvaluator(evaluators.TAEvaluator):
                                                                include_in_construction=inc_in_construction_data)
             low_candles = trading_api.get_symbol_low_candles(symbol_candles, time_frame,
                                                              include_in_construction=inc_in_construction_data)
-            await self.evaluate(cryptocurrency, symbol, time_frame, close_candles, high_candles, low_candles, candle)
+            indicators = EvaluatorUtil.CandlesIndicators.from_symbol_candles(
+                symbol_candles, exchange_id, symbol, time_frame, include_in_construction=inc_in_construction_data)
+            await self.evaluate(cryptocurrency, symbol, time_frame, close_candles, high_candles, low_candles, candle,
+                                indicators=indicators)
         else:
             self.eval_note = commons_constants.START_PENDING_EVAL_NOTE
             await self.evaluation_completed(cryptocurrency, symbol, time_frame,
                                             eval_time=evaluators_util.get_eval_time(full_candle=candle,
                                                                                     time_frame=time_frame))
 
-    async def evaluate(self, cryptocurrency, symbol, time_frame, close_candles, high_candles, low_candles, candle):
+    async def evaluate(self, cryptocurrency, symbol, time_frame, close_candles, high_candles, low_candles, candle,
+                       indicators=tulipy):
         self.eval_note = commons_constants.START_PENDING_EVAL_NOTE
         if len(close_candles) >= self.minimal_data:
             min_adx = 7.5
             max_adx = 45
             neutral_adx = 25
-            adx = tulipy.adx(high_candles, low_candles, close_candles, self.period_length)
-            instant_ema = data_util.drop_nan(tulipy.ema(close_candles, 2))
-            slow_ema = data_util.drop_nan(tulipy.ema(close_candles, 20))
+            adx = indicators.adx(high_candles, low_candles, close_candles, self.period_length)
+            instant_ema = data_util.drop_nan(indicators.ema(close_candles, 2))
+            slow_ema = data_util.drop_nan(indicators.ema(close_candles, 20))
             adx = data_util.drop_nan(adx)
 
             if len(adx):
@@ -333,15 +367,19 @@ class ADXMomentumEvaluator(evaluators.TAEvaluator):
 
 
 class MACDMomentumEvaluator(evaluators.TAEvaluator):
+    USE_PROCESS_POOL = "use_process_pool"
+
     def __init__(self, tentacles_setup_config):
         super().__init__(tentacles_setup_config)
+        self.evaluator_config = tentacles_manager_api.get_tentacle_config(self.tentacles_setup_config, self.__class__)
+        self.use_process_pool = self.evaluator_config.get(self.USE_PROCESS_POOL, False)
         self.previous_note = None
         self.long_period_length = 26
         self.short_period_length = 12
         self.signal_period_length = 9
 
-    def _analyse_pattern(self, pattern, macd_hist, zero_crossing_indexes, price_weight,
-                         pattern_move_time, sign_multiplier):
+    @staticmethod
+    def _get_pattern_analysis(pattern, macd_hist, zero_crossing_indexes, price_weight, pattern_move_time):
         # add pattern's strength
         weight = price_weight * EvaluatorUtil.PatternAnalyser.get_pattern_strength(pattern)
 
@@ -364,9 +402,11 @@ class MACDMomentumEvaluator(evaluators.TAEvaluator):
                 macd_hist,
                 pattern_move_time,
                 double_patterns_count)
+        return weight, average_pattern_period
 
+    def _analyse_pattern(self, sign_multiplier, weight, average_pattern_period, is_growing_with_few_data):
         # if we have few data but wave is growing => set higher value
-        if len(zero_crossing_indexes) <= 1 and price_weight == 1:
+        if is_growing_with_few_data:
             if self.previous_note is not None:
                 average_pattern_period = 0.95
             self.previous_note = sign_multiplier * weight * average_pattern_period
@@ -375,48 +415,83 @@ class MACDMomentumEvaluator(evaluators.TAEvaluator):
 
         self.eval_note = sign_multiplier * weight * average_pattern_period
 
+    async def start(self, bot_id: str) -> bool:
+        if self.use_process_pool:
+            EvaluatorUtil.EvaluatorsProcessPool.instance().add_user(self)
+        return await super().start(bot_id)
+
+    async def stop(self) -> None:
+        await super().stop()
+        EvaluatorUtil.EvaluatorsProcessPool.instance().remove_user(self)
+
+    @EvaluatorUtil.timed_ohlcv_callback
     async def ohlcv_callback(self, exchange: str, exchange_id: str,
                              cryptocurrency: str, symbol: str, time_frame, candle, inc_in_construction_data):
-        candle_data = trading_api.get_symbol_close_candles(self.get_exchange_symbol_data(exchange, exchange_id, symbol),
+        symbol_candles = self.get_exchange_symbol_data(exchange, exchange_id, symbol)
+        candle_data = trading_api.get_symbol_close_candles(symbol_candles,
                                                            time_frame,
                                                            include_in_construction=inc_in_construction_data)
+        # the whole MACD histogram is analysed: incremental indicators only return its latest values
         await self.evaluate(cryptocurrency, symbol, time_frame, candle_data, candle)
 
-    async def evaluate(self, cryptocurrency, symbol, time_frame, candle_data, candle):
+    async def evaluate(self, cryptocurrency, symbol, time_frame, candle_data, candle, indicators=tulipy):
         self.eval_note = commons_constants.START_PENDING_EVAL_NOTE
         if len(candle_data) > self.long_period_length:
-            macd, macd_signal, macd_hist = tulipy.macd(candle_data, self.short_period_length,
-                                                       self.long_period_length, self.signal_period_length)
-
-            # on macd hist => M pattern: bearish movement, W pattern: bullish movement
-            #                 max on hist: optimal sell or buy
-            macd_hist = data_util.drop_nan(macd_hist)
-            zero_crossing_indexes = EvaluatorUtil.TrendAnalysis.get_threshold_change_indexes(macd_hist, 0)
-            last_index = len(macd_hist) - 1
-            pattern, start_index, end_index = EvaluatorUtil.PatternAnalyser.find_pattern(macd_hist,
-                                                                                         zero_crossing_indexes,
-                                                                                         last_index)
-
-            if pattern != EvaluatorUtil.PatternAnalyser.UNKNOWN_PATTERN:
-
-                # set sign (-1 buy or 1 sell)
-                sign_multiplier = -1 if pattern == "W" or pattern == "V" else 1
-
-                # set pattern time frame => W and M are on 2 time frames, others 1
-                pattern_move_time = 2 if (pattern == "W" or pattern == "M") and end_index == last_index else 1
-
-                # set weight according to the max value of the pattern and the current value
-                current_pattern_start = start_index
-                price_weight = macd_hist[-1] / macd_hist[current_pattern_start:].max() if sign_multiplier == 1 \
-                    else macd_hist[-1] / macd_hist[current_pattern_start:].min()
-
-                if not math.isnan(price_weight):
-                    self._analyse_pattern(pattern, macd_hist, zero_crossing_indexes, price_weight,
-                                          pattern_move_time, sign_multiplier)
+            if self.use_process_pool:
+                pattern_analysis = await EvaluatorUtil.EvaluatorsProcessPool.instance().run(
+                    self.get_macd_pattern_analysis, (candle_data, ), self.short_period_length,
+                    self.long_period_length, self.signal_period_length
+                )
+            else:
+                pattern_analysis = self.get_macd_pattern_analysis(candle_data, self.short_period_length,
+                                                                  self.long_period_length, self.signal_period_length,
+                                                                  indicators=indicators)
+            if pattern_analysis is not None:
+                self._analyse_pattern(*pattern_analysis)
         await self.evaluation_completed(cryptocurrency, symbol, time_frame,
                                         eval_time=evaluators_util.get_eval_time(full_candle=candle,
                                                                                 time_frame=time_frame))
 
+    @staticmethod
+    def get_macd_pattern_analysis(candle_data, short_period_length, long_period_length, signal_period_length,
+                                  indicators=tulipy):
+        """
+        Numeric part of the evaluation: can be run in the evaluators process pool
+        :return: None when no pattern is found, otherwise sign multiplier, weight, average pattern period and
+        True when the pattern is growing with few data
+        """
+        macd, macd_signal, macd_hist = indicators.macd(candle_data, short_period_length,
+                                                       long_period_length, signal_period_length)
+
+        # on macd hist => M pattern: bearish movement, W pattern: bullish movement
+        #                 max on hist: optimal sell or buy
+        macd_hist = data_util.drop_nan(macd_hist)
+        zero_crossing_indexes = EvaluatorUtil.TrendAnalysis.get_threshold_change_indexes(macd_hist, 0)
+        last_index = len(macd_hist) - 1
+        pattern, start_index, end_index = EvaluatorUtil.PatternAnalyser.find_pattern(macd_hist,
+                                                                                     zero_crossing_indexes,
+                                                                                     last_index)
+
+        if pattern != EvaluatorUtil.PatternAnalyser.UNKNOWN_PATTERN:
+
+            # set sign (-1 buy or 1 sell)
+            sign_multiplier = -1 if pattern == "W" or pattern == "V" else 1
+
+            # set pattern time frame => W and M are on 2 time frames, others 1
+            pattern_move_time = 2 if (pattern == "W" or pattern == "M") and end_index == last_index else 1
+
+            # set weight according to the max value of the pattern and the current value
+            current_pattern_start = start_index
+            price_weight = macd_hist[-1] / macd_hist[current_pattern_start:].max() if sign_multiplier == 1 \
+                else macd_hist[-1] / macd_hist[current_pattern_start:].min()
+
+            if not math.isnan(price_weight):
+                weight, average_pattern_period = MACDMomentumEvaluator._get_pattern_analysis(
+                    pattern, macd_hist, zero_crossing_indexes, price_weight, pattern_move_time)
+                return sign_multiplier, weight, average_pattern_period, \
+                    len(zero_crossing_indexes) <= 1 and price_weight == 1
+        return None
+
 
 class KlingerOscillatorMomentumEvaluator(evaluators.TAEvaluator):
     def __init__(self, tentacles_setup_config):
@@ -425,6 +500,7 @@ class KlingerOscillatorMomentumEvaluator(evaluators.TAEvaluator):
         self.long_period = 55  # standard with klinger
         self.ema_signal_period = 13  # standard ema signal for klinger
 
+    @EvaluatorUtil.timed_ohlcv_callback
     async def ohlcv_callback(self, exchange: str, exchange_id: str,
                              cryptocurrency: str, symbol: str, time_frame, candle, inc_in_construction_data):
         symbol_candles = self.get_exchange_symbol_data(exchange, exchange_id, symbol)
@@ -496,6 +572,7 @@ class KlingerOscillatorReversalConfirmationMomentumEvaluator(evaluators.TAEvalua
     def get_eval_type():
         return bool
 
+    @EvaluatorUtil.timed_ohlcv_callback
     async def ohlcv_callback(self, exchange: str, exchange_id: str,
                              cryptocurrency: str, symbol: str, time_frame, candle, inc_in_construction_data):
         symbol_candles = self.get_exchange_symbol_data(exchange, exchange_id, symbol)
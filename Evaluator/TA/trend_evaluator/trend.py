@@ -43,6 +43,11 @@ class SuperTrendEvaluator(evaluators.TAEvaluator):
         self.eval_note = commons_constants.START_PENDING_EVAL_NOTE
         self.previous_value = {}
 
+    async def stop(self) -> None:
+        await super().stop()
+        EvaluatorUtil.clear_evaluator_indicators(self)
+
+    @EvaluatorUtil.timed_ohlcv_callback
     async def ohlcv_callback(self, exchange: str, exchange_id: str, cryptocurrency: str,
                              symbol: str, time_frame, candle, inc_in_construction_data):
         exchange_symbol_data = self.get_exchange_symbol_data(exchange, exchange_id, symbol)
@@ -54,14 +59,16 @@ class SuperTrendEvaluator(evaluators.TAEvaluator):
                                                      include_in_construction=inc_in_construction_data)
         self.eval_note = commons_constants.START_PENDING_EVAL_NOTE
         if len(close) > self.length:
-            await self.evaluate(cryptocurrency, symbol, time_frame, candle, high, low, close)
+            indicators = EvaluatorUtil.CandlesIndicators.from_symbol_candles(
+                exchange_symbol_data, exchange_id, symbol, time_frame, include_in_construction=inc_in_construction_data)
+            await self.evaluate(cryptocurrency, symbol, time_frame, candle, high, low, close, indicators=indicators)
         await self.evaluation_completed(cryptocurrency, symbol, time_frame,
                                         eval_time=evaluators_util.get_eval_time(full_candle=candle,
                                                                                 time_frame=time_frame))
 
-    async def evaluate(self, cryptocurrency, symbol, time_frame, candle, high, low, close):
+    async def evaluate(self, cryptocurrency, symbol, time_frame, candle, high, low, close, indicators=tulipy):
         hl2 = EvaluatorUtil.CandlesUtil.HL2(high, low)[-1]
-        atr = tulipy.atr(high, low, close, self.length)[-1]
+        atr = indicators.atr(high, low, close, self.length)[-1]
 
         previous_value = self.get_previous_value(symbol, time_frame)
 
@@ -106,6 +113,7 @@ class DeathAndGoldenCrossEvaluator(evaluators.TAEvaluator):
     SLOW_LENGTH = "slow_length"
     SLOW_MA_TYPE = "slow_ma_type"
     FAST_MA_TYPE = "fast_ma_type"
+    BATCH_EVALUATION = "batch_evaluation"
 
     def __init__(self, tentacles_setup_config):
         super().__init__(tentacles_setup_config)
@@ -114,38 +122,73 @@ class DeathAndGoldenCrossEvaluator(evaluators.TAEvaluator):
         self.slow_length = self.config.get(self.SLOW_LENGTH, 200)
         self.fast_ma_type = self.config.get(self.FAST_MA_TYPE, "SMA").lower()
         self.slow_ma_type = self.config.get(self.SLOW_MA_TYPE, "SMA").lower()
+        self.batch_evaluation = self.config.get(self.BATCH_EVALUATION, False)
         self.eval_note = commons_constants.START_PENDING_EVAL_NOTE
 
+    async def stop(self) -> None:
+        EvaluatorUtil.BatchEvaluationScheduler.instance().remove_evaluator(self)
+        await super().stop()
+        EvaluatorUtil.clear_evaluator_indicators(self)
+
+    @EvaluatorUtil.timed_ohlcv_callback
     async def ohlcv_callback(self, exchange: str, exchange_id: str,
                              cryptocurrency: str, symbol: str, time_frame, candle, inc_in_construction_data):
-
-        close = trading_api.get_symbol_close_candles(self.get_exchange_symbol_data(exchange, exchange_id, symbol),
+        if self.batch_evaluation and EvaluatorUtil.is_batchable_candle(exchange, exchange_id, inc_in_construction_data):
+            await EvaluatorUtil.BatchEvaluationScheduler.instance().get_batcher(
+                self.__class__, self.batch_ohlcv_callback
+            ).add(self, exchange, exchange_id, cryptocurrency, symbol, time_frame, candle)
+            return EvaluatorUtil.DEFERRED_EVALUATION
+        symbol_candles = self.get_exchange_symbol_data(exchange, exchange_id, symbol)
+        close = trading_api.get_symbol_close_candles(symbol_candles,
                                                      time_frame,
                                                      include_in_construction=inc_in_construction_data)
-        volume = trading_api.get_symbol_volume_candles(self.get_exchange_symbol_data(exchange, exchange_id, symbol),
+        volume = trading_api.get_symbol_volume_candles(symbol_candles,
                                                        time_frame,
                                                        include_in_construction=inc_in_construction_data)
+        indicators = EvaluatorUtil.CandlesIndicators.from_symbol_candles(
+            symbol_candles, exchange_id, symbol, time_frame, include_in_construction=inc_in_construction_data)
+        await self._evaluate_candles(cryptocurrency, symbol, time_frame, candle, close, volume, indicators)
+
+    @classmethod
+    async def batch_ohlcv_callback(cls, exchange, exchange_id, time_frame, entries):
+        for entry, stacked_candles, index in EvaluatorUtil.stack_batch_entries(
+                exchange, exchange_id, time_frame, entries,
+                inputs=(EvaluatorUtil.StackedCandles.CLOSE, EvaluatorUtil.StackedCandles.VOLUME)):
+            try:
+                with EvaluatorUtil.timed_evaluation(entry.evaluator, exchange, exchange_id, entry.symbol):
+                    await entry.evaluator._evaluate_candles(
+                        entry.cryptocurrency, entry.symbol, time_frame, entry.candle,
+                        stacked_candles.get_row(index, EvaluatorUtil.StackedCandles.CLOSE),
+                        stacked_candles.get_row(index, EvaluatorUtil.StackedCandles.VOLUME),
+                        stacked_candles.get_indicators(index)
+                    )
+            except Exception as e:
+                # keep evaluating the other symbols
+                entry.evaluator.logger.exception(e, True, f"Error when evaluating {entry.symbol} {time_frame} "
+                                                          f"candle: {e}")
+
+    async def _evaluate_candles(self, cryptocurrency, symbol, time_frame, candle, close, volume, indicators):
         self.eval_note = commons_constants.START_PENDING_EVAL_NOTE
         if len(close) > self.slow_length:
-            await self.evaluate(cryptocurrency, symbol, time_frame, candle, close, volume)
+            await self.evaluate(cryptocurrency, symbol, time_frame, candle, close, volume, indicators=indicators)
         await self.evaluation_completed(cryptocurrency, symbol, time_frame,
                                         eval_time=evaluators_util.get_eval_time(full_candle=candle,
                                                                                 time_frame=time_frame))
 
-    async def evaluate(self, cryptocurrency, symbol, time_frame, candle, candle_data, volume_data):
+    async def evaluate(self, cryptocurrency, symbol, time_frame, candle, candle_data, volume_data, indicators=tulipy):
         if self.fast_ma_type == "vwma":
-            ma1 = tulipy.vwma(candle_data, volume_data, self.fast_length)[-1]
+            ma1 = indicators.vwma(candle_data, volume_data, self.fast_length)[-1]
         elif self.fast_ma_type == "lsma":
-            ma1 = tulipy.linreg(candle_data, self.fast_length)[-1]
+            ma1 = indicators.linreg(candle_data, self.fast_length)[-1]
         else:
-            ma1 = getattr(tulipy, self.fast_ma_type)(candle_data, self.fast_length)[-1]
+            ma1 = getattr(indicators, self.fast_ma_type)(candle_data, self.fast_length)[-1]
 
         if self.slow_ma_type == "vwma":
-            ma2 = tulipy.vwma(candle_data, volume_data, self.slow_length)[-1]
+            ma2 = indicators.vwma(candle_data, volume_data, self.slow_length)[-1]
         elif self.slow_ma_type == "lsma":
-            ma2 = tulipy.linreg(candle_data, self.slow_length)[-1]
+            ma2 = indicators.linreg(candle_data, self.slow_length)[-1]
         else:
-            ma2 = getattr(tulipy, self.slow_ma_type)(candle_data, self.slow_length)[-1]
+            ma2 = getattr(indicators, self.slow_ma_type)(candle_data, self.slow_length)[-1]
 
         if ma1 > ma2:
             self.eval_note = -1
@@ -155,43 +198,76 @@ class DeathAndGoldenCrossEvaluator(evaluators.TAEvaluator):
 
 # evaluates position of the current (2 unit) average trend relatively to the 5 units average and 10 units average trend
 class DoubleMovingAverageTrendEvaluator(evaluators.TAEvaluator):
+    USE_PROCESS_POOL = "use_process_pool"
 
     def __init__(self, tentacles_setup_config):
         super().__init__(tentacles_setup_config)
+        self.evaluator_config = tentacles_manager_api.get_tentacle_config(self.tentacles_setup_config, self.__class__)
+        self.use_process_pool = self.evaluator_config.get(self.USE_PROCESS_POOL, False)
         self.long_period_length = 10
 
+    async def start(self, bot_id: str) -> bool:
+        if self.use_process_pool:
+            EvaluatorUtil.EvaluatorsProcessPool.instance().add_user(self)
+        return await super().start(bot_id)
+
+    async def stop(self) -> None:
+        await super().stop()
+        EvaluatorUtil.EvaluatorsProcessPool.instance().remove_user(self)
+        EvaluatorUtil.clear_evaluator_indicators(self)
+
+    @EvaluatorUtil.timed_ohlcv_callback
     async def ohlcv_callback(self, exchange: str, exchange_id: str,
                              cryptocurrency: str, symbol: str, time_frame, candle, inc_in_construction_data):
         # self.logger.info(f"ohlcv_callback {time_frame}")
-        candle_data = trading_api.get_symbol_close_candles(self.get_exchange_symbol_data(exchange, exchange_id, symbol),
+        symbol_candles = self.get_exchange_symbol_data(exchange, exchange_id, symbol)
+        candle_data = trading_api.get_symbol_close_candles(symbol_candles,
                                                            time_frame,
                                                            include_in_construction=inc_in_construction_data)
-        await self.evaluate(cryptocurrency, symbol, time_frame, candle_data, candle)
+        indicators = EvaluatorUtil.CandlesIndicators.from_symbol_candles(
+            symbol_candles, exchange_id, symbol, time_frame, include_in_construction=inc_in_construction_data)
+        await self.evaluate(cryptocurrency, symbol, time_frame, candle_data, candle, indicators=indicators)
 
-    async def evaluate(self, cryptocurrency, symbol, time_frame, candle_data, candle):
+    async def evaluate(self, cryptocurrency, symbol, time_frame, candle_data, candle, indicators=tulipy):
         self.eval_note = commons_constants.START_PENDING_EVAL_NOTE
         if len(candle_data) >= self.long_period_length:
-            time_units = [5, self.long_period_length]
-            current_moving_average = tulipy.sma(candle_data, 2)
-            results = [self.get_moving_average_analysis(candle_data, current_moving_average, time_unit)
-                       for time_unit in time_units]
-            if len(results):
-                self.eval_note = numpy.mean(results)
+            if self.use_process_pool:
+                self.eval_note = await EvaluatorUtil.EvaluatorsProcessPool.instance().run(
+                    self.get_moving_averages_note, (candle_data, ), self.long_period_length
+                )
             else:
-                self.eval_note = commons_constants.START_PENDING_EVAL_NOTE
-
-            if self.eval_note == 0:
-                self.eval_note = commons_constants.START_PENDING_EVAL_NOTE
+                self.eval_note = self.get_moving_averages_note(candle_data, self.long_period_length, indicators)
         await self.evaluation_completed(cryptocurrency, symbol, time_frame,
                                         eval_time=evaluators_util.get_eval_time(full_candle=candle,
                                                                                 time_frame=time_frame))
 
+    @staticmethod
+    def get_moving_averages_note(candle_data, long_period_length, indicators=tulipy):
+        """
+        Numeric part of the evaluation: can be run in the evaluators process pool
+        """
+        time_units = [5, long_period_length]
+        current_moving_average = indicators.sma(candle_data, 2)
+        results = [DoubleMovingAverageTrendEvaluator.get_moving_average_analysis(candle_data,
+                                                                                 current_moving_average,
+                                                                                 time_unit,
+                                                                                 indicators)
+                   for time_unit in time_units]
+        if len(results):
+            eval_note = numpy.mean(results)
+        else:
+            eval_note = commons_constants.START_PENDING_EVAL_NOTE
+
+        if eval_note == 0:
+            eval_note = commons_constants.START_PENDING_EVAL_NOTE
+        return eval_note
+
     # < 0 --> Current average bellow other one (computed using time_period)
     # > 0 --> Current average above other one (computed using time_period)
     @staticmethod
-    def get_moving_average_analysis(data, current_moving_average, time_period):
+    def get_moving_average_analysis(data, current_moving_average, time_period, indicators=tulipy):
 
-        time_period_unit_moving_average = tulipy.sma(data, time_period)
+        time_period_unit_moving_average = indicators.sma(data, time_period)
 
         # equalize array size
         min_len_arrays = min(len(time_period_unit_moving_average), len(current_moving_average))
@@ -232,23 +308,53 @@ class EMADivergenceTrendEvaluator(evaluators.TAEvaluator):
     EMA_SIZE = "size"
     SHORT_VALUE = "short"
     LONG_VALUE = "long"
+    BATCH_EVALUATION = "batch_evaluation"
 
     def __init__(self, tentacles_setup_config):
         super().__init__(tentacles_setup_config)
         self.evaluator_config = tentacles_manager_api.get_tentacle_config(self.tentacles_setup_config, self.__class__)
         self.period = self.evaluator_config[self.EMA_SIZE]
+        self.batch_evaluation = self.evaluator_config.get(self.BATCH_EVALUATION, False)
+
+    async def stop(self) -> None:
+        EvaluatorUtil.BatchEvaluationScheduler.instance().remove_evaluator(self)
+        await super().stop()
+        EvaluatorUtil.clear_evaluator_indicators(self)
 
+    @EvaluatorUtil.timed_ohlcv_callback
     async def ohlcv_callback(self, exchange: str, exchange_id: str,
                              cryptocurrency: str, symbol: str, time_frame, candle, inc_in_construction_data):
-        candle_data = trading_api.get_symbol_close_candles(self.get_exchange_symbol_data(exchange, exchange_id, symbol),
+        if self.batch_evaluation and EvaluatorUtil.is_batchable_candle(exchange, exchange_id, inc_in_construction_data):
+            await EvaluatorUtil.BatchEvaluationScheduler.instance().get_batcher(
+                self.__class__, self.batch_ohlcv_callback
+            ).add(self, exchange, exchange_id, cryptocurrency, symbol, time_frame, candle)
+            return EvaluatorUtil.DEFERRED_EVALUATION
+        symbol_candles = self.get_exchange_symbol_data(exchange, exchange_id, symbol)
+        candle_data = trading_api.get_symbol_close_candles(symbol_candles,
                                                            time_frame,
                                                            include_in_construction=inc_in_construction_data)
-        await self.evaluate(cryptocurrency, symbol, time_frame, candle_data, candle)
-
-    async def evaluate(self, cryptocurrency, symbol, time_frame, candle_data, candle):
+        indicators = EvaluatorUtil.CandlesIndicators.from_symbol_candles(
+            symbol_candles, exchange_id, symbol, time_frame, include_in_construction=inc_in_construction_data)
+        await self.evaluate(cryptocurrency, symbol, time_frame, candle_data, candle, indicators=indicators)
+
+    @classmethod
+    async def batch_ohlcv_callback(cls, exchange, exchange_id, time_frame, entries):
+        for entry, stacked_candles, index in EvaluatorUtil.stack_batch_entries(exchange, exchange_id,
+                                                                               time_frame, entries):
+            try:
+                with EvaluatorUtil.timed_evaluation(entry.evaluator, exchange, exchange_id, entry.symbol):
+                    await entry.evaluator.evaluate(entry.cryptocurrency, entry.symbol, time_frame,
+                                                   stacked_candles.get_row(index), entry.candle,
+                                                   indicators=stacked_candles.get_indicators(index))
+            except Exception as e:
+                # keep evaluating the other symbols
+                entry.evaluator.logger.exception(e, True, f"Error when evaluating {entry.symbol} {time_frame} "
+                                                          f"candle: {e}")
+
+    async def evaluate(self, cryptocurrency, symbol, time_frame, candle_data, candle, indicators=tulipy):
         self.eval_note = commons_constants.START_PENDING_EVAL_NOTE
         if len(candle_data) >= self.period:
-            current_ema = tulipy.ema(candle_data, self.period)[-1]
+            current_ema = indicators.ema(candle_data, self.period)[-1]
             current_price_close = candle_data[-1]
             diff = (current_price_close / current_ema * 100) - 100
 
@@ -21,6 +21,7 @@ import octobot_evaluators.evaluators as evaluators
 import octobot_evaluators.util as evaluators_util
 import octobot_tentacles_manager.api as tentacles_manager_api
 import octobot_trading.api as trading_api
+import tentacles.Evaluator.Util as EvaluatorUtil
 
 
 class StochasticRSIVolatilityEvaluator(evaluators.TAEvaluator):
@@ -34,17 +35,25 @@ class StochasticRSIVolatilityEvaluator(evaluators.TAEvaluator):
         self.evaluator_config = tentacles_manager_api.get_tentacle_config(self.tentacles_setup_config, self.__class__)
         self.period = self.evaluator_config[self.STOCHRSI_PERIOD]
 
+    async def stop(self) -> None:
+        await super().stop()
+        EvaluatorUtil.clear_evaluator_indicators(self)
+
+    @EvaluatorUtil.timed_ohlcv_callback
     async def ohlcv_callback(self, exchange: str, exchange_id: str,
                              cryptocurrency: str, symbol: str, time_frame, candle, inc_in_construction_data):
-        candle_data = trading_api.get_symbol_close_candles(self.get_exchange_symbol_data(exchange, exchange_id, symbol),
+        symbol_candles = self.get_exchange_symbol_data(exchange, exchange_id, symbol)
+        candle_data = trading_api.get_symbol_close_candles(symbol_candles,
                                                            time_frame,
                                                            include_in_construction=inc_in_construction_data)
-        await self.evaluate(cryptocurrency, symbol, time_frame, candle_data, candle)
+        indicators = EvaluatorUtil.CandlesIndicators.from_symbol_candles(
+            symbol_candles, exchange_id, symbol, time_frame, include_in_construction=inc_in_construction_data)
+        await self.evaluate(cryptocurrency, symbol, time_frame, candle_data, candle, indicators=indicators)
 
-    async def evaluate(self, cryptocurrency, symbol, time_frame, candle_data, candle):
+    async def evaluate(self, cryptocurrency, symbol, time_frame, candle_data, candle, indicators=tulipy):
         try:
             if len(candle_data) >= self.period * 2:
-                stochrsi_value = tulipy.stochrsi(data_util.drop_nan(candle_data), self.period)[-1]
+                stochrsi_value = indicators.stochrsi(data_util.drop_nan(candle_data), self.period)[-1]
 
                 if stochrsi_value * self.TULIPY_INDICATOR_MULTIPLICATOR >= self.evaluator_config[self.HIGH_LEVEL]:
                     self.eval_note = 1
@@ -52,7 +61,7 @@ class StochasticRSIVolatilityEvaluator(evaluators.TAEvaluator):
                     self.eval_note = -1
                 else:
                     self.eval_note = stochrsi_value - 0.5
-        except tulipy.lib.InvalidOptionError as e:
+        except (tulipy.lib.InvalidOptionError, ValueError) as e:
             self.logger.debug(f"Error when computing StochRSI: {e}")
             self.logger.exception(e, False)
             self.eval_note = commons_constants.START_PENDING_EVAL_NOTE
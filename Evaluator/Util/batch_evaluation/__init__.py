@@ -0,0 +1,2 @@
+from .candles_batcher import BatchEntry, CandlesBatcher, BatchEvaluationScheduler, is_batchable_candle
+from .stacked_candles import StackedCandles, StackedIndicators, stack_batch_entries, stacked_tulipy
@@ -0,0 +1,154 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import collections
+
+import octobot_commons.enums as commons_enums
+import octobot_commons.logging as logging
+import octobot_commons.singleton as singleton
+import octobot_trading.api as trading_api
+
+BatchEntry = collections.namedtuple("BatchEntry", ["evaluator", "cryptocurrency", "symbol", "candle"])
+
+
+class CandlesBatcher:
+    """
+    Groups the closed candles notifications of an exchange time frame received by the evaluators of a class.
+    A batch is given to batch_callback once every expected symbol has notified its candle or when max_wait seconds
+    elapsed since its first candle. Expected symbols are learnt from the previous batches: the first batch of a
+    time frame is always waiting for max_wait seconds.
+    """
+    DEFAULT_MAX_WAIT = 2
+
+    def __init__(self, batch_callback, max_wait=DEFAULT_MAX_WAIT):
+        # batch_callback(exchange, exchange_id, time_frame, entries)
+        self.batch_callback = batch_callback
+        self.max_wait = max_wait
+        self.logger = logging.get_logger(self.__class__.__name__)
+        # (exchange_id, time_frame): symbols
+        self.expected_symbols = {}
+        # (exchange_id, time_frame): candle time of the last evaluated batch
+        self.last_batch_times = {}
+        # (exchange, exchange_id, time_frame, candle time): {symbol: BatchEntry}
+        self.pending_batches = {}
+        self.flush_tasks = {}
+
+    async def add(self, evaluator, exchange, exchange_id, cryptocurrency, symbol, time_frame, candle):
+        candle_time = candle[commons_enums.PriceIndexes.IND_PRICE_TIME.value]
+        key = (exchange, exchange_id, time_frame, candle_time)
+        entries = self.pending_batches.setdefault(key, {})
+        entries[symbol] = BatchEntry(evaluator, cryptocurrency, symbol, candle)
+        expected_symbols = self.expected_symbols.get((exchange_id, time_frame))
+        if expected_symbols is None:
+            # first batch: wait for max_wait to know the symbols to expect
+            self._schedule_flush(key)
+            return
+        expected_symbols.add(symbol)
+        if candle_time <= self.last_batch_times[(exchange_id, time_frame)]:
+            # late candle: its batch has already been evaluated
+            await self.flush(key)
+        elif expected_symbols.issubset(entries):
+            await self.flush(key)
+        else:
+            self._schedule_flush(key)
+
+    async def flush(self, key):
+        entries = self.pending_batches.pop(key, None)
+        flush_task = self.flush_tasks.pop(key, None)
+        if flush_task is not None and flush_task is not asyncio.current_task():
+            flush_task.cancel()
+        if entries:
+            exchange, exchange_id, time_frame, candle_time = key
+            time_frame_key = (exchange_id, time_frame)
+            self.last_batch_times[time_frame_key] = max(self.last_batch_times.get(time_frame_key, candle_time),
+                                                        candle_time)
+            self.expected_symbols.setdefault(time_frame_key, set()).update(entries)
+            await self.batch_callback(exchange, exchange_id, time_frame, list(entries.values()))
+
+    def remove_evaluator(self, evaluator):
+        """
+        Removes the pending candles of a stopping evaluator: they should not be evaluated after its stop
+        """
+        for key, entries in list(self.pending_batches.items()):
+            for symbol, entry in list(entries.items()):
+                if entry.evaluator is evaluator:
+                    entries.pop(symbol)
+            if not entries:
+                self.pending_batches.pop(key)
+                flush_task = self.flush_tasks.pop(key, None)
+                if flush_task is not None:
+                    flush_task.cancel()
+
+    def stop(self):
+        for flush_task in self.flush_tasks.values():
+            flush_task.cancel()
+        self.flush_tasks = {}
+        self.pending_batches = {}
+
+    def _schedule_flush(self, key):
+        if key not in self.flush_tasks:
+            self.flush_tasks[key] = asyncio.create_task(self._flush_after_max_wait(key))
+
+    async def _flush_after_max_wait(self, key):
+        await asyncio.sleep(self.max_wait)
+        _, exchange_id, time_frame, _ = key
+        entries = self.pending_batches.get(key, {})
+        expected_symbols = self.expected_symbols.get((exchange_id, time_frame), set())
+        missing_symbols = expected_symbols.difference(entries)
+        if missing_symbols:
+            self.logger.debug(f"{time_frame} candles of {', '.join(missing_symbols)} are missing after "
+                              f"{self.max_wait} seconds: evaluating {len(entries)} symbols without them.")
+            # don't wait for symbols that stopped being notified
+            expected_symbols.difference_update(missing_symbols)
+        try:
+            await self.flush(key)
+        except Exception as e:
+            self.logger.exception(e, True, f"Error when evaluating {time_frame} candles batch: {e}")
+
+
+class BatchEvaluationScheduler(singleton.Singleton):
+    """
+    CandlesBatchers shared by the evaluators instances of a class: evaluators instantiated for each symbol
+    get their candles evaluated together.
+    """
+
+    def __init__(self):
+        self.batchers = {}
+
+    def get_batcher(self, evaluator_class, batch_callback, max_wait=CandlesBatcher.DEFAULT_MAX_WAIT):
+        try:
+            return self.batchers[evaluator_class]
+        except KeyError:
+            batcher = self.batchers[evaluator_class] = CandlesBatcher(batch_callback, max_wait=max_wait)
+            return batcher
+
+    def remove_evaluator(self, evaluator):
+        try:
+            self.batchers[evaluator.__class__].remove_evaluator(evaluator)
+        except KeyError:
+            # evaluator has not batched any candle
+            pass
+
+
+def is_batchable_candle(exchange, exchange_id, inc_in_construction_data):
+    """
+    :return: True when the candle can wait for the candles of other symbols: only closed candles are batched,
+    in construction candles re-evaluations and backtesting candles are evaluated right away
+    """
+    if inc_in_construction_data:
+        return False
+    exchange_manager = trading_api.get_exchange_manager_from_exchange_name_and_id(exchange, exchange_id)
+    return not trading_api.get_is_backtesting(exchange_manager)
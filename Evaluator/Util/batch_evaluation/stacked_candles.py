@@ -0,0 +1,194 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import numpy as np
+import tulipy
+
+import octobot_trading.api as trading_api
+
+import tentacles.Evaluator.Util as EvaluatorUtil
+
+
+def stacked_tulipy(tulipy_function, start, inputs, params):
+    """
+    Computes a non recursive tulipy indicator on every row of the given 2D inputs with a single tulipy call
+    :param start: index of the first output in the inputs
+    :return: the indicator outputs, a 2D array per output, each row is equal to the row tulipy outputs
+    """
+    rows_count, size = inputs[0].shape
+    outputs = tulipy_function(*(np.ascontiguousarray(values).ravel() for values in inputs), *params)
+    # output i is computed from the [i, i + start] inputs: keep the outputs computed from a single row
+    stacked_outputs = []
+    for output in (outputs if isinstance(outputs, tuple) else (outputs, )):
+        padded_output = np.empty(rows_count * size)
+        padded_output[:len(output)] = output
+        stacked_outputs.append(padded_output.reshape(rows_count, size)[:, :size - start])
+    return tuple(stacked_outputs)
+
+
+class StackedCandles:
+    """
+    Candles of symbols sharing the same exchange, time frame and candles times stacked into 2D arrays
+    (one row per symbol) to compute indicators of every symbol at once.
+    """
+    CLOSE = "close"
+    HIGH = "high"
+    LOW = "low"
+    VOLUME = "volume"
+    CANDLES_GETTERS = {
+        CLOSE: trading_api.get_symbol_close_candles,
+        HIGH: trading_api.get_symbol_high_candles,
+        LOW: trading_api.get_symbol_low_candles,
+        VOLUME: trading_api.get_symbol_volume_candles,
+    }
+    # non recursive indicators: (tulipy function, index of the first output in the inputs from the options).
+    # Recursive indicators depend on the whole row history, they are computed by the row symbol incremental series
+    STACKED_INDICATORS = {
+        "sma": (tulipy.sma, lambda period: period - 1),
+        "vwma": (tulipy.vwma, lambda period: period - 1),
+        "bbands": (tulipy.bbands, lambda period, stddev: period - 1),
+    }
+
+    def __init__(self, exchange_id, time_frame, symbols, times, inputs):
+        self.exchange_id = exchange_id
+        self.time_frame = time_frame
+        self.symbols = symbols
+        self.times = times
+        self.inputs = inputs
+        # rows are created once: they are identified by the stacked indicators
+        self.rows = {
+            name: list(values)
+            for name, values in inputs.items()
+        }
+        self.outputs = {}
+
+    @classmethod
+    def from_symbols_candles(cls, exchange_id, time_frame, symbols_candles, limit=-1, inputs=(CLOSE, )):
+        """
+        :param symbols_candles: symbol candles data by symbol
+        :return: a StackedCandles for each group of symbols having the same candles times
+        """
+        groups = {}
+        for symbol, symbol_candles in symbols_candles.items():
+            times = trading_api.get_symbol_time_candles(symbol_candles, time_frame, limit,
+                                                        include_in_construction=False)
+            key = (len(times), times[0], times[-1]) if len(times) else (0, None, None)
+            groups.setdefault(key, []).append((symbol, symbol_candles, times))
+        return [
+            cls(exchange_id, time_frame, [symbol for symbol, _, _ in group], group[0][2], {
+                name: np.stack([
+                    np.asarray(cls.CANDLES_GETTERS[name](symbol_candles, time_frame, limit,
+                                                         include_in_construction=False), dtype=np.float64)
+                    for _, symbol_candles, _ in group
+                ])
+                for name in inputs
+            })
+            for group in groups.values()
+        ]
+
+    def get_row(self, index, name=CLOSE):
+        return self.rows[name][index]
+
+    def get_indicators(self, index):
+        return StackedIndicators(self, index)
+
+    def get_input_names(self, index, inputs):
+        names = []
+        for values in inputs:
+            for name, rows in self.rows.items():
+                if rows[index] is values:
+                    names.append(name)
+                    break
+            else:
+                return None
+        return tuple(names)
+
+    def compute(self, name, input_names, params):
+        key = (name, input_names, params)
+        try:
+            return self.outputs[key]
+        except KeyError:
+            tulipy_function, get_start = self.STACKED_INDICATORS[name]
+            outputs = self.outputs[key] = stacked_tulipy(tulipy_function, get_start(*params),
+                                                         [self.inputs[input_name] for input_name in input_names],
+                                                         params)
+            return outputs
+
+    def can_compute(self, name, params):
+        try:
+            _, get_start = self.STACKED_INDICATORS[name]
+        except KeyError:
+            return False
+        # invalid options: let tulipy raise as it usually does
+        return params[0] >= 1 and len(self.times) > get_start(*params)
+
+
+class StackedIndicators:
+    """
+    tulipy-like access to the indicators of a row of StackedCandles: indicators given rows of the stacked candles
+    are computed once for every stacked symbol, others are computed by the incremental indicators of the row symbol.
+    """
+
+    def __init__(self, stacked_candles, index):
+        self.stacked_candles = stacked_candles
+        self.index = index
+        self.candles_indicators = EvaluatorUtil.CandlesIndicators(stacked_candles.exchange_id,
+                                                                      stacked_candles.symbols[index],
+                                                                      stacked_candles.time_frame,
+                                                                      stacked_candles.times)
+
+    def sma(self, real, period):
+        return self._compute("sma", (real, ), (period, ))
+
+    def vwma(self, close, volume, period):
+        return self._compute("vwma", (close, volume), (period, ))
+
+    def bbands(self, real, period, stddev):
+        return self._compute("bbands", (real, ), (period, stddev))
+
+    def __getattr__(self, item):
+        return getattr(self.candles_indicators, item)
+
+    def _compute(self, name, inputs, params):
+        input_names = self.stacked_candles.get_input_names(self.index, inputs)
+        if input_names is None or not self.stacked_candles.can_compute(name, params):
+            return getattr(self.candles_indicators, name)(*inputs, *params)
+        outputs = tuple(
+            _read_only(output[self.index])
+            for output in self.stacked_candles.compute(name, input_names, params)
+        )
+        return outputs if len(outputs) > 1 else outputs[0]
+
+
+def _read_only(view):
+    # stacked outputs are shared between the stacked symbols evaluators: they should not be edited
+    view.flags.writeable = False
+    return view
+
+
+def stack_batch_entries(exchange, exchange_id, time_frame, entries, limit=-1, inputs=(StackedCandles.CLOSE, )):
+    """
+    :param entries: BatchEntry of the symbols to evaluate together
+    :return: a generator of (entry, stacked_candles, index of the entry symbol in stacked_candles)
+    """
+    entries_by_symbol = {entry.symbol: entry for entry in entries}
+    symbols_candles = {
+        entry.symbol: entry.evaluator.get_exchange_symbol_data(exchange, exchange_id, entry.symbol)
+        for entry in entries
+    }
+    for stacked_candles in StackedCandles.from_symbols_candles(exchange_id, time_frame, symbols_candles,
+                                                               limit=limit, inputs=inputs):
+        for index, symbol in enumerate(stacked_candles.symbols):
+            yield entries_by_symbol[symbol], stacked_candles, index
@@ -0,0 +1,139 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+
+import numpy as np
+import pytest
+import tulipy
+
+import tentacles.Evaluator.Util as EvaluatorUtil
+
+SYMBOLS_COUNT = 20
+CANDLES_COUNT = 500
+
+
+@pytest.fixture
+def stacked_candles():
+    random = np.random.default_rng(42)
+    close = np.cumsum(random.normal(0, 1, (SYMBOLS_COUNT, CANDLES_COUNT)), axis=1) + 1000
+    volume = random.random((SYMBOLS_COUNT, CANDLES_COUNT)) * 100
+    return EvaluatorUtil.StackedCandles("exchange_id", "1h", [f"S{index}/USDT" for index in range(SYMBOLS_COUNT)],
+                                        np.arange(CANDLES_COUNT, dtype=np.float64) * 3600,
+                                        {
+                                            EvaluatorUtil.StackedCandles.CLOSE: close,
+                                            EvaluatorUtil.StackedCandles.VOLUME: volume,
+                                        })
+
+
+def test_stacked_indicators_equal_tulipy(stacked_candles):
+    close = stacked_candles.inputs[EvaluatorUtil.StackedCandles.CLOSE]
+    volume = stacked_candles.inputs[EvaluatorUtil.StackedCandles.VOLUME]
+    stacked_sma, = EvaluatorUtil.stacked_tulipy(tulipy.sma, 19, [close], (20, ))
+    stacked_vwma, = EvaluatorUtil.stacked_tulipy(tulipy.vwma, 19, [close, volume], (20, ))
+    stacked_bbands = EvaluatorUtil.stacked_tulipy(tulipy.bbands, 19, [close], (20, 2))
+    for index in range(SYMBOLS_COUNT):
+        np.testing.assert_allclose(stacked_sma[index], tulipy.sma(close[index], 20), rtol=1e-10)
+        np.testing.assert_allclose(stacked_vwma[index], tulipy.vwma(close[index], volume[index], 20), rtol=1e-10)
+        for stacked_band, band in zip(stacked_bbands, tulipy.bbands(close[index], 20, 2)):
+            np.testing.assert_allclose(stacked_band[index], band, rtol=1e-10)
+
+
+def test_stacked_indicators_are_computed_once(stacked_candles):
+    for index in range(SYMBOLS_COUNT):
+        indicators = stacked_candles.get_indicators(index)
+        close = stacked_candles.get_row(index)
+        np.testing.assert_allclose(indicators.sma(close, 50), tulipy.sma(close, 50), rtol=1e-10)
+        vwma = indicators.vwma(close, stacked_candles.get_row(index, EvaluatorUtil.StackedCandles.VOLUME), 20)
+        assert len(vwma) == CANDLES_COUNT - 19
+    assert list(stacked_candles.outputs) == [
+        ("sma", (EvaluatorUtil.StackedCandles.CLOSE, ), (50, )),
+        ("vwma", (EvaluatorUtil.StackedCandles.CLOSE, EvaluatorUtil.StackedCandles.VOLUME), (20, )),
+    ]
+    with pytest.raises(ValueError):
+        # outputs are shared between symbols
+        vwma[-1] = 0
+
+
+def test_not_stacked_indicators_use_symbol_indicators(stacked_candles):
+    indicators = stacked_candles.get_indicators(0)
+    close = stacked_candles.get_row(0)
+    # not a stacked row
+    np.testing.assert_array_equal(indicators.sma(close.copy(), 50), tulipy.sma(close, 50))
+    # recursive indicators
+    np.testing.assert_allclose(indicators.ema(close, 50), tulipy.ema(close, 50), rtol=1e-10)
+    np.testing.assert_array_equal(indicators.kama(close, 50), tulipy.kama(close, 50))
+    # invalid options
+    with pytest.raises(tulipy.lib.InvalidOptionError):
+        indicators.sma(close, CANDLES_COUNT + 1)
+    assert stacked_candles.outputs == {}
+
+
+@pytest.mark.asyncio
+async def test_candles_batcher():
+    batches = []
+
+    async def batch_callback(exchange, exchange_id, time_frame, entries):
+        batches.append((time_frame, [entry.symbol for entry in entries]))
+
+    batcher = EvaluatorUtil.CandlesBatcher(batch_callback, max_wait=0.1)
+    # first batch: expected symbols are unknown, wait for max_wait
+    await batcher.add(None, "binance", "exchange_id", "BTC", "BTC/USDT", "1h", [0])
+    await batcher.add(None, "binance", "exchange_id", "ETH", "ETH/USDT", "1h", [0])
+    assert batches == []
+    await asyncio.sleep(0.2)
+    assert batches == [("1h", ["BTC/USDT", "ETH/USDT"])]
+
+    # next batch: evaluated when every expected symbol is received
+    await batcher.add(None, "binance", "exchange_id", "ETH", "ETH/USDT", "1h", [3600])
+    assert len(batches) == 1
+    await batcher.add(None, "binance", "exchange_id", "BTC", "BTC/USDT", "1h", [3600])
+    assert batches[-1] == ("1h", ["ETH/USDT", "BTC/USDT"])
+    assert batcher.pending_batches == batcher.flush_tasks == {}
+
+    # missing symbol: not waited for in next batches
+    await batcher.add(None, "binance", "exchange_id", "BTC", "BTC/USDT", "1h", [7200])
+    await asyncio.sleep(0.2)
+    assert batches[-1] == ("1h", ["BTC/USDT"])
+    await batcher.add(None, "binance", "exchange_id", "BTC", "BTC/USDT", "1h", [10800])
+    assert batches[-1] == ("1h", ["BTC/USDT"])
+    assert len(batches) == 4
+
+    # late symbol: evaluated right away and expected again
+    await batcher.add(None, "binance", "exchange_id", "ETH", "ETH/USDT", "1h", [10800])
+    assert batches[-1] == ("1h", ["ETH/USDT"])
+    assert batcher.expected_symbols == {("exchange_id", "1h"): {"BTC/USDT", "ETH/USDT"}}
+    batcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_candles_batcher_remove_evaluator():
+    batches = []
+
+    async def batch_callback(exchange, exchange_id, time_frame, entries):
+        batches.append((time_frame, [entry.symbol for entry in entries]))
+
+    batcher = EvaluatorUtil.CandlesBatcher(batch_callback, max_wait=0.1)
+    btc_evaluator, eth_evaluator = object(), object()
+    await batcher.add(btc_evaluator, "binance", "exchange_id", "BTC", "BTC/USDT", "1h", [0])
+    await batcher.add(eth_evaluator, "binance", "exchange_id", "ETH", "ETH/USDT", "1h", [0])
+    await batcher.add(eth_evaluator, "binance", "exchange_id", "ETH", "ETH/USDT", "1h", [3600])
+    # stopped evaluators candles are not evaluated
+    batcher.remove_evaluator(eth_evaluator)
+    assert list(batcher.flush_tasks) == list(batcher.pending_batches) == [("binance", "exchange_id", "1h", 0)]
+    await asyncio.sleep(0.2)
+    assert batches == [("1h", ["BTC/USDT"])]
+    batcher.remove_evaluator(btc_evaluator)
+    assert batcher.pending_batches == batcher.flush_tasks == {}
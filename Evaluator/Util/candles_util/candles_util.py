@@ -15,7 +15,6 @@
 #  License along with this library.
 
 import numpy as np
-from octobot_commons.data_util import mean
 
 class CandlesUtil:
 
@@ -27,8 +26,7 @@ class CandlesUtil:
         :param low: list of low
         :return: list of HL2
         """
-        return np.array(list(map((lambda candles_high, candles_low: mean([candles_high, candles_low])),
-                                                                candles_high, candles_low)))
+        return (np.asarray(candles_high) + np.asarray(candles_low)) / 2
 
     @staticmethod
     def HLC3(candles_high, candles_low, candles_close):
@@ -39,9 +37,7 @@ class CandlesUtil:
         :param close: list of close
         :return: list of HLC3
         """
-        return np.array(list(map((lambda candles_high, candles_low, candles_close:
-                            mean([candles_high, candles_low, candles_close])),
-                            candles_high, candles_low, candles_close)))
+        return (np.asarray(candles_high) + np.asarray(candles_low) + np.asarray(candles_close)) / 3
 
     @staticmethod
     def OHLC4(candles_open, candles_high, candles_low, candles_close):
@@ -53,9 +49,8 @@ class CandlesUtil:
         :param close: list of close
         :return: list of OHLC4
         """
-        return np.array(list(map((lambda candles_open, candles_high, candles_low, candles_close:
-                            mean([candles_open, candles_high, candles_low, candles_close])),
-                            candles_open, candles_high, candles_low, candles_close)))
+        return (np.asarray(candles_open) + np.asarray(candles_high) + np.asarray(candles_low)
+                + np.asarray(candles_close)) / 4
 
     @staticmethod
     def HeikinAshi(candles_open, candles_high, candles_low, candles_close):
@@ -67,17 +62,16 @@ class CandlesUtil:
         :param close: list of close
         :return: HAopen, HAhigh, HAlow, HAclose
         """
-        haOpen, haHigh, haLow, haClose = [np.array([]) for i in range(4)]
-        for i, (open_value, high_value, low_value, close_value) \
-                            in enumerate(zip(candles_open, candles_high, candles_low, candles_close)):
-            if i == 0:
-                haOpen = np.append(haOpen, open_value)
-                haHigh = np.append(haHigh, high_value)
-                haLow = np.append(haLow, low_value)
-                haClose = np.append(haClose, close_value)
-                continue
-            haOpen = np.append(haOpen, mean([candles_open[i-1], candles_close[i-1]]))
-            haHigh = np.append(haHigh, high_value)
-            haLow = np.append(haLow, low_value)
-            haClose = np.append(haClose, mean([open_value, high_value, low_value, close_value]))
-        return haOpen, haHigh, haLow, haClose
\ No newline at end of file
+        size = min(len(candles_open), len(candles_high), len(candles_low), len(candles_close))
+        candles_open, candles_high, candles_low, candles_close = (
+            np.asarray(values, dtype=np.float64)[:size]
+            for values in (candles_open, candles_high, candles_low, candles_close)
+        )
+        haOpen = np.empty(size, dtype=np.float64)
+        haClose = np.empty(size, dtype=np.float64)
+        if size:
+            haOpen[0] = candles_open[0]
+            haClose[0] = candles_close[0]
+        haOpen[1:] = (candles_open[:-1] + candles_close[:-1]) / 2
+        haClose[1:] = (candles_open[1:] + candles_high[1:] + candles_low[1:] + candles_close[1:]) / 4
+        return haOpen, candles_high.copy(), candles_low.copy(), haClose
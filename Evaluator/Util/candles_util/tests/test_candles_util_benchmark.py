@@ -0,0 +1,102 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import os
+import timeit
+
+import numpy as np
+import pytest
+from octobot_commons.data_util import mean
+
+from tentacles.Evaluator.Util import CandlesUtil
+
+CANDLES_COUNT = 10000
+MIN_SPEEDUP = 10
+
+# benchmarks are timing dependant: they only run when this environment variable is set
+BENCHMARKS_ENV_VAR = "RUN_BENCHMARKS"
+benchmark = pytest.mark.skipif(not os.getenv(BENCHMARKS_ENV_VAR),
+                               reason=f"set {BENCHMARKS_ENV_VAR}=1 to run benchmarks")
+
+
+def _legacy_HL2(candles_high, candles_low):
+    return np.array(list(map((lambda high, low: mean([high, low])), candles_high, candles_low)))
+
+
+def _legacy_OHLC4(candles_open, candles_high, candles_low, candles_close):
+    return np.array(list(map((lambda open_value, high, low, close: mean([open_value, high, low, close])),
+                             candles_open, candles_high, candles_low, candles_close)))
+
+
+def _legacy_HeikinAshi(candles_open, candles_high, candles_low, candles_close):
+    haOpen, haHigh, haLow, haClose = [np.array([]) for i in range(4)]
+    for i, (open_value, high_value, low_value, close_value) \
+            in enumerate(zip(candles_open, candles_high, candles_low, candles_close)):
+        if i == 0:
+            haOpen = np.append(haOpen, open_value)
+            haHigh = np.append(haHigh, high_value)
+            haLow = np.append(haLow, low_value)
+            haClose = np.append(haClose, close_value)
+            continue
+        haOpen = np.append(haOpen, mean([candles_open[i-1], candles_close[i-1]]))
+        haHigh = np.append(haHigh, high_value)
+        haLow = np.append(haLow, low_value)
+        haClose = np.append(haClose, mean([open_value, high_value, low_value, close_value]))
+    return haOpen, haHigh, haLow, haClose
+
+
+def _candles():
+    random = np.random.default_rng(42)
+    return tuple(np.cumsum(random.normal(0, 1, CANDLES_COUNT)) + 1000 for _ in range(4))
+
+
+def _best_time(function, *args):
+    return min(timeit.repeat(lambda: function(*args), number=1, repeat=3))
+
+
+def test_HL2():
+    _, candles_high, candles_low, _ = _candles()
+    np.testing.assert_array_equal(CandlesUtil.HL2(candles_high, candles_low),
+                                  _legacy_HL2(candles_high, candles_low))
+
+
+@benchmark
+def test_HL2_benchmark():
+    _, candles_high, candles_low, _ = _candles()
+    assert _best_time(_legacy_HL2, candles_high, candles_low) \
+        > MIN_SPEEDUP * _best_time(CandlesUtil.HL2, candles_high, candles_low)
+
+
+def test_OHLC4():
+    candles = _candles()
+    np.testing.assert_array_equal(CandlesUtil.OHLC4(*candles), _legacy_OHLC4(*candles))
+
+
+@benchmark
+def test_OHLC4_benchmark():
+    candles = _candles()
+    assert _best_time(_legacy_OHLC4, *candles) > MIN_SPEEDUP * _best_time(CandlesUtil.OHLC4, *candles)
+
+
+def test_HeikinAshi():
+    candles = _candles()
+    for values, legacy_values in zip(CandlesUtil.HeikinAshi(*candles), _legacy_HeikinAshi(*candles)):
+        np.testing.assert_array_equal(values, legacy_values)
+
+
+@benchmark
+def test_HeikinAshi_benchmark():
+    candles = _candles()
+    assert _best_time(_legacy_HeikinAshi, *candles) > MIN_SPEEDUP * _best_time(CandlesUtil.HeikinAshi, *candles)
@@ -0,0 +1,2 @@
+from .latency_tracker import EvaluationLatencyTracker, DEFERRED_EVALUATION, timed_ohlcv_callback, \
+    timed_evaluation, timed_stage
@@ -0,0 +1,240 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import collections
+import contextlib
+import functools
+import inspect
+import threading
+import time
+
+import numpy as np
+
+import octobot_commons.enums as commons_enums
+import octobot_commons.singleton as singleton
+import octobot_trading.api as trading_api
+
+
+class EvaluationLatencyTracker(singleton.Singleton):
+    """
+    Durations of the evaluation pipeline stages, from a candle evaluation to the resulting orders creation.
+    The latest MAX_SAMPLES durations are kept by stage, tentacle, exchange and symbol.
+    Backtesting exchanges are not tracked unless track_backtesting is True.
+    """
+    TA_EVALUATION = "ta_evaluation"
+    STRATEGY_EVALUATION = "strategy_evaluation"
+    STATE_CREATION = "state_creation"
+    ORDERS_CREATION = "orders_creation"
+    # from the first closed candle evaluation of a symbol time frame to its orders creation
+    CANDLE_TO_ORDERS = "candle_to_orders"
+    STAGES = [TA_EVALUATION, STRATEGY_EVALUATION, STATE_CREATION, ORDERS_CREATION, CANDLE_TO_ORDERS]
+    PERCENTILES = (50, 95, 99)
+    MAX_SAMPLES = 1000
+
+    def __init__(self):
+        self.enabled = True
+        self.track_backtesting = False
+        # (stage, tentacle, exchange, symbol): durations in seconds
+        self.samples = {}
+        # (exchange, symbol): {time frame: (candle time, pipeline start)}
+        self.pipeline_starts = {}
+        # (exchange, exchange_id, matrix_id): True when the exchange is tracked
+        self._tracked_exchanges = {}
+        # statistics are read from the web interface thread
+        self._lock = threading.Lock()
+
+    def add_sample(self, stage, tentacle, exchange, symbol, duration):
+        key = (stage, tentacle, exchange, symbol)
+        with self._lock:
+            try:
+                self.samples[key].append(duration)
+            except KeyError:
+                self.samples[key] = collections.deque((duration, ), maxlen=self.MAX_SAMPLES)
+
+    def is_tracked(self, exchange, exchange_id=None, matrix_id=None, exchange_manager=None):
+        """
+        :return: True when the evaluations of the exchange identified by exchange_manager, exchange_id or matrix_id
+        should be tracked
+        """
+        if not self.enabled:
+            return False
+        if self.track_backtesting:
+            return True
+        if exchange_manager is not None:
+            return not trading_api.get_is_backtesting(exchange_manager)
+        key = (exchange, exchange_id, matrix_id)
+        try:
+            return self._tracked_exchanges[key]
+        except KeyError:
+            try:
+                if exchange_id is None:
+                    exchange_id = trading_api.get_exchange_id_from_matrix_id(exchange, matrix_id)
+                exchange_manager = trading_api.get_exchange_manager_from_exchange_name_and_id(exchange, exchange_id)
+            except KeyError:
+                # stopped exchange
+                return False
+            tracked = self._tracked_exchanges[key] = not trading_api.get_is_backtesting(exchange_manager)
+            return tracked
+
+    def start_pipeline(self, exchange, symbol, time_frame, candle_time, start):
+        time_frame_starts = self.pipeline_starts.setdefault((exchange, symbol), {})
+        started_candle_time, _ = time_frame_starts.get(time_frame, (None, None))
+        # keep the start of the first evaluator notified of this candle
+        if started_candle_time is None or candle_time > started_candle_time:
+            time_frame_starts[time_frame] = (candle_time, start)
+
+    def complete_pipeline(self, tentacle, exchange, symbol, end):
+        time_frame_starts = self.pipeline_starts.pop((exchange, symbol), None)
+        if time_frame_starts:
+            # orders are created from the latest evaluated candle: previous ones did not lead to orders
+            start = max(start for _, start in time_frame_starts.values())
+            self.add_sample(self.CANDLE_TO_ORDERS, tentacle, exchange, symbol, end - start)
+
+    def get_statistics(self, stage=None):
+        """
+        :return: the count, mean, max and percentiles in milliseconds of each stage, tentacle, exchange and symbol
+        """
+        with self._lock:
+            samples = {
+                key: np.array(durations)
+                for key, durations in self.samples.items()
+                if stage is None or key[0] == stage
+            }
+        statistics = []
+        for (sample_stage, tentacle, exchange, symbol), durations in samples.items():
+            milliseconds = durations * 1000
+            statistic = {
+                "stage": sample_stage,
+                "tentacle": tentacle,
+                "exchange": exchange,
+                "symbol": symbol,
+                "count": len(milliseconds),
+                "mean": float(np.mean(milliseconds)),
+                "max": float(np.max(milliseconds)),
+            }
+            for percentile, value in zip(self.PERCENTILES, np.percentile(milliseconds, self.PERCENTILES)):
+                statistic[f"p{percentile}"] = float(value)
+            statistics.append(statistic)
+        return sorted(statistics, key=lambda s: (self.STAGES.index(s["stage"]), s["tentacle"], s["exchange"],
+                                                 s["symbol"]))
+
+    def clear(self):
+        with self._lock:
+            self.samples = {}
+            self.pipeline_starts = {}
+            self._tracked_exchanges = {}
+
+
+def _get_argument_getter(method, names):
+    parameters = list(inspect.signature(method).parameters)
+    for name in names:
+        if name in parameters:
+            # index in args: self is not in args
+            index = parameters.index(name) - 1
+
+            def _get_argument(args, kwargs):
+                return kwargs[name] if name in kwargs else args[index]
+            return _get_argument
+    return None
+
+
+# ohlcv_callback result when its candle is evaluated later, such as in batch evaluation: the evaluation duration
+# is then recorded by timed_evaluation
+DEFERRED_EVALUATION = "deferred_evaluation"
+
+
+def timed_ohlcv_callback(ohlcv_callback):
+    """
+    Records the duration of a TA evaluator ohlcv_callback and starts the latency pipeline of its symbol
+    when the evaluated candle is closed. Deferred evaluations durations are not recorded, see DEFERRED_EVALUATION.
+    """
+    @functools.wraps(ohlcv_callback)
+    async def _timed_ohlcv_callback(self, exchange, exchange_id, cryptocurrency, symbol, time_frame, candle,
+                                    inc_in_construction_data):
+        tracker = EvaluationLatencyTracker.instance()
+        if not tracker.is_tracked(exchange, exchange_id=exchange_id):
+            return await ohlcv_callback(self, exchange, exchange_id, cryptocurrency, symbol, time_frame, candle,
+                                        inc_in_construction_data)
+        start = time.perf_counter()
+        if not inc_in_construction_data:
+            tracker.start_pipeline(exchange, symbol, time_frame,
+                                   candle[commons_enums.PriceIndexes.IND_PRICE_TIME.value], start)
+        result = None
+        try:
+            result = await ohlcv_callback(self, exchange, exchange_id, cryptocurrency, symbol, time_frame, candle,
+                                          inc_in_construction_data)
+            return result
+        finally:
+            if result is not DEFERRED_EVALUATION:
+                tracker.add_sample(EvaluationLatencyTracker.TA_EVALUATION, self.__class__.__name__, exchange, symbol,
+                                   time.perf_counter() - start)
+    return _timed_ohlcv_callback
+
+
+@contextlib.contextmanager
+def timed_evaluation(evaluator, exchange, exchange_id, symbol):
+    """
+    Records the duration of a TA evaluation made outside of its ohlcv_callback, such as a batched candle evaluation
+    """
+    tracker = EvaluationLatencyTracker.instance()
+    if not tracker.is_tracked(exchange, exchange_id=exchange_id):
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        tracker.add_sample(EvaluationLatencyTracker.TA_EVALUATION, evaluator.__class__.__name__, exchange, symbol,
+                           time.perf_counter() - start)
+
+
+def timed_stage(stage, completes_pipeline=False):
+    """
+    Records the duration of the decorated async method.
+    Exchange and symbol are read from the "exchange_name" or "exchange", "matrix_id" and "symbol" method arguments,
+    trading modes exchange is their exchange manager's one.
+    :param completes_pipeline: when True, a truthy method result completes the latency pipeline of the symbol
+    """
+    def decorator(method):
+        get_symbol = _get_argument_getter(method, ("symbol", ))
+        get_exchange = _get_argument_getter(method, ("exchange_name", "exchange"))
+        get_matrix_id = _get_argument_getter(method, ("matrix_id", ))
+
+        @functools.wraps(method)
+        async def _timed_method(self, *args, **kwargs):
+            tracker = EvaluationLatencyTracker.instance()
+            if get_exchange is None:
+                exchange = self.exchange_manager.exchange_name
+                tracked = tracker.is_tracked(exchange, exchange_manager=self.exchange_manager)
+            else:
+                exchange = get_exchange(args, kwargs)
+                tracked = tracker.is_tracked(
+                    exchange, matrix_id=None if get_matrix_id is None else get_matrix_id(args, kwargs)
+                )
+            if not tracked:
+                return await method(self, *args, **kwargs)
+            start = time.perf_counter()
+            result = None
+            try:
+                result = await method(self, *args, **kwargs)
+                return result
+            finally:
+                end = time.perf_counter()
+                symbol = get_symbol(args, kwargs)
+                tracker.add_sample(stage, self.__class__.__name__, exchange, symbol, end - start)
+                if completes_pipeline and result:
+                    tracker.complete_pipeline(self.__class__.__name__, exchange, symbol, end)
+        return _timed_method
+    return decorator
@@ -0,0 +1,158 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import mock
+import pytest
+
+import octobot_trading.api as trading_api
+import tentacles.Evaluator.Util as EvaluatorUtil
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def tracker():
+    tracker = EvaluatorUtil.EvaluationLatencyTracker.instance()
+    tracker.clear()
+    # test exchanges are not registered
+    tracker.track_backtesting = True
+    yield tracker
+    tracker.track_backtesting = False
+    tracker.clear()
+
+
+class Evaluator:
+    @EvaluatorUtil.timed_ohlcv_callback
+    async def ohlcv_callback(self, exchange, exchange_id, cryptocurrency, symbol, time_frame, candle,
+                             inc_in_construction_data):
+        await asyncio.sleep(0.01)
+
+
+class BatchEvaluator:
+    @EvaluatorUtil.timed_ohlcv_callback
+    async def ohlcv_callback(self, exchange, exchange_id, cryptocurrency, symbol, time_frame, candle,
+                             inc_in_construction_data):
+        return EvaluatorUtil.DEFERRED_EVALUATION
+
+
+class Strategy:
+    @EvaluatorUtil.timed_stage(EvaluatorUtil.EvaluationLatencyTracker.STRATEGY_EVALUATION)
+    async def trigger_evaluation(self, matrix_id, exchange_name, cryptocurrency, symbol):
+        pass
+
+
+class Consumer:
+    def __init__(self):
+        self.exchange_manager = mock.Mock(exchange_name="binance")
+
+    @EvaluatorUtil.timed_stage(EvaluatorUtil.EvaluationLatencyTracker.ORDERS_CREATION, completes_pipeline=True)
+    async def create_new_orders(self, symbol, final_note, state, **kwargs):
+        return ["order"] if final_note else []
+
+
+async def test_pipeline(tracker):
+    await Evaluator().ohlcv_callback("binance", "id", "BTC", "BTC/USDT", "1h", [0], False)
+    await Strategy().trigger_evaluation("matrix_id", "binance", "BTC", symbol="BTC/USDT")
+    consumer = Consumer()
+    assert await consumer.create_new_orders("BTC/USDT", 0, "state") == []
+    # no order: pipeline is not completed
+    assert tracker.pipeline_starts
+    assert await consumer.create_new_orders("BTC/USDT", 1, "state") == ["order"]
+    assert tracker.pipeline_starts == {}
+    statistics = tracker.get_statistics()
+    assert [(s["stage"], s["tentacle"], s["exchange"], s["symbol"], s["count"]) for s in statistics] == [
+        (tracker.TA_EVALUATION, "Evaluator", "binance", "BTC/USDT", 1),
+        (tracker.STRATEGY_EVALUATION, "Strategy", "binance", "BTC/USDT", 1),
+        (tracker.ORDERS_CREATION, "Consumer", "binance", "BTC/USDT", 2),
+        (tracker.CANDLE_TO_ORDERS, "Consumer", "binance", "BTC/USDT", 1),
+    ]
+    assert statistics[0]["p50"] >= 10
+    assert statistics[-1]["p99"] >= statistics[0]["p99"]
+
+
+async def test_pipeline_start(tracker):
+    evaluator = Evaluator()
+    await evaluator.ohlcv_callback("binance", "id", "BTC", "BTC/USDT", "1h", [3600], False)
+    time_frame_starts = tracker.pipeline_starts[("binance", "BTC/USDT")]
+    _, start = time_frame_starts["1h"]
+    # same or older candles: keep the first start
+    await evaluator.ohlcv_callback("binance", "id", "BTC", "BTC/USDT", "1h", [3600], False)
+    await evaluator.ohlcv_callback("binance", "id", "BTC", "BTC/USDT", "1h", [0], False)
+    # in construction candles: not starting a pipeline
+    await evaluator.ohlcv_callback("binance", "id", "BTC", "BTC/USDT", "1h", [7200], True)
+    assert time_frame_starts["1h"] == (3600, start)
+    # other time frame
+    await evaluator.ohlcv_callback("binance", "id", "BTC", "BTC/USDT", "4h", [0], False)
+    assert time_frame_starts["1h"] == (3600, start)
+    assert time_frame_starts["4h"][0] == 0
+    await evaluator.ohlcv_callback("binance", "id", "BTC", "BTC/USDT", "1h", [7200], False)
+    assert time_frame_starts["1h"][0] == 7200
+
+    # completed from the latest started pipeline
+    _, latest_start = time_frame_starts["1h"]
+    tracker.complete_pipeline("Consumer", "binance", "BTC/USDT", latest_start + 1)
+    assert tracker.pipeline_starts == {}
+    assert tracker.get_statistics(tracker.CANDLE_TO_ORDERS)[0]["max"] == pytest.approx(1000)
+
+
+async def test_deferred_evaluation(tracker):
+    evaluator = BatchEvaluator()
+    assert await evaluator.ohlcv_callback("binance", "id", "BTC", "BTC/USDT", "1h", [3600], False) \
+        == EvaluatorUtil.DEFERRED_EVALUATION
+    # the pipeline starts at the candle notification, its evaluation is timed when it happens
+    assert tracker.pipeline_starts[("binance", "BTC/USDT")]["1h"][0] == 3600
+    assert tracker.get_statistics() == []
+    with EvaluatorUtil.timed_evaluation(evaluator, "binance", "id", "BTC/USDT"):
+        await asyncio.sleep(0.01)
+    statistic, = tracker.get_statistics()
+    assert (statistic["stage"], statistic["tentacle"], statistic["symbol"], statistic["count"]) == \
+        (tracker.TA_EVALUATION, "BatchEvaluator", "BTC/USDT", 1)
+    assert statistic["max"] >= 10
+
+
+async def test_backtesting_is_not_tracked(tracker):
+    tracker.track_backtesting = False
+    exchange_managers = {"live_id": mock.Mock(is_backtesting=False), "backtesting_id": mock.Mock(is_backtesting=True)}
+    with mock.patch.object(trading_api, "get_exchange_manager_from_exchange_name_and_id",
+                           mock.Mock(side_effect=lambda _, exchange_id: exchange_managers[exchange_id])) \
+            as get_exchange_manager_mock, \
+            mock.patch.object(trading_api, "get_is_backtesting",
+                              mock.Mock(side_effect=lambda exchange_manager: exchange_manager.is_backtesting)), \
+            mock.patch.object(trading_api, "get_exchange_id_from_matrix_id",
+                              mock.Mock(return_value="backtesting_id")):
+        evaluator = Evaluator()
+        await evaluator.ohlcv_callback("binance", "live_id", "BTC", "BTC/USDT", "1h", [0], False)
+        await evaluator.ohlcv_callback("binance", "backtesting_id", "BTC", "ETH/USDT", "1h", [0], False)
+        await evaluator.ohlcv_callback("binance", "backtesting_id", "BTC", "ETH/USDT", "1h", [3600], False)
+        await Strategy().trigger_evaluation("matrix_id", "binance", "BTC", symbol="ETH/USDT")
+        # exchanges are looked up once by exchange_id or matrix_id
+        assert get_exchange_manager_mock.call_count == 3
+    assert [(s["stage"], s["symbol"]) for s in tracker.get_statistics()] == [
+        (tracker.TA_EVALUATION, "BTC/USDT")
+    ]
+
+
+async def test_percentiles(tracker):
+    for duration in range(1, 101):
+        tracker.add_sample(tracker.STATE_CREATION, "Producer", "binance", "ETH/USDT", duration / 1000)
+    statistic, = tracker.get_statistics(tracker.STATE_CREATION)
+    assert statistic["count"] == 100
+    assert statistic["p50"] == pytest.approx(50.5)
+    assert statistic["p95"] == pytest.approx(95.05)
+    assert statistic["p99"] == pytest.approx(99.01)
+    assert statistic["max"] == pytest.approx(100)
+    assert tracker.get_statistics(tracker.TA_EVALUATION) == []
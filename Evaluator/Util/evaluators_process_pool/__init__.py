@@ -0,0 +1 @@
+from .evaluators_process_pool import SharedArrays, EvaluatorsProcessPool
@@ -0,0 +1,211 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import concurrent.futures
+import concurrent.futures.process
+import multiprocessing
+import multiprocessing.shared_memory as shared_memory
+import os
+import threading
+
+import numpy as np
+
+import octobot_commons.logging as logging
+import octobot_commons.singleton as singleton
+
+
+class SharedArrays:
+    """
+    Shared memory block in which numpy arrays are copied: arrays are given to pool processes without being pickled.
+    A block can be written again with other arrays fitting in its size.
+    """
+    MIN_SIZE = 4096
+
+    def __init__(self, size):
+        # power of 2 sizes: blocks can be reused for arrays of similar sizes
+        self.size = 1 << (max(size, self.MIN_SIZE) - 1).bit_length()
+        self.shared_memory = shared_memory.SharedMemory(create=True, size=self.size)
+        # (offset, shape, dtype) of each array in the block
+        self.layout = []
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        arrays = [np.ascontiguousarray(array) for array in arrays]
+        shared_arrays = cls(_get_arrays_size(arrays))
+        shared_arrays.write(arrays)
+        return shared_arrays
+
+    def write(self, arrays):
+        """
+        :param arrays: C contiguous arrays fitting in the block
+        """
+        self.layout = []
+        offset = 0
+        for array in arrays:
+            np.ndarray(array.shape, dtype=array.dtype, buffer=self.shared_memory.buf, offset=offset)[...] = array
+            self.layout.append((offset, array.shape, array.dtype.str))
+            offset += array.nbytes
+
+    def get_description(self):
+        return self.shared_memory.name, self.layout
+
+    def release(self):
+        self.shared_memory.close()
+        self.shared_memory.unlink()
+
+
+def _get_arrays_size(arrays):
+    return sum(array.nbytes for array in arrays)
+
+
+def _run_on_shared_arrays(function, shared_arrays_description, args):
+    # executed in the pool processes
+    name, layout = shared_arrays_description
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        arrays = [
+            np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf, offset=offset)
+            for offset, shape, dtype in layout
+        ]
+        # read only: the arrays are the evaluator candles
+        for array in arrays:
+            array.flags.writeable = False
+        result = function(*arrays, *args)
+        # release the shared buffer before closing it
+        del arrays
+        return result
+    finally:
+        block.close()
+
+
+class EvaluatorsProcessPool(singleton.Singleton):
+    """
+    Process pool running the pure numeric part of evaluators (arrays in, evaluation out) outside of the asyncio loop.
+    Evaluated functions have to be picklable (module level or static methods), they receive the given arrays as
+    read only shared memory arrays followed by the given args and should not return views on those arrays.
+    """
+    MAX_WORKERS = max(1, min(4, (os.cpu_count() or 1) - 1))
+    MAX_FREE_SHARED_ARRAYS = 8
+
+    def __init__(self):
+        self.logger = logging.get_logger(self.__class__.__name__)
+        self.max_workers = self.MAX_WORKERS
+        self.executor = None
+        # shared memory blocks that are not used by a running function
+        self.free_shared_arrays = []
+        # submitted functions that are not done yet
+        self.pending_futures = set()
+        # futures are done in the executor management thread
+        self.lock = threading.Lock()
+        # the pool is stopped when its last user stops
+        self.users = set()
+
+    async def run(self, function, arrays, *args):
+        """
+        :param function: function(*arrays, *args) to run in a pool process
+        :param arrays: numpy arrays given to function through shared memory
+        :return: the function result
+        """
+        shared_arrays = self._acquire_shared_arrays(arrays)
+        executor = self._get_executor()
+        try:
+            return await asyncio.wrap_future(self._submit(executor, shared_arrays, function, args))
+        except concurrent.futures.process.BrokenProcessPool as e:
+            self.logger.error(f"Evaluators process pool is broken ({e}), running {function.__name__} "
+                              f"in the current process.")
+            if self.executor is executor:
+                executor.shutdown(wait=False)
+                self.executor = None
+            return function(*arrays, *args)
+
+    def add_user(self, user):
+        self.users.add(user)
+
+    def remove_user(self, user):
+        """
+        Stops the pool when user is its last user
+        """
+        self.users.discard(user)
+        if not self.users:
+            self.stop()
+
+    def stop(self):
+        """
+        Cancels the functions that are not running yet, the blocks of running functions are released when they are
+        done
+        """
+        if self.executor is not None:
+            executor = self.executor
+            self.executor = None
+            with self.lock:
+                pending_futures = list(self.pending_futures)
+            for future in pending_futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+        with self.lock:
+            free_shared_arrays = self.free_shared_arrays
+            self.free_shared_arrays = []
+        for shared_arrays in free_shared_arrays:
+            shared_arrays.release()
+
+    def _submit(self, executor, shared_arrays, function, args):
+        try:
+            future = executor.submit(_run_on_shared_arrays, function, shared_arrays.get_description(), args)
+        except BaseException:
+            self._release_shared_arrays(shared_arrays, executor)
+            raise
+        with self.lock:
+            self.pending_futures.add(future)
+        # the block can only be reused once the pool process stopped reading it, even when the awaiting task
+        # is cancelled
+        future.add_done_callback(lambda done_future: self._on_done(done_future, shared_arrays, executor))
+        return future
+
+    def _acquire_shared_arrays(self, arrays):
+        arrays = [np.ascontiguousarray(array) for array in arrays]
+        size = _get_arrays_size(arrays)
+        with self.lock:
+            for index, shared_arrays in enumerate(self.free_shared_arrays):
+                if shared_arrays.size >= size:
+                    shared_arrays = self.free_shared_arrays.pop(index)
+                    break
+            else:
+                shared_arrays = None
+        if shared_arrays is None:
+            shared_arrays = SharedArrays(size)
+        shared_arrays.write(arrays)
+        return shared_arrays
+
+    def _on_done(self, future, shared_arrays, executor):
+        # called from an executor thread or from the asyncio loop when cancelled before running
+        with self.lock:
+            self.pending_futures.discard(future)
+        self._release_shared_arrays(shared_arrays, executor)
+
+    def _release_shared_arrays(self, shared_arrays, executor):
+        with self.lock:
+            # blocks of a stopped or replaced executor are not reused
+            if executor is self.executor and len(self.free_shared_arrays) < self.MAX_FREE_SHARED_ARRAYS:
+                self.free_shared_arrays.append(shared_arrays)
+                return
+        shared_arrays.release()
+
+    def _get_executor(self):
+        if self.executor is None:
+            # spawn: forking a process running an asyncio loop and threads is unsafe
+            self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers,
+                                                                   mp_context=multiprocessing.get_context("spawn"))
+        return self.executor
@@ -0,0 +1,148 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import contextlib
+import multiprocessing.shared_memory as shared_memory
+import time
+
+import mock
+import numpy as np
+import pytest
+
+import tentacles.Evaluator.Util as EvaluatorUtil
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+RUNNING_TIMEOUT = 30
+
+
+@pytest.fixture
+def process_pool():
+    process_pool = EvaluatorUtil.EvaluatorsProcessPool()
+    process_pool.max_workers = 1
+    yield process_pool
+    process_pool.stop()
+
+
+def _slow_sum(array, duration):
+    # executed in the pool processes
+    time.sleep(duration)
+    return array.sum()
+
+
+async def _wait_for(condition):
+    start = time.time()
+    while not condition():
+        assert time.time() - start < RUNNING_TIMEOUT
+        await asyncio.sleep(0.01)
+
+
+def _is_running(process_pool):
+    return any(future.running() for future in process_pool.pending_futures)
+
+
+async def test_shared_arrays():
+    arrays = [np.arange(10, dtype=np.float64), np.arange(5, dtype=np.int32), np.array([])]
+    shared_arrays = EvaluatorUtil.SharedArrays.from_arrays(arrays)
+    name, layout = shared_arrays.get_description()
+    block = shared_memory.SharedMemory(name=name)
+    for array, (offset, shape, dtype) in zip(arrays, layout):
+        np.testing.assert_array_equal(np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf, offset=offset),
+                                      array)
+    block.close()
+    shared_arrays.release()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+
+
+async def test_run(process_pool):
+    data = np.random.default_rng(42).normal(0, 1, 1000)
+    assert await process_pool.run(EvaluatorUtil.PatternAnalyser.get_pattern, (data, )) \
+        == EvaluatorUtil.PatternAnalyser.get_pattern(data)
+    # arrays and args
+    assert await process_pool.run(EvaluatorUtil.TrendAnalysis.get_threshold_change_indexes, (data, ), 0.5) \
+        == EvaluatorUtil.TrendAnalysis.get_threshold_change_indexes(data, 0.5)
+    assert await process_pool.run(np.dot, (data, data[::-1])) == np.dot(data, data[::-1])
+    # executor is reused
+    executor = process_pool.executor
+    await process_pool.run(np.sum, (data, ))
+    assert process_pool.executor is executor
+
+
+async def test_shared_arrays_are_reused(process_pool):
+    data = np.random.default_rng(42).normal(0, 1, 1000)
+    await process_pool.run(np.sum, (data, ))
+    shared_arrays, = process_pool.free_shared_arrays
+    # fits in the same block
+    assert await process_pool.run(np.dot, (data[:500], data[500:])) == np.dot(data[:500], data[500:])
+    assert process_pool.free_shared_arrays == [shared_arrays]
+    # larger arrays
+    assert await process_pool.run(np.sum, (np.ones(shared_arrays.size), )) == shared_arrays.size
+    assert len(process_pool.free_shared_arrays) == 2
+    process_pool.stop()
+    assert process_pool.free_shared_arrays == []
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=shared_arrays.get_description()[0])
+
+
+async def test_remove_user(process_pool):
+    data = np.random.default_rng(42).normal(0, 1, 1000)
+    process_pool.add_user("evaluator_1")
+    process_pool.add_user("evaluator_2")
+    await process_pool.run(np.sum, (data, ))
+    process_pool.remove_user("evaluator_1")
+    assert process_pool.executor is not None
+    process_pool.remove_user("evaluator_2")
+    assert process_pool.executor is None
+
+
+async def test_cancelled_run(process_pool):
+    task = asyncio.create_task(process_pool.run(_slow_sum, (np.ones(1000), ), 1))
+    await _wait_for(lambda: _is_running(process_pool))
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+    # the pool process is still reading the block
+    assert process_pool.free_shared_arrays == []
+    await _wait_for(lambda: not process_pool.pending_futures)
+    assert len(process_pool.free_shared_arrays) == 1
+
+
+async def test_stop_while_running(process_pool):
+    acquired_shared_arrays = []
+    acquire_shared_arrays = process_pool._acquire_shared_arrays
+
+    def _acquire_shared_arrays(arrays):
+        acquired_shared_arrays.append(acquire_shared_arrays(arrays))
+        return acquired_shared_arrays[-1]
+
+    with mock.patch.object(process_pool, "_acquire_shared_arrays", _acquire_shared_arrays):
+        tasks = [asyncio.create_task(process_pool.run(_slow_sum, (np.ones(1000), ), 1)) for _ in range(4)]
+        await _wait_for(lambda: _is_running(process_pool))
+    process_pool.stop()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    # running functions complete, pending ones are cancelled
+    assert results[0] == 1000
+    assert any(isinstance(result, asyncio.CancelledError) for result in results)
+    await _wait_for(lambda: not process_pool.pending_futures)
+    # blocks of a stopped pool are released
+    assert process_pool.free_shared_arrays == []
+    assert len(acquired_shared_arrays) == 4
+    for shared_arrays in acquired_shared_arrays:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=shared_arrays.get_description()[0])
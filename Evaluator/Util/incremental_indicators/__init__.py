@@ -0,0 +1,5 @@
+from .incremental_indicators import IncrementalIndicator, IncrementalSMA, IncrementalEMA, IncrementalRSI, \
+    IncrementalMACD, IncrementalATR, IncrementalADX, IncrementalBBands, IncrementalStochRSI, IncrementalVWMA, \
+    IncrementalLinReg
+from .indicators_engine import IndicatorSeries, IncrementalIndicatorsEngine, CandlesIndicators, \
+    clear_evaluator_indicators
@@ -0,0 +1,429 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import collections
+import math
+
+# Incremental versions of the tulipy indicators used by TA evaluators.
+# Each indicator is fed one value (or one high/low/close... tuple) at a time through update() and follows
+# the exact tulipy algorithm, so that feeding a whole array gives the same values as the tulipy function.
+
+
+class IncrementalIndicator:
+    # number of input series (ex: close only or high, low and close)
+    INPUTS_COUNT = 1
+    # number of output series (ex: macd, signal and histogram)
+    OUTPUTS_COUNT = 1
+    # True when values depend on the whole history (exponential smoothing) instead of a fixed window
+    IS_RECURSIVE = False
+    # candles required to make the initial values of a recursive indicator negligible
+    CONVERGENCE_FACTOR = 10
+
+    def __init__(self, period):
+        if period < 1:
+            raise ValueError(f"Invalid period: {period}")
+        self.period = period
+        self.index = -1
+
+    @classmethod
+    def get_start(cls, *params):
+        """
+        :return: the number of input values consumed before the first output, as in tulipy *_start functions
+        """
+        raise NotImplementedError("get_start is not implemented")
+
+    @classmethod
+    def get_convergence_length(cls, *params):
+        """
+        :return: the input size from which results computed from a longer history are equivalent
+        """
+        if cls.IS_RECURSIVE:
+            return cls.get_start(*params) + cls.CONVERGENCE_FACTOR * max(params)
+        return cls.get_start(*params) + 1
+
+    def update(self, *values):
+        """
+        Feed the next input value(s)
+        :return: the output values tuple, filled with nan while the indicator is warming up
+        """
+        self.index += 1
+        return self._update(*values)
+
+    def _update(self, *values):
+        raise NotImplementedError("_update is not implemented")
+
+    def _empty_output(self):
+        return (math.nan, ) * self.OUTPUTS_COUNT
+
+
+class IncrementalSMA(IncrementalIndicator):
+
+    def __init__(self, period):
+        super().__init__(period)
+        self.scale = 1.0 / period
+        self.sum = 0
+        self.window = collections.deque()
+
+    @classmethod
+    def get_start(cls, period):
+        return period - 1
+
+    def _update(self, value):
+        self.sum += value
+        self.window.append(value)
+        if len(self.window) > self.period:
+            self.sum -= self.window.popleft()
+        if self.index < self.period - 1:
+            return self._empty_output()
+        return self.sum * self.scale,
+
+
+class IncrementalEMA(IncrementalIndicator):
+    IS_RECURSIVE = True
+
+    def __init__(self, period):
+        super().__init__(period)
+        self.per = 2 / (period + 1)
+        self.value = math.nan
+
+    @classmethod
+    def get_start(cls, period):
+        return 0
+
+    def _update(self, value):
+        if self.index == 0:
+            self.value = value
+        else:
+            self.value = (value - self.value) * self.per + self.value
+        return self.value,
+
+
+class IncrementalRSI(IncrementalIndicator):
+    IS_RECURSIVE = True
+
+    def __init__(self, period):
+        super().__init__(period)
+        self.per = 1.0 / period
+        self.previous = math.nan
+        self.smooth_up = 0
+        self.smooth_down = 0
+
+    @classmethod
+    def get_start(cls, period):
+        return period
+
+    def _update(self, value):
+        previous, self.previous = self.previous, value
+        if self.index == 0:
+            return self._empty_output()
+        upward = value - previous if value > previous else 0
+        downward = previous - value if value < previous else 0
+        if self.index < self.period:
+            self.smooth_up += upward
+            self.smooth_down += downward
+            return self._empty_output()
+        if self.index == self.period:
+            self.smooth_up += upward
+            self.smooth_down += downward
+            self.smooth_up /= self.period
+            self.smooth_down /= self.period
+        else:
+            self.smooth_up = (upward - self.smooth_up) * self.per + self.smooth_up
+            self.smooth_down = (downward - self.smooth_down) * self.per + self.smooth_down
+        return _rsi(self.smooth_up, self.smooth_down),
+
+
+class IncrementalMACD(IncrementalIndicator):
+    IS_RECURSIVE = True
+    OUTPUTS_COUNT = 3
+
+    def __init__(self, short_period, long_period, signal_period):
+        super().__init__(min(short_period, long_period, signal_period))
+        if long_period < short_period:
+            raise ValueError(f"Invalid periods: long period ({long_period}) < short period ({short_period})")
+        self.long_period = long_period
+        self.short_per = 2 / (short_period + 1)
+        self.long_per = 2 / (long_period + 1)
+        self.signal_per = 2 / (signal_period + 1)
+        if short_period == 12 and long_period == 26:
+            # same as tulipy
+            self.short_per = 0.15
+            self.long_per = 0.075
+        self.short_ema = math.nan
+        self.long_ema = math.nan
+        self.signal_ema = 0
+
+    @classmethod
+    def get_start(cls, short_period, long_period, signal_period):
+        return long_period - 1
+
+    def _update(self, value):
+        if self.index == 0:
+            self.short_ema = self.long_ema = value
+            if self.long_period > 1:
+                return self._empty_output()
+        else:
+            self.short_ema = (value - self.short_ema) * self.short_per + self.short_ema
+            self.long_ema = (value - self.long_ema) * self.long_per + self.long_ema
+        out = self.short_ema - self.long_ema
+        if self.index == self.long_period - 1:
+            self.signal_ema = out
+        if self.index >= self.long_period - 1:
+            self.signal_ema = (out - self.signal_ema) * self.signal_per + self.signal_ema
+            return out, self.signal_ema, out - self.signal_ema
+        return self._empty_output()
+
+
+class IncrementalATR(IncrementalIndicator):
+    IS_RECURSIVE = True
+    INPUTS_COUNT = 3
+
+    def __init__(self, period):
+        super().__init__(period)
+        self.per = 1.0 / period
+        self.previous_close = math.nan
+        self.value = 0
+
+    @classmethod
+    def get_start(cls, period):
+        return period - 1
+
+    def _update(self, high, low, close):
+        true_range = high - low if self.index == 0 else _true_range(high, low, self.previous_close)
+        self.previous_close = close
+        if self.index < self.period - 1:
+            self.value += true_range
+            return self._empty_output()
+        if self.index == self.period - 1:
+            self.value = (self.value + true_range) / self.period
+        else:
+            self.value = (true_range - self.value) * self.per + self.value
+        return self.value,
+
+
+class IncrementalADX(IncrementalIndicator):
+    IS_RECURSIVE = True
+    INPUTS_COUNT = 3
+
+    def __init__(self, period):
+        super().__init__(period)
+        self.per = (period - 1) / period
+        self.invper = 1.0 / period
+        self.previous_high = self.previous_low = self.previous_close = math.nan
+        self.atr = 0
+        self.dmup = 0
+        self.dmdown = 0
+        self.adx = 0.0
+
+    @classmethod
+    def get_start(cls, period):
+        return (period - 1) * 2
+
+    def _update(self, high, low, close):
+        if self.index > 0:
+            true_range = _true_range(high, low, self.previous_close)
+            dp, dm = _direction(high, low, self.previous_high, self.previous_low)
+        self.previous_high, self.previous_low, self.previous_close = high, low, close
+        if self.index == 0:
+            return self._empty_output()
+        if self.index < self.period:
+            self.atr += true_range
+            self.dmup += dp
+            self.dmdown += dm
+            if self.index < self.period - 1:
+                return self._empty_output()
+        else:
+            self.atr = self.atr * self.per + true_range
+            self.dmup = self.dmup * self.per + dp
+            self.dmdown = self.dmdown * self.per + dm
+        di_up = self.dmup / self.atr
+        di_down = self.dmdown / self.atr
+        dm_diff = math.fabs(di_up - di_down)
+        dm_sum = di_up + di_down
+        dx = _safe_div(dm_diff, dm_sum) * 100
+        step = self.index - self.period + 1
+        if step < self.period - 1:
+            self.adx += dx
+            return self._empty_output()
+        if step == self.period - 1:
+            self.adx += dx
+        else:
+            self.adx = self.adx * self.per + dx
+        return self.adx * self.invper,
+
+
+class IncrementalBBands(IncrementalIndicator):
+    OUTPUTS_COUNT = 3
+
+    def __init__(self, period, stddev):
+        super().__init__(period)
+        self.stddev = stddev
+        self.scale = 1.0 / period
+        self.sum = 0
+        self.sum2 = 0
+        self.window = collections.deque()
+
+    @classmethod
+    def get_start(cls, period, stddev):
+        return period - 1
+
+    def _update(self, value):
+        self.sum += value
+        self.sum2 += value * value
+        self.window.append(value)
+        if len(self.window) > self.period:
+            removed = self.window.popleft()
+            self.sum -= removed
+            self.sum2 -= removed * removed
+        if self.index < self.period - 1:
+            return self._empty_output()
+        middle = self.sum * self.scale
+        deviation = math.sqrt(max(self.sum2 * self.scale - middle * middle, 0))
+        return middle - self.stddev * deviation, middle, middle + self.stddev * deviation
+
+
+class IncrementalStochRSI(IncrementalIndicator):
+    IS_RECURSIVE = True
+
+    def __init__(self, period):
+        super().__init__(period)
+        self.rsi = IncrementalRSI(period)
+        self.window = _RollingMinMax(period)
+
+    @classmethod
+    def get_start(cls, period):
+        return period * 2 - 1
+
+    def _update(self, value):
+        rsi_value = self.rsi.update(value)[0]
+        if self.index < self.period:
+            return self._empty_output()
+        min_value, max_value = self.window.push(rsi_value)
+        if self.index < self.period * 2 - 1:
+            return self._empty_output()
+        diff = max_value - min_value
+        return 0.0 if diff == 0.0 else (rsi_value - min_value) / diff,
+
+
+class IncrementalVWMA(IncrementalIndicator):
+    INPUTS_COUNT = 2
+
+    def __init__(self, period):
+        super().__init__(period)
+        self.sum = 0
+        self.volume_sum = 0
+        self.window = collections.deque()
+
+    @classmethod
+    def get_start(cls, period):
+        return period - 1
+
+    def _update(self, value, volume):
+        self.sum += value * volume
+        self.volume_sum += volume
+        self.window.append((value, volume))
+        if len(self.window) > self.period:
+            removed_value, removed_volume = self.window.popleft()
+            self.sum -= removed_value * removed_volume
+            self.volume_sum -= removed_volume
+        if self.index < self.period - 1:
+            return self._empty_output()
+        return _safe_div(self.sum, self.volume_sum),
+
+
+class IncrementalLinReg(IncrementalIndicator):
+
+    def __init__(self, period):
+        super().__init__(period)
+        self.x = period * (period + 1) / 2
+        self.x2 = period * (period + 1) * (2 * period + 1) / 6
+        self.bd = 1.0 / (period * self.x2 - self.x * self.x)
+        self.p = 1.0 / period
+        self.y = 0
+        self.xy = 0
+        self.window = collections.deque()
+
+    @classmethod
+    def get_start(cls, period):
+        return period - 1
+
+    def _update(self, value):
+        self.window.append(value)
+        if self.index < self.period - 1:
+            self.xy += value * (self.index + 1)
+            self.y += value
+            return self._empty_output()
+        self.xy += value * self.period
+        self.y += value
+        b = (self.period * self.xy - self.x * self.y) * self.bd
+        a = (self.y - b * self.x) * self.p
+        # slide the window: every remaining value gets its x decremented
+        self.xy -= self.y
+        self.y -= self.window.popleft()
+        return a + b * self.period,
+
+
+class _RollingMinMax:
+    """
+    Monotonic queues giving the min and max of the last period values in amortized O(1)
+    """
+
+    def __init__(self, period):
+        self.period = period
+        self.index = -1
+        self.min_queue = collections.deque()
+        self.max_queue = collections.deque()
+
+    def push(self, value):
+        self.index += 1
+        while self.min_queue and self.min_queue[-1][1] >= value:
+            self.min_queue.pop()
+        self.min_queue.append((self.index, value))
+        while self.max_queue and self.max_queue[-1][1] <= value:
+            self.max_queue.pop()
+        self.max_queue.append((self.index, value))
+        oldest_index = self.index - self.period + 1
+        if self.min_queue[0][0] < oldest_index:
+            self.min_queue.popleft()
+        if self.max_queue[0][0] < oldest_index:
+            self.max_queue.popleft()
+        return self.min_queue[0][1], self.max_queue[0][1]
+
+
+def _rsi(smooth_up, smooth_down):
+    return 100.0 * _safe_div(smooth_up, smooth_up + smooth_down)
+
+
+def _true_range(high, low, previous_close):
+    return max(high - low, math.fabs(high - previous_close), math.fabs(low - previous_close))
+
+
+def _direction(high, low, previous_high, previous_low):
+    up = high - previous_high
+    down = previous_low - low
+    if up < 0:
+        up = 0
+    elif up > down:
+        down = 0
+    if down < 0:
+        down = 0
+    elif down > up:
+        up = 0
+    return up, down
+
+
+def _safe_div(numerator, denominator):
+    # tulipy divisions by 0 give nan
+    return numerator / denominator if denominator else math.nan
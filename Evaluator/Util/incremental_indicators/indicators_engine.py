@@ -0,0 +1,399 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import copy
+
+import numpy as np
+import tulipy
+
+import octobot_commons.logging as logging
+import octobot_commons.singleton as singleton
+import octobot_trading.api as trading_api
+
+import tentacles.Evaluator.Util.incremental_indicators.incremental_indicators as incremental_indicators
+
+
+class IndicatorSeries:
+    """
+    State of an incremental indicator fed with the candles of a (exchange, symbol, time frame).
+    Closed candles are committed into the indicator state, new candles are processed in O(1) and
+    the series is rebuilt from scratch when the given candles are not a continuation of the committed ones.
+    When the given candles are a rolling window that doesn't start at the first committed candle, values are
+    computed from the whole committed history: values of recursive indicators (EMA, RSI, MACD, ATR, ADX, StochRSI)
+    are equivalent to the tulipy ones computed on the window only from its convergence_length candles.
+    Previous values would differ from the tulipy ones: they are not returned.
+    """
+    MIN_CAPACITY = 64
+
+    def __init__(self, indicator_class, params):
+        self.indicator_class = indicator_class
+        self.params = params
+        self.start = indicator_class.get_start(*params)
+        self.convergence_length = indicator_class.get_convergence_length(*params)
+        self.indicator = None
+        self.first_time = None
+        self.committed_time = None
+        self.max_size = 0
+        self.rebuilds_count = 0
+        # committed inputs are kept with their outputs to identify the input arrays the series is built from
+        self._inputs = [np.empty(self.MIN_CAPACITY, dtype=np.float64)
+                        for _ in range(indicator_class.INPUTS_COUNT)]
+        self._outputs = [np.empty(self.MIN_CAPACITY, dtype=np.float64)
+                         for _ in range(indicator_class.OUTPUTS_COUNT)]
+        self._end = 0
+
+    def compute(self, times, inputs, closed=True):
+        """
+        :param times: candles times, ascending
+        :param inputs: indicator input arrays, aligned with times
+        :param closed: False when the last candle is still in construction: it will not be committed
+        :return: the indicator output arrays, aligned on their last value with the equivalent tulipy function
+        outputs. Outputs of rolling windows start from the window convergence_length candles.
+        """
+        return self.compute_from(self.get_new_values_index(times, inputs), times, inputs, closed=closed)
+
+    def compute_from(self, new_values_index, times, inputs, closed=True):
+        """
+        compute() using the already known get_new_values_index() result
+        """
+        size = len(times)
+        self.max_size = max(self.max_size, size)
+        if new_values_index is None:
+            self._reset(times[0])
+            new_values_index = 0
+        to_commit_end = size if closed else size - 1
+        for index in range(new_values_index, to_commit_end):
+            self._commit(times[index], tuple(values[index] for values in inputs))
+        result_size = max(size - self.start, 0)
+        if times[0] != self.first_time:
+            # rolling window: previous values would differ from the tulipy ones computed on this window
+            result_size = min(result_size, max(size - self.convergence_length + 1, 0))
+        if closed or new_values_index >= size:
+            # last value is already committed
+            return tuple(_read_only(outputs[self._end - result_size:self._end]) for outputs in self._outputs)
+        pending_outputs = copy.deepcopy(self.indicator).update(*(values[-1] for values in inputs))
+        committed_size = max(result_size - 1, 0)
+        return tuple(
+            _read_only(np.append(outputs[self._end - committed_size:self._end], pending_output)
+                       if result_size else outputs[:0].copy())
+            for outputs, pending_output in zip(self._outputs, pending_outputs)
+        )
+
+    def get_new_values_index(self, times, inputs):
+        """
+        :return: the index of the first given candle that is not committed yet or None when the given candles
+        and inputs are not a continuation of the committed ones
+        """
+        if self.committed_time is None:
+            return None
+        if times[0] != self.first_time and len(times) < self.convergence_length:
+            # not enough history for the committed state to give the same values as a computation from times[0]
+            return None
+        last_index = len(times) - 1
+        if last_index > 0 and times[last_index - 1] == self.committed_time:
+            # most common case: one new candle
+            committed_index = last_index - 1
+        elif times[last_index] == self.committed_time:
+            committed_index = last_index
+        else:
+            committed_index = np.searchsorted(times, self.committed_time)
+        if committed_index > last_index \
+                or times[committed_index] != self.committed_time \
+                or committed_index + 1 > self._end:
+            # gap or older candles: committed state can't be used
+            return None
+        checked_size = min(committed_index + 1, self._end, self.convergence_length)
+        for values, committed_values in zip(inputs, self._inputs):
+            if not np.array_equal(values[committed_index + 1 - checked_size:committed_index + 1],
+                                  committed_values[self._end - checked_size:self._end], equal_nan=True):
+                # other input array or committed candle has been updated
+                return None
+        return committed_index + 1
+
+    def _reset(self, first_time):
+        self.indicator = self.indicator_class(*self.params)
+        self.first_time = first_time
+        self.committed_time = None
+        capacity = max(self.max_size, self.MIN_CAPACITY)
+        self._inputs = [np.empty(capacity, dtype=np.float64) for _ in self._inputs]
+        # use new buffers: previously returned outputs are views on the current ones
+        self._outputs = [np.empty(capacity, dtype=np.float64) for _ in self._outputs]
+        self._end = 0
+        self.rebuilds_count += 1
+
+    def _commit(self, time, values):
+        outputs = self.indicator.update(*values)
+        if self._end == len(self._outputs[0]):
+            self._compact()
+        for buffer, value in zip(self._inputs, values):
+            buffer[self._end] = value
+        for buffer, output in zip(self._outputs, outputs):
+            buffer[self._end] = output
+        self._end += 1
+        self.committed_time = time
+
+    def _compact(self):
+        # keep the latest values (at least the largest requested window) and make room for the next ones.
+        # Values are copied into new buffers: previously returned outputs are views on the current ones
+        kept = min(self._end, self.max_size)
+        self._inputs, self._outputs = (
+            [
+                np.concatenate((buffer[self._end - kept:self._end],
+                                np.empty(max(kept, self.MIN_CAPACITY), dtype=np.float64)))
+                for buffer in buffers
+            ]
+            for buffers in (self._inputs, self._outputs)
+        )
+        self._end = kept
+
+
+class IncrementalIndicatorsEngine(singleton.Singleton):
+    """
+    Shared incremental indicators states, identified by exchange_id, symbol, time frame, indicator and parameters.
+    The latest used series of each identifier are kept to compute the same indicator on different input arrays
+    (ex: sma of close and volume).
+    Computed values are cached until the next candle of their exchange_id, symbol and time frame so that
+    evaluators using the same indicator on the same candle only compute it once. Inputs of the same candles
+    (ex: close and volume) are told apart by their first and last values.
+    """
+    MAX_SERIES_PER_KEY = 4
+    # cache statistics are logged every CACHE_STATISTICS_LOG_INTERVAL cached candles
+    CACHE_STATISTICS_LOG_INTERVAL = 1000
+
+    def __init__(self):
+        self.logger = logging.get_logger(self.__class__.__name__)
+        # (exchange_id, symbol, time_frame, indicator_class, params): series, the latest used first
+        self.series = {}
+        # (exchange_id, symbol, time_frame): (last candle time, {cache key: outputs})
+        self.candle_caches = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cached_candles_count = 0
+
+    def compute(self, exchange_id, symbol, time_frame, indicator_class, params, times, inputs, closed=True):
+        candle_cache, cache_key = self._get_candle_cache(exchange_id, symbol, time_frame,
+                                                         indicator_class, params, times, inputs, closed)
+        outputs = self._get_cached_outputs(candle_cache, cache_key)
+        if outputs is not None:
+            return outputs
+        key = (exchange_id, symbol, time_frame, indicator_class, params)
+        try:
+            series_list = self.series[key]
+        except KeyError:
+            series_list = self.series[key] = []
+        for index, series in enumerate(series_list):
+            new_values_index = series.get_new_values_index(times, inputs)
+            if new_values_index is not None:
+                if index:
+                    series_list.insert(0, series_list.pop(index))
+                break
+        else:
+            # inputs are not a continuation of any series: build a new one or rebuild the least recently used
+            new_values_index = None
+            if len(series_list) < self.MAX_SERIES_PER_KEY:
+                series = IndicatorSeries(indicator_class, params)
+            else:
+                series = series_list.pop()
+            series_list.insert(0, series)
+        outputs = candle_cache[cache_key] = series.compute_from(new_values_index, times, inputs, closed=closed)
+        return outputs
+
+    def compute_with_tulipy(self, exchange_id, symbol, time_frame, tulipy_function, params, times, inputs,
+                            closed=True):
+        candle_cache, cache_key = self._get_candle_cache(exchange_id, symbol, time_frame,
+                                                         tulipy_function, params, times, inputs, closed)
+        outputs = self._get_cached_outputs(candle_cache, cache_key)
+        if outputs is not None:
+            return outputs
+        outputs = tulipy_function(*inputs, *params)
+        outputs = candle_cache[cache_key] = tuple(
+            _read_only(output) for output in (outputs if isinstance(outputs, tuple) else (outputs, ))
+        )
+        return outputs
+
+    def get_cache_statistics(self):
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "cached_candles": len(self.candle_caches),
+        }
+
+    def log_cache_statistics(self):
+        statistics = self.get_cache_statistics()
+        lookups = statistics["hits"] + statistics["misses"]
+        self.logger.debug(f"Indicators cache: {statistics['hits']} hits, {statistics['misses']} misses "
+                          f"({statistics['hits'] / lookups if lookups else 0:.1%} hit rate), "
+                          f"{statistics['cached_candles']} cached candles")
+
+    def clear(self, exchange_id=None):
+        self.log_cache_statistics()
+        if exchange_id is None:
+            self.series = {}
+            self.candle_caches = {}
+        else:
+            self.series = {
+                key: series
+                for key, series in self.series.items()
+                if key[0] != exchange_id
+            }
+            self.candle_caches = {
+                key: candle_cache
+                for key, candle_cache in self.candle_caches.items()
+                if key[0] != exchange_id
+            }
+
+    def _get_candle_cache(self, exchange_id, symbol, time_frame, indicator, params, times, inputs, closed):
+        last_time = times[-1]
+        # input arrays are part of the key: the same indicator can be computed on different inputs
+        # (ex: sma of close and volume) and the last candle values change when it is in construction
+        cache_key = (indicator, params, times[0], len(times), closed, _get_inputs_identity(inputs))
+        candles_key = (exchange_id, symbol, time_frame)
+        cached_time, candle_cache = self.candle_caches.get(candles_key, (None, None))
+        if candle_cache is not None and cached_time == last_time:
+            return candle_cache, cache_key
+        # new candle: evict values of the previous one
+        candle_cache = {}
+        self.candle_caches[candles_key] = (last_time, candle_cache)
+        self.cached_candles_count += 1
+        if self.cached_candles_count % self.CACHE_STATISTICS_LOG_INTERVAL == 0:
+            self.log_cache_statistics()
+        return candle_cache, cache_key
+
+    def _get_cached_outputs(self, candle_cache, cache_key):
+        outputs = candle_cache.get(cache_key)
+        if outputs is None:
+            self.cache_misses += 1
+        else:
+            self.cache_hits += 1
+        return outputs
+
+
+class CandlesIndicators:
+    """
+    tulipy-like access to incremental indicators for the candles of a (exchange, symbol, time frame).
+    Indicators that have no incremental implementation, inputs that are not aligned with the given candles
+    times and candles windows shorter than the indicator convergence length are computed by tulipy.
+    On rolling windows, recursive indicators only return their values equivalent to the tulipy ones computed on
+    the window, from its convergence_length candles (see IndicatorSeries): evaluators reading whole arrays should
+    use tulipy.
+    """
+
+    def __init__(self, exchange_id, symbol, time_frame, times, include_in_construction=False, engine=None):
+        self.exchange_id = exchange_id
+        self.symbol = symbol
+        self.time_frame = time_frame
+        self.times = times
+        self.closed = not include_in_construction
+        self.engine = engine or IncrementalIndicatorsEngine.instance()
+
+    @classmethod
+    def from_symbol_candles(cls, symbol_candles, exchange_id, symbol, time_frame, limit=-1,
+                            include_in_construction=False):
+        times = trading_api.get_symbol_time_candles(symbol_candles, time_frame, limit,
+                                                    include_in_construction=include_in_construction)
+        return cls(exchange_id, symbol, time_frame, times, include_in_construction=include_in_construction)
+
+    def sma(self, real, period):
+        return self._compute(incremental_indicators.IncrementalSMA, (period, ), (real, ), tulipy.sma)[0]
+
+    def ema(self, real, period):
+        return self._compute(incremental_indicators.IncrementalEMA, (period, ), (real, ), tulipy.ema)[0]
+
+    def rsi(self, real, period):
+        return self._compute(incremental_indicators.IncrementalRSI, (period, ), (real, ), tulipy.rsi)[0]
+
+    def macd(self, real, short_period, long_period, signal_period):
+        return self._compute(incremental_indicators.IncrementalMACD, (short_period, long_period, signal_period),
+                             (real, ), tulipy.macd)
+
+    def atr(self, high, low, close, period):
+        return self._compute(incremental_indicators.IncrementalATR, (period, ), (high, low, close), tulipy.atr)[0]
+
+    def adx(self, high, low, close, period):
+        return self._compute(incremental_indicators.IncrementalADX, (period, ), (high, low, close), tulipy.adx)[0]
+
+    def bbands(self, real, period, stddev):
+        return self._compute(incremental_indicators.IncrementalBBands, (period, stddev), (real, ), tulipy.bbands)
+
+    def stochrsi(self, real, period):
+        return self._compute(incremental_indicators.IncrementalStochRSI, (period, ), (real, ), tulipy.stochrsi)[0]
+
+    def vwma(self, close, volume, period):
+        return self._compute(incremental_indicators.IncrementalVWMA, (period, ), (close, volume), tulipy.vwma)[0]
+
+    def linreg(self, real, period):
+        return self._compute(incremental_indicators.IncrementalLinReg, (period, ), (real, ), tulipy.linreg)[0]
+
+    def __getattr__(self, item):
+        # indicators without incremental implementation: computed by tulipy and cached for the current candle
+        tulipy_function = getattr(tulipy, item)
+
+        def _cached_tulipy_function(*args):
+            inputs = tuple(arg for arg in args if isinstance(arg, np.ndarray))
+            params = tuple(arg for arg in args if not isinstance(arg, np.ndarray))
+            if not self._is_aligned(inputs):
+                return tulipy_function(*args)
+            outputs = self.engine.compute_with_tulipy(self.exchange_id, self.symbol, self.time_frame,
+                                                      tulipy_function, params, self.times, inputs,
+                                                      closed=self.closed)
+            return outputs if len(outputs) > 1 else outputs[0]
+        return _cached_tulipy_function
+
+    def _compute(self, indicator_class, params, inputs, tulipy_function):
+        if not self._is_aligned(inputs) or len(self.times) <= indicator_class.get_start(*params):
+            # not enough candles: let tulipy raise as it usually does
+            outputs = tulipy_function(*inputs, *params)
+            return outputs if isinstance(outputs, tuple) else (outputs, )
+        if len(self.times) < indicator_class.get_convergence_length(*params):
+            # a series would be rebuilt at each rolling window move
+            return self.engine.compute_with_tulipy(self.exchange_id, self.symbol, self.time_frame, tulipy_function,
+                                                   params, self.times, inputs, closed=self.closed)
+        return self.engine.compute(self.exchange_id, self.symbol, self.time_frame, indicator_class, params,
+                                   self.times, inputs, closed=self.closed)
+
+    def _is_aligned(self, inputs):
+        if self.times is None:
+            return False
+        size = len(self.times)
+        if size == 0:
+            return False
+        for values in inputs:
+            if len(values) != size:
+                return False
+        return True
+
+
+def clear_evaluator_indicators(evaluator):
+    """
+    Clears the indicators of the exchange of the given evaluator, to call when the evaluator stops
+    """
+    try:
+        exchange_id = trading_api.get_exchange_id_from_matrix_id(evaluator.exchange_name, evaluator.matrix_id)
+    except KeyError:
+        # exchange is already stopped
+        exchange_id = None
+    if exchange_id is not None:
+        IncrementalIndicatorsEngine.instance().clear(exchange_id)
+
+
+def _get_inputs_identity(inputs):
+    # O(1): inputs are aligned with the same candles times
+    return tuple((values[0], values[-1]) for values in inputs)
+
+
+def _read_only(view):
+    # returned values are views on the series buffer: they should not be edited
+    view.flags.writeable = False
+    return view
@@ -0,0 +1,248 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import mock
+import numpy as np
+import pytest
+import tulipy
+
+import octobot_trading.api as trading_api
+import tentacles.Evaluator.Util as EvaluatorUtil
+
+CANDLES_COUNT = 1000
+WINDOW_SIZE = 300
+TIME_FRAME_SECONDS = 60
+
+
+@pytest.fixture
+def candles():
+    random = np.random.default_rng(42)
+    close = np.cumsum(random.normal(0, 1, CANDLES_COUNT)) + 1000
+    high = close + random.random(CANDLES_COUNT)
+    low = close - random.random(CANDLES_COUNT)
+    volume = random.random(CANDLES_COUNT) * 100
+    times = np.arange(CANDLES_COUNT, dtype=np.float64) * TIME_FRAME_SECONDS
+    return times, high, low, close, volume
+
+
+@pytest.fixture
+def engine():
+    return EvaluatorUtil.IncrementalIndicatorsEngine()
+
+
+def _indicators_cases(high, low, close, volume):
+    return [
+        ("sma", (close, ), (20, )),
+        ("ema", (close, ), (20, )),
+        ("rsi", (close, ), (14, )),
+        ("macd", (close, ), (12, 26, 9)),
+        ("macd", (close, ), (5, 10, 4)),
+        ("atr", (high, low, close), (10, )),
+        ("adx", (high, low, close), (14, )),
+        ("bbands", (close, ), (20, 2)),
+        ("stochrsi", (close, ), (14, )),
+        ("vwma", (close, volume), (20, )),
+        ("linreg", (close, ), (20, )),
+    ]
+
+
+def _as_tuple(outputs):
+    return outputs if isinstance(outputs, tuple) else (outputs, )
+
+
+def _all_series(engine):
+    return [series for series_list in engine.series.values() for series in series_list]
+
+
+def test_full_history_equals_tulipy(candles, engine):
+    times, high, low, close, volume = candles
+    for name, inputs, params in _indicators_cases(high, low, close, volume):
+        indicators = EvaluatorUtil.CandlesIndicators("exchange_id", "BTC/USDT", "1m", times, engine=engine)
+        outputs = _as_tuple(getattr(indicators, name)(*inputs, *params))
+        expected_outputs = _as_tuple(getattr(tulipy, name)(*inputs, *params))
+        assert len(outputs) == len(expected_outputs)
+        for output, expected_output in zip(outputs, expected_outputs):
+            np.testing.assert_allclose(output, expected_output, rtol=1e-10, err_msg=f"{name} {params}")
+
+
+def test_sliding_window_updates_incrementally(candles, engine):
+    times, high, low, close, volume = candles
+    for name, inputs, params in _indicators_cases(high, low, close, volume):
+        for end in range(WINDOW_SIZE, CANDLES_COUNT):
+            window = slice(end - WINDOW_SIZE, end)
+            indicators = EvaluatorUtil.CandlesIndicators("exchange_id", "BTC/USDT", "1m", times[window],
+                                                         engine=engine)
+            outputs = _as_tuple(getattr(indicators, name)(*(values[window] for values in inputs), *params))
+            expected_outputs = _as_tuple(getattr(tulipy, name)(*(values[window] for values in inputs), *params))
+            for output, expected_output in zip(outputs, expected_outputs):
+                # values computed from a longer history are only returned when equivalent to the tulipy ones
+                assert 0 < len(output) <= len(expected_output)
+                np.testing.assert_allclose(output, expected_output[len(expected_output) - len(output):], rtol=1e-3,
+                                           err_msg=f"{name} {params}")
+    # each series has only been built once
+    assert all(series.rebuilds_count == 1 for series in _all_series(engine))
+
+
+def test_rolling_window_values(candles, engine):
+    times, high, low, close, volume = candles
+    for end in (WINDOW_SIZE, WINDOW_SIZE + 1):
+        indicators = EvaluatorUtil.CandlesIndicators("exchange_id", "BTC/USDT", "1m", times[end - WINDOW_SIZE:end],
+                                                     engine=engine)
+        rsi = indicators.rsi(close[end - WINDOW_SIZE:end], 14)
+        sma = indicators.sma(close[end - WINDOW_SIZE:end], 20)
+    # first values of recursive indicators are not returned: they would differ from the tulipy ones
+    assert len(rsi) == WINDOW_SIZE - EvaluatorUtil.IncrementalRSI.get_convergence_length(14) + 1
+    np.testing.assert_allclose(rsi, tulipy.rsi(close[1:WINDOW_SIZE + 1], 14)[-len(rsi):], rtol=1e-4)
+    np.testing.assert_allclose(sma, tulipy.sma(close[1:WINDOW_SIZE + 1], 20), rtol=1e-10)
+
+
+def test_rebuild_on_gap(candles, engine):
+    times, high, low, close, volume = candles
+    indicators = EvaluatorUtil.CandlesIndicators("exchange_id", "BTC/USDT", "1m", times[:WINDOW_SIZE], engine=engine)
+    indicators.rsi(close[:WINDOW_SIZE], 14)
+    series = _all_series(engine)[0]
+    assert series.rebuilds_count == 1
+
+    # next candle
+    indicators = EvaluatorUtil.CandlesIndicators("exchange_id", "BTC/USDT", "1m", times[1:WINDOW_SIZE + 1],
+                                                 engine=engine)
+    indicators.rsi(close[1:WINDOW_SIZE + 1], 14)
+    assert series.rebuilds_count == 1
+
+    # committed candle is missing
+    indicators = EvaluatorUtil.CandlesIndicators("exchange_id", "BTC/USDT", "1m",
+                                                 times[WINDOW_SIZE + 5:WINDOW_SIZE * 2], engine=engine)
+    np.testing.assert_array_equal(indicators.rsi(close[WINDOW_SIZE + 5:WINDOW_SIZE * 2], 14),
+                                  tulipy.rsi(close[WINDOW_SIZE + 5:WINDOW_SIZE * 2], 14))
+    assert sum(series.rebuilds_count for series in _all_series(engine)) == 2
+
+
+def test_in_construction_candle_is_not_committed(candles, engine):
+    times, high, low, close, volume = candles
+    updated_close = close[:WINDOW_SIZE].copy()
+    for last_close in (close[WINDOW_SIZE - 1], close[WINDOW_SIZE - 1] * 1.1, close[WINDOW_SIZE - 1] * 0.9):
+        updated_close[-1] = last_close
+        indicators = EvaluatorUtil.CandlesIndicators("exchange_id", "BTC/USDT", "1m", times[:WINDOW_SIZE],
+                                                     include_in_construction=True, engine=engine)
+        np.testing.assert_allclose(indicators.rsi(updated_close, 14), tulipy.rsi(updated_close, 14), rtol=1e-10)
+    series, = _all_series(engine)
+    assert series.rebuilds_count == 1
+    assert series.committed_time == times[WINDOW_SIZE - 2]
+
+
+def test_not_aligned_inputs_use_tulipy(candles, engine):
+    times, high, low, close, volume = candles
+    indicators = EvaluatorUtil.CandlesIndicators("exchange_id", "BTC/USDT", "1m", times[:10], engine=engine)
+    np.testing.assert_array_equal(indicators.rsi(close, 14), tulipy.rsi(close, 14))
+    np.testing.assert_array_equal(indicators.kama(close, 14), tulipy.kama(close, 14))
+    with pytest.raises(tulipy.lib.InvalidOptionError):
+        # not enough candles
+        indicators.rsi(close[:10], 14)
+    assert engine.series == {}
+
+
+def test_different_inputs_use_their_own_series(candles, engine):
+    times, high, low, close, volume = candles
+    for end in range(WINDOW_SIZE, CANDLES_COUNT):
+        window = slice(end - WINDOW_SIZE, end)
+        indicators = EvaluatorUtil.CandlesIndicators("exchange_id", "BTC/USDT", "1m", times[window], engine=engine)
+        for values in (close, volume, high):
+            np.testing.assert_allclose(indicators.sma(values[window], 20), tulipy.sma(values[window], 20),
+                                       rtol=1e-10)
+    series_list, = engine.series.values()
+    assert len(series_list) == 3
+    assert all(series.rebuilds_count == 1 for series in series_list)
+
+    # least recently used series are rebuilt
+    for values in (low, close + 1, volume + 1):
+        indicators.sma(values[window], 20)
+    assert len(series_list) == engine.MAX_SERIES_PER_KEY
+    assert sum(series.rebuilds_count for series in series_list) == 6
+
+
+def test_short_windows_use_tulipy(candles, engine):
+    times, high, low, close, volume = candles
+    # shorter than the RSI convergence length
+    window_size = 100
+    for end in range(window_size, window_size * 2):
+        window = slice(end - window_size, end)
+        indicators = EvaluatorUtil.CandlesIndicators("exchange_id", "BTC/USDT", "1m", times[window], engine=engine)
+        np.testing.assert_array_equal(indicators.rsi(close[window], 14), tulipy.rsi(close[window], 14))
+        # still computed once per candle
+        indicators.rsi(close[window], 14)
+    assert engine.series == {}
+    assert engine.get_cache_statistics()["hits"] == window_size
+
+
+def test_indicators_are_computed_once_per_candle(candles, engine):
+    times, high, low, close, volume = candles
+    for _ in range(3):
+        indicators = EvaluatorUtil.CandlesIndicators("exchange_id", "BTC/USDT", "1m", times[:WINDOW_SIZE],
+                                                     engine=engine)
+        rsi = indicators.rsi(close[:WINDOW_SIZE], 14)
+        kama = indicators.kama(close[:WINDOW_SIZE], 14)
+    assert engine.get_cache_statistics() == {"hits": 4, "misses": 2, "cached_candles": 1}
+    np.testing.assert_array_equal(kama, tulipy.kama(close[:WINDOW_SIZE], 14))
+    with pytest.raises(ValueError):
+        # cached values are shared between evaluators: they can't be edited
+        rsi[-1] = 0
+
+    # other parameters or inputs
+    indicators.rsi(close[:WINDOW_SIZE], 10)
+    indicators.rsi(close[1:WINDOW_SIZE + 1], 14)
+    assert engine.get_cache_statistics() == {"hits": 4, "misses": 4, "cached_candles": 1}
+
+    # same last value on other inputs
+    other_close = close[:WINDOW_SIZE] + 1
+    other_close[-1] = close[WINDOW_SIZE - 1]
+    np.testing.assert_allclose(indicators.rsi(other_close, 14), tulipy.rsi(other_close, 14), rtol=1e-10)
+    assert engine.get_cache_statistics() == {"hits": 4, "misses": 5, "cached_candles": 1}
+
+    # next candle: previous candle values are evicted
+    indicators = EvaluatorUtil.CandlesIndicators("exchange_id", "BTC/USDT", "1m", times[1:WINDOW_SIZE + 1],
+                                                 engine=engine)
+    indicators.rsi(close[1:WINDOW_SIZE + 1], 14)
+    assert engine.get_cache_statistics() == {"hits": 4, "misses": 6, "cached_candles": 1}
+    assert len(engine.candle_caches[("exchange_id", "BTC/USDT", "1m")][1]) == 1
+
+    # other symbol
+    indicators = EvaluatorUtil.CandlesIndicators("exchange_id", "ETH/USDT", "1m", times[:WINDOW_SIZE], engine=engine)
+    indicators.rsi(close[:WINDOW_SIZE], 14)
+    assert engine.get_cache_statistics() == {"hits": 4, "misses": 7, "cached_candles": 2}
+    engine.clear("exchange_id")
+    assert engine.series == engine.candle_caches == {}
+
+
+def test_clear_evaluator_indicators(candles):
+    times, high, low, close, volume = candles
+    engine = EvaluatorUtil.IncrementalIndicatorsEngine.instance()
+    evaluator = mock.Mock(exchange_name="binance", matrix_id="matrix_id")
+    try:
+        for exchange_id in ("exchange_id", "other_exchange_id"):
+            EvaluatorUtil.CandlesIndicators(exchange_id, "BTC/USDT", "1m", times[:WINDOW_SIZE]).rsi(
+                close[:WINDOW_SIZE], 14)
+        with mock.patch.object(trading_api, "get_exchange_id_from_matrix_id",
+                               mock.Mock(return_value="exchange_id")) as get_exchange_id_from_matrix_id:
+            EvaluatorUtil.clear_evaluator_indicators(evaluator)
+            get_exchange_id_from_matrix_id.assert_called_once_with("binance", "matrix_id")
+        assert [key[0] for key in engine.series] == ["other_exchange_id"]
+
+        # stopped exchange
+        with mock.patch.object(trading_api, "get_exchange_id_from_matrix_id",
+                               mock.Mock(side_effect=KeyError)):
+            EvaluatorUtil.clear_evaluator_indicators(evaluator)
+        assert [key[0] for key in engine.series] == ["other_exchange_id"]
+    finally:
+        engine.clear()
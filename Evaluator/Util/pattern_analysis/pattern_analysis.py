@@ -73,10 +73,7 @@ class PatternAnalyser:
             if mean_value < 0 \
             else np.where(data < mean_value)[0]
 
-        nb_gaps = 0
-        for i in range(len(indexes_under_mean_value)-1):
-            if indexes_under_mean_value[i+1]-indexes_under_mean_value[i] > 3:
-                nb_gaps += 1
+        nb_gaps = np.count_nonzero(np.diff(indexes_under_mean_value) > 3)
 
         if nb_gaps > 1:
             return "W" if mean_value < 0 else "M"
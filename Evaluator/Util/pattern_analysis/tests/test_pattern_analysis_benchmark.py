@@ -0,0 +1,61 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import os
+import timeit
+
+import numpy as np
+import pytest
+
+from tentacles.Evaluator.Util import PatternAnalyser
+
+CANDLES_COUNT = 10000
+MIN_SPEEDUP = 5
+
+# benchmarks are timing dependant: they only run when this environment variable is set
+BENCHMARKS_ENV_VAR = "RUN_BENCHMARKS"
+benchmark = pytest.mark.skipif(not os.getenv(BENCHMARKS_ENV_VAR),
+                               reason=f"set {BENCHMARKS_ENV_VAR}=1 to run benchmarks")
+
+
+def _legacy_count_gaps(data):
+    mean_value = np.mean(data) * 0.7
+    indexes_under_mean_value = np.where(data > mean_value)[0] \
+        if mean_value < 0 \
+        else np.where(data < mean_value)[0]
+    nb_gaps = 0
+    for i in range(len(indexes_under_mean_value)-1):
+        if indexes_under_mean_value[i+1]-indexes_under_mean_value[i] > 3:
+            nb_gaps += 1
+    return nb_gaps
+
+
+def _best_time(function, *args):
+    return min(timeit.repeat(lambda: function(*args), number=1, repeat=3))
+
+
+def test_get_pattern():
+    assert PatternAnalyser.get_pattern(np.array([])) == PatternAnalyser.UNKNOWN_PATTERN
+    assert PatternAnalyser.get_pattern(np.array([1, 2, 3, 2, 1])) == "N"
+    assert PatternAnalyser.get_pattern(np.array([1, 5, 5, 5, 5, 1, 5, 5, 5, 5, 1])) == "M"
+    assert PatternAnalyser.get_pattern(-np.array([1, 5, 5, 5, 5, 1, 5, 5, 5, 5, 1])) == "W"
+    data = np.random.default_rng(42).normal(0.1, 1, CANDLES_COUNT)
+    assert PatternAnalyser.get_pattern(data) == ("M" if _legacy_count_gaps(data) > 1 else "N")
+
+
+@benchmark
+def test_get_pattern_benchmark():
+    data = np.random.default_rng(42).normal(0.1, 1, CANDLES_COUNT)
+    assert _best_time(_legacy_count_gaps, data) > MIN_SPEEDUP * _best_time(PatternAnalyser.get_pattern, data)
@@ -0,0 +1,78 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import os
+import timeit
+
+import numpy as np
+import pytest
+
+from tentacles.Evaluator.Util import TrendAnalysis
+
+CANDLES_COUNT = 10000
+MIN_SPEEDUP = 10
+
+# benchmarks are timing dependant: they only run when this environment variable is set
+BENCHMARKS_ENV_VAR = "RUN_BENCHMARKS"
+benchmark = pytest.mark.skipif(not os.getenv(BENCHMARKS_ENV_VAR),
+                               reason=f"set {BENCHMARKS_ENV_VAR}=1 to run benchmarks")
+
+
+def _legacy_get_threshold_change_indexes(data, threshold):
+    sub_threshold_indexes = np.where(data <= threshold)[0]
+    threshold_crossing_indexes = []
+    current_move_size = 1
+    for i, index in enumerate(sub_threshold_indexes):
+        if not len(threshold_crossing_indexes):
+            threshold_crossing_indexes.append(index)
+        else:
+            if threshold_crossing_indexes[-1] == index - current_move_size:
+                current_move_size += 1
+            else:
+                if sub_threshold_indexes[i-1] not in threshold_crossing_indexes:
+                    threshold_crossing_indexes.append(sub_threshold_indexes[i-1])
+                if index not in threshold_crossing_indexes:
+                    threshold_crossing_indexes.append(index)
+                current_move_size = 1
+    if len(sub_threshold_indexes) > 0 \
+            and sub_threshold_indexes[-1] < len(data) \
+            and data[-1] > threshold \
+            and sub_threshold_indexes[-1]+1 not in threshold_crossing_indexes:
+        threshold_crossing_indexes.append(sub_threshold_indexes[-1]+1)
+    return threshold_crossing_indexes
+
+
+def _best_time(function, *args):
+    return min(timeit.repeat(lambda: function(*args), number=1, repeat=3))
+
+
+def test_get_threshold_change_indexes():
+    random = np.random.default_rng(42)
+    for size in range(30):
+        data = np.round(random.normal(0, 1, size))
+        for threshold in (-1, 0, 0.5):
+            assert TrendAnalysis.get_threshold_change_indexes(data, threshold) \
+                == _legacy_get_threshold_change_indexes(data, threshold)
+    assert TrendAnalysis.get_threshold_change_indexes(np.array([1, 0, 0, 1, 2, 0, 3, 0, 0]), 0) == [1, 2, 5, 7]
+    assert TrendAnalysis.get_threshold_change_indexes(np.array([1, 0, 0, 1, 2, 0, 3, 0, 2]), 0) == [1, 2, 5, 7, 8]
+    data = np.random.default_rng(42).normal(0, 1, CANDLES_COUNT)
+    assert TrendAnalysis.get_threshold_change_indexes(data, 0) == _legacy_get_threshold_change_indexes(data, 0)
+
+
+@benchmark
+def test_get_threshold_change_indexes_benchmark():
+    data = np.random.default_rng(42).normal(0, 1, CANDLES_COUNT)
+    assert _best_time(_legacy_get_threshold_change_indexes, data, 0) \
+        > MIN_SPEEDUP * _best_time(TrendAnalysis.get_threshold_change_indexes, data, 0)
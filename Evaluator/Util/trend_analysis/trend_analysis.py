@@ -113,28 +113,24 @@ class TrendAnalysis:
 
         # sub threshold values
         sub_threshold_indexes = np.where(data <= threshold)[0]
-
-        # remove consecutive sub-threshold values because they are not crosses
-        threshold_crossing_indexes = []
-        current_move_size = 1
-        for i, index in enumerate(sub_threshold_indexes):
-            if not len(threshold_crossing_indexes):
-                threshold_crossing_indexes.append(index)
-            else:
-                if threshold_crossing_indexes[-1] == index - current_move_size:
-                    current_move_size += 1
-                else:
-                    if sub_threshold_indexes[i-1] not in threshold_crossing_indexes:
-                        threshold_crossing_indexes.append(sub_threshold_indexes[i-1])
-                    if index not in threshold_crossing_indexes:
-                        threshold_crossing_indexes.append(index)
-                    current_move_size = 1
-        # add last index if data_frame ends above threshold and last threshold_crossing_indexes inferior
-        # to data_frame size
-        if len(sub_threshold_indexes) > 0 \
-                and sub_threshold_indexes[-1] < len(data) \
-                and data[-1] > threshold \
-                and sub_threshold_indexes[-1]+1 not in threshold_crossing_indexes:
+        if not len(sub_threshold_indexes):
+            return []
+
+        # remove consecutive sub-threshold values because they are not crosses: keep the first and last index of
+        # each sub-threshold move (last index of the current move excluded)
+        move_end_positions = np.where(np.diff(sub_threshold_indexes) != 1)[0]
+        moves_starts = sub_threshold_indexes[np.concatenate(([0], move_end_positions + 1))]
+        moves_ends = sub_threshold_indexes[move_end_positions]
+        crossing_indexes = np.empty(len(moves_ends) * 2, dtype=sub_threshold_indexes.dtype)
+        crossing_indexes[0::2] = moves_starts[:-1]
+        crossing_indexes[1::2] = moves_ends
+        # single value moves start and end at the same index
+        kept_indexes = np.ones(len(crossing_indexes), dtype=bool)
+        kept_indexes[1::2] = moves_ends != moves_starts[:-1]
+        threshold_crossing_indexes = list(crossing_indexes[kept_indexes])
+        threshold_crossing_indexes.append(moves_starts[-1])
+        # add last index if data_frame ends above threshold
+        if data[-1] > threshold:
             threshold_crossing_indexes.append(sub_threshold_indexes[-1]+1)
 
         return threshold_crossing_indexes
@@ -44,6 +44,7 @@ from tentacles.Services.Interfaces.web_interface.api.trading import (
     orders,
     refresh_portfolio,
     currency_list,
+    evaluation_latency,
 )
 from tentacles.Services.Interfaces.web_interface.api.user_commands import (
     user_command,
@@ -59,6 +60,7 @@ __all__ = [
     "orders",
     "refresh_portfolio",
     "currency_list",
+    "evaluation_latency",
     "user_command",
     "get_config_currency",
     "set_config_currency",
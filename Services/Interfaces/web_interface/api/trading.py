@@ -61,6 +61,12 @@ def currency_list():
     return flask.jsonify(models.get_all_symbols_dict())
 
 
+@api.api.route("/evaluation_latency", methods=['GET'])
+@login.login_required_when_activated
+def evaluation_latency():
+    return flask.jsonify(models.get_evaluation_latency_statistics(flask.request.args.get("stage")))
+
+
 @api.api.route("/historical_portfolio_value", methods=['GET'])
 @login.login_required_when_activated
 def historical_portfolio_value():
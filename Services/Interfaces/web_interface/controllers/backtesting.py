@@ -113,6 +113,11 @@ def data_collector():
         if action_type == "delete_data_file":
             file = flask.request.get_json()
             success, reply = models.get_delete_data_file(file)
+        elif action_type == "repair_data_file":
+            file = flask.request.get_json()
+            success, reply = models.repair_data_file(file)
+            if success:
+                web_interface.send_data_collector_status()
         elif action_type == "start_collector":
             details = flask.request.get_json()
             success, reply = models.collect_data_file(details["exchange"], details["symbols"], details["time_frames"],
@@ -161,6 +166,15 @@ def data_collector():
                     return flask.jsonify([timeframe.value for timeframe in
                                           time_frame_manager.sort_time_frames(
                                               models.get_timeframes_list([exchange]))])
+                elif target == "data_files":
+                    return flask.jsonify(models.get_data_files_with_description(
+                        exchange=flask.request.args.get('exchange'),
+                        symbol=flask.request.args.get('symbol'),
+                        start_timestamp=flask.request.args.get('start_timestamp', type=int),
+                        end_timestamp=flask.request.args.get('end_timestamp', type=int),
+                        page=flask.request.args.get('page', type=int),
+                        page_size=flask.request.args.get('page_size', type=int)
+                    ))
             from_key = "from"
             if from_key in flask.request.args:
                 origin_page = flask.request.args[from_key]
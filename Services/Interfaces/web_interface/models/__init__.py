@@ -44,6 +44,7 @@ from tentacles.Services.Interfaces.web_interface.models.backtesting import (
     get_backtesting_report,
     get_latest_backtesting_run_id,
     get_delete_data_file,
+    repair_data_file,
     get_data_collector_status,
     stop_data_collector,
     collect_data_file,
@@ -122,6 +123,7 @@ from tentacles.Services.Interfaces.web_interface.models.dashboard import (
     get_watched_symbols,
     get_first_symbol_data,
     get_currency_price_graph_update,
+    get_evaluation_latency_statistics,
 )
 from tentacles.Services.Interfaces.web_interface.models.interface_settings import (
     add_watched_symbol,
@@ -195,6 +197,7 @@ __all__ = [
     "get_backtesting_report",
     "get_latest_backtesting_run_id",
     "get_delete_data_file",
+    "repair_data_file",
     "get_data_collector_status",
     "stop_data_collector",
     "collect_data_file",
@@ -256,6 +259,7 @@ __all__ = [
     "get_watched_symbol_data",
     "get_first_symbol_data",
     "get_currency_price_graph_update",
+    "get_evaluation_latency_statistics",
     "get_watched_symbols",
     "add_watched_symbol",
     "remove_watched_symbol",
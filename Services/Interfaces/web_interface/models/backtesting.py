@@ -15,6 +15,7 @@
 #  License along with this library.
 import os
 import asyncio
+import json
 import ccxt
 import threading
 
@@ -39,6 +40,11 @@ import tentacles.Services.Interfaces.web_interface.models.trading as trading_mod
 
 STOPPING_TIMEOUT = 30
 CURRENT_BOT_DATA = "current_bot_data"
+# data files descriptions are cached in this file of the backtesting data folder
+DATA_FILES_INDEX_FILE = "data_files_index.json"
+DATA_FILES_INDEX_FILE_KEY = "file_key"
+DATA_FILES_INDEX_DESCRIPTION = "description"
+_DATA_FILES_INDEX_LOCK = threading.Lock()
 
 
 def get_full_candle_history_exchange_list():
@@ -52,21 +58,144 @@ def get_other_history_exchange_list():
             exchange not in trading_constants.FULL_CANDLE_HISTORY_EXCHANGES]
 
 
-async def _get_description(data_file, files_with_description):
-    description = await backtesting_api.get_file_description(data_file)
-    if _is_usable_description(description):
-        files_with_description.append((data_file, description))
-
-
 def _is_usable_description(description):
     return description is not None \
            and description[backtesting_enums.DataFormatKeys.SYMBOLS.value] is not None \
            and description[backtesting_enums.DataFormatKeys.TIME_FRAMES.value] is not None
 
 
-async def _retrieve_data_files_with_description(files):
-    files_with_description = []
-    await asyncio.gather(*[_get_description(data_file, files_with_description) for data_file in files])
+def _get_index_description(description):
+    # time frames are saved as values in the JSON index
+    return {
+        **description,
+        backtesting_enums.DataFormatKeys.TIME_FRAMES.value:
+            [time_frame.value for time_frame in description[backtesting_enums.DataFormatKeys.TIME_FRAMES.value]]
+    }
+
+
+def _get_description_from_index(index_description):
+    # same description as backtesting_api.get_file_description
+    return {
+        **index_description,
+        backtesting_enums.DataFormatKeys.TIME_FRAMES.value:
+            [commons_enums.TimeFrames(time_frame)
+             for time_frame in index_description[backtesting_enums.DataFormatKeys.TIME_FRAMES.value]]
+    }
+
+
+def _get_data_files_index_path():
+    return os.path.join(backtesting_constants.BACKTESTING_FILE_PATH, DATA_FILES_INDEX_FILE)
+
+
+def _load_data_files_index():
+    try:
+        with open(_get_data_files_index_path()) as index_file:
+            return json.load(index_file)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        bot_logging.get_logger("DataCollectorWebInterfaceModel").warning(f"Ignored invalid data files index: {e}")
+        return {}
+
+
+def _update_data_files_index(updated_entries, removed_files=None, kept_files=None):
+    """
+    Applies changes to the data files index, reloading it first as collectors can update it from their own thread
+    :param updated_entries: index entries by data file
+    :param removed_files: data files to remove from the index
+    :param kept_files: when given, any other data file is removed from the index
+    """
+    with _DATA_FILES_INDEX_LOCK:
+        index = _load_data_files_index()
+        updated_index = {
+            data_file: entry
+            for data_file, entry in index.items()
+            if (kept_files is None or data_file in kept_files) and data_file not in (removed_files or [])
+        }
+        updated_index.update(updated_entries)
+        if updated_index == index:
+            return index
+        tmp_index_path = f"{_get_data_files_index_path()}.tmp"
+        try:
+            # write into a temporary file first to never leave a partial index
+            with open(tmp_index_path, "w") as index_file:
+                json.dump(updated_index, index_file)
+            os.replace(tmp_index_path, _get_data_files_index_path())
+        except (OSError, TypeError, ValueError) as e:
+            bot_logging.get_logger("DataCollectorWebInterfaceModel").warning(f"Can't save data files index: {e}")
+            if os.path.isfile(tmp_index_path):
+                os.remove(tmp_index_path)
+        return updated_index
+
+
+def _get_data_file_key(data_file):
+    # a data file is described again when its size or modification time changes
+    stat = os.stat(os.path.join(backtesting_constants.BACKTESTING_FILE_PATH, data_file))
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+async def _get_index_entry(data_file, file_key):
+    description = await backtesting_api.get_file_description(data_file)
+    return {
+        DATA_FILES_INDEX_FILE_KEY: file_key,
+        # unusable descriptions are also indexed to avoid opening invalid files again
+        DATA_FILES_INDEX_DESCRIPTION: _get_index_description(description)
+        if _is_usable_description(description) else None
+    }
+
+
+async def _index_data_files(files, full_listing):
+    """
+    Describes the given data files that are not in the index or changed since they were indexed
+    :param full_listing: when True, files are every available data file: other files are removed from the index
+    :return: the up-to-date index
+    """
+    index = _load_data_files_index()
+    file_keys = {}
+    for data_file in files:
+        try:
+            file_keys[data_file] = _get_data_file_key(data_file)
+        except OSError:
+            # deleted in the meantime
+            continue
+    outdated_files = [
+        data_file
+        for data_file, file_key in file_keys.items()
+        if index.get(data_file, {}).get(DATA_FILES_INDEX_FILE_KEY) != file_key
+    ]
+    entries = await asyncio.gather(*[_get_index_entry(data_file, file_keys[data_file])
+                                     for data_file in outdated_files])
+    return _update_data_files_index(dict(zip(outdated_files, entries)),
+                                    kept_files=set(file_keys) if full_listing else None)
+
+
+def _is_matching_description(description, exchange, symbol, start_timestamp, end_timestamp):
+    if exchange is not None and description[backtesting_enums.DataFormatKeys.EXCHANGE.value] != exchange:
+        return False
+    if symbol is not None and symbol not in description[backtesting_enums.DataFormatKeys.SYMBOLS.value]:
+        return False
+    # data files without start and end timestamps contain data from their recording date
+    data_start = description[backtesting_enums.DataFormatKeys.START_TIMESTAMP.value] or \
+        description[backtesting_enums.DataFormatKeys.TIMESTAMP.value]
+    data_end = description[backtesting_enums.DataFormatKeys.END_TIMESTAMP.value] or \
+        description[backtesting_enums.DataFormatKeys.TIMESTAMP.value]
+    if start_timestamp is not None and data_end < start_timestamp:
+        return False
+    if end_timestamp is not None and data_start > end_timestamp:
+        return False
+    return True
+
+
+async def _retrieve_data_files_with_description(files, exchange=None, symbol=None,
+                                                start_timestamp=None, end_timestamp=None):
+    index = await _index_data_files(files, True)
+    files_with_description = [
+        (data_file, _get_description_from_index(index[data_file][DATA_FILES_INDEX_DESCRIPTION]))
+        for data_file in files
+        if data_file in index and index[data_file][DATA_FILES_INDEX_DESCRIPTION] is not None
+        and _is_matching_description(index[data_file][DATA_FILES_INDEX_DESCRIPTION],
+                                     exchange, symbol, start_timestamp, end_timestamp)
+    ]
     return sorted(
         files_with_description,
         key=lambda f: f[1][backtesting_enums.DataFormatKeys.TIMESTAMP.value],
@@ -74,9 +203,23 @@ async def _retrieve_data_files_with_description(files):
     )
 
 
-def get_data_files_with_description():
+def get_data_files_with_description(exchange=None, symbol=None, start_timestamp=None, end_timestamp=None,
+                                    page=None, page_size=None):
+    """
+    Data files descriptions are read from the data files index: only new or updated data files are opened
+    :param start_timestamp: in seconds, only data files with data after start_timestamp are returned
+    :param end_timestamp: in seconds, only data files with data before end_timestamp are returned
+    :param page: when given with page_size, only the data files of this page (starting at 0) are returned
+    :return: (data file, description) tuples, the most recent first
+    """
     files = backtesting_api.get_all_available_data_files()
-    return interfaces_util.run_in_bot_async_executor(_retrieve_data_files_with_description(files))
+    files_with_description = interfaces_util.run_in_bot_async_executor(
+        _retrieve_data_files_with_description(files, exchange=exchange, symbol=symbol,
+                                              start_timestamp=start_timestamp, end_timestamp=end_timestamp)
+    )
+    if page is not None and page_size is not None:
+        return files_with_description[page * page_size:(page + 1) * page_size]
+    return files_with_description
 
 
 def start_backtesting_using_specific_files(files, source, reset_tentacle_config=False, run_on_common_part_only=True,
@@ -188,6 +331,7 @@ async def _collect_initialize_and_run_independent_backtesting(
             if collector_start_callback:
                 collector_start_callback()
             files = [await backtesting_api.initialize_and_run_data_collector(data_collector_instance)]
+            await _index_data_files(files, False)
         except Exception as e:
             bot_logging.get_logger("DataCollectorModel").exception(
                 e, True, f"Error when collecting historical data: {e}")
@@ -268,11 +412,56 @@ def get_latest_backtesting_run_id(trading_mode):
 def get_delete_data_file(file_name):
     deleted, error = backtesting_api.delete_data_file(file_name)
     if deleted:
+        _remove_columnar_candles_file(file_name)
+        _update_data_files_index({}, removed_files=[file_name])
         return deleted, f"{file_name} deleted"
     else:
         return deleted, f"Can't delete {file_name} ({error})"
 
 
+def _remove_columnar_candles_file(data_file):
+    import tentacles.Backtesting.importers.exchanges as importer_exchanges
+    columnar_candles_file = importer_exchanges.ColumnarCandlesFile.get_file_path(
+        os.path.join(backtesting_constants.BACKTESTING_FILE_PATH, data_file)
+    )
+    try:
+        if os.path.isfile(columnar_candles_file):
+            os.remove(columnar_candles_file)
+    except OSError as e:
+        bot_logging.get_logger("DataCollectorWebInterfaceModel").warning(
+            f"Can't delete {columnar_candles_file}: {e}"
+        )
+
+
+def repair_data_file(file_name):
+    if web_interface_root.WebInterface.tools[constants.BOT_TOOLS_DATA_COLLECTOR] is not None and \
+            not backtesting_api.is_data_collector_finished(
+                web_interface_root.WebInterface.tools[constants.BOT_TOOLS_DATA_COLLECTOR]):
+        return False, f"Can't repair {file_name} (Historical data collector is already running)"
+    description = interfaces_util.run_in_bot_async_executor(backtesting_api.get_file_description(file_name))
+    if not _is_usable_description(description):
+        return False, f"Can't repair {file_name} (invalid data file)"
+    interfaces_util.run_in_bot_main_loop(
+        _background_repair_data_file(file_name, description[backtesting_enums.DataFormatKeys.EXCHANGE.value]))
+    return True, f"{file_name} repair started."
+
+
+async def _background_repair_data_file(file_name, exchange):
+    import tentacles.Backtesting.collectors.exchanges as collector_exchanges
+    # missing candles are downloaded and duplicated candles removed by the data file exchange history collector
+    data_collector_instance = collector_exchanges.ExchangeHistoryDataCollector(
+        {},
+        exchange,
+        interfaces_util.get_bot_api().get_edited_tentacles_config(),
+        [],
+        None,
+        data_file=file_name,
+        repair_candle_gaps=True)
+    web_interface_root.WebInterface.tools[constants.BOT_TOOLS_DATA_COLLECTOR] = data_collector_instance
+    coro = _start_collect_and_notify(data_collector_instance)
+    threading.Thread(target=asyncio.run, args=(coro,), name=f"DataFileRepair{file_name}").start()
+
+
 def get_data_collector_status():
     progress = {"current_step": 0, "total_steps": 0, "current_step_percent": 0}
     if web_interface_root.WebInterface.tools[constants.BOT_TOOLS_DATA_COLLECTOR] is not None:
@@ -322,6 +511,7 @@ def get_data_files_from_current_bot(exchange_id, start_timestamp, end_timestamp,
         collected_files = interfaces_util.run_in_bot_main_loop(
             backtesting_api.initialize_and_run_data_collector(data_collector_instance)
         )
+        interfaces_util.run_in_bot_async_executor(_index_data_files([collected_files], False))
         return collected_files
     finally:
         web_interface_root.WebInterface.tools[constants.BOT_TOOLS_DATA_COLLECTOR] = None
@@ -350,7 +540,8 @@ async def _start_collect_and_notify(data_collector_instance):
     success = False
     message = "finished"
     try:
-        await backtesting_api.initialize_and_run_data_collector(data_collector_instance)
+        collected_file = await backtesting_api.initialize_and_run_data_collector(data_collector_instance)
+        await _index_data_files([collected_file], False)
         success = True
     except Exception as e:
         message = f"error: {e}"
@@ -398,6 +589,10 @@ def save_data_file(name, file):
         output_file = f"{backtesting_constants.BACKTESTING_FILE_PATH}/{name}"
         file.save(output_file)
         message = interfaces_util.run_in_bot_async_executor(_convert_into_octobot_data_file_if_necessary(output_file))
+        # index the saved or converted file
+        interfaces_util.run_in_bot_async_executor(
+            _index_data_files(backtesting_api.get_all_available_data_files(), True)
+        )
         bot_logging.get_logger("DataCollectorWebInterfaceModel").info(message)
         return True, message
     except Exception as e:
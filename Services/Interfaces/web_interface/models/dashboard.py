@@ -144,6 +144,14 @@ def get_first_symbol_data():
         return {}
 
 
+def get_evaluation_latency_statistics(stage=None):
+    try:
+        import tentacles.Evaluator.Util as EvaluatorUtil
+        return EvaluatorUtil.EvaluationLatencyTracker.instance().get_statistics(stage)
+    except ImportError:
+        return []
+
+
 def _create_candles_data(symbol, time_frame, historical_candles, kline, bot_api, list_arrays, in_backtesting,
                          ignore_trades):
     candles_key = "candles"
@@ -68,6 +68,7 @@ const max_attempts = 20;
 const price_graph_update_interval = 3000;
 const profitability_graph_update_interval = 30000;
 const portfolio_update_interval = 60000;
+const evaluation_latency_update_interval = 10000;
 
 const mobile_width_breakpoint = 1024;
 
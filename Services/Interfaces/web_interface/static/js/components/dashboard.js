@@ -242,6 +242,37 @@ function init_graphs() {
     handle_profitability(socket);
 }
 
+function update_evaluation_latency(){
+    const evaluationLatencyDiv = $("#evaluationLatency");
+    $.get({
+        url: evaluationLatencyDiv.attr(update_url_attr),
+        dataType: "json",
+        success: function(statistics, status){
+            const table = $("#evaluationLatencyTable");
+            const tableBody = table.find("tbody");
+            tableBody.empty();
+            $.each(statistics, function (i, statistic) {
+                const row = $("<tr></tr>");
+                $.each(["stage", "tentacle", "exchange", "symbol"], function (j, key) {
+                    row.append($("<td></td>").text(statistic[key]));
+                });
+                row.append($("<td></td>").text(statistic["count"]));
+                $.each(["p50", "p95", "p99", "max"], function (j, key) {
+                    row.append($("<td></td>").text(statistic[key].toFixed(2)));
+                });
+                tableBody.append(row);
+            });
+            if(statistics.length){
+                table.removeClass(disabled_item_class);
+                $("#evaluationLatencyEmpty").addClass(disabled_item_class);
+            }
+        },
+        complete: function(){
+            setTimeout(update_evaluation_latency, evaluation_latency_update_interval);
+        }
+    })
+}
+
 let update_details = [];
 let waiting_profitability_update = false;
 
@@ -252,5 +283,6 @@ $(document).ready(function() {
     get_version_upgrade();
     init_dashboard_websocket();
     init_graphs();
+    update_evaluation_latency();
     showModalIfAny($("#tutorialModal"));
 });
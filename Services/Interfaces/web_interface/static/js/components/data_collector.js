@@ -23,6 +23,13 @@ function handle_data_files_buttons(){
         const update_url = $("#dataFilesTable").attr(update_url_attr);
         send_and_interpret_bot_update(request, update_url, $(this), delete_success_callback, delete_error_callback)
     });
+    $(".repair_data_file").unbind('click');
+    $('.repair_data_file').click(function () {
+        const request = $(this).attr("data-file");
+        const update_url = $("#dataFilesTable").attr("repair-url");
+        lock_collector_ui();
+        send_and_interpret_bot_update(request, update_url, $(this), collector_success_callback, collector_error_callback)
+    });
 
 }
 
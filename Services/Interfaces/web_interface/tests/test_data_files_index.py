@@ -0,0 +1,169 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import json
+import os
+
+import mock
+import pytest
+
+import octobot_backtesting.constants as backtesting_constants
+import octobot_backtesting.enums as backtesting_enums
+import octobot_commons.enums as commons_enums
+import tentacles.Services.Interfaces.web_interface.models.backtesting as backtesting_model
+
+DESCRIPTIONS = {
+    "binance_1.data": {
+        backtesting_enums.DataFormatKeys.TIMESTAMP.value: 1600000000,
+        backtesting_enums.DataFormatKeys.VERSION.value: "1.1",
+        backtesting_enums.DataFormatKeys.EXCHANGE.value: "binance",
+        backtesting_enums.DataFormatKeys.SYMBOLS.value: ["BTC/USDT"],
+        backtesting_enums.DataFormatKeys.TIME_FRAMES.value: [commons_enums.TimeFrames.ONE_HOUR,
+                                                             commons_enums.TimeFrames.ONE_DAY],
+        backtesting_enums.DataFormatKeys.START_TIMESTAMP.value: 1590000000,
+        backtesting_enums.DataFormatKeys.END_TIMESTAMP.value: 1600000000,
+        backtesting_enums.DataFormatKeys.CANDLES_LENGTH.value: 100,
+    },
+    "binance_2.data": {
+        backtesting_enums.DataFormatKeys.TIMESTAMP.value: 1610000000,
+        backtesting_enums.DataFormatKeys.VERSION.value: "1.1",
+        backtesting_enums.DataFormatKeys.EXCHANGE.value: "binance",
+        backtesting_enums.DataFormatKeys.SYMBOLS.value: ["ETH/USDT"],
+        backtesting_enums.DataFormatKeys.TIME_FRAMES.value: [commons_enums.TimeFrames.ONE_HOUR],
+        backtesting_enums.DataFormatKeys.START_TIMESTAMP.value: 1600000000,
+        backtesting_enums.DataFormatKeys.END_TIMESTAMP.value: 1610000000,
+        backtesting_enums.DataFormatKeys.CANDLES_LENGTH.value: 100,
+    },
+    "kucoin_1.data": {
+        backtesting_enums.DataFormatKeys.TIMESTAMP.value: 1620000000,
+        backtesting_enums.DataFormatKeys.VERSION.value: "1.1",
+        backtesting_enums.DataFormatKeys.EXCHANGE.value: "kucoin",
+        backtesting_enums.DataFormatKeys.SYMBOLS.value: ["BTC/USDT"],
+        backtesting_enums.DataFormatKeys.TIME_FRAMES.value: [commons_enums.TimeFrames.FOUR_HOURS],
+        backtesting_enums.DataFormatKeys.START_TIMESTAMP.value: 1610000000,
+        backtesting_enums.DataFormatKeys.END_TIMESTAMP.value: 1620000000,
+        backtesting_enums.DataFormatKeys.CANDLES_LENGTH.value: 100,
+    },
+    "invalid.data": None,
+}
+
+
+@pytest.fixture
+def data_files(tmp_path):
+    data_path = str(tmp_path)
+    for data_file in DESCRIPTIONS:
+        with open(os.path.join(data_path, data_file), "w") as f:
+            f.write("data")
+    with mock.patch.object(backtesting_constants, "BACKTESTING_FILE_PATH", data_path), \
+            mock.patch.object(backtesting_model.backtesting_api, "get_all_available_data_files",
+                              mock.Mock(side_effect=lambda: list(DESCRIPTIONS))), \
+            mock.patch.object(backtesting_model.backtesting_api, "get_file_description",
+                              mock.AsyncMock(side_effect=lambda data_file: DESCRIPTIONS[data_file])) \
+            as get_file_description_mock, \
+            mock.patch.object(backtesting_model.interfaces_util, "run_in_bot_async_executor",
+                              mock.Mock(side_effect=asyncio.run)):
+        yield data_path, get_file_description_mock
+
+
+def _described_files(get_file_description_mock):
+    described_files = sorted(call.args[0] for call in get_file_description_mock.call_args_list)
+    get_file_description_mock.reset_mock()
+    return described_files
+
+
+def test_get_data_files_with_description_index_hit(data_files):
+    data_path, get_file_description_mock = data_files
+    expected_files = [
+        (data_file, DESCRIPTIONS[data_file])
+        for data_file in ("kucoin_1.data", "binance_2.data", "binance_1.data")
+    ]
+    assert backtesting_model.get_data_files_with_description() == expected_files
+    assert _described_files(get_file_description_mock) == sorted(DESCRIPTIONS)
+    assert os.listdir(data_path).count(backtesting_model.DATA_FILES_INDEX_FILE) == 1
+    assert f"{backtesting_model.DATA_FILES_INDEX_FILE}.tmp" not in os.listdir(data_path)
+    # time frames are saved as values
+    with open(os.path.join(data_path, backtesting_model.DATA_FILES_INDEX_FILE)) as index_file:
+        assert json.load(index_file)["binance_1.data"][backtesting_model.DATA_FILES_INDEX_DESCRIPTION][
+                   backtesting_enums.DataFormatKeys.TIME_FRAMES.value] == ["1h", "1d"]
+
+    # indexed descriptions are the same as fresh ones
+    assert backtesting_model.get_data_files_with_description() == expected_files
+    assert _described_files(get_file_description_mock) == []
+
+
+def test_get_data_files_with_description_index_invalidation(data_files):
+    data_path, get_file_description_mock = data_files
+    backtesting_model.get_data_files_with_description()
+    _described_files(get_file_description_mock)
+
+    # size change
+    with open(os.path.join(data_path, "binance_1.data"), "a") as f:
+        f.write("more data")
+    # modification time change
+    stat = os.stat(os.path.join(data_path, "kucoin_1.data"))
+    os.utime(os.path.join(data_path, "kucoin_1.data"), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+    assert len(backtesting_model.get_data_files_with_description()) == 3
+    assert _described_files(get_file_description_mock) == ["binance_1.data", "kucoin_1.data"]
+
+
+def test_get_data_files_with_description_deleted_files(data_files):
+    data_path, get_file_description_mock = data_files
+    backtesting_model.get_data_files_with_description()
+    os.remove(os.path.join(data_path, "binance_2.data"))
+    with mock.patch.object(backtesting_model.backtesting_api, "get_all_available_data_files",
+                           mock.Mock(return_value=["binance_1.data", "kucoin_1.data", "invalid.data"])):
+        assert [data_file for data_file, _ in backtesting_model.get_data_files_with_description()] == \
+               ["kucoin_1.data", "binance_1.data"]
+    assert "binance_2.data" not in backtesting_model._load_data_files_index()
+
+    columnar_candles_file = os.path.join(data_path, "kucoin_1.data.candles")
+    with open(columnar_candles_file, "w") as f:
+        f.write("candles")
+    with mock.patch.object(backtesting_model.backtesting_api, "delete_data_file",
+                           mock.Mock(return_value=(True, None))):
+        assert backtesting_model.get_delete_data_file("kucoin_1.data")[0]
+    assert sorted(backtesting_model._load_data_files_index()) == ["binance_1.data", "invalid.data"]
+    assert not os.path.isfile(columnar_candles_file)
+
+
+def test_get_data_files_with_description_filters_and_pages(data_files):
+    assert [data_file for data_file, _ in backtesting_model.get_data_files_with_description(exchange="binance")] == \
+           ["binance_2.data", "binance_1.data"]
+    assert [data_file for data_file, _ in backtesting_model.get_data_files_with_description(symbol="BTC/USDT")] == \
+           ["kucoin_1.data", "binance_1.data"]
+    assert [data_file
+            for data_file, _ in backtesting_model.get_data_files_with_description(start_timestamp=1605000000,
+                                                                                  end_timestamp=1615000000)] == \
+           ["kucoin_1.data", "binance_2.data"]
+    assert [data_file for data_file, _ in backtesting_model.get_data_files_with_description(page=0, page_size=2)] == \
+           ["kucoin_1.data", "binance_2.data"]
+    assert [data_file for data_file, _ in backtesting_model.get_data_files_with_description(page=1, page_size=2)] == \
+           ["binance_1.data"]
+    assert backtesting_model.get_data_files_with_description(page=2, page_size=2) == []
+
+
+def test_update_data_files_index_save_error(data_files):
+    data_path, _ = data_files
+    updated_entries = {
+        "binance_1.data": {
+            backtesting_model.DATA_FILES_INDEX_FILE_KEY: [1, 1],
+            backtesting_model.DATA_FILES_INDEX_DESCRIPTION: DESCRIPTIONS["binance_1.data"]
+        }
+    }
+    # time frames enums are not serializable
+    assert backtesting_model._update_data_files_index(updated_entries) == updated_entries
+    assert os.listdir(data_path).count(backtesting_model.DATA_FILES_INDEX_FILE) == 0
+    assert f"{backtesting_model.DATA_FILES_INDEX_FILE}.tmp" not in os.listdir(data_path)
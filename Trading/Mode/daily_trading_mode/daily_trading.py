@@ -32,6 +32,7 @@ import octobot_trading.errors as trading_errors
 import octobot_trading.modes as trading_modes
 import octobot_trading.enums as trading_enums
 import octobot_trading.api as trading_api
+import tentacles.Evaluator.Util as EvaluatorUtil
 
 
 class DailyTradingMode(trading_modes.AbstractTradingMode):
@@ -281,6 +282,7 @@ class DailyTradingModeConsumer(trading_modes.AbstractTradingModeConsumer):
                                   f"Set it to 100 to buy anyway.")
         return trading_constants.ZERO
 
+    @EvaluatorUtil.timed_stage(EvaluatorUtil.EvaluationLatencyTracker.ORDERS_CREATION, completes_pipeline=True)
     async def create_new_orders(self, symbol, final_note, state, **kwargs):
         data = kwargs.get("data", {})
         user_price = data.get(self.PRICE_KEY, trading_constants.ZERO)
@@ -451,6 +453,7 @@ class DailyTradingModeProducer(trading_modes.AbstractTradingModeProducer):
     def _get_delta_risk(self):
         return self.RISK_THRESHOLD * self.exchange_manager.trader.risk
 
+    @EvaluatorUtil.timed_stage(EvaluatorUtil.EvaluationLatencyTracker.STATE_CREATION)
     async def create_state(self, cryptocurrency: str, symbol: str):
         delta_risk = self._get_delta_risk()
 
@@ -40,6 +40,7 @@ class GridTradingMode(staggered_orders_trading.StaggeredOrdersTradingMode):
     CONFIG_BUY_ORDERS_COUNT = "buy_orders_count"
     CONFIG_SELL_ORDERS_COUNT = "sell_orders_count"
     LIMIT_ORDERS_IF_NECESSARY = "limit_orders_if_necessary"
+    CONFIG_CANCEL_UNMATCHED_OPEN_ORDERS = "cancel_unmatched_open_orders"
     USER_COMMAND_CREATE_ORDERS = "create initial orders"
     USER_COMMAND_STOP_ORDERS_CREATION = "stop initial orders creation"
     USER_COMMAND_PAUSE_ORDER_MIRRORING = "pause orders mirroring"
@@ -121,6 +122,7 @@ class GridTradingModeProducer(staggered_orders_trading.StaggeredOrdersTradingMod
 
     def __init__(self, channel, config, trading_mode, exchange_manager):
         self.buy_orders_count = self.sell_orders_count = None
+        self.cancel_unmatched_open_orders = False
         self.sell_price_range = AllowedPriceRange()
         self.buy_price_range = AllowedPriceRange()
         super().__init__(channel, config, trading_mode, exchange_manager)
@@ -155,12 +157,21 @@ class GridTradingModeProducer(staggered_orders_trading.StaggeredOrdersTradingMod
                                                                        self.use_existing_orders_only)
         self.mirror_order_delay = self.symbol_trading_config.get(self.trading_mode.CONFIG_MIRROR_ORDER_DELAY,
                                                                  self.mirror_order_delay)
+        self.cancel_unmatched_open_orders = self.symbol_trading_config.get(
+            self.trading_mode.CONFIG_CANCEL_UNMATCHED_OPEN_ORDERS,
+            self.cancel_unmatched_open_orders
+        )
 
     async def _handle_staggered_orders(self, current_price, ignore_mirror_orders_only, ignore_available_funds):
         self._init_allowed_price_ranges(current_price)
         if ignore_mirror_orders_only or not self.use_existing_orders_only:
             buy_orders, sell_orders = await self._generate_staggered_orders(current_price, ignore_available_funds)
             grid_orders = self._merged_and_sort_not_virtual_orders(buy_orders, sell_orders)
+            # keep open orders that are already part of the grid, other open orders within the grid range can be
+            # manual or mirror orders: only cancel them when configured to
+            grid_orders, to_cancel_orders = self._get_orders_delta(grid_orders, self.cancel_unmatched_open_orders)
+            if to_cancel_orders:
+                await self._cancel_orders(to_cancel_orders)
             async with self.exchange_manager.exchange_personal_data.portfolio_manager.portfolio.lock:
                 await self._create_not_virtual_orders(grid_orders, current_price)
 
@@ -183,9 +194,8 @@ class GridTradingModeProducer(staggered_orders_trading.StaggeredOrdersTradingMod
                                   f"using pair(s): {interfering_orders_pairs}. Configure funds to use for each pairs "
                                   f"to be able to use interfering pairs.")
                 return [], []
-        existing_orders = order_manager.get_open_orders(self.symbol)
-
-        sorted_orders = sorted(existing_orders, key=lambda order: order.origin_price)
+        self.sorted_orders.sync(order_manager.get_open_orders(self.symbol))
+        sorted_orders = self.sorted_orders
 
         state = self.NEW
         missing_orders = []
@@ -270,6 +270,75 @@ async def test_create_orders_with_fixed_volume_per_order():
         assert created_sell_orders[0] is created_orders[0]
         assert all(o.origin_quantity == producer.buy_volume_per_order for o in created_buy_orders)
         assert all(o.origin_quantity == producer.sell_volume_per_order for o in created_sell_orders)
+
+        # refreshing the grid keeps its open orders
+        await producer._ensure_staggered_orders()
+        await asyncio.create_task(_wait_for_orders_creation(27))
+        assert trading_api.get_open_orders(exchange_manager) == created_orders
+    finally:
+        await _stop(exchange_manager)
+
+
+async def test_get_orders_delta():
+    exchange_manager = None
+    try:
+        symbol = "BTC/USDT"
+        producer, _, exchange_manager = await _get_tools(symbol)
+        producer.buy_volume_per_order = decimal.Decimal("0.1")
+        producer.sell_volume_per_order = decimal.Decimal("0.3")
+        trading_api.force_set_mark_price(exchange_manager, symbol, 4000)
+        await producer._ensure_staggered_orders()
+        await asyncio.create_task(_check_open_orders_count(exchange_manager, producer.sell_orders_count + 2))
+        sell_orders = [o for o in trading_api.get_open_orders(exchange_manager)
+                       if o.side is trading_enums.TradeOrderSide.SELL]
+        assert [o.origin_price for o in sell_orders[:4]] == [4005, 4010, 4015, 4020]
+        producer.sorted_orders.sync(trading_api.get_open_orders(exchange_manager))
+
+        side = trading_enums.TradeOrderSide.SELL
+        orders = [
+            # within half an increment from the 4005 order
+            staggered_orders_trading.OrderData(side, decimal.Decimal("0.3"), decimal.Decimal(4006), symbol, False),
+            # bigger than the 4010 order
+            staggered_orders_trading.OrderData(side, decimal.Decimal(1), decimal.Decimal(4010), symbol, False),
+            staggered_orders_trading.OrderData(side, decimal.Decimal("0.29"), decimal.Decimal(4017), symbol, False),
+        ]
+        assert producer._get_orders_delta(orders, False) == ([orders[1]], [])
+        # open orders within the orders price range matching no order are cancelled
+        assert producer._get_orders_delta(orders, True) == ([orders[1]], [sell_orders[1], sell_orders[3]])
+        assert producer._get_orders_delta([], True) == ([], [])
+    finally:
+        await _stop(exchange_manager)
+
+
+async def test_refresh_grid_unmatched_open_orders():
+    exchange_manager = None
+    try:
+        symbol = "BTC/USDT"
+        # enough BTC for 3 grids of sell orders
+        producer, _, exchange_manager = await _get_tools(symbol, btc_holdings=20)
+        producer.buy_volume_per_order = decimal.Decimal("0.1")
+        producer.sell_volume_per_order = decimal.Decimal("0.1")
+        trading_api.force_set_mark_price(exchange_manager, symbol, 4000)
+        await producer._ensure_staggered_orders()
+        await asyncio.create_task(_check_open_orders_count(exchange_manager, producer.sell_orders_count + 2))
+        sell_orders = [o for o in trading_api.get_open_orders(exchange_manager)
+                       if o.side is trading_enums.TradeOrderSide.SELL]
+
+        # open sell orders are now too small to be part of the grid
+        producer.sell_volume_per_order = decimal.Decimal("0.2")
+        assert producer.cancel_unmatched_open_orders is False
+        # by default, unmatched open orders are kept: they can be manual or mirror orders
+        await producer._ensure_staggered_orders()
+        await asyncio.create_task(_wait_for_orders_creation(producer.sell_orders_count))
+        open_orders = trading_api.get_open_orders(exchange_manager)
+        assert all(order in open_orders for order in sell_orders)
+
+        producer.sell_volume_per_order = decimal.Decimal("0.3")
+        producer.cancel_unmatched_open_orders = True
+        await producer._ensure_staggered_orders()
+        await asyncio.create_task(_wait_for_orders_creation(2 * producer.sell_orders_count))
+        open_orders = trading_api.get_open_orders(exchange_manager)
+        assert not any(order in open_orders for order in sell_orders)
     finally:
         await _stop(exchange_manager)
 
@@ -1 +1,3 @@
-from .staggered_orders_trading import StaggeredOrdersTradingMode
\ No newline at end of file
+from .staggered_orders_trading import StaggeredOrdersTradingMode
+from .orders_price_index import OrdersPriceIndex
+from .virtual_orders_book import VirtualOrdersBook
@@ -0,0 +1,140 @@
+# Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import bisect
+
+
+class OrdersPriceIndex:
+    """
+    Orders (or trades) sorted by origin price. Prices are kept in a list parallel to the orders list: orders are
+    added and removed by bisection and the orders around a price are found in O(log n) instead of walking every order.
+    Iterating, indexing and len() work like on a list of orders sorted by origin price.
+    """
+
+    def __init__(self, orders=None):
+        self._prices = []
+        self._orders = []
+        # id() of the indexed orders
+        self._keys = set()
+        # order_id: order of the indexed orders that have an order_id
+        self._orders_by_id = {}
+        if orders:
+            self._set_orders(orders)
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __iter__(self):
+        return iter(self._orders)
+
+    def __getitem__(self, item):
+        return self._orders[item]
+
+    def __contains__(self, order):
+        return self._find(order) is not None
+
+    def add(self, order):
+        # orders at the same price are kept in insertion order
+        index = bisect.bisect_right(self._prices, order.origin_price)
+        self._prices.insert(index, order.origin_price)
+        self._orders.insert(index, order)
+        self._keys.add(id(order))
+        order_id = getattr(order, "order_id", None)
+        if order_id is not None:
+            self._orders_by_id[order_id] = order
+
+    def remove(self, order):
+        """
+        :return: True when the order was indexed
+        """
+        index = self._find(order)
+        if index is None:
+            return False
+        del self._prices[index]
+        del self._orders[index]
+        self._keys.discard(id(order))
+        order_id = getattr(order, "order_id", None)
+        if self._orders_by_id.get(order_id) is order:
+            self._orders_by_id.pop(order_id)
+        return True
+
+    def remove_order_id(self, order_id):
+        """
+        :return: True when an order with this order_id was indexed
+        """
+        order = self._orders_by_id.get(order_id)
+        return order is not None and self.remove(order)
+
+    def get_order(self, order_id):
+        return self._orders_by_id.get(order_id)
+
+    def sync(self, orders):
+        """
+        Updates the index to contain the given orders only: orders already in the index are not moved
+        :return: True when the index changed
+        """
+        orders_by_key = {id(order): order for order in orders}
+        removed_orders = [order for order in self._orders if id(order) not in orders_by_key]
+        added_orders = [order for key, order in orders_by_key.items() if key not in self._keys]
+        if len(removed_orders) + len(added_orders) > len(orders_by_key) // 2:
+            # most orders changed: sorting again is faster
+            self._set_orders(orders_by_key.values())
+        else:
+            for order in removed_orders:
+                self.remove(order)
+            for order in added_orders:
+                self.add(order)
+        return bool(removed_orders or added_orders)
+
+    def get_neighbours(self, price):
+        """
+        :return: the last order priced at or below price and the first order priced above price, None when there is
+        no such order
+        """
+        index = bisect.bisect_right(self._prices, price)
+        return self._orders[index - 1] if index > 0 else None, \
+            self._orders[index] if index < len(self._orders) else None
+
+    def has_order_between(self, lower_price, upper_price):
+        index = bisect.bisect_left(self._prices, lower_price)
+        return index < len(self._prices) and self._prices[index] <= upper_price
+
+    def get_orders_between(self, lower_price, upper_price):
+        return self._orders[bisect.bisect_left(self._prices, lower_price):
+                            bisect.bisect_right(self._prices, upper_price)]
+
+    def _set_orders(self, orders):
+        self._orders = sorted(orders, key=lambda order: order.origin_price)
+        self._prices = [order.origin_price for order in self._orders]
+        self._keys = set(id(order) for order in self._orders)
+        self._orders_by_id = {
+            order.order_id: order
+            for order in self._orders
+            if getattr(order, "order_id", None) is not None
+        }
+
+    def _find(self, order):
+        if id(order) not in self._keys:
+            return None
+        index = bisect.bisect_left(self._prices, order.origin_price)
+        while index < len(self._orders) and self._prices[index] == order.origin_price:
+            if self._orders[index] is order:
+                return index
+            index += 1
+        # the order price changed since it was indexed
+        for index, indexed_order in enumerate(self._orders):
+            if indexed_order is order:
+                return index
+        return None
@@ -19,6 +19,7 @@ import dataclasses
 import math
 import asyncio
 import decimal
+import os
 
 import async_channel.constants as channel_constants
 import octobot_commons.constants as commons_constants
@@ -31,6 +32,8 @@ import octobot_trading.constants as trading_constants
 import octobot_trading.enums as trading_enums
 import octobot_trading.personal_data as trading_personal_data
 import octobot_trading.errors as trading_errors
+import tentacles.Trading.Mode.staggered_orders_trading_mode.orders_price_index as orders_price_index
+import tentacles.Trading.Mode.staggered_orders_trading_mode.virtual_orders_book as virtual_orders_book
 
 
 class StrategyModes(enum.Enum):
@@ -155,6 +158,7 @@ class StaggeredOrdersTradingMode(trading_modes.AbstractTradingMode):
 
     async def _order_notification_callback(self, exchange, exchange_id, cryptocurrency, symbol, order,
                                            is_new, is_from_bot):
+        self.producers[0].update_sorted_orders(order)
         if order[
             trading_enums.ExchangeConstantsOrderColumns.STATUS.value] == trading_enums.OrderStatus.FILLED.value and is_from_bot:
             async with self.producers[0].get_lock():
@@ -170,8 +174,11 @@ class StaggeredOrdersTradingMode(trading_modes.AbstractTradingMode):
 
 class StaggeredOrdersTradingModeConsumer(trading_modes.AbstractTradingModeConsumer):
     ORDER_DATA_KEY = "order_data"
+    ORDERS_DATA_KEY = "orders_data"
     CURRENT_PRICE_KEY = "current_price"
     SYMBOL_MARKET_KEY = "symbol_market"
+    # max orders simultaneously sent to (or cancelled on) the exchange
+    ORDERS_CONCURRENCY = 10
 
     def __init__(self, trading_mode):
         super().__init__(trading_mode)
@@ -191,12 +198,64 @@ class StaggeredOrdersTradingModeConsumer(trading_modes.AbstractTradingModeConsum
         # use dict default getter: can't afford missing data
         data = kwargs["data"]
         if not self.skip_orders_creation:
-            order_data = data[self.ORDER_DATA_KEY]
             current_price = data[self.CURRENT_PRICE_KEY]
             symbol_market = data[self.SYMBOL_MARKET_KEY]
+            if self.ORDERS_DATA_KEY in data:
+                return await self.create_orders(data[self.ORDERS_DATA_KEY], current_price, symbol_market)
+            order_data = data[self.ORDER_DATA_KEY]
             return await self.create_order(order_data, current_price, symbol_market)
         else:
-            self.logger.info(f"Skipped {data.get(self.ORDER_DATA_KEY, '')}")
+            self.logger.info(f"Skipped {data.get(self.ORDER_DATA_KEY, data.get(self.ORDERS_DATA_KEY, ''))}")
+
+    async def create_orders(self, orders_data, current_price, symbol_market):
+        """
+        Creates orders_data orders by groups of concurrently created orders, groups are created in orders_data order.
+        An order creation failure does not prevent the other orders creation.
+        :return: the created orders in orders_data order
+        """
+        created_orders = []
+        concurrency = self._get_orders_concurrency()
+        for group_start in range(0, len(orders_data), concurrency):
+            if self.skip_orders_creation:
+                self.logger.info(f"Skipped {len(orders_data) - group_start} orders creation")
+                break
+            results = await asyncio.gather(
+                *(self.create_order(order_data, current_price, symbol_market)
+                  for order_data in orders_data[group_start:group_start + concurrency]),
+                return_exceptions=True
+            )
+            for order_data, result in zip(orders_data[group_start:group_start + concurrency], results):
+                if isinstance(result, Exception):
+                    # orders of this group might have been created: don't let the whole group be created again
+                    self.logger.error(f"Failed to create order : {result}. Order: {order_data}")
+                elif result:
+                    created_orders += result
+        return created_orders
+
+    async def cancel_orders(self, orders):
+        """
+        Cancels orders by groups of concurrently cancelled orders, groups are cancelled in orders order.
+        An order cancel failure does not prevent the other orders cancel.
+        :return: the cancelled orders
+        """
+        cancelled_orders = []
+        concurrency = self._get_orders_concurrency()
+        for group_start in range(0, len(orders), concurrency):
+            group = orders[group_start:group_start + concurrency]
+            results = await asyncio.gather(
+                *(self.exchange_manager.trader.cancel_order(order) for order in group),
+                return_exceptions=True
+            )
+            for order, result in zip(group, results):
+                if isinstance(result, Exception):
+                    self.logger.error(f"Failed to cancel order : {result}. Order: {order}")
+                elif result:
+                    cancelled_orders.append(order)
+        return cancelled_orders
+
+    def _get_orders_concurrency(self):
+        # simulated orders are instantly created: keep the exact orders creation order
+        return 1 if self.exchange_manager.trader.simulate else self.ORDERS_CONCURRENCY
 
     async def create_order(self, order_data, current_price, symbol_market):
         created_order = None
@@ -249,6 +308,10 @@ class StaggeredOrdersTradingModeProducer(trading_modes.AbstractTradingModeProduc
     # when True, orders creation/health check will be performed on start()
     SCHEDULE_ORDERS_CREATION_ON_START = True
     ORDERS_DESC = "staggered"
+    # open orders smaller than their target order quantity by more than this ratio are replaced on refresh
+    ORDERS_QUANTITY_TOLERANCE = decimal.Decimal("0.1")
+    # virtual orders are saved in this folder to be restored on restart
+    VIRTUAL_ORDERS_FOLDER = os.path.join(commons_constants.USER_FOLDER, "staggered_orders")
     # keep track of available funds in order placement process to avoid spending multiple times
     # the same funds due to async between producers and consumers and the possibility to trade multiple pairs with
     # shared quote or base
@@ -271,6 +334,10 @@ class StaggeredOrdersTradingModeProducer(trading_modes.AbstractTradingModeProduc
         self.scheduled_health_check = None
         self.sell_volume_per_order = self.buy_volume_per_order = self.starting_price = trading_constants.ZERO
         self.mirror_orders_tasks = []
+        # open orders of self.symbol by price, updated on orders notifications and refreshes
+        self.sorted_orders = orders_price_index.OrdersPriceIndex()
+        # orders further than self.operational_depth, created when an open order is missing
+        self.virtual_orders = virtual_orders_book.VirtualOrdersBook()
 
         self.healthy = False
 
@@ -344,6 +411,8 @@ class StaggeredOrdersTradingModeProducer(trading_modes.AbstractTradingModeProduc
 
     async def start(self) -> None:
         await super().start()
+        if self.healthy:
+            self._load_virtual_orders()
         if StaggeredOrdersTradingModeProducer.SCHEDULE_ORDERS_CREATION_ON_START and self.healthy:
             await self._ensure_staggered_orders_and_reschedule()
 
@@ -450,6 +519,34 @@ class StaggeredOrdersTradingModeProducer(trading_modes.AbstractTradingModeProduc
                 asyncio.create_task,
                 self._lock_portfolio_and_create_order_when_possible(new_order, filled_price)
             ))
+        # filled order is not in self.sorted_orders anymore and its mirror order might not be created yet
+        if len(self.virtual_orders) and len(self.sorted_orders) + 1 < self.operational_depth:
+            await self._create_next_virtual_order(
+                trading_enums.TradeOrderSide.BUY if now_selling else trading_enums.TradeOrderSide.SELL, filled_price
+            )
+
+    async def _create_next_virtual_order(self, side, filled_price):
+        next_order = self.virtual_orders.pop_next_order(side, filled_price)
+        if next_order is not None:
+            price, quantity = next_order
+            self.logger.debug(f"Creating virtual order at {price} for {self.symbol}")
+            async with self.exchange_manager.exchange_personal_data.portfolio_manager.portfolio.lock:
+                await self._create_order(OrderData(side, quantity, price, self.symbol, False), filled_price)
+            self._save_virtual_orders()
+
+    def update_sorted_orders(self, order):
+        order_id = order[trading_enums.ExchangeConstantsOrderColumns.ID.value]
+        try:
+            order_instance = self.exchange_manager.exchange_personal_data.orders_manager.get_order(order_id)
+        except KeyError:
+            order_instance = None
+        if order_instance is not None and order_instance.is_open():
+            if order_instance not in self.sorted_orders:
+                # the order might have been indexed under a previous instance
+                self.sorted_orders.remove_order_id(order_id)
+                self.sorted_orders.add(order_instance)
+        else:
+            self.sorted_orders.remove_order_id(order_id)
 
     def _compute_mirror_order_volume(self, now_selling, filled_price, target_price, filled_volume):
         # use target volumes if set
@@ -485,6 +582,8 @@ class StaggeredOrdersTradingModeProducer(trading_modes.AbstractTradingModeProduc
             async with self.exchange_manager.exchange_personal_data.portfolio_manager.portfolio.lock:
                 buy_orders, sell_orders = await self._generate_staggered_orders(current_price, ignore_available_funds)
                 staggered_orders = self._merged_and_sort_not_virtual_orders(buy_orders, sell_orders)
+                # only missing orders are generated: other open orders are kept
+                staggered_orders, _ = self._get_orders_delta(staggered_orders, False)
                 await self._create_not_virtual_orders(staggered_orders, current_price)
 
     def _ensure_current_price_in_limit_parameters(self, current_price):
@@ -518,15 +617,15 @@ class StaggeredOrdersTradingModeProducer(trading_modes.AbstractTradingModeProduc
                               f"interfering orders using pair(s): {interfering_orders_pairs}. "
                               f"{self.ORDERS_DESC.capitalize()} orders require no other orders in both quote and base.")
             return [], []
-        existing_orders = order_manager.get_open_orders(self.symbol)
-
-        sorted_orders = sorted(existing_orders, key=lambda order: order.origin_price)
+        # only orders that changed since the last refresh are moved in the index
+        self.sorted_orders.sync(order_manager.get_open_orders(self.symbol))
+        sorted_orders = self.sorted_orders
 
         recent_trades_time = trading_api.get_exchange_current_time(
             self.exchange_manager) - self.RECENT_TRADES_ALLOWED_TIME
-        recently_closed_trades = trading_api.get_trade_history(self.exchange_manager, symbol=self.symbol,
-                                                               since=recent_trades_time)
-        recently_closed_trades = sorted(recently_closed_trades, key=lambda trade: trade.origin_price)
+        recently_closed_trades = orders_price_index.OrdersPriceIndex(
+            trading_api.get_trade_history(self.exchange_manager, symbol=self.symbol, since=recent_trades_time)
+        )
 
         missing_orders, state, candidate_flat_increment = self._analyse_current_orders_situation(sorted_orders,
                                                                                                  recently_closed_trades)
@@ -541,6 +640,8 @@ class StaggeredOrdersTradingModeProducer(trading_modes.AbstractTradingModeProduc
 
         if state == self.NEW:
             self._set_virtual_orders(buy_orders, sell_orders, self.operational_depth)
+            self.virtual_orders.set_orders([order for order in buy_orders + sell_orders if order.is_virtual])
+            self._save_virtual_orders()
 
         return buy_orders, sell_orders
 
@@ -582,6 +683,8 @@ class StaggeredOrdersTradingModeProducer(trading_modes.AbstractTradingModeProduc
     def _analyse_current_orders_situation(self, sorted_orders, recently_closed_trades):
         if not sorted_orders:
             return None, self.NEW, None
+        if not isinstance(recently_closed_trades, orders_price_index.OrdersPriceIndex):
+            recently_closed_trades = orders_price_index.OrdersPriceIndex(recently_closed_trades)
         # check if orders are staggered orders
         return self._bootstrap_parameters(sorted_orders, recently_closed_trades)
 
@@ -622,17 +725,9 @@ class StaggeredOrdersTradingModeProducer(trading_modes.AbstractTradingModeProduc
                 missing_orders_around_spread = []
                 for missing_order_price, missing_order_side in missing_orders:
                     if missing_order_side == side:
-                        previous_o = None
-                        following_o = None
-                        for o in sorted_orders:
-                            if previous_o is None:
-                                previous_o = o
-                            elif o.origin_price > missing_order_price:
-                                following_o = o
-                                break
-                            else:
-                                previous_o = o
-                        if previous_o.side == following_o.side:
+                        previous_o, following_o = sorted_orders.get_neighbours(missing_order_price)
+                        if previous_o is not None and following_o is not None \
+                                and previous_o.side == following_o.side:
                             decimal_missing_order_price = decimal.Decimal(str(missing_order_price))
                             # missing order between similar orders
                             quantity = min(data_util.mean([previous_o.origin_quantity, following_o.origin_quantity]),
@@ -891,10 +986,7 @@ class StaggeredOrdersTradingModeProducer(trading_modes.AbstractTradingModeProduc
             return len(recently_closed_trades)
         else:
             inc = self.flat_spread * decimal.Decimal("1.5")
-            for trade in recently_closed_trades:
-                if trade.origin_price - inc <= price <= trade.origin_price + inc:
-                    return True
-        return False
+            return recently_closed_trades.has_order_between(price - inc, price + inc)
 
     @staticmethod
     def _spread_in_recently_closed_order(min_amount, max_amount, sorted_closed_orders):
@@ -909,6 +1001,52 @@ class StaggeredOrdersTradingModeProducer(trading_modes.AbstractTradingModeProduc
         return StaggeredOrdersTradingModeProducer._filter_virtual_order(sell_orders) + \
                StaggeredOrdersTradingModeProducer._filter_virtual_order(buy_orders)
 
+    def _get_orders_delta(self, orders, cancel_unmatched_orders):
+        """
+        Matches orders with open orders of the same side at the same price (within half an increment) and with a
+        similar or bigger quantity.
+        :param orders: the not virtual orders to create
+        :param cancel_unmatched_orders: when True, open orders within the orders price range that are matching no
+        order are to be cancelled
+        :return: the orders that are matching no open order and the open orders to cancel
+        """
+        tolerance = self.flat_increment / 2 if self.flat_increment else trading_constants.ZERO
+        matched_orders = set()
+        to_create_orders = []
+        for order in orders:
+            min_quantity = order.quantity * (1 - self.ORDERS_QUANTITY_TOLERANCE)
+            candidates = [
+                open_order
+                for open_order in self.sorted_orders.get_orders_between(order.price - tolerance, order.price + tolerance)
+                if open_order.side is order.side and id(open_order) not in matched_orders
+                and open_order.origin_quantity >= min_quantity
+            ]
+            if candidates:
+                matched_orders.add(id(min(candidates, key=lambda o: abs(o.origin_price - order.price))))
+            else:
+                to_create_orders.append(order)
+        to_cancel_orders = []
+        if cancel_unmatched_orders:
+            for side in (trading_enums.TradeOrderSide.SELL, trading_enums.TradeOrderSide.BUY):
+                side_prices = [order.price for order in orders if order.side is side]
+                if side_prices:
+                    to_cancel_orders += [
+                        open_order
+                        for open_order in self.sorted_orders.get_orders_between(min(side_prices) - tolerance,
+                                                                                max(side_prices) + tolerance)
+                        if open_order.side is side and id(open_order) not in matched_orders
+                    ]
+        if len(to_create_orders) < len(orders) or to_cancel_orders:
+            self.logger.info(f"Keeping {len(orders) - len(to_create_orders)} open {self.ORDERS_DESC} orders for "
+                             f"{self.symbol}: creating {len(to_create_orders)} and cancelling {len(to_cancel_orders)} "
+                             f"orders.")
+        return to_create_orders, to_cancel_orders
+
+    async def _cancel_orders(self, orders):
+        # portfolio lock is acquired by orders cancel: never call this method when holding it
+        for order in await self.trading_mode.consumers[0].cancel_orders(orders):
+            self.sorted_orders.remove(order)
+
     @staticmethod
     def _filter_virtual_order(orders):
         return [order for order in orders if not order.is_virtual]
@@ -1086,9 +1224,28 @@ class StaggeredOrdersTradingModeProducer(trading_modes.AbstractTradingModeProduc
                                              state=state,
                                              data=data)
 
+    async def _create_orders_batch(self, orders, current_price):
+        data = {
+            StaggeredOrdersTradingModeConsumer.ORDERS_DATA_KEY: orders,
+            StaggeredOrdersTradingModeConsumer.CURRENT_PRICE_KEY: current_price,
+            StaggeredOrdersTradingModeConsumer.SYMBOL_MARKET_KEY: self.symbol_market,
+        }
+        state = trading_enums.EvaluatorStates.LONG if orders[0].side is trading_enums.TradeOrderSide.BUY \
+            else trading_enums.EvaluatorStates.SHORT
+        await self.submit_trading_evaluation(cryptocurrency=self.trading_mode.cryptocurrency,
+                                             symbol=self.trading_mode.symbol,
+                                             time_frame=None,
+                                             state=state,
+                                             data=data)
+
     async def _create_not_virtual_orders(self, orders_to_create, current_price):
+        # one batch per side (checked against this side funds by the consumer), closest to price orders first
+        for side in (trading_enums.TradeOrderSide.SELL, trading_enums.TradeOrderSide.BUY):
+            side_orders = sorted((order for order in orders_to_create if order.side is side),
+                                 key=lambda o: abs(o.price - current_price))
+            if side_orders:
+                await self._create_orders_batch(side_orders, current_price)
         for order in orders_to_create:
-            await self._create_order(order, current_price)
             quote, base = symbol_util.split_symbol(order.symbol)
             # keep track of the required funds
             volume = order.quantity if order.side is trading_enums.TradeOrderSide.SELL \
@@ -1116,6 +1273,38 @@ class StaggeredOrdersTradingModeProducer(trading_modes.AbstractTradingModeProduc
     def get_should_cancel_loaded_orders(cls):
         return False
 
+    def _get_virtual_orders_file_path(self):
+        return os.path.join(self.VIRTUAL_ORDERS_FOLDER,
+                            f"{self.exchange_manager.exchange_name}_{self.symbol.replace('/', '_')}.npz")
+
+    def _get_virtual_orders_parameters(self):
+        # virtual orders are only valid for the configuration they have been generated with
+        return {
+            "mode": self.mode.value,
+            "spread": str(self.spread),
+            "increment": str(self.increment),
+            "lowest_buy": str(self.lowest_buy),
+            "highest_sell": str(self.highest_sell),
+            "operational_depth": self.operational_depth,
+        }
+
+    def _save_virtual_orders(self):
+        if trading_api.get_is_backtesting(self.exchange_manager):
+            return
+        try:
+            self.virtual_orders.save(self._get_virtual_orders_file_path(), self._get_virtual_orders_parameters())
+        except OSError as e:
+            self.logger.exception(e, True, f"Error when saving {self.symbol} virtual orders: {e}")
+
+    def _load_virtual_orders(self):
+        if trading_api.get_is_backtesting(self.exchange_manager):
+            return
+        try:
+            if self.virtual_orders.load(self._get_virtual_orders_file_path(), self._get_virtual_orders_parameters()):
+                self.logger.info(f"Loaded {len(self.virtual_orders)} {self.symbol} virtual orders")
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.exception(e, True, f"Error when loading {self.symbol} virtual orders: {e}")
+
     def _remove_from_available_funds(self, currency, amount) -> None:
         StaggeredOrdersTradingModeProducer.AVAILABLE_FUNDS[self.exchange_manager.id][currency] = \
             StaggeredOrdersTradingModeProducer.AVAILABLE_FUNDS[self.exchange_manager.id][currency] - amount
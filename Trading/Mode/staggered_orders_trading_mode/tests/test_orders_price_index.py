@@ -0,0 +1,86 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import decimal
+import random
+
+import octobot_trading.enums as trading_enums
+import tentacles.Trading.Mode.staggered_orders_trading_mode.orders_price_index as orders_price_index
+
+
+class _Order:
+    def __init__(self, order_id, price, side=trading_enums.TradeOrderSide.BUY):
+        self.order_id = order_id
+        self.origin_price = decimal.Decimal(str(price))
+        self.side = side
+
+
+def _sorted_prices(orders):
+    return sorted(order.origin_price for order in orders)
+
+
+def test_add_and_remove():
+    rand = random.Random(42)
+    orders = [_Order(order_id, rand.randint(1, 300)) for order_id in range(200)]
+    index = orders_price_index.OrdersPriceIndex(orders[:100])
+    for order in orders[100:]:
+        index.add(order)
+    assert len(index) == len(orders)
+    assert [order.origin_price for order in index] == _sorted_prices(orders)
+    assert index[0].origin_price == min(order.origin_price for order in orders)
+    assert all(order in index for order in orders)
+
+    for order in orders[::2]:
+        assert index.remove(order)
+    assert not index.remove(orders[0])
+    assert index.remove_order_id(orders[1].order_id)
+    assert not index.remove_order_id(orders[1].order_id)
+    assert index.get_order(orders[3].order_id) is orders[3]
+    remaining_orders = orders[3::2]
+    assert sorted(id(order) for order in index) == sorted(id(order) for order in remaining_orders)
+    assert [order.origin_price for order in index] == _sorted_prices(remaining_orders)
+
+    # the order price changed since it was indexed
+    orders[3].origin_price = decimal.Decimal(1000)
+    assert index.remove(orders[3])
+    assert orders[3] not in index
+
+
+def test_sync():
+    orders = [_Order(order_id, 100 + order_id) for order_id in range(50)]
+    index = orders_price_index.OrdersPriceIndex(orders)
+    assert not index.sync(orders)
+    updated_orders = orders[5:] + [_Order(100, 99.5), _Order(101, 120.5)]
+    assert index.sync(updated_orders)
+    assert [order.origin_price for order in index] == _sorted_prices(updated_orders)
+    assert index.get_order(0) is None
+    assert index.get_order(101).origin_price == decimal.Decimal("120.5")
+    # most orders changed
+    assert index.sync(orders[:3])
+    assert list(index) == orders[:3]
+
+
+def test_neighbours_and_price_ranges():
+    sell = trading_enums.TradeOrderSide.SELL
+    orders = [_Order(1, 90), _Order(2, 95), _Order(3, 100), _Order(4, 110, sell), _Order(5, 120, sell)]
+    index = orders_price_index.OrdersPriceIndex(reversed(orders))
+    assert index.get_neighbours(decimal.Decimal(97)) == (orders[1], orders[2])
+    assert index.get_neighbours(decimal.Decimal(100)) == (orders[2], orders[3])
+    assert index.get_neighbours(decimal.Decimal(80)) == (None, orders[0])
+    assert index.get_neighbours(decimal.Decimal(130)) == (orders[4], None)
+    assert index.has_order_between(decimal.Decimal(96), decimal.Decimal(100))
+    assert not index.has_order_between(decimal.Decimal(101), decimal.Decimal(109))
+    assert index.get_orders_between(decimal.Decimal(95), decimal.Decimal(110)) == orders[1:4]
+    assert orders_price_index.OrdersPriceIndex().get_neighbours(decimal.Decimal(1)) == (None, None)
@@ -0,0 +1,157 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import asyncio
+import contextlib
+import decimal
+import os
+import time
+import tracemalloc
+
+import mock
+import pytest
+
+import octobot_commons.asyncio_tools as asyncio_tools
+import octobot_commons.logging as logging
+import octobot_trading.api as trading_api
+import octobot_trading.personal_data as trading_personal_data
+import tentacles.Trading.Mode.staggered_orders_trading_mode.staggered_orders_trading as staggered_orders_trading
+from tentacles.Trading.Mode.staggered_orders_trading_mode.tests import test_staggered_orders_trading_mode
+
+# benchmarks are long and timing dependant: they only run when this environment variable is set
+BENCHMARKS_ENV_VAR = "RUN_BENCHMARKS"
+# All test coroutines will be treated as marked.
+pytestmark = [
+    pytest.mark.asyncio,
+    pytest.mark.skipif(not os.getenv(BENCHMARKS_ENV_VAR), reason=f"set {BENCHMARKS_ENV_VAR}=1 to run benchmarks"),
+]
+
+SYMBOL = "BTC/USD"
+PRICE = decimal.Decimal(1000)
+ORDERS_COUNTS = [10, 100, 1000, 5000]
+SCALING_REFERENCE_ORDERS_COUNT = 100
+MEASURES_COUNT = 3
+MAX_GENERATION_TIME_PER_ORDER = 0.001
+MAX_REFRESH_TIME_PER_ORDER = 0.01
+BASE_ALLOCATED_BYTES = 512 * 1024
+MAX_ALLOCATED_BYTES_PER_ORDER = 10 * 1024
+# orders generation time per order at the largest orders count compared to SCALING_REFERENCE_ORDERS_COUNT
+MAX_SCALING_RATIO = 3
+ORDERS_CREATION_TIMEOUT = 60
+
+
+def _get_logger():
+    return logging.get_logger("StaggeredOrdersBenchmark")
+
+
+@contextlib.asynccontextmanager
+async def _producer(orders_count):
+    # funds are large enough for orders to never be limited by the available funds
+    async with test_staggered_orders_trading_mode._get_tools(
+            SYMBOL, btc_holdings=orders_count, additional_portfolio={"USD": orders_count * 1000}
+    ) as tools:
+        producer, consumer, exchange_manager = tools
+        producer.mode = staggered_orders_trading.StrategyModes.NEUTRAL
+        producer.lowest_buy = PRICE / 2
+        producer.highest_sell = PRICE * 3 / 2
+        # orders_count orders between lowest_buy and highest_sell, half of them being virtual orders
+        producer.increment = decimal.Decimal(1) / orders_count
+        producer.spread = producer.increment * 2
+        producer.operational_depth = orders_count // 2
+        trading_api.force_set_mark_price(exchange_manager, SYMBOL, PRICE)
+        _, _, _, _, producer.symbol_market = await trading_personal_data.get_pre_order_data(exchange_manager,
+                                                                                            symbol=SYMBOL,
+                                                                                            timeout=1)
+        producer._refresh_symbol_data(producer.symbol_market)
+        yield producer, consumer, exchange_manager
+
+
+async def _measure_orders_generation(producer):
+    durations = []
+    for _ in range(MEASURES_COUNT):
+        start = time.perf_counter()
+        buy_orders, sell_orders = await producer._generate_staggered_orders(PRICE, False)
+        durations.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        await producer._generate_staggered_orders(PRICE, False)
+        _, allocated_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return buy_orders, sell_orders, min(durations), allocated_bytes
+
+
+async def _wait_for_open_orders(exchange_manager, orders_count):
+    start = time.perf_counter()
+    while len(trading_api.get_open_orders(exchange_manager)) < orders_count \
+            and time.perf_counter() - start < ORDERS_CREATION_TIMEOUT:
+        await asyncio_tools.wait_asyncio_next_cycle()
+    return len(trading_api.get_open_orders(exchange_manager))
+
+
+@pytest.mark.parametrize("orders_count", ORDERS_COUNTS)
+async def test_orders_generation_benchmark(orders_count):
+    async with _producer(orders_count) as (producer, _, _):
+        buy_orders, sell_orders, duration, allocated_bytes = await _measure_orders_generation(producer)
+        generated_orders_count = len(buy_orders) + len(sell_orders)
+        _get_logger().info(f"{generated_orders_count} orders generated in {round(duration * 1000, 3)}ms, "
+                           f"{allocated_bytes} bytes allocated")
+        assert orders_count * 0.9 <= generated_orders_count <= orders_count * 1.1
+        # closest to price orders are not virtual
+        assert len(producer._merged_and_sort_not_virtual_orders(buy_orders, sell_orders)) \
+            == producer.operational_depth
+        assert duration < MAX_GENERATION_TIME_PER_ORDER * generated_orders_count, \
+            f"{generated_orders_count} orders generated in {duration}s"
+        assert allocated_bytes < BASE_ALLOCATED_BYTES + MAX_ALLOCATED_BYTES_PER_ORDER * generated_orders_count, \
+            f"{allocated_bytes} bytes allocated to generate {generated_orders_count} orders"
+
+
+async def test_orders_generation_scaling():
+    durations_per_order = []
+    for orders_count in (SCALING_REFERENCE_ORDERS_COUNT, ORDERS_COUNTS[-1]):
+        async with _producer(orders_count) as (producer, _, _):
+            buy_orders, sell_orders, duration, _ = await _measure_orders_generation(producer)
+            durations_per_order.append(duration / (len(buy_orders) + len(sell_orders)))
+    reference_duration, duration = durations_per_order
+    _get_logger().info(f"{round(duration * 1000, 6)}ms per order for {ORDERS_COUNTS[-1]} orders, "
+                       f"{round(reference_duration * 1000, 6)}ms per order for {SCALING_REFERENCE_ORDERS_COUNT} orders")
+    assert duration < MAX_SCALING_RATIO * reference_duration, \
+        f"{duration}s per order for {ORDERS_COUNTS[-1]} orders, {reference_duration}s per order for " \
+        f"{SCALING_REFERENCE_ORDERS_COUNT} orders"
+
+
+@pytest.mark.parametrize("orders_count", ORDERS_COUNTS)
+async def test_orders_refresh_benchmark(orders_count):
+    async with _producer(orders_count) as (producer, consumer, exchange_manager):
+        with mock.patch.object(consumer, "create_order", mock.AsyncMock(wraps=consumer.create_order)) \
+                as create_order_mock:
+            start = time.perf_counter()
+            await producer._ensure_staggered_orders()
+            assert await _wait_for_open_orders(exchange_manager, producer.operational_depth) \
+                == producer.operational_depth
+            duration = time.perf_counter() - start
+            _get_logger().info(f"{producer.operational_depth} orders created in {round(duration, 3)}s with "
+                               f"{create_order_mock.call_count} exchange calls")
+            # one exchange call per created order
+            assert create_order_mock.call_count == producer.operational_depth
+            assert duration < MAX_REFRESH_TIME_PER_ORDER * producer.operational_depth, \
+                f"{producer.operational_depth} orders created in {duration}s"
+
+            # open orders are already complete: no exchange call
+            create_order_mock.reset_mock()
+            await producer._ensure_staggered_orders()
+            await asyncio.create_task(test_staggered_orders_trading_mode._wait_for_orders_creation(10))
+            create_order_mock.assert_not_called()
+            assert len(trading_api.get_open_orders(exchange_manager)) == producer.operational_depth
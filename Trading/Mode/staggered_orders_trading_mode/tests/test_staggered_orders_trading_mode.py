@@ -33,6 +33,7 @@ import octobot_trading.enums as trading_enums
 import octobot_trading.exchanges as exchanges
 import octobot_trading.personal_data as trading_personal_data
 import octobot_trading.constants as trading_constants
+import octobot_trading.errors as trading_errors
 import tentacles.Trading.Mode.staggered_orders_trading_mode.staggered_orders_trading as staggered_orders_trading
 import tests.test_utils.config as test_utils_config
 import tests.test_utils.memory_check_util as memory_check_util
@@ -565,6 +566,8 @@ async def test_create_orders_from_different_markets():
 
         original_orders = copy.copy(trading_api.get_open_orders(exchange_manager))
         assert len(original_orders) == producer.operational_depth
+        virtual_orders_count = expected_buy_count + expected_sell_count - producer.operational_depth
+        assert len(producer.virtual_orders) == virtual_orders_count
 
         # test trigger refresh
         trading_api.force_set_mark_price(exchange_manager, producer.symbol, 0.0024161)
@@ -574,6 +577,18 @@ async def test_create_orders_from_different_markets():
         assert original_orders[0] is trading_api.get_open_orders(exchange_manager)[0]
         assert original_orders[-1] is trading_api.get_open_orders(exchange_manager)[-1]
         assert len(trading_api.get_open_orders(exchange_manager)) == producer.operational_depth
+        assert len(producer.virtual_orders) == virtual_orders_count
+
+        # the next virtual buy order is created under the lowest buy order
+        lowest_buy_order = min((o for o in original_orders if o.side is trading_enums.TradeOrderSide.BUY),
+                               key=lambda o: o.origin_price)
+        await producer._create_next_virtual_order(trading_enums.TradeOrderSide.BUY, lowest_buy_order.origin_price)
+        await asyncio.create_task(_wait_for_orders_creation(2))
+        open_orders = trading_api.get_open_orders(exchange_manager)
+        assert len(open_orders) == producer.operational_depth + 1
+        assert open_orders[-1].side is trading_enums.TradeOrderSide.BUY
+        assert open_orders[-1].origin_price < lowest_buy_order.origin_price
+        assert len(producer.virtual_orders) == virtual_orders_count - 1
 
 
 async def test_create_orders_from_different_very_close_refresh():
@@ -1292,6 +1307,46 @@ async def test_create_new_orders():
             await consumer.create_new_orders(symbol, None, None)
 
 
+async def test_create_orders():
+    symbol = "BTC/USD"
+    async with _get_tools(symbol) as tools:
+        producer, consumer, exchange_manager = tools
+        _, _, _, _, symbol_market = await trading_personal_data.get_pre_order_data(exchange_manager,
+                                                                                   symbol=producer.symbol,
+                                                                                   timeout=1)
+        producer.symbol_market = symbol_market
+        producer._refresh_symbol_data(symbol_market)
+        side = trading_enums.TradeOrderSide.BUY
+        orders_data = [
+            staggered_orders_trading.OrderData(side, decimal.Decimal(1), decimal.Decimal(price), symbol, False)
+            for price in (99, 98, 97, 2000, 96)
+        ]
+        origin_create_order = consumer.create_order
+
+        async def _create_order(order_data, current_price, symbol_market):
+            if order_data is orders_data[1]:
+                raise trading_errors.MissingFunds
+            return await origin_create_order(order_data, current_price, symbol_market)
+
+        with mock.patch.object(consumer, "create_order", mock.AsyncMock(side_effect=_create_order)) \
+                as create_order_mock, \
+                mock.patch.object(consumer, "_get_orders_concurrency", mock.Mock(return_value=2)):
+            created_orders = await consumer.create_orders(orders_data, decimal.Decimal(100), symbol_market)
+            assert create_order_mock.call_count == len(orders_data)
+        # failed and missing funds orders are skipped, other orders are created in orders_data order
+        assert [order.origin_price for order in created_orders] == [decimal.Decimal(price) for price in (99, 97, 96)]
+
+        # orders creation is cancelled between groups
+        consumer.skip_orders_creation = True
+        assert await consumer.create_orders(orders_data, decimal.Decimal(100), symbol_market) == []
+        consumer.skip_orders_creation = False
+
+        assert await consumer.cancel_orders(created_orders[1:2]) == created_orders[1:2]
+        # already cancelled orders are skipped
+        assert await consumer.cancel_orders(created_orders) == [created_orders[0], created_orders[2]]
+        assert trading_api.get_open_orders(exchange_manager) == []
+
+
 async def test_ensure_current_price_in_limit_parameters():
     symbol = "BTC/USD"
     async with _get_tools(symbol) as tools:
@@ -0,0 +1,80 @@
+#  Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import decimal
+
+import octobot_trading.enums as trading_enums
+import tentacles.Trading.Mode.staggered_orders_trading_mode.staggered_orders_trading as staggered_orders_trading
+import tentacles.Trading.Mode.staggered_orders_trading_mode.virtual_orders_book as virtual_orders_book
+
+SYMBOL = "BTC/USD"
+BUY = trading_enums.TradeOrderSide.BUY
+SELL = trading_enums.TradeOrderSide.SELL
+PARAMETERS = {"mode": "neutral", "increment": "0.01"}
+
+
+def _orders():
+    return [
+        staggered_orders_trading.OrderData(side, decimal.Decimal(quantity), decimal.Decimal(price), SYMBOL, True)
+        for side, price, quantity in ((SELL, "130", "1"), (BUY, "70.5", "2"), (BUY, "80", "1.5"),
+                                      (SELL, "120", "1.25"), (BUY, "60", "3"), (SELL, "110", "1"))
+    ]
+
+
+def test_set_orders():
+    book = virtual_orders_book.VirtualOrdersBook()
+    assert len(book) == 0
+    book.set_orders(_orders())
+    assert len(book) == 6
+    assert book.get_count(BUY) == book.get_count(SELL) == 3
+    assert book.get_orders(BUY) == [(decimal.Decimal("60"), decimal.Decimal("3")),
+                                    (decimal.Decimal("70.5"), decimal.Decimal("2")),
+                                    (decimal.Decimal("80"), decimal.Decimal("1.5"))]
+    book.clear()
+    assert len(book) == 0
+
+
+def test_pop_next_order():
+    book = virtual_orders_book.VirtualOrdersBook()
+    book.set_orders(_orders())
+    # closest to the spread orders first
+    assert book.pop_next_order(BUY, decimal.Decimal(90)) == (decimal.Decimal("80"), decimal.Decimal("1.5"))
+    assert book.pop_next_order(SELL, decimal.Decimal(100)) == (decimal.Decimal("110"), decimal.Decimal("1"))
+    # orders further than price
+    assert book.pop_next_order(BUY, decimal.Decimal("70.5")) == (decimal.Decimal("60"), decimal.Decimal("3"))
+    assert book.pop_next_order(BUY, decimal.Decimal(60)) is None
+    assert book.pop_next_order(SELL, decimal.Decimal(125)) == (decimal.Decimal("130"), decimal.Decimal("1"))
+    assert book.pop_next_order(SELL, decimal.Decimal(130)) is None
+    assert book.get_orders(BUY) == [(decimal.Decimal("70.5"), decimal.Decimal("2"))]
+    assert book.get_orders(SELL) == [(decimal.Decimal("120"), decimal.Decimal("1.25"))]
+    assert len(book) == 2
+
+
+def test_save_and_load(tmp_path):
+    file_path = str(tmp_path / "virtual_orders" / "binance_BTC_USD.npz")
+    book = virtual_orders_book.VirtualOrdersBook()
+    assert not book.load(file_path, PARAMETERS)
+    book.set_orders(_orders())
+    book.pop_next_order(SELL, decimal.Decimal(100))
+    book.save(file_path, PARAMETERS)
+
+    loaded_book = virtual_orders_book.VirtualOrdersBook()
+    # virtual orders of other parameters are not loaded
+    assert not loaded_book.load(file_path, {**PARAMETERS, "increment": "0.02"})
+    assert len(loaded_book) == 0
+    assert loaded_book.load(file_path, PARAMETERS)
+    assert len(loaded_book) == 5
+    for side in (BUY, SELL):
+        assert loaded_book.get_orders(side) == book.get_orders(side)
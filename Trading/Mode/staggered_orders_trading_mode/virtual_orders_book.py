@@ -0,0 +1,126 @@
+# Drakkar-Software OctoBot-Tentacles
+#  Copyright (c) Drakkar-Software, All rights reserved.
+#
+#  This library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 3.0 of the License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library.
+import decimal
+import json
+import os
+
+import numpy as np
+
+import octobot_trading.enums as trading_enums
+
+
+class VirtualOrdersBook:
+    """
+    Virtual orders stored as price sorted float64 price and quantity arrays, one pair of arrays by side.
+    The next virtual order of a side is found by bisection and removing the virtual orders that are the closest
+    to the real orders (the usual case) only moves the arrays bounds.
+    """
+    SIDES = (trading_enums.TradeOrderSide.BUY, trading_enums.TradeOrderSide.SELL)
+    PARAMETERS_KEY = "parameters"
+
+    def __init__(self):
+        self._prices = {side: np.empty(0, dtype=np.float64) for side in self.SIDES}
+        self._quantities = {side: np.empty(0, dtype=np.float64) for side in self.SIDES}
+
+    def __len__(self):
+        return sum(len(prices) for prices in self._prices.values())
+
+    def get_count(self, side):
+        return len(self._prices[side])
+
+    def get_orders(self, side):
+        """
+        :return: the (price, quantity) of the side virtual orders sorted by price
+        """
+        return [
+            (self._to_decimal(price), self._to_decimal(quantity))
+            for price, quantity in zip(self._prices[side], self._quantities[side])
+        ]
+
+    def set_orders(self, orders):
+        """
+        Replaces the virtual orders
+        :param orders: orders with side, price and quantity attributes
+        """
+        for side in self.SIDES:
+            side_orders = sorted((order.price, order.quantity) for order in orders if order.side is side)
+            self._prices[side] = np.array([float(price) for price, _ in side_orders], dtype=np.float64)
+            self._quantities[side] = np.array([float(quantity) for _, quantity in side_orders], dtype=np.float64)
+
+    def clear(self):
+        self.set_orders([])
+
+    def pop_next_order(self, side, price):
+        """
+        Removes the virtual order of this side that is the closest to price while being further from the spread:
+        the highest buy order under price or the lowest sell order over price
+        :return: the (price, quantity) of the removed order, None when there is no such order
+        """
+        prices = self._prices[side]
+        if side is trading_enums.TradeOrderSide.BUY:
+            index = int(np.searchsorted(prices, float(price), side="left")) - 1
+            if index < 0:
+                return None
+        else:
+            index = int(np.searchsorted(prices, float(price), side="right"))
+            if index >= len(prices):
+                return None
+        order = (self._to_decimal(prices[index]), self._to_decimal(self._quantities[side][index]))
+        if index == len(prices) - 1:
+            self._prices[side] = prices[:-1]
+            self._quantities[side] = self._quantities[side][:-1]
+        elif index == 0:
+            self._prices[side] = prices[1:]
+            self._quantities[side] = self._quantities[side][1:]
+        else:
+            self._prices[side] = np.delete(prices, index)
+            self._quantities[side] = np.delete(self._quantities[side], index)
+        return order
+
+    def save(self, file_path, parameters):
+        """
+        Saves the virtual orders into file_path
+        :param parameters: json serializable parameters the virtual orders have been generated with
+        """
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        arrays = {self.PARAMETERS_KEY: np.array(json.dumps(parameters))}
+        for side in self.SIDES:
+            arrays[f"{side.value}_prices"] = self._prices[side]
+            arrays[f"{side.value}_quantities"] = self._quantities[side]
+        # write a complete file or nothing
+        tmp_file_path = f"{file_path}.tmp"
+        with open(tmp_file_path, "wb") as tmp_file:
+            np.savez(tmp_file, **arrays)
+        os.replace(tmp_file_path, file_path)
+
+    def load(self, file_path, parameters):
+        """
+        Loads the virtual orders saved in file_path when they have been generated with the same parameters
+        :return: True when virtual orders are loaded
+        """
+        if not os.path.isfile(file_path):
+            return False
+        with np.load(file_path, allow_pickle=False) as arrays:
+            if json.loads(str(arrays[self.PARAMETERS_KEY])) != parameters:
+                return False
+            for side in self.SIDES:
+                self._prices[side] = arrays[f"{side.value}_prices"].astype(np.float64)
+                self._quantities[side] = arrays[f"{side.value}_quantities"].astype(np.float64)
+        return True
+
+    @staticmethod
+    def _to_decimal(value):
+        return decimal.Decimal(repr(float(value)))